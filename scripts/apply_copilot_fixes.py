@@ -14,6 +14,8 @@ Safety:
 - Creates backups before modifying files
 - Only applies SAFE fixes by default
 - Generates a detailed change report
+- Writes all modified files at the end, atomically: if any write fails,
+  no file is changed
 """
 
 import json
@@ -29,6 +31,8 @@ script_dir = Path(__file__).parent
 src_dir = script_dir.parent / "src"
 sys.path.insert(0, str(src_dir))
 
+from utils.atomic_writer import AtomicFileWriter, AtomicWriteError
+from utils.file_utils import FileUtils
 from utils.logger import logger
 
 
@@ -51,6 +55,9 @@ class DirectFixApplicator:
         if backup:
             self.backup_dir.mkdir(parents=True, exist_ok=True)
 
+        # Fixed contents not written yet; later fixes to a file build on them
+        self._pending: Dict[Path, str] = {}
+
     def apply_fixes(
         self, instructions: List[Dict], safety_filter: str = "safe"
     ) -> Dict:
@@ -135,9 +142,33 @@ class DirectFixApplicator:
                     }
                 )
 
+        self._write_pending(results)
         results["files_modified"] = list(results["files_modified"])
         return results
 
+    def _write_pending(self, results: Dict):
+        """Write all fixed files in one batch, or none of them"""
+        writer = AtomicFileWriter(
+            journal_dir=str(
+                FileUtils.project_cache_dir(self.project_path) / "write-journal"
+            )
+        )
+        for file_path, content in self._pending.items():
+            writer.add(file_path, content)
+        self._pending = {}
+
+        try:
+            writer.commit()
+        except AtomicWriteError as e:
+            logger.error(f"Could not write fixed files, none were changed: {e}")
+            for detail in results["details"]:
+                if detail["status"] == "applied":
+                    detail["status"] = "failed"
+                    detail["reason"] = str(e)
+            results["failed"] += results["applied"]
+            results["applied"] = 0
+            results["files_modified"] = set()
+
     def _apply_single_fix(self, instruction: Dict) -> bool:
         """
         Apply a single fix using Copilot prompt or rule-specific logic.
@@ -156,8 +187,8 @@ class DirectFixApplicator:
             logger.warning(f"File not found: {file_path}")
             return False
 
-        # Backup file
-        if self.backup:
+        # Backup file (once, before its first fix)
+        if self.backup and file_path not in self._pending:
             # For backup, use relative path from project_path
             if Path(file_path_str).is_absolute():
                 try:
@@ -174,25 +205,25 @@ class DirectFixApplicator:
             backup_file.parent.mkdir(parents=True, exist_ok=True)
             shutil.copy2(file_path, backup_file)
 
-        # Read file
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
+        # Read file, including fixes already applied to it
+        content = self._pending.get(file_path)
+        if content is None:
+            with open(file_path, "r", encoding="utf-8") as f:
+                content = f.read()
 
         # Try Copilot prompt-based fix first (if available)
         if "prompt" in instruction:
             fixed_content = self._apply_copilot_fix(content, instruction)
             if fixed_content and fixed_content != content:
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(fixed_content)
+                self._pending[file_path] = fixed_content
                 return True
 
         # Fallback to rule-specific fix for hardcoded patterns
         fixed_content = self._apply_rule_fix(rule_id, content, instruction)
 
         if fixed_content and fixed_content != content:
-            # Write fixed content
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(fixed_content)
+            # Written with the other fixed files by apply_fixes
+            self._pending[file_path] = fixed_content
             return True
 
         return False
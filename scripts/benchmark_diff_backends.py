@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Benchmark diff backends on a spec rewritten by yaml.dump
+
+Generates a synthetic OpenAPI spec with comments and quoted values, rewrites
+it the way a full yaml.dump fix does (comments dropped, quoting and key
+layout changed), then times DiffGenerator's backends on the result:
+
+- difflib: difflib.SequenceMatcher (the previous implementation)
+- myers: linear-space Myers over interned lines
+- patience: unique-line anchors with Myers between them
+
+Usage:
+    python scripts/benchmark_diff_backends.py [--lines 20000] [--repeat 3]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+script_dir = Path(__file__).parent
+src_dir = script_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from autofix.diff_backends import unified_diff
+import yaml
+
+BACKENDS = ["difflib", "myers", "patience"]
+
+PATH_TEMPLATE = """  # Account {n}
+  /userAccounts{n}/{{accountId}}:
+    get:
+      operationId: getUserAccount{n}
+      parameters:
+      - name: accountId
+        in: path
+        required: true
+        schema:
+          type: "string"
+      responses:
+        "200":
+          description: "OK"
+        "404":
+          description: "Not found"
+"""
+
+
+def build_spec(target_lines: int) -> str:
+    """Build a synthetic spec of roughly target_lines lines"""
+    count = max(1, target_lines // PATH_TEMPLATE.count("\n"))
+    paths = "".join(PATH_TEMPLATE.format(n=n) for n in range(count))
+    return f"openapi: 3.0.0\ninfo:\n  title: Benchmark\n  version: '1'\npaths:\n{paths}"
+
+
+def rewrite(content: str) -> str:
+    """Rename the paths and re-dump the whole spec"""
+    spec = yaml.safe_load(content)
+    spec["paths"] = {
+        path.replace("userAccounts", "user-accounts"): item
+        for path, item in spec["paths"].items()
+    }
+    return yaml.dump(spec, default_flow_style=False, sort_keys=False)
+
+
+def best_of(repeat: int, func, *args):
+    """Best wall time of several runs, and the last result"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=20000, help="Spec size")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per backend")
+    args = parser.parse_args()
+
+    original = build_spec(args.lines)
+    fixed = rewrite(original)
+    a = original.splitlines(keepends=True)
+    b = fixed.splitlines(keepends=True)
+    print(f"Spec: {len(a)} lines -> {len(b)} lines after yaml.dump")
+
+    baseline = None
+    for backend in BACKENDS:
+        elapsed, (lines, additions, deletions) = best_of(
+            args.repeat, unified_diff, a, b, "a/api.yaml", "b/api.yaml", 3, "", backend
+        )
+        baseline = baseline or elapsed
+        print(
+            f"{backend:<9} {elapsed:8.3f}s  {baseline / elapsed:5.1f}x  "
+            f"+{additions} -{deletions}  ({len(lines)} diff lines)"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark spec fixes: chained fixers vs. the single-parse pipeline
+
+Generates a synthetic OpenAPI spec (about 10k lines by default) that trips
+eight spec rules, then times:
+
+- chained: each fix_* function parses and dumps the whole spec in turn
+- pipeline: FixProposer._prepare_file_job, which parses once and serializes
+  once
+
+It also reports how many lines differ from the original when the result is
+written as minimal edits vs. a full yaml.dump.
+
+Usage:
+    python scripts/benchmark_spec_transforms.py [--lines 10000] [--repeat 3]
+"""
+
+import argparse
+import difflib
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+script_dir = Path(__file__).parent
+src_dir = script_dir.parent / "src"
+sys.path.insert(0, str(src_dir))
+
+from autofix.fix_cache import FixCache
+from autofix.fix_strategies import get_strategy
+from autofix.proposer import FixProposer
+from autofix.spec_transforms import SPEC_TRANSFORMS, SpecTree
+import yaml
+
+RULES = [
+    "kebab-case-paths",
+    "plural-resources",
+    "no-verbs-in-url",
+    "uuid-resource-ids",
+    "array-fields-plural",
+    "operation-description-required",
+    "versioning-required",
+    "created-returns-resource",
+]
+
+PATH_TEMPLATE = """  # Account {n}
+  /getUserAccount{n}/{{accountId}}:
+    get:
+      operationId: getUserAccount{n}
+      parameters:
+      - name: accountId
+        in: path
+        required: true
+        schema:
+          type: string
+      responses:
+        "200":
+          description: "OK"
+    post:
+      operationId: createUserAccount{n}
+      responses:
+        "201":
+          description: "Created"
+"""
+
+SCHEMA_TEMPLATE = """    UserAccount{n}:
+      type: object
+      properties:
+        first_name:
+          type: string
+        last_name:
+          type: string
+        account_id:
+          type: string
+"""
+
+
+def build_spec(target_lines: int) -> str:
+    """Build a synthetic spec of roughly target_lines lines"""
+    per_item = PATH_TEMPLATE.count("\n") + SCHEMA_TEMPLATE.count("\n")
+    count = max(1, target_lines // per_item)
+    paths = "".join(PATH_TEMPLATE.format(n=n) for n in range(count))
+    schemas = "".join(SCHEMA_TEMPLATE.format(n=n) for n in range(count))
+    return (
+        "openapi: 3.0.0\n"
+        "info:\n  title: Benchmark\n  version: '1'\n"
+        f"paths:\n{paths}"
+        f"components:\n  schemas:\n{schemas}"
+    )
+
+
+def run_chained(proposer: FixProposer, content: str) -> str:
+    """Apply each fixer to the previous fixer's output"""
+    for rule in RULES:
+        fixer = getattr(proposer, get_strategy(rule).fix_function)
+        result = fixer(content, "", None)
+        if result:
+            content = result[0]
+    return content
+
+
+def run_pipeline(proposer: FixProposer, spec_name: str) -> str:
+    """Apply all fixes over one parsed tree"""
+    violations = [{"rule": rule, "message": "", "source": spec_name} for rule in RULES]
+    return proposer._prepare_file_job(spec_name, violations).current_content
+
+
+def changed_lines(original: str, fixed: str) -> int:
+    """Lines added or removed between two texts"""
+    diff = difflib.unified_diff(original.splitlines(), fixed.splitlines(), n=0)
+    return sum(
+        1 for line in diff if line[:1] in "+-" and not line.startswith(("+++", "---"))
+    )
+
+
+def full_dump(content: str) -> str:
+    """Result of the same fixes written with a full yaml.dump"""
+    tree = SpecTree(content)
+    for rule in RULES:
+        tree.apply(SPEC_TRANSFORMS[get_strategy(rule).fix_function])
+    return yaml.dump(tree.spec, default_flow_style=False, sort_keys=False)
+
+
+def best_of(repeat: int, func, *args):
+    """Best wall time of several runs, and the last result"""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=10000, help="Spec size")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per mode")
+    args = parser.parse_args()
+
+    project = tempfile.mkdtemp()
+    try:
+        content = build_spec(args.lines)
+        (Path(project) / "api.yaml").write_text(content, encoding="utf-8")
+        proposer = FixProposer(
+            project, use_copilot=False, fix_cache=FixCache(project, enabled=False)
+        )
+
+        chained_time, chained = best_of(args.repeat, run_chained, proposer, content)
+        pipeline_time, pipeline = best_of(
+            args.repeat, run_pipeline, proposer, "api.yaml"
+        )
+
+        print(f"Spec: {content.count(chr(10))} lines, {len(RULES)} rules")
+        print(f"Chained fixers:  {chained_time:.3f}s")
+        print(f"Single parse:    {pipeline_time:.3f}s")
+        print(f"Speedup:         {chained_time / pipeline_time:.1f}x")
+        print(f"Identical output: {chained == pipeline}")
+        print(f"Changed lines (minimal edits): {changed_lines(content, pipeline)}")
+        print(
+            f"Changed lines (full dump):     {changed_lines(content, full_dump(content))}"
+        )
+        return 0 if chained == pipeline else 1
+    finally:
+        shutil.rmtree(project)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Blob Store - Content-addressed storage for fix contents
+
+ProposedFix used to carry the full original and proposed file contents
+(plus related-file contents) as strings, so fixes touching the same file
+and repeated sessions kept identical multi-megabyte copies in memory and in
+saved session state. Contents are now stored once under their SHA-256:
+
+- on disk: zlib-compressed, one file per hash (<root>/ab/cdef...)
+- in memory: an LRU of recently used contents, bounded in size
+
+Fixes hold only hashes and load contents on first access.
+
+Blobs on disk are garbage-collected: owners that keep fixes beyond the
+process (fix sessions) pin the hashes they reference, and gc() deletes
+unpinned blobs that haven't been used for FIX_BLOB_TTL_SECONDS. The shared
+store collects once per process, when it's first used.
+"""
+
+import hashlib
+import os
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+from utils.logger import logger
+
+
+class BlobStore:
+    """Content-addressed store of text blobs"""
+
+    _instances: Dict[str, "BlobStore"] = {}
+
+    def __init__(
+        self,
+        root_dir: str,
+        cache_size_mb: Optional[int] = None,
+        ttl_seconds: Optional[int] = None,
+    ):
+        """
+        Initialize blob store
+
+        Args:
+            root_dir: Directory for compressed blobs
+            cache_size_mb: Contents kept in memory (or FIX_BLOB_CACHE_MB env,
+                default: 64); the most recently used blob is always kept
+            ttl_seconds: Unpinned blobs unused for this long are deleted by
+                gc() (or FIX_BLOB_TTL_SECONDS env, default: 1 day)
+        """
+        self.root_dir = Path(root_dir)
+        cache_size_mb = (
+            cache_size_mb
+            if cache_size_mb is not None
+            else int(os.getenv("FIX_BLOB_CACHE_MB", "64"))
+        )
+        self.cache_size = cache_size_mb * 1024 * 1024
+        self.ttl_seconds = (
+            ttl_seconds
+            if ttl_seconds is not None
+            else int(os.getenv("FIX_BLOB_TTL_SECONDS", "86400"))
+        )
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cached_size = 0
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.writes = 0
+
+    @classmethod
+    def default(cls) -> "BlobStore":
+        """
+        Shared store (FIX_BLOB_DIR env, default: ~/.governance-cache/blobs)
+
+        Shared by all fixes of the process, so identical contents are stored
+        and cached once.
+        """
+        root_dir = os.getenv(
+            "FIX_BLOB_DIR", str(Path.home() / ".governance-cache" / "blobs")
+        )
+        key = str(Path(root_dir).resolve())
+        if key not in cls._instances:
+            store = cls._instances[key] = cls(root_dir)
+            store.gc()
+        return cls._instances[key]
+
+    @staticmethod
+    def hash_content(content: str) -> str:
+        """Hash under which a content is stored"""
+        return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+    def _blob_path(self, blob_hash: str) -> Path:
+        return self.root_dir / blob_hash[:2] / blob_hash[2:]
+
+    def put(self, content: str) -> str:
+        """
+        Store a content
+
+        Returns:
+            Its hash
+        """
+        blob_hash = self.hash_content(content)
+        with self._lock:
+            if blob_hash in self._cache:
+                self._cache.move_to_end(blob_hash)
+                return blob_hash
+            self._remember(blob_hash, content)
+
+        path = self._blob_path(blob_hash)
+        if path.exists():
+            _touch(path)  # Recently used: not collected
+        else:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+                tmp_path.write_bytes(zlib.compress(content.encode("utf-8")))
+                os.replace(tmp_path, path)
+                self.writes += 1
+            except OSError as e:
+                # Still served from memory while cached
+                logger.warning(f"Could not write blob {blob_hash[:12]}: {e}")
+        return blob_hash
+
+    def get(self, blob_hash: str) -> str:
+        """
+        Content by hash
+
+        Raises:
+            KeyError: If the blob is neither cached nor on disk
+        """
+        with self._lock:
+            content = self._cache.get(blob_hash)
+            if content is not None:
+                self._cache.move_to_end(blob_hash)
+                return content
+
+        try:
+            content = zlib.decompress(self._blob_path(blob_hash).read_bytes()).decode(
+                "utf-8"
+            )
+        except (OSError, zlib.error) as e:
+            raise KeyError(f"Blob not found: {blob_hash}") from e
+        self.reads += 1
+        _touch(self._blob_path(blob_hash))
+        with self._lock:
+            self._remember(blob_hash, content)
+        return content
+
+    def _pin_path(self, owner: str) -> Path:
+        return self.root_dir / "pins" / re.sub(r"[^\w.-]", "_", owner)
+
+    def pin(self, owner: str, blob_hashes: Iterable[str]):
+        """
+        Keep blobs referenced by an owner (e.g. a fix session) from being
+        collected; replaces the owner's previous pins
+        """
+        path = self._pin_path(owner)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_text("\n".join(sorted(set(blob_hashes))), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def unpin(self, owner: str):
+        """Release an owner's pins (its blobs are collected once unused)"""
+        try:
+            self._pin_path(owner).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _pinned(self) -> Set[str]:
+        pinned = set()
+        pin_dir = self.root_dir / "pins"
+        if pin_dir.is_dir():
+            for path in pin_dir.iterdir():
+                try:
+                    pinned.update(path.read_text(encoding="utf-8").split())
+                except OSError:
+                    pass
+        return pinned
+
+    def gc(self) -> int:
+        """
+        Delete blobs that are neither pinned, cached by this process, nor
+        used within the TTL
+
+        Returns:
+            Number of blobs deleted
+        """
+        if not self.root_dir.is_dir():
+            return 0
+        cutoff = time.time() - self.ttl_seconds
+        keep = self._pinned()
+        with self._lock:
+            keep.update(self._cache)
+
+        deleted = 0
+        for shard in self.root_dir.iterdir():
+            if len(shard.name) != 2 or not shard.is_dir():
+                continue
+            for path in shard.iterdir():
+                try:
+                    if shard.name + path.name.split(".")[0] in keep:
+                        continue
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                        deleted += 1
+                except OSError:
+                    pass  # Removed concurrently
+        if deleted:
+            logger.debug(f"Deleted {deleted} unused blob(s)")
+        return deleted
+
+    def _remember(self, blob_hash: str, content: str):
+        """Cache a content, evicting least recently used ones"""
+        self._cache[blob_hash] = content
+        self._cached_size += len(content)
+        while len(self._cache) > 1 and self._cached_size > self.cache_size:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_size -= len(evicted)
+
+
+def _touch(path: Path):
+    """Mark a blob as recently used"""
+    try:
+        os.utime(path)
+    except OSError:
+        pass
@@ -11,7 +11,7 @@ Handles the complete validation cycle:
 
 import subprocess
 import json
-from typing import Optional, Dict, List
+from typing import Optional, Dict, Iterable, List
 from pathlib import Path
 from dataclasses import dataclass
 
@@ -273,6 +273,7 @@ class BuildValidator:
         violations_before: List[Dict],
         clean_build: bool = True,
         output_dir: Optional[str] = None,
+        rules: Optional[Iterable[str]] = None,
     ) -> ValidationResult:
         """
         Complete validation workflow: build + scan + compare
@@ -282,6 +283,8 @@ class BuildValidator:
             violations_before: Violations before fixes were applied
             clean_build: Whether to run clean before build
             output_dir: Output directory for scan results
+            rules: Only count re-scan violations of these rules (default: all
+                violations of the category)
 
         Returns:
             ValidationResult with comparison
@@ -326,6 +329,13 @@ class BuildValidator:
 
         # Step 3: Compare violations
         violations_after = scan_result.get("violations", [])
+        if rules is not None:
+            rules = set(rules)
+            violations_after = [
+                v
+                for v in violations_after
+                if (v.get("rule") or v.get("rule_id")) in rules
+            ]
 
         # Calculate changes
         before_count = len(violations_before)
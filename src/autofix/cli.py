@@ -33,6 +33,9 @@ Examples:
 
   # Apply fixes without creating PR
   python -m autofix.cli --report report.json --project . --no-pr
+
+  # Apply only fixes that build and pass the re-scan in a worktree
+  python -m autofix.cli --report report.json --project . --isolated
         """,
     )
 
@@ -76,6 +79,13 @@ Examples:
         help="Apply fixes without creating git branch/commits",
     )
 
+    parser.add_argument(
+        "--isolated",
+        action="store_true",
+        help="Build and re-scan each rule's fixes in a temporary git worktree "
+        "and apply only the ones that pass",
+    )
+
     parser.add_argument(
         "--branch-name", help="Custom branch name for PR (default: auto-generated)"
     )
@@ -143,6 +153,7 @@ Examples:
                 auto_approve_safe=args.auto_approve_safe,
                 create_pr=not args.no_pr,
                 output_dir=str(output_dir),
+                isolated=args.isolated,
             )
 
             # Print final summary
@@ -0,0 +1,187 @@
+"""
+Adaptive Concurrency - AIMD limiter for parallel fix generation
+
+Replaces a fixed semaphore with a limit that grows while the backend keeps
+up and halves when it shows signs of overload (429s, timeouts, or latency
+drifting well above the best observed). A laptop running Ollama settles low,
+a remote API settles high, without hand-tuning either.
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+from utils.logger import logger
+
+
+class ConcurrencySlot:
+    """Handle for one in-flight call; set `overloaded` if the call hit a limit"""
+
+    def __init__(self, started_at: float):
+        self.started_at = started_at
+        self.overloaded = False
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Additive-increase / multiplicative-decrease concurrency limiter.
+
+    - After `limit` consecutive healthy calls the limit grows by one.
+    - An overloaded or slow call halves the limit (never below the floor).
+      Calls that started before the last decrease can't trigger another one,
+      so a single burst of failures only backs off once.
+    """
+
+    def __init__(
+        self,
+        initial: int = 3,
+        floor: int = 1,
+        ceiling: int = 16,
+        latency_tolerance: float = 3.0,
+        decrease_factor: float = 0.5,
+        smoothing: float = 0.3,
+    ):
+        """
+        Initialize adaptive limiter
+
+        Args:
+            initial: Starting concurrency
+            floor: Lowest concurrency allowed
+            ceiling: Highest concurrency allowed
+            latency_tolerance: Smoothed latency above this multiple of the
+                best observed latency counts as overload
+            decrease_factor: Multiplier applied on overload
+            smoothing: EWMA weight of the newest latency sample
+        """
+        self.floor = max(1, int(floor))
+        self.ceiling = max(self.floor, int(ceiling))
+        self.limit = min(self.ceiling, max(self.floor, int(initial)))
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self.smoothing = smoothing
+
+        self._in_flight = 0
+        self._healthy_streak = 0
+        self._last_decrease_at = 0.0
+        self._latency_ewma: Optional[float] = None
+        self._baseline_latency: Optional[float] = None
+
+        self._condition: Optional[asyncio.Condition] = None
+        self._condition_loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self.peak_limit = self.limit
+        self.increases = 0
+        self.decreases = 0
+        self.calls = 0
+        self.overloads = 0
+
+    def _get_condition(self) -> asyncio.Condition:
+        """Get the wait condition for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._condition_loop is not loop:
+            self._condition = asyncio.Condition()
+            self._condition_loop = loop
+        return self._condition
+
+    @asynccontextmanager
+    async def slot(self):
+        """
+        Hold one concurrency slot for the duration of a backend call
+
+        Usage:
+            async with limiter.slot() as slot:
+                result = await analyzer.generate_batch_fix(...)
+                slot.overloaded = saw_rate_limit
+        """
+        condition = self._get_condition()
+        async with condition:
+            while self._in_flight >= self.limit:
+                await condition.wait()
+            self._in_flight += 1
+
+        slot = ConcurrencySlot(time.monotonic())
+        try:
+            yield slot
+        except asyncio.TimeoutError:
+            slot.overloaded = True
+            raise
+        finally:
+            self.record(time.monotonic() - slot.started_at, slot.overloaded, slot)
+            async with condition:
+                self._in_flight -= 1
+                condition.notify_all()
+
+    def record(
+        self,
+        latency: float,
+        overloaded: bool = False,
+        slot: Optional[ConcurrencySlot] = None,
+    ):
+        """
+        Feed one call outcome into the AIMD controller
+
+        Args:
+            latency: Call duration in seconds
+            overloaded: Whether the call saw a 429/timeout
+            slot: Slot the call ran in (used to ignore stale overload signals)
+        """
+        self.calls += 1
+
+        if not overloaded:
+            if self._latency_ewma is None:
+                self._latency_ewma = latency
+            else:
+                self._latency_ewma = (
+                    self.smoothing * latency + (1 - self.smoothing) * self._latency_ewma
+                )
+            if (
+                self._baseline_latency is None
+                or self._latency_ewma < self._baseline_latency
+            ):
+                self._baseline_latency = self._latency_ewma
+
+            overloaded = (
+                self._baseline_latency > 0
+                and self._latency_ewma > self.latency_tolerance * self._baseline_latency
+            )
+
+        if overloaded:
+            self.overloads += 1
+            self._healthy_streak = 0
+            started_at = slot.started_at if slot else time.monotonic()
+            if started_at >= self._last_decrease_at:
+                self._decrease()
+            return
+
+        self._healthy_streak += 1
+        if self._healthy_streak >= self.limit and self.limit < self.ceiling:
+            self.limit += 1
+            self.increases += 1
+            self.peak_limit = max(self.peak_limit, self.limit)
+            self._healthy_streak = 0
+
+    def _decrease(self):
+        """Back off multiplicatively"""
+        new_limit = max(self.floor, int(self.limit * self.decrease_factor))
+        if new_limit < self.limit:
+            logger.debug(f"Backend overloaded, concurrency {self.limit} -> {new_limit}")
+            self.limit = new_limit
+            self.decreases += 1
+        self._last_decrease_at = time.monotonic()
+        # Re-learn the latency baseline at the new level
+        self._latency_ewma = None
+        self._baseline_latency = None
+
+    def get_stats(self) -> Dict:
+        """Get the concurrency the limiter settled on and how it got there"""
+        return {
+            "concurrency": self.limit,
+            "peak_concurrency": self.peak_limit,
+            "floor": self.floor,
+            "ceiling": self.ceiling,
+            "calls": self.calls,
+            "overloads": self.overloads,
+            "increases": self.increases,
+            "decreases": self.decreases,
+        }
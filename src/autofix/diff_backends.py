@@ -0,0 +1,404 @@
+"""
+Diff Backends - Unified diffs for large files
+
+difflib.SequenceMatcher is quadratic in the worst case, which shows on
+multi-megabyte specs rewritten by yaml.dump. The backends here intern each
+line to an integer, skip identical prefix and suffix runs, and compute the
+edit script with:
+
+- myers: Myers' O(ND) algorithm in linear space (middle-snake divide and
+  conquer) over the lines present on both sides, giving a minimal diff
+- patience: patience diff, anchoring on lines unique to both sides and
+  running Myers between anchors; fast on large rewrites and usually easier
+  to read
+- difflib: the standard library's SequenceMatcher (previous behavior)
+- auto: difflib for small files, patience above AUTO_THRESHOLD_LINES
+
+All backends produce the same unified diff format as difflib.unified_diff
+and count additions and deletions while building the edit script.
+"""
+
+import bisect
+import difflib
+from typing import Dict, Iterator, List, Sequence, Tuple
+
+# (tag, i1, i2, j1, j2) as in difflib.SequenceMatcher.get_opcodes()
+Opcode = Tuple[str, int, int, int, int]
+
+BACKENDS = ("auto", "difflib", "myers", "patience")
+
+# Combined line count above which "auto" leaves difflib
+AUTO_THRESHOLD_LINES = 5000
+
+
+def unified_diff(
+    a: Sequence[str],
+    b: Sequence[str],
+    fromfile: str = "",
+    tofile: str = "",
+    n: int = 3,
+    lineterm: str = "\n",
+    backend: str = "auto",
+) -> Tuple[List[str], int, int]:
+    """
+    Unified diff of two line lists
+
+    Args:
+        a: Original lines
+        b: New lines
+        fromfile: Original file label
+        tofile: New file label
+        n: Context lines
+        lineterm: Terminator of header lines (as in difflib.unified_diff)
+        backend: One of BACKENDS
+
+    Returns:
+        (diff lines, additions, deletions)
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    opcodes = get_opcodes(a, b, backend)
+    additions, deletions = count_changes(opcodes)
+    lines = list(format_unified(a, b, opcodes, fromfile, tofile, n, lineterm))
+    return lines, additions, deletions
+
+
+def count_changes(opcodes: List[Opcode]) -> Tuple[int, int]:
+    """(additions, deletions) of an edit script"""
+    additions = sum(j2 - j1 for tag, _, _, j1, j2 in opcodes if tag != "equal")
+    deletions = sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag != "equal")
+    return additions, deletions
+
+
+def get_opcodes(
+    a: Sequence[str], b: Sequence[str], backend: str = "auto"
+) -> List[Opcode]:
+    """
+    Edit script turning a into b
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend not in BACKENDS:
+        raise ValueError(
+            f"Unknown diff backend: {backend} (expected one of {BACKENDS})"
+        )
+    if backend == "auto":
+        backend = "patience" if len(a) + len(b) > AUTO_THRESHOLD_LINES else "difflib"
+    if backend == "difflib":
+        return difflib.SequenceMatcher(None, a, b).get_opcodes()
+
+    a_ids, b_ids = _intern_lines(a, b)
+    if backend == "myers":
+        matches = _myers_matches(a_ids, b_ids)
+    else:
+        matches = _patience_matches(a_ids, b_ids)
+    return _matches_to_opcodes(matches, len(a), len(b))
+
+
+def _intern_lines(a: Sequence[str], b: Sequence[str]) -> Tuple[List[int], List[int]]:
+    """Map each distinct line to an integer so comparisons are int compares"""
+    ids: Dict[str, int] = {}
+    a_ids = [ids.setdefault(line, len(ids)) for line in a]
+    b_ids = [ids.setdefault(line, len(ids)) for line in b]
+    return a_ids, b_ids
+
+
+# ============================================================================
+# MYERS (LINEAR SPACE)
+# ============================================================================
+
+
+def _trim(a, b, alo, ahi, blo, bhi, matches):
+    """Record the common prefix and suffix of a window and return the rest"""
+    while alo < ahi and blo < bhi and a[alo] == b[blo]:
+        matches.append((alo, blo))
+        alo += 1
+        blo += 1
+    while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+        ahi -= 1
+        bhi -= 1
+        matches.append((ahi, bhi))
+    return alo, ahi, blo, bhi
+
+
+def _middle_snake(a, alo, ahi, b, blo, bhi) -> Tuple[int, int, int, int]:
+    """
+    Middle snake of the shortest edit path of a window
+
+    Returns:
+        (x0, y0, x1, y1) window-relative start and end of the snake
+    """
+    n = ahi - alo
+    m = bhi - blo
+    delta = n - m
+    odd = delta & 1
+    max_d = (n + m + 1) // 2
+    offset = max_d + 1
+    vf = [0] * (2 * offset + 1)
+    vb = [0] * (2 * offset + 1)
+
+    for d in range(max_d + 1):
+        # Forward paths from the top-left corner
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and vf[offset + k - 1] < vf[offset + k + 1]):
+                x = vf[offset + k + 1]
+            else:
+                x = vf[offset + k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[alo + x] == b[blo + y]:
+                x += 1
+                y += 1
+            vf[offset + k] = x
+            if odd and -(d - 1) <= delta - k <= d - 1:
+                if x + vb[offset + delta - k] >= n:
+                    return x0, y0, x, y
+
+        # Backward paths from the bottom-right corner
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and vb[offset + k - 1] < vb[offset + k + 1]):
+                x = vb[offset + k + 1]
+            else:
+                x = vb[offset + k - 1] + 1
+            y = x - k
+            x0, y0 = x, y
+            while x < n and y < m and a[ahi - 1 - x] == b[bhi - 1 - y]:
+                x += 1
+                y += 1
+            vb[offset + k] = x
+            if not odd and -d <= delta - k <= d:
+                if x + vf[offset + delta - k] >= n:
+                    return n - x, m - y, n - x0, m - y0
+
+    raise AssertionError("No middle snake found")  # Unreachable
+
+
+def _myers_window(a, alo, ahi, b, blo, bhi, matches):
+    """Matching line pairs of one window (explicit stack, no recursion limit)"""
+    stack = [(alo, ahi, blo, bhi)]
+    while stack:
+        alo, ahi, blo, bhi = _trim(a, b, *stack.pop(), matches)
+        if alo == ahi or blo == bhi:
+            continue
+        x0, y0, x1, y1 = _middle_snake(a, alo, ahi, b, blo, bhi)
+        for step in range(x1 - x0):
+            matches.append((alo + x0 + step, blo + y0 + step))
+        stack.append((alo + x1, ahi, blo + y1, bhi))
+        stack.append((alo, alo + x0, blo, blo + y0))
+
+
+def _myers_matches(a: List[int], b: List[int]) -> List[Tuple[int, int]]:
+    """Matching (i, j) line pairs of a minimal diff"""
+    matches: List[Tuple[int, int]] = []
+    _myers_common_lines(a, 0, len(a), b, 0, len(b), matches)
+    matches.sort()
+    return matches
+
+
+def _myers_common_lines(a, alo, ahi, b, blo, bhi, matches):
+    """
+    Myers over the lines of a window that occur on both sides
+
+    Lines found on one side only can't match. Dropping them first doesn't
+    change the result, but keeps a rewrite touching many lines from
+    inflating the edit distance D that Myers' running time depends on.
+    """
+    common = set(a[alo:ahi]) & set(b[blo:bhi])
+    a_index = [i for i in range(alo, ahi) if a[i] in common]
+    b_index = [j for j in range(blo, bhi) if b[j] in common]
+    a_kept = [a[i] for i in a_index]
+    b_kept = [b[j] for j in b_index]
+
+    kept_matches: List[Tuple[int, int]] = []
+    _myers_window(a_kept, 0, len(a_kept), b_kept, 0, len(b_kept), kept_matches)
+    matches.extend((a_index[i], b_index[j]) for i, j in kept_matches)
+
+
+# ============================================================================
+# PATIENCE
+# ============================================================================
+
+
+def _patience_matches(a: List[int], b: List[int]) -> List[Tuple[int, int]]:
+    """Matching (i, j) line pairs anchored on lines unique to both sides"""
+    matches: List[Tuple[int, int]] = []
+    stack = [(0, len(a), 0, len(b))]
+    while stack:
+        alo, ahi, blo, bhi = _trim(a, b, *stack.pop(), matches)
+        if alo == ahi or blo == bhi:
+            continue
+
+        anchors = _unique_anchors(a, alo, ahi, b, blo, bhi)
+        if not anchors:
+            _myers_common_lines(a, alo, ahi, b, blo, bhi, matches)
+            continue
+
+        prev_i, prev_j = alo, blo
+        for i, j in anchors:
+            stack.append((prev_i, i, prev_j, j))
+            matches.append((i, j))
+            prev_i, prev_j = i + 1, j + 1
+        stack.append((prev_i, ahi, prev_j, bhi))
+
+    matches.sort()
+    return matches
+
+
+def _unique_anchors(a, alo, ahi, b, blo, bhi) -> List[Tuple[int, int]]:
+    """Longest increasing run of lines occurring exactly once on each side"""
+    a_count: Dict[int, int] = {}
+    a_pos: Dict[int, int] = {}
+    for i in range(alo, ahi):
+        a_count[a[i]] = a_count.get(a[i], 0) + 1
+        a_pos[a[i]] = i
+    b_count: Dict[int, int] = {}
+    b_pos: Dict[int, int] = {}
+    for j in range(blo, bhi):
+        b_count[b[j]] = b_count.get(b[j], 0) + 1
+        b_pos[b[j]] = j
+
+    pairs = [
+        (a_pos[line], b_pos[line])
+        for line, count in a_count.items()
+        if count == 1 and b_count.get(line) == 1
+    ]
+    if not pairs:
+        return []
+    pairs.sort()
+
+    # Patience sorting: longest increasing subsequence of b positions
+    tails: List[int] = []  # b position ending each pile
+    tail_index: List[int] = []  # pair index ending each pile
+    previous: List[int] = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        pile = bisect.bisect_left(tails, j)
+        if pile:
+            previous[index] = tail_index[pile - 1]
+        if pile == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[pile] = j
+            tail_index[pile] = index
+
+    anchors = []
+    index = tail_index[-1]
+    while index != -1:
+        anchors.append(pairs[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+# ============================================================================
+# FORMATTING
+# ============================================================================
+
+
+def _matches_to_opcodes(matches: List[Tuple[int, int]], n: int, m: int) -> List[Opcode]:
+    """Opcodes from sorted matching line pairs"""
+    opcodes: List[Opcode] = []
+    i = j = 0
+    index = 0
+    while index < len(matches):
+        mi, mj = matches[index]
+        if i < mi or j < mj:
+            if i < mi and j < mj:
+                tag = "replace"
+            elif i < mi:
+                tag = "delete"
+            else:
+                tag = "insert"
+            opcodes.append((tag, i, mi, j, mj))
+        # Extend the run of consecutive matches
+        end = index
+        while (
+            end + 1 < len(matches)
+            and matches[end + 1][0] == matches[end][0] + 1
+            and matches[end + 1][1] == matches[end][1] + 1
+        ):
+            end += 1
+        length = end - index + 1
+        opcodes.append(("equal", mi, mi + length, mj, mj + length))
+        i, j = mi + length, mj + length
+        index = end + 1
+
+    if i < n or j < m:
+        if i < n and j < m:
+            tag = "replace"
+        elif i < n:
+            tag = "delete"
+        else:
+            tag = "insert"
+        opcodes.append((tag, i, n, j, m))
+    return opcodes
+
+
+def _grouped_opcodes(opcodes: List[Opcode], n: int):
+    """Hunks of opcodes with n lines of context (as SequenceMatcher does)"""
+    codes = list(opcodes) or [("equal", 0, 1, 0, 1)]
+    if codes[0][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[0]
+        codes[0] = tag, max(i1, i2 - n), i2, max(j1, j2 - n), j2
+    if codes[-1][0] == "equal":
+        tag, i1, i2, j1, j2 = codes[-1]
+        codes[-1] = tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)
+
+    group = []
+    for tag, i1, i2, j1, j2 in codes:
+        if tag == "equal" and i2 - i1 > 2 * n:
+            group.append((tag, i1, min(i2, i1 + n), j1, min(j2, j1 + n)))
+            yield group
+            group = []
+            i1, j1 = max(i1, i2 - n), max(j1, j2 - n)
+        group.append((tag, i1, i2, j1, j2))
+    if group and not (len(group) == 1 and group[0][0] == "equal"):
+        yield group
+
+
+def _format_range(start: int, stop: int) -> str:
+    """Unified diff range (as difflib formats it)"""
+    beginning = start + 1
+    length = stop - start
+    if length == 1:
+        return str(beginning)
+    if not length:
+        beginning -= 1
+    return f"{beginning},{length}"
+
+
+def format_unified(
+    a: Sequence[str],
+    b: Sequence[str],
+    opcodes: List[Opcode],
+    fromfile: str = "",
+    tofile: str = "",
+    n: int = 3,
+    lineterm: str = "\n",
+) -> Iterator[str]:
+    """Unified diff lines for an edit script (as difflib.unified_diff yields them)"""
+    started = False
+    for group in _grouped_opcodes(opcodes, n):
+        if not started:
+            started = True
+            yield f"--- {fromfile}{lineterm}"
+            yield f"+++ {tofile}{lineterm}"
+
+        first, last = group[0], group[-1]
+        old_range = _format_range(first[1], last[2])
+        new_range = _format_range(first[3], last[4])
+        yield f"@@ -{old_range} +{new_range} @@{lineterm}"
+
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for line in a[i1:i2]:
+                    yield " " + line
+                continue
+            if tag in ("replace", "delete"):
+                for line in a[i1:i2]:
+                    yield "-" + line
+            if tag in ("replace", "insert"):
+                for line in b[j1:j2]:
+                    yield "+" + line
@@ -4,25 +4,173 @@ Diff Generator - Creates unified diffs with explanations
 Generates before/after diffs for proposed fixes with detailed explanations.
 """
 
-import difflib
-from typing import List
-from dataclasses import dataclass
+import multiprocessing
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-from .proposer import ProposedFix
+from utils.logger import logger
+from utils.path_utils import PathUtils
+from .diff_backends import (
+    BACKENDS,
+    count_changes,
+    format_unified,
+    get_opcodes,
+    unified_diff,
+)
+from .blob_store import BlobStore
+from .proposer import RELATED_FILE_REFERENCE, ProposedFix
 
 
-@dataclass
 class FileDiff:
-    """Represents a diff for a single file"""
+    """
+    Represents a diff for a single file
+
+    A diff built from file contents (DiffGenerator.generate_diff) is lazy:
+    the edit script is computed when the stats are first read, and the
+    unified diff text only when it's first read, so callers that only need
+    a summary never format the diff. Contents given by hash are loaded from
+    the BlobStore when needed instead of being held by the diff.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        unified_diff: Optional[str] = None,
+        additions: Optional[int] = None,
+        deletions: Optional[int] = None,
+        explanation: str = "",
+        rule_id: str = "",
+        severity: str = "warning",
+        original_content: Optional[str] = None,
+        proposed_content: Optional[str] = None,
+        backend: str = "auto",
+        original_hash: Optional[str] = None,
+        proposed_hash: Optional[str] = None,
+        blob_store: Optional[BlobStore] = None,
+    ):
+        """
+        Initialize file diff
 
-    file_path: str
-    unified_diff: str
-    additions: int
-    deletions: int
-    explanation: str
-    rule_id: str
-    severity: str = "warning"
+        Args:
+            file_path: Path of the changed file
+            unified_diff: Diff text (computed from the contents if None)
+            additions: Added lines (computed from the contents if None)
+            deletions: Removed lines (computed from the contents if None)
+            explanation: Explanation of the change
+            rule_id: Rule the change fixes
+            severity: critical, warning or info
+            original_content: File content before the fix (for lazy diffs)
+            proposed_content: File content after the fix (for lazy diffs)
+            backend: Diff backend for lazy diffs (see diff_backends)
+            original_hash: Hash of the content before the fix in blob_store
+                (instead of original_content)
+            proposed_hash: Hash of the content after the fix in blob_store
+                (instead of proposed_content)
+            blob_store: Store the hashes refer to
+        """
+        self.file_path = file_path
+        self.explanation = explanation
+        self.rule_id = rule_id
+        self.severity = severity
+        self._original_content = original_content
+        self._proposed_content = proposed_content
+        self.original_hash = original_hash
+        self.proposed_hash = proposed_hash
+        self.blob_store = blob_store
+        self.backend = backend
+        self._unified_diff = unified_diff
+        self._additions = additions
+        self._deletions = deletions
+        self._opcodes = None
+
+    @property
+    def original_content(self) -> Optional[str]:
+        """File content before the fix"""
+        if self._original_content is None and self.original_hash:
+            return self.blob_store.get(self.original_hash)
+        return self._original_content
+
+    @property
+    def proposed_content(self) -> Optional[str]:
+        """File content after the fix"""
+        if self._proposed_content is None and self.proposed_hash:
+            return self.blob_store.get(self.proposed_hash)
+        return self._proposed_content
+
+    @property
+    def is_materialized(self) -> bool:
+        """Whether the diff text has been computed"""
+        return self._unified_diff is not None
+
+    @property
+    def unified_diff(self) -> str:
+        """Unified diff text (computed on first access)"""
+        if self._unified_diff is None:
+            original_lines, proposed_lines = self._lines()
+            diff_lines = format_unified(
+                original_lines,
+                proposed_lines,
+                self._get_opcodes(original_lines, proposed_lines),
+                fromfile=f"a/{self.file_path}",
+                tofile=f"b/{self.file_path}",
+                lineterm="",
+            )
+            self._set_rendered("\n".join(diff_lines) or "No changes")
+        return self._unified_diff
+
+    @property
+    def additions(self) -> int:
+        """Added lines"""
+        if self._additions is None:
+            self._count()
+        return self._additions
+
+    @property
+    def deletions(self) -> int:
+        """Removed lines"""
+        if self._deletions is None:
+            self._count()
+        return self._deletions
+
+    def _lines(self):
+        original = self.original_content or ""
+        proposed = self.proposed_content or ""
+        return original.splitlines(keepends=True), proposed.splitlines(keepends=True)
+
+    def _get_opcodes(self, original_lines, proposed_lines):
+        if self._opcodes is None:
+            self._opcodes = get_opcodes(original_lines, proposed_lines, self.backend)
+        return self._opcodes
+
+    def _count(self):
+        additions, deletions = count_changes(self._get_opcodes(*self._lines()))
+        if self._additions is None:
+            self._additions = additions
+        if self._deletions is None:
+            self._deletions = deletions
+
+    def _set_rendered(
+        self,
+        text: str,
+        additions: Optional[int] = None,
+        deletions: Optional[int] = None,
+    ):
+        """Store computed diff text (and stats); the edit script is dropped"""
+        self._unified_diff = text
+        if additions is not None and self._additions is None:
+            self._additions = additions
+        if deletions is not None and self._deletions is None:
+            self._deletions = deletions
+        if self._additions is not None and self._deletions is not None:
+            self._opcodes = None
+
+    def __repr__(self) -> str:
+        return (
+            f"FileDiff(file_path={self.file_path!r}, rule_id={self.rule_id!r}, "
+            f"severity={self.severity!r}, materialized={self.is_materialized})"
+        )
 
     def __str__(self) -> str:
         """Format diff for display"""
@@ -42,15 +190,82 @@ class FileDiff:
         return "\n".join(output)
 
 
+def _render_diff(
+    file_path: str, original_content: str, proposed_content: str, backend: str
+):
+    """Diff text and stats of one file (run in diff worker processes)"""
+    diff_lines, additions, deletions = unified_diff(
+        original_content.splitlines(keepends=True),
+        proposed_content.splitlines(keepends=True),
+        fromfile=f"a/{file_path}",
+        tofile=f"b/{file_path}",
+        lineterm="",
+        backend=backend,
+    )
+    return "\n".join(diff_lines) or "No changes", additions, deletions
+
+
+def _patch_entries(
+    fixes: List[ProposedFix], root: Path
+) -> Iterator[Tuple[str, ProposedFix, Optional[str], str]]:
+    """
+    Files written by fixes, in apply order
+
+    Yields:
+        (posix path relative to root, fix, original content hash or None to
+        read the file from disk, proposed content hash)
+    """
+    reference_hash = BlobStore.hash_content(RELATED_FILE_REFERENCE)
+    for fix in fixes:
+        path = PathUtils.repo_relative_path(fix.file_path, root)
+        yield path, fix, fix.original_hash, fix.proposed_hash
+        for add_path, add_hash in fix.additional_file_hashes:
+            if add_hash != reference_hash:
+                yield PathUtils.repo_relative_path(add_path, root), fix, None, add_hash
+
+
 class DiffGenerator:
     """Generates unified diffs for proposed fixes"""
 
-    def __init__(self, project_path: str):
+    def __init__(
+        self,
+        project_path: str,
+        diff_backend: Optional[str] = None,
+        diff_workers: Optional[int] = None,
+    ):
+        """
+        Initialize diff generator
+
+        Args:
+            project_path: Root path of the project
+            diff_backend: auto, difflib, myers or patience (or DIFF_BACKEND
+                env, default: auto); see diff_backends
+            diff_workers: Processes used to compute pending diffs for an
+                export (or DIFF_WORKERS env, default: CPU count; 0 or 1
+                computes them inline)
+        """
         self.project_path = Path(project_path)
+        self.diff_workers = (
+            diff_workers
+            if diff_workers is not None
+            else int(os.getenv("DIFF_WORKERS", str(os.cpu_count() or 1)))
+        )
+        # Pending diffs below this many lines in total are computed inline
+        self.parallel_min_lines = int(os.getenv("DIFF_PARALLEL_MIN_LINES", "50000"))
+        self.diff_backend = diff_backend or os.getenv("DIFF_BACKEND", "auto")
+        if self.diff_backend not in BACKENDS:
+            logger.warning(
+                f"Unknown diff backend '{self.diff_backend}', using auto "
+                f"(expected one of {', '.join(BACKENDS)})"
+            )
+            self.diff_backend = "auto"
 
     def generate_diff(self, fix: ProposedFix) -> FileDiff:
         """
-        Generate a unified diff for a proposed fix
+        Create the diff of a proposed fix
+
+        The diff is lazy: stats and text are computed on first access (see
+        materialize for computing many at once).
 
         Args:
             fix: ProposedFix object
@@ -58,54 +273,56 @@ class DiffGenerator:
         Returns:
             FileDiff object with unified diff and metadata
         """
-
-        # Split content into lines
-        original_lines = fix.original_content.splitlines(keepends=True)
-        proposed_lines = fix.proposed_content.splitlines(keepends=True)
-
-        # Generate unified diff
-        diff_lines = list(
-            difflib.unified_diff(
-                original_lines,
-                proposed_lines,
-                fromfile=f"a/{fix.file_path}",
-                tofile=f"b/{fix.file_path}",
-                lineterm="",
-            )
-        )
-
-        # Count additions and deletions
-        additions = sum(
-            1
-            for line in diff_lines
-            if line.startswith("+") and not line.startswith("+++")
-        )
-        deletions = sum(
-            1
-            for line in diff_lines
-            if line.startswith("-") and not line.startswith("---")
-        )
-
-        # Format diff
-        unified_diff = "\n".join(diff_lines) if diff_lines else "No changes"
-
-        # Build explanation
-        explanation = self._build_explanation(fix)
-
         return FileDiff(
             file_path=fix.file_path,
-            unified_diff=unified_diff,
-            additions=additions,
-            deletions=deletions,
-            explanation=explanation,
+            explanation=self._build_explanation(fix),
             rule_id=fix.rule_id,
             severity=self._get_severity(fix),
+            original_hash=fix.original_hash,
+            proposed_hash=fix.proposed_hash,
+            blob_store=fix.blob_store,
+            backend=self.diff_backend,
         )
 
     def generate_all_diffs(self, fixes: List[ProposedFix]) -> List[FileDiff]:
         """Generate diffs for all proposed fixes"""
         return [self.generate_diff(fix) for fix in fixes]
 
+    def materialize(self, diffs: List[FileDiff]):
+        """
+        Compute the text of every pending diff
+
+        Large batches are spread over worker processes (diff computation is
+        CPU-bound pure Python, so threads wouldn't help).
+        """
+        pending = [d for d in diffs if not d.is_materialized]
+        total_lines = sum(
+            (d.original_content or "").count("\n")
+            + (d.proposed_content or "").count("\n")
+            for d in pending
+        )
+        workers = min(self.diff_workers, len(pending))
+        if workers < 2 or total_lines < self.parallel_min_lines:
+            for diff in pending:
+                diff.unified_diff  # Computed and cached on access
+            return
+
+        # Not fork: this may run in a thread of a process with an event loop
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context(
+            "forkserver" if "forkserver" in methods else "spawn"
+        )
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            rendered = pool.map(
+                _render_diff,
+                [d.file_path for d in pending],
+                [d.original_content or "" for d in pending],
+                [d.proposed_content or "" for d in pending],
+                [d.backend for d in pending],
+            )
+            for diff, (text, additions, deletions) in zip(pending, rendered):
+                diff._set_rendered(text, additions, deletions)
+
     def generate_summary(self, diffs: List[FileDiff]) -> str:
         """Generate a summary of all diffs"""
 
@@ -202,6 +419,7 @@ class DiffGenerator:
 
     def export_diff_to_file(self, diffs: List[FileDiff], output_path: str):
         """Export all diffs to a file"""
+        self.materialize(diffs)
 
         with open(output_path, "w", encoding="utf-8") as f:
             # Write summary
@@ -215,6 +433,7 @@ class DiffGenerator:
 
     def export_diff_to_markdown(self, diffs: List[FileDiff], output_path: str):
         """Export diffs to a markdown file"""
+        self.materialize(diffs)
 
         with open(output_path, "w", encoding="utf-8") as f:
             # Write header
@@ -243,19 +462,150 @@ class DiffGenerator:
             f.write("## Proposed Changes\n\n")
 
             for i, diff in enumerate(diffs, 1):
-                severity_icon = {"critical": "🔴", "warning": "🟡", "info": "🔵"}.get(
-                    diff.severity, "⚪"
-                )
+                f.write(self._markdown_section(i, diff))
+
+    def _markdown_section(
+        self, index: int, diff: FileDiff, pending: bool = False
+    ) -> str:
+        """Markdown for one proposed change (without its diff if pending)"""
+        severity_icon = {"critical": "🔴", "warning": "🟡", "info": "🔵"}.get(
+            diff.severity, "⚪"
+        )
 
-                f.write(f"### {i}. {severity_icon} {diff.file_path}\n\n")
-                f.write(f"**Rule**: `{diff.rule_id}`  \n")
-                f.write(f"**Changes**: +{diff.additions} -{diff.deletions}\n\n")
+        section = []
+        section.append(f"### {index}. {severity_icon} {diff.file_path}\n\n")
+        section.append(f"**Rule**: `{diff.rule_id}`  \n")
+        if pending:
+            section.append("_Diff is added once all fixes are ready._\n\n")
+        else:
+            section.append(f"**Changes**: +{diff.additions} -{diff.deletions}\n\n")
+            section.append("#### Diff\n\n")
+            section.append("```diff\n")
+            section.append(diff.unified_diff)
+            section.append("\n```\n\n")
+
+        section.append("#### Explanation\n\n")
+        section.append(diff.explanation)
+        section.append("\n\n---\n\n")
+        return "".join(section)
+
+    def export_patch(self, fixes: List[ProposedFix], output_path: str) -> Dict:
+        """
+        Export fixes as a patch for git apply
+
+        Writes a git-style multi-file patch (main files and additional_files)
+        one file at a time, so only the file being diffed is held in memory.
+        When several fixes write the same file, the last one wins, as when
+        the fixes are applied. Absolute fix paths are made relative to the
+        project root. Apply with `git apply --index <patch>` from the
+        project root.
+
+        Args:
+            fixes: Fixes to export, in apply order
+            output_path: Patch file to write
+
+        Returns:
+            Stats: {"files": n, "additions": n, "deletions": n}
+        """
+        last_writer = {}
+        for position, (path, _, _, _) in enumerate(
+            _patch_entries(fixes, self.project_path)
+        ):
+            last_writer[path] = position
+
+        stats = {"files": 0, "additions": 0, "deletions": 0}
+        with open(output_path, "w", encoding="utf-8", newline="") as f:
+            for position, (path, fix, original_hash, proposed_hash) in enumerate(
+                _patch_entries(fixes, self.project_path)
+            ):
+                if last_writer[path] != position:
+                    continue
+                if original_hash is None:
+                    original = self._read_original(path)
+                else:
+                    original = fix.blob_store.get(original_hash)
+                    if not original and not (self.project_path / path).exists():
+                        original = None  # Fix creating a new file
+                additions, deletions = self._write_file_patch(
+                    f, path, original, fix.blob_store.get(proposed_hash)
+                )
+                if additions or deletions:
+                    stats["files"] += 1
+                    stats["additions"] += additions
+                    stats["deletions"] += deletions
+        return stats
+
+    def _read_original(self, rel_path: str) -> Optional[str]:
+        """Current content of a project file (None if it doesn't exist)"""
+        try:
+            with open(
+                self.project_path / rel_path, "r", encoding="utf-8", newline=""
+            ) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _write_file_patch(
+        self, f, path: str, original: Optional[str], proposed: str
+    ) -> Tuple[int, int]:
+        """Write the patch of one file; returns (additions, deletions)"""
+        a = (original or "").splitlines(keepends=True)
+        b = proposed.splitlines(keepends=True)
+        opcodes = get_opcodes(a, b, backend=self.diff_backend)
+        additions, deletions = count_changes(opcodes)
+        if not additions and not deletions and original is not None:
+            return 0, 0
+
+        f.write(f"diff --git a/{path} b/{path}\n")
+        if original is None:
+            f.write("new file mode 100644\n")
+        for line in format_unified(
+            a,
+            b,
+            opcodes,
+            fromfile="/dev/null" if original is None else f"a/{path}",
+            tofile=f"b/{path}",
+        ):
+            f.write(line)
+            if not line.endswith("\n"):
+                f.write("\n\\ No newline at end of file\n")
+        return additions, deletions
+
+    def start_markdown_preview(self, output_path: str) -> "MarkdownPreviewWriter":
+        """Start a markdown preview that grows as fixes are proposed"""
+        return MarkdownPreviewWriter(self, output_path)
+
+
+class MarkdownPreviewWriter:
+    """
+    Writes the markdown preview incrementally
+
+    Each change is appended as soon as its fix exists, so the preview can
+    be followed while slow fixes are still being generated. Diffs aren't
+    computed while streaming (that would run on the event loop, one at a
+    time): finish() computes them all at once (see DiffGenerator.materialize)
+    and rewrites the file with the summary, diffs and changes in their
+    final order.
+    """
+
+    def __init__(self, generator: DiffGenerator, output_path: str):
+        self.generator = generator
+        self.output_path = Path(output_path)
+        self.count = 0
+
+        with open(self.output_path, "w", encoding="utf-8") as f:
+            f.write("# Governance Auto-Fix Proposal\n\n")
+            f.write(
+                "_Fix generation in progress; changes appear as they are ready._\n\n"
+            )
+            f.write("## Proposed Changes\n\n")
 
-                f.write("#### Diff\n\n")
-                f.write("```diff\n")
-                f.write(diff.unified_diff)
-                f.write("\n```\n\n")
+    def add(self, diff: FileDiff):
+        """Append one change to the preview (its diff follows at finish)"""
+        self.count += 1
+        with open(self.output_path, "a", encoding="utf-8") as f:
+            f.write(self.generator._markdown_section(self.count, diff, pending=True))
 
-                f.write("#### Explanation\n\n")
-                f.write(diff.explanation)
-                f.write("\n\n---\n\n")
+    def finish(self, diffs: List[FileDiff]):
+        """Replace the in-progress preview with the complete one"""
+        self.generator.export_diff_to_markdown(diffs, str(self.output_path))
@@ -4,9 +4,10 @@ Auto-Fix Engine - Main orchestrator for the auto-fix workflow
 Coordinates the entire fix proposal, review, and application process.
 """
 
-from typing import List, Dict, Optional
+import asyncio
+from typing import AsyncIterator, List, Dict, Optional, Tuple
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from .proposer import FixProposer, ProposedFix
 from .diff_generator import DiffGenerator, FileDiff
@@ -14,9 +15,11 @@ from .review_gate import ReviewGate, ReviewState
 from .pr_creator import PRCreator, PullRequestInfo
 from .vscode_integration import integrate_with_vscode
 from .build_validator import BuildValidator, ValidationResult
+from .worktree_validator import BatchValidation, WorktreeValidator
 from engines.llm_analyzer import LLMAnalyzer
 from engines.copilot_analyzer import CopilotAnalyzer
 from utils import FileUtils
+from utils.atomic_writer import AtomicFileWriter, AtomicWriteError
 
 
 @dataclass
@@ -32,6 +35,7 @@ class AutoFixResult:
     diff_preview_path: Optional[str] = None
     review_report_path: Optional[str] = None
     validation_result: Optional[ValidationResult] = None
+    batch_validations: List[BatchValidation] = field(default_factory=list)
 
 
 class AutoFixEngine:
@@ -133,8 +137,79 @@ class AutoFixEngine:
         Returns:
             Tuple of (proposed_fixes, diffs)
         """
+        diffs_by_fix = {}
+        fixes = []
+        async for fix, diff in self.iter_fixes(violations, output_dir):
+            fixes.append(fix)
+            diffs_by_fix[id(fix)] = diff
+
+        if not fixes:
+            print("No fixable violations found.")
+            return [], []
+
+        fixes = self.in_report_order(fixes, violations)
+        return fixes, [diffs_by_fix[id(fix)] for fix in fixes]
+
+    async def iter_fixes(
+        self, violations: List[Dict], output_dir: Optional[str] = None
+    ) -> AsyncIterator[Tuple[ProposedFix, FileDiff]]:
+        """
+        Generate fix proposals, yielding each with its diff as soon as it's ready
+
+        With an output directory, fix-preview.md grows as fixes arrive and is
+        rewritten with the summary (alongside fix-preview.txt) once all fixes
+        are in, in report order.
+
+        Args:
+            violations: List of violation dictionaries
+            output_dir: Optional directory to save diff previews
+
+        Yields:
+            (proposed_fix, diff) tuples in completion order
+        """
+        sorted_violations = self._prioritize(violations)
+
+        preview = None
+        diffs_by_fix = {}
+        fixes = []
+        async for fix in self.proposer.iter_fixes(sorted_violations):
+            diff = self.diff_generator.generate_diff(fix)
+            fixes.append(fix)
+            diffs_by_fix[id(fix)] = diff
+
+            if output_dir:
+                if preview is None:
+                    output_path = Path(output_dir)
+                    output_path.mkdir(parents=True, exist_ok=True)
+                    preview = self.diff_generator.start_markdown_preview(
+                        str(output_path / "fix-preview.md")
+                    )
+                preview.add(diff)
+            yield fix, diff
+
+        if preview:
+            fixes = self.in_report_order(fixes, violations)
+            diffs = [diffs_by_fix[id(fix)] for fix in fixes]
+
+            # Diff text is computed here (possibly in worker processes);
+            # keep it off the event loop so a server stays responsive
+            diff_txt = Path(output_dir) / "fix-preview.txt"
+            await asyncio.to_thread(
+                self.diff_generator.export_diff_to_file, diffs, str(diff_txt)
+            )
+            await asyncio.to_thread(preview.finish, diffs)
+
+            print(f"Diff preview saved to: {preview.output_path}")
+
+    def in_report_order(
+        self, fixes: List[ProposedFix], violations: List[Dict]
+    ) -> List[ProposedFix]:
+        """Sort streamed fixes the way propose_fixes returns them"""
+        return self.proposer.in_report_order(fixes, self._prioritize(violations))
+
+    def _prioritize(self, violations: List[Dict]) -> List[Dict]:
+        """Sort violations: Code (Java) first, then Specs"""
 
-        # Sort violations: Code (Java) first, then Specs
         def prioritization_key(v):
             fpath = v.get("file", "") or v.get("source", "")
             if fpath.endswith(".java"):
@@ -147,34 +222,7 @@ class AutoFixEngine:
                 return 1
             return 2
 
-        sorted_violations = sorted(violations, key=prioritization_key)
-
-        # Generate fix proposals
-        fixes = await self.proposer.propose_fixes(sorted_violations)
-
-        if not fixes:
-            print("No fixable violations found.")
-            return [], []
-
-        # Generate diffs
-        diffs = self.diff_generator.generate_all_diffs(fixes)
-
-        # Save diff preview if output directory provided
-        if output_dir:
-            output_path = Path(output_dir)
-            output_path.mkdir(parents=True, exist_ok=True)
-
-            # Save as text
-            diff_txt = output_path / "fix-preview.txt"
-            self.diff_generator.export_diff_to_file(diffs, str(diff_txt))
-
-            # Save as markdown
-            diff_md = output_path / "fix-preview.md"
-            self.diff_generator.export_diff_to_markdown(diffs, str(diff_md))
-
-            print(f"Diff preview saved to: {diff_md}")
-
-        return fixes, diffs
+        return sorted(violations, key=prioritization_key)
 
     def review_fixes(
         self,
@@ -210,6 +258,26 @@ class AutoFixEngine:
 
         return review_state
 
+    def export_patch(self, review_state: ReviewState, output_path: str) -> Dict:
+        """
+        Export approved fixes as a patch for git apply
+
+        Args:
+            review_state: ReviewState with approved fixes
+            output_path: Patch file to write
+
+        Returns:
+            Patch stats (files, additions, deletions)
+        """
+        stats = self.diff_generator.export_patch(
+            review_state.approved_fixes, output_path
+        )
+        print(
+            f"Exported {stats['files']} file(s) to {output_path} "
+            f"(+{stats['additions']} -{stats['deletions']})"
+        )
+        return stats
+
     def apply_fixes(
         self,
         review_state: ReviewState,
@@ -233,7 +301,6 @@ class AutoFixEngine:
         Returns:
             AutoFixResult with application details
         """
-
         approved_fixes = review_state.approved_fixes
 
         if not approved_fixes:
@@ -280,7 +347,7 @@ class AutoFixEngine:
                 # Collect modified file paths
                 for fix in approved_fixes:
                     modified_files.append(fix.file_path)
-                    for add_path, _ in fix.additional_files:
+                    for add_path, _ in fix.additional_file_hashes:
                         modified_files.append(add_path)
 
             except Exception as e:
@@ -289,24 +356,25 @@ class AutoFixEngine:
                 self.pr_creator.apply_fixes(approved_fixes)
                 for fix in approved_fixes:
                     modified_files.append(fix.file_path)
-                    for add_path, _ in fix.additional_files:
+                    for add_path, _ in fix.additional_file_hashes:
                         modified_files.append(add_path)
         else:
-            # Apply fixes without git operations
-            for fix in approved_fixes:
-                file_path = self.project_path / fix.file_path
-                file_path.parent.mkdir(parents=True, exist_ok=True)
-                with open(file_path, "w", encoding="utf-8") as f:
-                    f.write(fix.proposed_content)
-                modified_files.append(fix.file_path)
-
-                # Apply additional files (e.g. corresponding Java code)
-                for add_path, add_content in fix.additional_files:
-                    add_full_path = self.project_path / add_path
-                    add_full_path.parent.mkdir(parents=True, exist_ok=True)
-                    with open(add_full_path, "w", encoding="utf-8") as f:
-                        f.write(add_content)
-                    modified_files.append(add_path)
+            # Apply fixes without git operations, including additional files
+            # (e.g. corresponding Java code); all files are written or none
+            writer = AtomicFileWriter(
+                journal_dir=str(
+                    FileUtils.project_cache_dir(self.project_path) / "write-journal"
+                )
+            )
+            try:
+                for fix in approved_fixes:
+                    for path, blob in PRCreator._fix_files(fix, self.project_path):
+                        writer.add(self.project_path / path, fix.blob_store.get(blob))
+                        modified_files.append(path)
+                writer.commit()
+            except (AtomicWriteError, ValueError) as e:
+                print(f"Failed to apply fixes: {e}")
+                modified_files = []
 
         # Integrate with VS Code - show modified files in UI
         if modified_files:
@@ -366,6 +434,97 @@ class AutoFixEngine:
             validation_result=validation_result,
         )
 
+    async def validate_in_worktrees(
+        self,
+        review_state: ReviewState,
+        violations: List[Dict],
+        category: Optional[str] = None,
+        promote: bool = True,
+    ) -> List[BatchValidation]:
+        """
+        Validate approved fixes without touching the checkout
+
+        Approved fixes are split into one batch per rule. Each batch is
+        committed in its own temporary git worktree, built and re-scanned
+        there, with batches validated in parallel (FIX_VALIDATION_WORKERS).
+        A batch passes if the re-scan finds fewer violations of the rules
+        reported for its files, and no new ones.
+
+        Args:
+            review_state: ReviewState with approved fixes
+            violations: Violations of the report the fixes were proposed for
+            category: Category being fixed (filters the re-scan)
+            promote: Bring the batches that pass into the checkout
+
+        Returns:
+            BatchValidation per rule
+        """
+        batches: Dict[str, List[ProposedFix]] = {}
+        for fix in review_state.approved_fixes:
+            batches.setdefault(fix.rule_id, []).append(fix)
+        if not batches:
+            return []
+
+        by_file = self.proposer.group_by_file(violations)
+        violations_before = {}
+        for name, fixes in batches.items():
+            rules = {
+                v.get("rule") or v.get("rule_id")
+                for fix in fixes
+                for v in by_file.get(fix.file_path, [])
+            }
+            violations_before[name] = [
+                v for v in violations if (v.get("rule") or v.get("rule_id")) in rules
+            ]
+
+        validator = WorktreeValidator(str(self.project_path))
+        results = await validator.validate_batches(
+            batches, category or "", violations_before
+        )
+        if promote:
+            promoted = validator.promote(results)
+            print(f"Promoted {len(promoted)}/{len(results)} validated fix batches")
+
+        for result in results:
+            status = "✅" if result.success else "❌"
+            reason = result.error or (
+                result.validation.message if result.validation else ""
+            )
+            print(f"{status} {result.name}: {reason}")
+        return results
+
+    async def apply_fixes_isolated(
+        self,
+        review_state: ReviewState,
+        violations: List[Dict],
+        category: Optional[str] = None,
+    ) -> AutoFixResult:
+        """
+        Apply approved fixes that pass validation in worktrees
+
+        The checkout is only touched by batches that built and passed the
+        re-scan; they are committed on the current branch.
+
+        Args:
+            review_state: ReviewState with approved fixes
+            violations: Violations of the report the fixes were proposed for
+            category: Category being fixed (filters the re-scan)
+
+        Returns:
+            AutoFixResult counting the fixes of the promoted batches
+        """
+        approved_fixes = review_state.approved_fixes
+        results = await self.validate_in_worktrees(review_state, violations, category)
+        applied = [fix for result in results if result.promoted for fix in result.fixes]
+
+        return AutoFixResult(
+            fixes_proposed=len(review_state.fixes),
+            fixes_approved=len(approved_fixes),
+            fixes_rejected=len(review_state.rejected_fixes),
+            fixes_applied=len(applied),
+            batch_validations=results,
+        )
+
     async def run_full_workflow(
         self,
         report_path: str,
@@ -373,6 +532,7 @@ class AutoFixEngine:
         auto_approve_safe: bool = False,
         create_pr: bool = True,
         output_dir: Optional[str] = None,
+        isolated: bool = False,
     ) -> AutoFixResult:
         """
         Run the complete auto-fix workflow
@@ -383,6 +543,8 @@ class AutoFixEngine:
             auto_approve_safe: Whether to auto-approve safe fixes
             create_pr: Whether to create PR branch and commits
             output_dir: Optional directory for output files
+            isolated: Validate the approved fixes in git worktrees and apply
+                only the rules whose fixes build and pass the re-scan
 
         Returns:
             AutoFixResult with workflow details
@@ -432,11 +594,14 @@ class AutoFixEngine:
         # Step 4: Apply fixes
         if summary["approved"] > 0:
             print("\n[4/5] Applying approved fixes...")
-            result = self.apply_fixes(
-                review_state,
-                create_branch=False,  # Always disable PR/branch creation
-                commit_strategy="by-rule",
-            )
+            if isolated:
+                result = await self.apply_fixes_isolated(review_state, violations)
+            else:
+                result = self.apply_fixes(
+                    review_state,
+                    create_branch=False,  # Always disable PR/branch creation
+                    commit_strategy="by-rule",
+                )
             print(f"Applied {result.fixes_applied} fixes")
 
             # Step 5: Skip PR creation
@@ -0,0 +1,167 @@
+"""
+Fix Cache - On-disk cache of AI-generated fixes
+
+Re-running propose_fixes on the same report used to regenerate every AI fix.
+Results are now stored under a key derived from everything that determines
+the model's output:
+
+- the file content the model is shown (after deterministic fixes)
+- the sorted fingerprints of the violations it is asked to fix
+- the analyzer class and model
+- the analyzer's prompt template version and the settings that shape its
+  prompts and parsing (fix format, context slicing)
+- the proposer's settings, e.g. whether small files are packed together
+
+Any change to an input produces a new key, so stale entries are never
+served; they simply stop being read.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils.logger import logger
+
+# Bump when the cache entry layout changes
+CACHE_FORMAT_VERSION = "2"
+
+
+class FixCache:
+    """Content-addressed cache of proposed file contents"""
+
+    def __init__(self, cache_dir: str, enabled: bool = True):
+        """
+        Initialize fix cache
+
+        Args:
+            cache_dir: Directory for cache entries
+            enabled: Set False to bypass the cache entirely
+        """
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @staticmethod
+    def violation_fingerprint(violation: Dict) -> str:
+        """Stable fingerprint of the violation fields that shape a fix"""
+        relevant = {
+            "rule": violation.get("rule") or violation.get("rule_id", ""),
+            "message": violation.get("message", ""),
+            "line": violation.get("line"),
+            "path": violation.get("path", ""),
+            "engine": violation.get("engine", ""),
+        }
+        encoded = json.dumps(relevant, sort_keys=True, default=str)
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def analyzer_identity(analyzer) -> str:
+        """Identify the analyzer, model, prompt version and fix settings"""
+        if analyzer is None:
+            return "none"
+        return ":".join(
+            [
+                type(analyzer).__name__,
+                str(getattr(analyzer, "model", "")),
+                str(getattr(analyzer, "PROMPT_TEMPLATE_VERSION", "0")),
+                str(getattr(analyzer, "fix_settings", "")),
+            ]
+        )
+
+    def make_key(
+        self,
+        content: str,
+        violations: List[Dict],
+        analyzer,
+        settings: Optional[Dict] = None,
+    ) -> str:
+        """
+        Build the cache key for one file fix
+
+        Args:
+            content: File content sent to the analyzer
+            violations: Violations the analyzer is asked to fix
+            analyzer: Analyzer instance generating the fix
+            settings: Caller settings that change the request (e.g. packing)
+
+        Returns:
+            Hex digest key
+        """
+        digest = hashlib.sha256()
+        digest.update(CACHE_FORMAT_VERSION.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(self.analyzer_identity(analyzer).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(json.dumps(settings or {}, sort_keys=True).encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(hashlib.sha256(content.encode("utf-8")).digest())
+        for fingerprint in sorted(self.violation_fingerprint(v) for v in violations):
+            digest.update(fingerprint.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        """Path of the entry for a key (sharded by prefix)"""
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get cached proposed content
+
+        Returns:
+            Proposed file content, or None on a miss
+        """
+        if not self.enabled:
+            return None
+
+        entry_path = self._entry_path(key)
+        try:
+            with open(entry_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            proposed_content = entry["proposed_content"]
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError) as e:
+            logger.debug(f"Ignoring unreadable fix cache entry {entry_path}: {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return proposed_content
+
+    def put(self, key: str, proposed_content: str, file_path: str = ""):
+        """
+        Store proposed content (written atomically)
+
+        Args:
+            key: Cache key from make_key
+            proposed_content: Fixed file content
+            file_path: File the fix belongs to (informational)
+        """
+        if not self.enabled:
+            return
+
+        entry_path = self._entry_path(key)
+        entry = {
+            "file_path": file_path,
+            "created_at": time.time(),
+            "proposed_content": proposed_content,
+        }
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, entry_path)
+            self.writes += 1
+        except OSError as e:
+            logger.warning(f"Could not write fix cache entry: {e}")
+
+    def get_stats(self) -> Dict:
+        """Get hit/miss counters"""
+        return {"hits": self.hits, "misses": self.misses, "writes": self.writes}
@@ -4,14 +4,20 @@ PR Creator - Handles Git operations and pull request creation
 Creates branches, commits changes, and generates pull requests for approved fixes.
 """
 
+import os
 import subprocess
-from typing import List, Optional, Dict
+import tempfile
+from typing import List, Optional, Dict, Tuple
 from pathlib import Path
 from dataclasses import dataclass
 from datetime import datetime
 
-from .proposer import ProposedFix
+from .blob_store import BlobStore
+from .proposer import RELATED_FILE_REFERENCE, ProposedFix
 from .review_gate import ReviewState
+from utils.atomic_writer import AtomicFileWriter
+from utils.file_utils import FileUtils
+from utils.path_utils import PathUtils
 
 
 @dataclass
@@ -39,8 +45,17 @@ class PullRequestInfo:
 class PRCreator:
     """Creates pull requests for approved governance fixes"""
 
-    def __init__(self, project_path: str):
+    def __init__(self, project_path: str, source_root: Optional[str] = None):
+        """
+        Initialize PR creator
+
+        Args:
+            project_path: Root of the git checkout to commit in
+            source_root: Root that absolute fix paths refer to (default:
+                project_path; a worktree of a checkout passes the checkout)
+        """
         self.project_path = Path(project_path)
+        self.source_root = Path(source_root) if source_root else self.project_path
         self._verify_git_repo()
 
     def _verify_git_repo(self):
@@ -50,12 +65,22 @@ class PRCreator:
             raise ValueError(f"Not a git repository: {self.project_path}")
 
     def _run_git_command(
-        self, args: List[str], check=True
+        self,
+        args: List[str],
+        check=True,
+        input: Optional[str] = None,
+        env: Optional[Dict[str, str]] = None,
     ) -> subprocess.CompletedProcess:
         """Run a git command"""
         cmd = ["git"] + args
         return subprocess.run(
-            cmd, cwd=self.project_path, capture_output=True, text=True, check=check
+            cmd,
+            cwd=self.project_path,
+            capture_output=True,
+            text=True,
+            check=check,
+            input=input,
+            env=env,
         )
 
     def create_branch(self, branch_name: Optional[str] = None) -> str:
@@ -90,22 +115,26 @@ class PRCreator:
             List of modified file paths
         """
 
+        writer = self._writer()
         modified_files = []
 
         for fix in fixes:
-            file_path = self.project_path / fix.file_path
-
-            # Ensure parent directory exists
-            file_path.parent.mkdir(parents=True, exist_ok=True)
-
-            # Write proposed content
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(fix.proposed_content)
-
-            modified_files.append(fix.file_path)
+            for path, blob in self._fix_files(fix, self.source_root):
+                writer.add(self.project_path / path, fix.blob_store.get(blob))
+                modified_files.append(path)
 
+        # All files are written, or none (AtomicWriteError)
+        writer.commit()
         return modified_files
 
+    def _writer(self) -> AtomicFileWriter:
+        """Batch writer journaling into the project's cache directory"""
+        return AtomicFileWriter(
+            journal_dir=str(
+                FileUtils.project_cache_dir(self.project_path) / "write-journal"
+            )
+        )
+
     def create_commit(
         self,
         files: List[str],
@@ -164,22 +193,17 @@ class PRCreator:
                 fixes_by_rule[fix.rule_id] = []
             fixes_by_rule[fix.rule_id].append(fix)
 
-        commits = []
-
-        # Create a commit for each rule
-        for rule_id, fixes in fixes_by_rule.items():
-            # Apply fixes
-            modified_files = self.apply_fixes(fixes)
-
-            # Determine severity
-            severity = self._determine_severity(rule_id)
-
-            # Create commit
-            description = f"Fix {len(fixes)} violation(s)"
-            commit = self.create_commit(modified_files, rule_id, description, severity)
-            commits.append(commit)
-
-        return commits
+        # One commit per rule
+        groups = [
+            (
+                rule_id,
+                f"Fix {len(fixes)} violation(s)",
+                self._determine_severity(rule_id),
+                fixes,
+            )
+            for rule_id, fixes in fixes_by_rule.items()
+        ]
+        return self._commit_fix_groups(groups)
 
     def create_single_commit(self, review_state: ReviewState) -> CommitInfo:
         """
@@ -194,9 +218,6 @@ class PRCreator:
 
         approved_fixes = review_state.approved_fixes
 
-        # Apply all fixes
-        modified_files = self.apply_fixes(approved_fixes)
-
         # Count by severity
         critical = sum(
             1
@@ -211,11 +232,176 @@ class PRCreator:
 
         # Create commit
         description = f"Fix {critical} critical and {warnings} warning violations"
-        commit = self.create_commit(
-            modified_files, "governance-auto-fix", description, "mixed"
+        commits = self._commit_fix_groups(
+            [("governance-auto-fix", description, "mixed", approved_fixes)]
+        )
+        if not commits:
+            raise ValueError("Approved fixes don't change any file")
+        return commits[0]
+
+    def _commit_fix_groups(
+        self, groups: List[Tuple[str, str, str, List[ProposedFix]]]
+    ) -> List[CommitInfo]:
+        """
+        Commit groups of fixes on top of HEAD with git plumbing
+
+        Commits are built in a temporary index: all fix contents are hashed
+        in one hash-object call, and each commit then takes one
+        update-index, write-tree and commit-tree call, however many files
+        it touches. The branch is moved once (update-ref), and the working
+        tree and index are updated once, after the last commit. Changes
+        already staged by the user are not included. Commit hooks don't run;
+        commits are signed when commit.gpgsign is set, as git commit would.
+
+        Args:
+            groups: (rule_id, description, severity, fixes) per commit, in
+                commit order
+
+        Returns:
+            CommitInfo per commit (groups that change nothing are skipped)
+        """
+        head = self._run_git_command(["rev-parse", "--verify", "-q", "HEAD"], False)
+        parent = head.stdout.strip() or None
+        # commit-tree only signs when asked to
+        gpgsign = self._run_git_command(["config", "--bool", "commit.gpgsign"], False)
+        sign = gpgsign.stdout.strip() == "true"
+
+        with tempfile.TemporaryDirectory(prefix="governance-commit-") as tmp_dir:
+            env = {**os.environ, "GIT_INDEX_FILE": os.path.join(tmp_dir, "index")}
+            self._run_git_command(
+                ["read-tree", parent] if parent else ["read-tree", "--empty"], env=env
+            )
+            modes = self._index_modes(env)
+
+            # Hash every distinct content once
+            group_files = [
+                [
+                    (path, blob, fix.blob_store)
+                    for fix in fixes
+                    for path, blob in self._fix_files(fix, self.source_root)
+                ]
+                for _, _, _, fixes in groups
+            ]
+            store_by_hash = {
+                blob: store for files in group_files for _, blob, store in files
+            }
+            object_ids = self._hash_contents(store_by_hash, tmp_dir)
+
+            commits = []
+            final_entries: Dict[str, str] = {}
+            final_blobs: Dict[str, Tuple[str, BlobStore]] = {}
+            tree = None
+            for (rule_id, description, severity, _), files in zip(groups, group_files):
+                entries: Dict[str, str] = {}
+                for path, blob, store in files:
+                    entries[path] = (
+                        f"{modes.get(path, '100644')} {object_ids[blob]}\t{path}"
+                    )
+                    final_blobs[path] = (blob, store)
+                self._update_index(entries, env=env)
+                final_entries.update(entries)
+
+                new_tree = self._run_git_command(["write-tree"], env=env).stdout.strip()
+                if new_tree == (tree or self._tree_of(parent)):
+                    tree = new_tree
+                    continue  # Nothing changed
+                tree = new_tree
+
+                paths = list(entries)
+                message = self._generate_commit_message(
+                    rule_id, description, paths, severity
+                )
+                args = ["commit-tree", tree, "-F", "-"]
+                if parent:
+                    args += ["-p", parent]
+                if sign:
+                    args.append("-S")
+                commit_hash = self._run_git_command(args, input=message).stdout.strip()
+                commits.append(
+                    CommitInfo(hash=commit_hash, message=message, files_changed=paths)
+                )
+                parent = commit_hash
+
+        if not commits:
+            return commits
+
+        # Bring the working tree and index up to date, then move the branch:
+        # if writing fails, HEAD, index and files are all left as they were
+        writer = self._writer()
+        for path, (blob, store) in final_blobs.items():
+            writer.add(self.project_path / path, store.get(blob))
+        writer.commit()
+        self._update_index(final_entries)
+
+        update_ref = ["update-ref", "-m", "governance auto-fix", "HEAD", parent]
+        if head.stdout.strip():
+            update_ref.append(head.stdout.strip())
+        self._run_git_command(update_ref)
+        self._run_git_command(["update-index", "-q", "--refresh"], check=False)
+        return commits
+
+    def _update_index(self, entries: Dict[str, str], env: Optional[Dict] = None):
+        """
+        Set index entries ("<mode> <object>\t<path>")
+
+        Raises:
+            ValueError: If git ignored a path (update-index still exits 0)
+        """
+        result = self._run_git_command(
+            ["update-index", "-z", "--index-info"],
+            input="".join(f"{entry}\0" for entry in entries.values()),
+            env=env,
+        )
+        if "Ignoring path" in result.stderr:
+            raise ValueError(f"git rejected fix paths: {result.stderr.strip()}")
+
+    @staticmethod
+    def _fix_files(fix: ProposedFix, root: Path) -> List[Tuple[str, str]]:
+        """(path relative to root, content hash) of every file a fix writes"""
+        reference_hash = BlobStore.hash_content(RELATED_FILE_REFERENCE)
+        files = [(PathUtils.repo_relative_path(fix.file_path, root), fix.proposed_hash)]
+        files += [
+            (PathUtils.repo_relative_path(path, root), blob)
+            for path, blob in fix.additional_file_hashes
+            if blob != reference_hash
+        ]
+        return files
+
+    def _index_modes(self, env: Dict[str, str]) -> Dict[str, str]:
+        """File modes of the entries of an index"""
+        result = self._run_git_command(["ls-files", "--stage", "-z"], env=env)
+        modes = {}
+        for record in result.stdout.split("\0"):
+            if record:
+                info, path = record.split("\t", 1)
+                mode = info.split(" ", 1)[0]
+                modes[path] = mode if mode in ("100644", "100755") else "100644"
+        return modes
+
+    def _hash_contents(
+        self, store_by_hash: Dict[str, BlobStore], tmp_dir: str
+    ) -> Dict[str, str]:
+        """Write contents as git blobs in one hash-object call"""
+        blob_dir = Path(tmp_dir) / "blobs"
+        blob_dir.mkdir()
+        paths = []
+        for blob, store in store_by_hash.items():
+            path = blob_dir / blob
+            path.write_bytes(store.get(blob).encode("utf-8"))
+            paths.append(str(path))
+        if not paths:
+            return {}
+        result = self._run_git_command(
+            ["hash-object", "-w", "--no-filters", "--stdin-paths"],
+            input="".join(f"{path}\n" for path in paths),
         )
+        return dict(zip(store_by_hash, result.stdout.split()))
 
-        return commit
+    def _tree_of(self, commit: Optional[str]) -> Optional[str]:
+        """Tree of a commit (None for no commit)"""
+        if not commit:
+            return None
+        return self._run_git_command(["rev-parse", f"{commit}^{{tree}}"]).stdout.strip()
 
     def generate_pr_description(
         self,
@@ -4,44 +4,132 @@ Fix Proposer - Analyzes violations and generates fix proposals
 This module takes governance violations and proposes minimal, safe fixes.
 """
 
+import multiprocessing
 import os
 import re
-from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from pathlib import Path
 from dataclasses import dataclass, field
 
 from .fix_strategies import FixStrategy, FixComplexity, FixSafety, get_strategy
+from .concurrency import AdaptiveConcurrencyLimiter
+from .blob_store import BlobStore
+from .fix_cache import FixCache
+from .spec_transforms import CONTROLLER_PATH_FIXES, SpecTree, get_spec_transform
 from engines.llm_analyzer import LLMAnalyzer
 from engines.copilot_analyzer import CopilotAnalyzer
+from engines.hedged_analyzer import HedgedAnalyzer, supports_multi_file_fix
+from engines.rate_limiter import estimate_tokens, track_overloads
+from utils.file_utils import FileUtils
 from utils.logger import logger
-from utils import PathUtils
+from utils.route_index import RouteIndex
+from utils.test_index import JavaTestIndex
 import asyncio
 
+# additional_files content of related files listed for reference only
+RELATED_FILE_REFERENCE = "RELATED_FILE_REFERENCE"
 
-@dataclass
+
+@dataclass(init=False)
 class ProposedFix:
-    """Represents a proposed fix for a violation"""
+    """
+    Represents a proposed fix for a violation
+
+    File contents are kept in a BlobStore: the fix holds their hashes and
+    original_content, proposed_content and additional_files load them on
+    access.
+    """
 
     fix_id: str
     rule_id: str
     file_path: str
     line_number: Optional[int]
-    original_content: str
-    proposed_content: str
+    original_hash: str
+    proposed_hash: str
     explanation: str
     strategy: FixStrategy
-    requires_imports: List[str] = field(default_factory=list)
-    removes_imports: List[str] = field(default_factory=list)
-    additional_files: List[Tuple[str, str]] = field(
-        default_factory=list
-    )  # [(path, content)]
+    requires_imports: List[str]
+    removes_imports: List[str]
+    additional_file_hashes: List[Tuple[str, str]]  # [(path, content hash)]
+
+    def __init__(
+        self,
+        fix_id: str,
+        rule_id: str,
+        file_path: str,
+        line_number: Optional[int],
+        original_content: str,
+        proposed_content: str,
+        explanation: str,
+        strategy: FixStrategy,
+        requires_imports: Optional[List[str]] = None,
+        removes_imports: Optional[List[str]] = None,
+        additional_files: Optional[List[Tuple[str, str]]] = None,
+        blob_store: Optional[BlobStore] = None,
+    ):
+        self.blob_store = blob_store or BlobStore.default()
+        self.fix_id = fix_id
+        self.rule_id = rule_id
+        self.file_path = file_path
+        self.line_number = line_number
+        self.original_content = original_content
+        self.proposed_content = proposed_content
+        self.explanation = explanation
+        self.strategy = strategy
+        self.requires_imports = requires_imports or []
+        self.removes_imports = removes_imports or []
+        self.additional_files = additional_files or []  # [(path, content)]
+
+    @classmethod
+    def from_hashes(
+        cls, blob_store: Optional[BlobStore] = None, **fields
+    ) -> "ProposedFix":
+        """Fix from its dataclass fields (contents given by hash)"""
+        fix = cls.__new__(cls)
+        fix.blob_store = blob_store or BlobStore.default()
+        for name, value in fields.items():
+            setattr(fix, name, value)
+        fix.additional_file_hashes = [tuple(f) for f in fix.additional_file_hashes]
+        return fix
+
+    @property
+    def original_content(self) -> str:
+        return self.blob_store.get(self.original_hash)
+
+    @original_content.setter
+    def original_content(self, content: str):
+        self.original_hash = self.blob_store.put(content)
+
+    @property
+    def proposed_content(self) -> str:
+        return self.blob_store.get(self.proposed_hash)
+
+    @proposed_content.setter
+    def proposed_content(self, content: str):
+        self.proposed_hash = self.blob_store.put(content)
+
+    @property
+    def additional_files(self) -> List[Tuple[str, str]]:
+        """[(path, content)] of related files the fix also changes"""
+        return [
+            (path, self.blob_store.get(blob_hash))
+            for path, blob_hash in self.additional_file_hashes
+        ]
+
+    @additional_files.setter
+    def additional_files(self, files: List[Tuple[str, str]]):
+        self.additional_file_hashes = [
+            (path, self.blob_store.put(content)) for path, content in files
+        ]
 
     @property
     def is_safe_to_auto_apply(self) -> bool:
         """Check if this fix can be auto-applied"""
         # If we have a concrete proposal (content changed), we consider it applicable
         # This matches the user's request to "apply all fixes"
-        return self.proposed_content != self.original_content
+        return self.proposed_hash != self.original_hash
 
     @property
     def complexity_level(self) -> str:
@@ -49,6 +137,23 @@ class ProposedFix:
         return self.strategy.complexity.value
 
 
+@dataclass
+class FileFixJob:
+    """Per-file state between the deterministic and LLM fix phases"""
+
+    file_path: str
+    violations: List[Dict]
+    original_content: str
+    current_content: str
+    llm_violations: List[Dict] = field(default_factory=list)
+
+    @property
+    def estimated_tokens(self) -> int:
+        """Prompt tokens this file adds to an LLM request"""
+        messages = " ".join(v.get("message", "") for v in self.llm_violations)
+        return estimate_tokens(self.current_content) + estimate_tokens(messages) + 20
+
+
 class FixProposer:
     """Proposes fixes for governance violations"""
 
@@ -57,6 +162,14 @@ class FixProposer:
         project_path: str,
         llm_analyzer: Optional[LLMAnalyzer] = None,
         use_copilot: bool = True,
+        concurrency_floor: Optional[int] = None,
+        concurrency_ceiling: Optional[int] = None,
+        concurrency_initial: Optional[int] = None,
+        pack_token_budget: Optional[int] = None,
+        fix_cache: Optional[FixCache] = None,
+        fast_analyzer=None,
+        hedge_analyzer=None,
+        process_workers: Optional[int] = None,
     ):
         """
         Initialize fix proposer with configurable analyzer
@@ -65,11 +178,71 @@ class FixProposer:
             project_path: Root path of the project
             llm_analyzer: Optional LLM analyzer (fallback/legacy)
             use_copilot: Use GitHub Copilot for fast fixes (default: True)
+            concurrency_floor: Minimum concurrent LLM calls (or FIX_CONCURRENCY_MIN env)
+            concurrency_ceiling: Maximum concurrent LLM calls (or FIX_CONCURRENCY_MAX env)
+            concurrency_initial: Starting concurrency (or FIX_CONCURRENCY_INITIAL env)
+            pack_token_budget: Token budget for packing small files into one
+                multi-file LLM request (or FIX_PACK_TOKEN_BUDGET env, 0 disables)
+            fix_cache: Cache of AI fixes (default: .governance-cache/fixes in
+                the project, git-ignored, or FIX_CACHE_DIR env; FIX_CACHE=0
+                disables)
+            fast_analyzer: Cheap analyzer for simple fixes; complex fixes and
+                failed ones escalate to the main analyzer (or FIX_FAST_MODEL env)
+            hedge_analyzer: Secondary backend that receives requests the main
+                analyzer hasn't answered within its p90 latency (or FIX_HEDGE=1
+                to hedge to the local LLM)
+            process_workers: Worker processes for the deterministic fixers
+                (or FIX_PROCESS_WORKERS env, default: CPU count; 0 runs them
+                inline on the event loop thread)
         """
         self.project_path = Path(project_path)
         self.use_copilot = use_copilot
         self._fix_counter = 0
 
+        # Concurrency adapts to the backend (AIMD on latency and 429s/timeouts)
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            initial=concurrency_initial
+            or int(os.getenv("FIX_CONCURRENCY_INITIAL", "3")),
+            floor=concurrency_floor or int(os.getenv("FIX_CONCURRENCY_MIN", "1")),
+            ceiling=concurrency_ceiling or int(os.getenv("FIX_CONCURRENCY_MAX", "16")),
+        )
+
+        # Small files share one LLM request up to this prompt budget
+        self.pack_token_budget = (
+            pack_token_budget
+            if pack_token_budget is not None
+            else int(os.getenv("FIX_PACK_TOKEN_BUDGET", "3000"))
+        )
+        self.pack_max_files = int(os.getenv("FIX_PACK_MAX_FILES", "8"))
+        self.pack_max_file_tokens = int(os.getenv("FIX_PACK_MAX_FILE_TOKENS", "1000"))
+
+        # CPU-bound deterministic fixes run in worker processes for reports
+        # with at least process_min_files files
+        self.process_workers = (
+            process_workers
+            if process_workers is not None
+            else int(os.getenv("FIX_PROCESS_WORKERS", str(os.cpu_count() or 1)))
+        )
+        self.process_min_files = int(os.getenv("FIX_PROCESS_MIN_FILES", "8"))
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+        # AI fixes are cached by content, violations, model and prompt version
+        if fix_cache is None:
+            enabled = os.getenv("FIX_CACHE", "1") != "0"
+            # Only create .governance-cache in the project when it will be used
+            cache_dir = os.getenv("FIX_CACHE_DIR") or (
+                str(FileUtils.project_cache_dir(self.project_path) / "fixes")
+                if enabled
+                else ""
+            )
+            fix_cache = FixCache(cache_dir, enabled=enabled)
+        self.fix_cache = fix_cache
+
+        # Spring routes -> controllers, parsed once per run
+        self.route_index = RouteIndex.for_project(str(self.project_path))
+        # Test sources by class name, walked once per run
+        self.test_index = JavaTestIndex.for_project(str(self.project_path))
+
         # Initialize analyzer based on configuration
         if use_copilot:
             try:
@@ -84,9 +257,61 @@ class FixProposer:
             self.analyzer = llm_analyzer
             print("⚠ Using legacy LLM analyzer (30-90s per fix)")
 
+        # Opt-in hedging of slow requests to a second backend
+        if self.analyzer and hedge_analyzer:
+            self.analyzer = HedgedAnalyzer(self.analyzer, hedge_analyzer)
+        elif self.analyzer:
+            self.analyzer = HedgedAnalyzer.from_env(self.analyzer) or self.analyzer
+
+        # Route simple fixes to a fast model when one is configured
+        # (imported here: model_router depends on this package's strategies)
+        from engines.model_router import ModelRouter
+
+        if self.analyzer and fast_analyzer:
+            self.analyzer = ModelRouter(fast_analyzer, self.analyzer)
+        elif self.analyzer:
+            self.analyzer = ModelRouter.from_env(self.analyzer) or self.analyzer
+
         # For backward compatibility
         self.llm_analyzer = self.analyzer
 
+    @classmethod
+    def for_deterministic_fixes(
+        cls,
+        project_path: str,
+        route_index: Optional[RouteIndex] = None,
+        test_index: Optional[JavaTestIndex] = None,
+    ) -> "FixProposer":
+        """
+        Proposer for the deterministic fixers only (no analyzer)
+
+        Used in fix worker processes, which never call an LLM and must not
+        set up analyzers, caches or concurrency limits.
+
+        Args:
+            project_path: Root path of the project
+            route_index: Index built by the parent process (default: scan
+                the project)
+            test_index: Index built by the parent process (default: walk
+                the project)
+        """
+        proposer = cls.__new__(cls)
+        proposer.project_path = Path(project_path)
+        proposer.use_copilot = False
+        proposer._fix_counter = 0
+        proposer.route_index = route_index or RouteIndex.for_project(project_path)
+        proposer.test_index = test_index or JavaTestIndex.for_project(project_path)
+        proposer.analyzer = None
+        proposer.llm_analyzer = None
+        proposer._process_pool = None
+        return proposer
+
+    def close(self):
+        """Stop the fix worker processes (without waiting for them)"""
+        pool, self._process_pool = self._process_pool, None
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+
     def _find_test_files_for_java_class(self, java_class_path: str) -> List[str]:
         """
         Find test files (unit tests and integration tests) for ANY Java class.
@@ -105,19 +330,13 @@ class FixProposer:
         Returns:
             List of test file paths (relative to project root)
         """
-        java_path_obj = Path(java_class_path)
-        class_name = java_path_obj.stem
-
-        # Use PathUtils to find test files
-        test_files = PathUtils.find_test_files_for_class(
-            str(self.project_path), class_name
+        class_name = Path(java_class_path).stem
+        base_name = (
+            class_name.replace("Controller", "")
+            .replace("Service", "")
+            .replace("Repository", "")
         )
-
-        # Convert to relative paths
-        return [
-            PathUtils.get_relative_path(str(f), str(self.project_path))
-            for f in test_files
-        ]
+        return self.test_index.tests_for_class(class_name, base_name=base_name)
 
     def _find_test_files_for_controller(self, controller_path: str) -> List[str]:
         """
@@ -226,7 +445,77 @@ class FixProposer:
         """
         Generate fix proposals for a list of violations with batching and parallelization.
         """
-        # Group violations by file path
+        proposals = [proposal async for proposal in self.iter_fixes(violations)]
+        return self.in_report_order(proposals, violations)
+
+    async def iter_fixes(self, violations: List[Dict]) -> AsyncIterator[ProposedFix]:
+        """
+        Generate fix proposals, yielding each one as soon as it's ready
+
+        Deterministic and cached fixes come first; LLM fixes follow in
+        completion order, so callers can show progress while the slowest
+        requests are still running.
+
+        Args:
+            violations: Violations from the governance report
+
+        Yields:
+            ProposedFix objects (use in_report_order to sort collected ones)
+        """
+        file_batches = self.group_by_file(violations)
+        if not file_batches:
+            return
+
+        # Phase 1: deterministic fixes
+        jobs = await self._prepare_file_jobs(file_batches)
+
+        # Cached AI fixes are served without calling the analyzer
+        pending = []
+        for job in jobs:
+            cached = self._get_cached_fix(job)
+            if cached is None:
+                pending.append(job)
+            else:
+                for proposal in self._build_batch_proposal(job, cached):
+                    yield proposal
+
+        # Phase 2: LLM fixes in parallel, small files packed into shared
+        # requests; LLM calls are throttled by self.concurrency
+        packs, singles = self._pack_jobs(pending)
+
+        async def process_job(job: FileFixJob) -> List[ProposedFix]:
+            try:
+                return await self._complete_file_job(job)
+            except Exception as e:
+                print(f"Error processing fixes for {job.file_path}: {e}")
+                return []
+
+        async def process_pack(pack: List[FileFixJob]) -> List[ProposedFix]:
+            try:
+                return await self._complete_packed_jobs(pack)
+            except Exception as e:
+                print(f"Error processing packed fixes for {len(pack)} files: {e}")
+                return []
+
+        tasks = [asyncio.ensure_future(process_job(job)) for job in singles]
+        tasks += [asyncio.ensure_future(process_pack(pack)) for pack in packs]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for proposal in await next_done:
+                    yield proposal
+        finally:
+            # The consumer stopped early: don't leave LLM requests running
+            for task in tasks:
+                task.cancel()
+
+        self._log_rate_limit_metrics()
+        self._log_concurrency_stats()
+        self._log_cache_stats()
+        self._log_routing_stats()
+        self._log_hedge_stats()
+
+    def group_by_file(self, violations: List[Dict]) -> Dict[str, List[Dict]]:
+        """Group violations by file path, in report order"""
         file_batches: Dict[str, List[Dict]] = {}
         for violation in violations:
             api_message = violation.get("message", "")
@@ -238,28 +527,142 @@ class FixProposer:
                 file_batches[file_path] = []
             file_batches[file_path].append(violation)
 
-        if not file_batches:
-            return []
+        return file_batches
+
+    def in_report_order(
+        self, proposals: List[ProposedFix], violations: List[Dict]
+    ) -> List[ProposedFix]:
+        """Sort streamed proposals into the order of their files in the report"""
+        order = {path: i for i, path in enumerate(self.group_by_file(violations))}
+        return sorted(proposals, key=lambda p: order.get(p.file_path, len(order)))
 
-        # Process files in parallel with a concurrency limit
-        semaphore = asyncio.Semaphore(3)  # Max 3 concurrent LLM sessions
+    async def _prepare_file_jobs(
+        self, file_batches: Dict[str, List[Dict]]
+    ) -> List[FileFixJob]:
+        """
+        Apply the deterministic fixes of every file
+
+        The regex and YAML fixers are CPU-bound. For large reports they run
+        in the proposer's process pool, so they use every core instead of
+        serializing on the event loop thread. Files are sent in chunks along
+        with the route and test indexes built here, so workers never walk
+        the project; inputs and outputs (FileFixJob) are plain picklable data.
+
+        Returns:
+            Jobs in report order (unreadable files are skipped)
+        """
+        workers = min(self.process_workers, len(file_batches))
+        results: Dict[str, Optional[FileFixJob]] = {}
 
-        async def process_file(path, v_list) -> List[ProposedFix]:
-            async with semaphore:
+        if workers > 1 and len(file_batches) >= self.process_min_files:
+            # Load (or re-validate) the indexes once, before they are pickled
+            self.route_index.routes()
+            self.test_index._ensure_loaded()
+
+            items = list(file_batches.items())
+            chunk_size = max(1, -(-len(items) // (workers * 4)))
+            loop = asyncio.get_running_loop()
+            try:
+                pool = self._get_process_pool()
+                futures = [
+                    loop.run_in_executor(
+                        pool,
+                        _prepare_file_jobs_in_worker,
+                        type(self),
+                        str(self.project_path),
+                        self.route_index,
+                        self.test_index,
+                        items[start : start + chunk_size],
+                    )
+                    for start in range(0, len(items), chunk_size)
+                ]
+                for future in futures:
+                    for path, job, error in await future:
+                        if error:
+                            print(f"Error processing fixes for {path}: {error}")
+                        results[path] = job
+            except BrokenProcessPool as e:
+                logger.warning(
+                    f"Fix worker processes failed ({e}); "
+                    "applying the remaining deterministic fixes inline"
+                )
+            finally:
+                # Idle workers would outlive the run in long-lived sessions
+                self.close()
+
+        jobs = []
+        for path, v_list in file_batches.items():
+            if path in results:
+                job = results[path]
+            else:
                 try:
-                    return await self._generate_fixes_for_file(path, v_list)
+                    job = self._prepare_file_job(path, v_list)
                 except Exception as e:
                     print(f"Error processing fixes for {path}: {e}")
-                    return []
+                    continue
+            if job:
+                jobs.append(job)
+        return jobs
 
-        tasks = [process_file(path, v_list) for path, v_list in file_batches.items()]
-        results = await asyncio.gather(*tasks)
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """
+        Fix worker pool, started on first use and closed at the end of the run
 
-        all_proposals = []
-        for file_proposals in results:
-            all_proposals.extend(file_proposals)
+        Workers are started with forkserver (or spawn) rather than fork: the
+        caller has a running event loop and background threads, which a
+        forked child would inherit in an inconsistent state.
+        """
+        if self._process_pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=self.process_workers, mp_context=context
+            )
+        return self._process_pool
 
-        return all_proposals
+    async def _call_analyzer(self, method_name: str, *args):
+        """
+        Call an analyzer method inside an adaptive concurrency slot
+
+        The slot is marked overloaded if this call's requests saw 429s or
+        timeouts; signals from other calls in flight don't count.
+        """
+        method = getattr(self.analyzer, method_name)
+        async with self.concurrency.slot() as slot:
+            with track_overloads() as overloads:
+                try:
+                    return await method(*args)
+                finally:
+                    slot.overloaded = overloads.count > 0
+
+    def _log_concurrency_stats(self):
+        """Log the concurrency level fix generation settled on"""
+        stats = self.concurrency.get_stats()
+        if stats["calls"]:
+            logger.info(
+                f"Adaptive concurrency settled at {stats['concurrency']} "
+                f"(peak {stats['peak_concurrency']}, range {stats['floor']}-{stats['ceiling']}, "
+                f"{stats['overloads']} overload signal(s) over {stats['calls']} call(s))"
+            )
+
+    def _log_rate_limit_metrics(self):
+        """Log how much time fix generation spent waiting on the API rate limit"""
+        get_metrics = getattr(self.analyzer, "get_rate_limit_metrics", None)
+        if not get_metrics:
+            return
+
+        metrics = get_metrics()
+        if not metrics:
+            return
+        if metrics["requests_throttled"] or metrics["rate_limited_responses"]:
+            logger.info(
+                f"Rate limiter: {metrics['requests_throttled']}/{metrics['requests_granted']} "
+                f"request(s) throttled for {metrics['total_throttle_seconds']}s total, "
+                f"{metrics['rate_limited_responses']} 429 response(s), "
+                f"max queue depth {metrics['max_queue_depth']}"
+            )
 
     async def _generate_fixes_for_file(
         self, file_path: str, violations: List[Dict]
@@ -268,19 +671,35 @@ class FixProposer:
         Process all violations for a single file.
         Attempts to apply specific strategies first, then falls back to batch LLM fix.
         """
+        job = self._prepare_file_job(file_path, violations)
+        if not job:
+            return []
+        return await self._complete_file_job(job)
+
+    def _prepare_file_job(
+        self, file_path: str, violations: List[Dict]
+    ) -> Optional[FileFixJob]:
+        """
+        Read a file and apply its deterministic fixes
+
+        Returns:
+            FileFixJob with the violations left for the LLM, or None if the
+            file can't be read
+        """
         full_path = self.project_path / file_path
         if not full_path.exists():
-            return []
+            return None
 
         try:
             with open(full_path, "r", encoding="utf-8") as f:
                 original_content = f.read()
         except Exception:
-            return []
+            return None
 
         current_content = original_content
-        fast_proposals = []
         llm_violations = []
+        # Spec fixes share one parsed tree, serialized once they're all applied
+        spec_tree: Optional[SpecTree] = None
 
         # 1. Apply fast fixes first
         for violation in violations:
@@ -292,6 +711,17 @@ class FixProposer:
                 llm_violations.append(violation)
                 continue
 
+            if get_spec_transform(strategy.fix_function):
+                if spec_tree is None:
+                    spec_tree = SpecTree(current_content)
+                if not self._apply_spec_transform(spec_tree, strategy.fix_function):
+                    llm_violations.append(violation)
+                continue
+
+            if spec_tree is not None:
+                current_content = spec_tree.serialize()
+                spec_tree = None
+
             # If strategy has a specific function, try applying it
             fix_method = getattr(self, strategy.fix_function, None)
             if fix_method:
@@ -306,9 +736,6 @@ class FixProposer:
                         current_content, _, _ = (
                             result  # We use the updated content for next steps
                         )
-                        # We still create a proposal so the user knows what happened
-                        # But wait, if we merge them all into one batch fix, it might be cleaner
-                        fast_proposals.append(violation)
                     else:
                         llm_violations.append(violation)
                 except Exception:
@@ -317,12 +744,193 @@ class FixProposer:
                 # Manual or no function strategy -> LLM candidate
                 llm_violations.append(violation)
 
-        # 2. If we have remaining violations, use batch LLM fix
-        final_content = current_content
-        if llm_violations and self.analyzer:
-            final_content = await self.analyzer.generate_batch_fix(
-                current_content, llm_violations
+        if spec_tree is not None:
+            current_content = spec_tree.serialize()
+
+        return FileFixJob(
+            file_path=file_path,
+            violations=violations,
+            original_content=original_content,
+            current_content=current_content,
+            llm_violations=llm_violations,
+        )
+
+    async def _complete_file_job(self, job: FileFixJob) -> List[ProposedFix]:
+        """Run the batch LLM fix for one file and build its proposal"""
+        final_content = job.current_content
+        if job.llm_violations and self.analyzer:
+            final_content = await self._call_analyzer(
+                "generate_batch_fix", job.current_content, job.llm_violations
+            )
+            self._store_cached_fix(job, final_content)
+        return self._build_batch_proposal(job, final_content)
+
+    def _get_cached_fix(self, job: FileFixJob) -> Optional[str]:
+        """Look up a cached AI fix for a job (None if not cached)"""
+        if not job.llm_violations or not self.analyzer:
+            return None
+        key = self.fix_cache.make_key(
+            job.current_content,
+            job.llm_violations,
+            self.analyzer,
+            self._fix_cache_settings(),
+        )
+        return self.fix_cache.get(key)
+
+    def _store_cached_fix(self, job: FileFixJob, final_content: str):
+        """
+        Cache an AI fix
+
+        Unchanged results aren't cached: analyzers return the input on
+        errors, and a transient failure must not stick.
+        """
+        if final_content == job.current_content:
+            return
+        key = self.fix_cache.make_key(
+            job.current_content,
+            job.llm_violations,
+            self.analyzer,
+            self._fix_cache_settings(),
+        )
+        self.fix_cache.put(key, final_content, job.file_path)
+
+    def _fix_cache_settings(self) -> Dict:
+        """Proposer settings that change AI fixes (part of the cache key)"""
+        if self.pack_token_budget <= 0:
+            return {"pack": None}
+        return {
+            "pack": [
+                self.pack_token_budget,
+                self.pack_max_files,
+                self.pack_max_file_tokens,
+            ]
+        }
+
+    def _log_hedge_stats(self):
+        """Log how often slow requests were hedged and what it saved"""
+        analyzer = self.analyzer
+        # The hedged analyzer may sit behind the model router's strong tier
+        for candidate in (analyzer, getattr(analyzer, "strong", None)):
+            get_stats = getattr(candidate, "get_hedge_stats", None)
+            if get_stats:
+                stats = get_stats()
+                if stats["hedged"]:
+                    logger.info(
+                        f"Hedging: {stats['hedged']}/{stats['requests']} request(s) "
+                        f"hedged after {stats['hedge_delay']}s, "
+                        f"{stats['secondary_wins']} won by the secondary, "
+                        f"~{stats['estimated_seconds_saved']}s saved"
+                    )
+                return
+
+    def _log_routing_stats(self):
+        """Log how fixes were split between the fast and strong models"""
+        get_stats = getattr(self.analyzer, "get_routing_stats", None)
+        if not get_stats:
+            return
+        for tier, stats in get_stats().items():
+            logger.info(
+                f"Model routing: {stats['calls']} call(s) on the {tier} model "
+                f"({stats['escalations']} escalation(s)), "
+                f"{stats['total_latency']:.1f}s total"
+            )
+
+    def _log_cache_stats(self):
+        """Log how many AI fixes were served from the cache"""
+        stats = self.fix_cache.get_stats()
+        if stats["hits"] or stats["writes"]:
+            logger.info(
+                f"Fix cache: {stats['hits']} hit(s), {stats['misses']} miss(es), "
+                f"{stats['writes']} stored"
+            )
+
+    def _pack_jobs(
+        self, jobs: List[FileFixJob]
+    ) -> Tuple[List[List[FileFixJob]], List[FileFixJob]]:
+        """
+        Group small files that need the LLM into shared requests
+
+        Greedy first-fit over files sorted largest first, bounded by the
+        token budget and a file count per pack.
+
+        Returns:
+            (packs of 2+ jobs, jobs to process on their own)
+        """
+        if (
+            self.pack_token_budget <= 0
+            or not self.analyzer
+            or not supports_multi_file_fix(self.analyzer)
+        ):
+            return [], jobs
+
+        singles = []
+        candidates = []
+        for job in jobs:
+            if (
+                job.llm_violations
+                and job.estimated_tokens <= self.pack_max_file_tokens
+                and job.estimated_tokens <= self.pack_token_budget
+            ):
+                candidates.append(job)
+            else:
+                singles.append(job)
+
+        bins: List[List[FileFixJob]] = []
+        bin_tokens: List[int] = []
+        for job in sorted(candidates, key=lambda j: j.estimated_tokens, reverse=True):
+            for index, tokens in enumerate(bin_tokens):
+                if (
+                    tokens + job.estimated_tokens <= self.pack_token_budget
+                    and len(bins[index]) < self.pack_max_files
+                ):
+                    bins[index].append(job)
+                    bin_tokens[index] += job.estimated_tokens
+                    break
+            else:
+                bins.append([job])
+                bin_tokens.append(job.estimated_tokens)
+
+        packs = [b for b in bins if len(b) > 1]
+        singles.extend(b[0] for b in bins if len(b) == 1)
+        if packs:
+            logger.info(
+                f"Packed {sum(len(p) for p in packs)} small file(s) into "
+                f"{len(packs)} shared LLM request(s)"
             )
+        return packs, singles
+
+    async def _complete_packed_jobs(self, pack: List[FileFixJob]) -> List[ProposedFix]:
+        """
+        Fix several small files with one multi-file LLM request
+
+        Files missing from the response are retried on their own.
+        """
+        files = {job.file_path: job.current_content for job in pack}
+        violations = {job.file_path: job.llm_violations for job in pack}
+        try:
+            fixed_files = await self._call_analyzer(
+                "generate_multi_file_fix", files, violations
+            )
+        except Exception as e:
+            logger.warning(f"Packed fix request failed, fixing files one by one: {e}")
+            fixed_files = {}
+
+        async def complete(job: FileFixJob) -> List[ProposedFix]:
+            if job.file_path in fixed_files:
+                self._store_cached_fix(job, fixed_files[job.file_path])
+                return self._build_batch_proposal(job, fixed_files[job.file_path])
+            return await self._complete_file_job(job)
+
+        results = await asyncio.gather(*(complete(job) for job in pack))
+        return [proposal for proposals in results for proposal in proposals]
+
+    def _build_batch_proposal(
+        self, job: FileFixJob, final_content: str
+    ) -> List[ProposedFix]:
+        """Create the consolidated ProposedFix for a file"""
+        file_path = job.file_path
+        violations = job.violations
+        original_content = job.original_content
 
         if final_content == original_content:
             return []
@@ -425,7 +1033,7 @@ class FixProposer:
             if related_files:
                 # Store in additional_files field for later reference
                 proposed_fix.additional_files = [
-                    (rel_file, "RELATED_FILE_REFERENCE") for rel_file in related_files
+                    (rel_file, RELATED_FILE_REFERENCE) for rel_file in related_files
                 ]
 
             return proposed_fix
@@ -468,8 +1076,8 @@ class FixProposer:
                         except Exception:
                             continue
 
-                    fixed_files = await self.analyzer.generate_cross_file_fix(
-                        files_to_fix, violation
+                    fixed_files = await self._call_analyzer(
+                        "generate_cross_file_fix", files_to_fix, violation
                     )
 
                     if file_path in fixed_files:
@@ -482,8 +1090,8 @@ class FixProposer:
 
                 else:
                     # Single file fix
-                    generated_content = await self.analyzer.generate_fix(
-                        content, violation
+                    generated_content = await self._call_analyzer(
+                        "generate_fix", content, violation
                     )
                     if generated_content != content:
                         proposed_content = generated_content
@@ -771,266 +1379,31 @@ class FixProposer:
         self, content: str, message: str, line_number: Optional[int]
     ) -> Optional[Tuple[str, List[str], List[str]]]:
         """Convert API paths to kebab-case in OpenAPI spec and Java controllers"""
-        try:
-            spec = yaml.safe_load(content)
-            if "paths" not in spec:
-                return None
-
-            modified = False
-            new_paths = {}
-            path_changes = {}
-
-            for path, path_item in spec["paths"].items():
-                # Convert camelCase or snake_case to kebab-case
-                new_path = re.sub(r"([a-z0-9])([A-Z])", r"\1-\2", path).lower()
-                new_path = new_path.replace("_", "-")
-
-                if new_path != path:
-                    modified = True
-                    path_changes[path] = new_path
-                    new_paths[new_path] = path_item
-                else:
-                    new_paths[path] = path_item
-
-            if not modified:
-                return None
-
-            spec["paths"] = new_paths
-            new_content = yaml.dump(spec, default_flow_style=False, sort_keys=False)
-
-            # Find and update Java controllers
-            additional_files = []
-            try:
-                for old_path in path_changes.keys():
-                    controllers = self._find_java_controllers_for_path(old_path)
-                    for controller in controllers:
-                        updated_java = self._update_java_controller_paths(
-                            controller, path_changes
-                        )
-                        if updated_java:
-                            rel_path = controller.relative_to(self.project_path)
-                            additional_files.append((str(rel_path), updated_java))
-                            print(f"  ✓ Will update Java controller: {rel_path}")
-            except Exception as e:
-                print(f"  ⚠ Warning: Could not update Java controllers: {e}")
-
-            return (new_content, [], [])
-
-        except Exception:
-            return None
+        return self._run_spec_fix("fix_kebab_case_paths", content)
 
     def fix_plural_resources(
         self, content: str, message: str, line_number: Optional[int]
     ) -> Optional[Tuple[str, List[str], List[str]]]:
         """Convert singular resource names to plural in OpenAPI spec and Java controllers"""
-        try:
-            spec = yaml.safe_load(content)
-            if "paths" not in spec:
-                return None
-
-            modified = False
-            new_paths = {}
-            path_changes = {}
-
-            # Simple pluralization rules
-            plurals = {
-                "user": "users",
-                "product": "products",
-                "order": "orders",
-                "customer": "customers",
-                "item": "items",
-                "category": "categories",
-                "company": "companies",
-            }
-
-            for path, path_item in spec["paths"].items():
-                new_path = path
-                for singular, plural in plurals.items():
-                    # Match /singular/ or /singular{param}
-                    pattern = f"/{singular}(/|{{)"
-                    replacement = f"/{plural}\\1"
-                    updated = re.sub(pattern, replacement, new_path)
-                    if updated != new_path:
-                        path_changes[path] = updated
-                        new_path = updated
-
-                if new_path != path:
-                    modified = True
-                    new_paths[new_path] = path_item
-                else:
-                    new_paths[path] = path_item
-
-            if not modified:
-                return None
-
-            spec["paths"] = new_paths
-            new_content = yaml.dump(spec, default_flow_style=False, sort_keys=False)
-
-            # Find and update Java controllers
-            additional_files = []
-            try:
-                for old_path in path_changes.keys():
-                    controllers = self._find_java_controllers_for_path(old_path)
-                    for controller in controllers:
-                        updated_java = self._update_java_controller_paths(
-                            controller, path_changes
-                        )
-                        if updated_java:
-                            rel_path = controller.relative_to(self.project_path)
-                            additional_files.append((str(rel_path), updated_java))
-                            print(f"  ✓ Will update Java controller: {rel_path}")
-            except Exception as e:
-                print(f"  ⚠ Warning: Could not update Java controllers: {e}")
-
-            return (new_content, [], [])
-
-        except Exception:
-            return None
+        return self._run_spec_fix("fix_plural_resources", content)
 
     def fix_standard_http_verbs(
         self, content: str, message: str, line_number: Optional[int]
     ) -> Optional[Tuple[str, List[str], List[str]]]:
         """Remove verbs from API paths in OpenAPI spec"""
-        import yaml
-
-        try:
-            spec = yaml.safe_load(content)
-            if "paths" not in spec:
-                return None
-
-            modified = False
-            new_paths = {}
-
-            # Common verbs to remove
-            verbs = [
-                "get",
-                "create",
-                "update",
-                "delete",
-                "fetch",
-                "retrieve",
-                "list",
-                "add",
-                "remove",
-            ]
-
-            for path, path_item in spec["paths"].items():
-                new_path = path
-                for verb in verbs:
-                    # Remove verb from path segments
-                    new_path = re.sub(
-                        f"/{verb}([A-Z])", lambda m: "/" + m.group(1).lower(), new_path
-                    )
-                    new_path = re.sub(f"/-{verb}", "", new_path)
-                    new_path = re.sub(f"/{verb}/", "/", new_path)
-
-                # Clean up double slashes
-                new_path = re.sub(r"/+", "/", new_path)
-
-                if new_path != path:
-                    modified = True
-                    new_paths[new_path] = path_item
-                else:
-                    new_paths[path] = path_item
-
-            if not modified:
-                return None
-
-            spec["paths"] = new_paths
-            new_content = yaml.dump(spec, default_flow_style=False, sort_keys=False)
-            return (new_content, [], [])
-
-        except Exception:
-            return None
+        return self._run_spec_fix("fix_standard_http_verbs", content)
 
     def fix_uuid_format(
         self, content: str, message: str, line_number: Optional[int]
     ) -> Optional[Tuple[str, List[str], List[str]]]:
         """Add format: uuid to UUID parameters in OpenAPI spec"""
-        import yaml
-
-        try:
-            spec = yaml.safe_load(content)
-            modified = False
-
-            def add_uuid_format(obj):
-                nonlocal modified
-                if isinstance(obj, dict):
-                    # Check if this is a UUID parameter without format
-                    if "type" in obj and obj["type"] == "string":
-                        name = obj.get("name", "").lower()
-                        description = obj.get("description", "").lower()
-                        if (
-                            "id" in name or "uuid" in name or "uuid" in description
-                        ) and "format" not in obj:
-                            obj["format"] = "uuid"
-                            modified = True
-
-                    # Recurse through all dict values
-                    for value in obj.values():
-                        add_uuid_format(value)
-                elif isinstance(obj, list):
-                    for item in obj:
-                        add_uuid_format(item)
-
-            add_uuid_format(spec)
-
-            if not modified:
-                return None
-
-            new_content = yaml.dump(spec, default_flow_style=False, sort_keys=False)
-            return (new_content, [], [])
-
-        except Exception:
-            return None
+        return self._run_spec_fix("fix_uuid_format", content)
 
     def fix_camelcase_properties(
         self, content: str, message: str, line_number: Optional[int]
     ) -> Optional[Tuple[str, List[str], List[str]]]:
         """Convert property names to camelCase in OpenAPI spec"""
-        import yaml
-
-        try:
-            spec = yaml.safe_load(content)
-            if "components" not in spec or "schemas" not in spec["components"]:
-                return None
-
-            modified = False
-
-            def to_camel_case(snake_str):
-                components = snake_str.split("_")
-                return components[0] + "".join(x.title() for x in components[1:])
-
-            def fix_properties(obj):
-                nonlocal modified
-                if isinstance(obj, dict):
-                    if "properties" in obj:
-                        new_props = {}
-                        for prop_name, prop_value in obj["properties"].items():
-                            if "_" in prop_name:
-                                new_name = to_camel_case(prop_name)
-                                new_props[new_name] = prop_value
-                                modified = True
-                            else:
-                                new_props[prop_name] = prop_value
-                        obj["properties"] = new_props
-
-                    for value in obj.values():
-                        fix_properties(value)
-                elif isinstance(obj, list):
-                    for item in obj:
-                        fix_properties(item)
-
-            fix_properties(spec)
-
-            if not modified:
-                return None
-
-            new_content = yaml.dump(spec, default_flow_style=False, sort_keys=False)
-            return (new_content, [], [])
-
-        except Exception:
-            return None
+        return self._run_spec_fix("fix_camelcase_properties", content)
 
     def fix_response_envelope(
         self, content: str, message: str, line_number: Optional[int]
@@ -1044,67 +1417,7 @@ class FixProposer:
         self, content: str, message: str, line_number: Optional[int]
     ) -> Optional[Tuple[str, List[str], List[str]]]:
         """Add standard pagination fields to OpenAPI spec"""
-        import yaml
-
-        try:
-            spec = yaml.safe_load(content)
-            modified = False
-
-            pagination_schema = {
-                "type": "object",
-                "properties": {
-                    "page": {"type": "integer", "description": "Current page number"},
-                    "pageSize": {
-                        "type": "integer",
-                        "description": "Number of items per page",
-                    },
-                    "totalItems": {
-                        "type": "integer",
-                        "description": "Total number of items",
-                    },
-                    "totalPages": {
-                        "type": "integer",
-                        "description": "Total number of pages",
-                    },
-                },
-            }
-
-            def add_pagination(obj, path=""):
-                nonlocal modified
-                if isinstance(obj, dict):
-                    # Check if this looks like a paginated response
-                    if (
-                        "type" in obj
-                        and obj["type"] == "object"
-                        and "properties" in obj
-                    ):
-                        props = obj["properties"]
-                        has_items = (
-                            "items" in props or "data" in props or "results" in props
-                        )
-                        missing_pagination = "page" not in props
-
-                        if has_items and missing_pagination:
-                            # Add pagination fields
-                            obj["properties"].update(pagination_schema["properties"])
-                            modified = True
-
-                    for key, value in obj.items():
-                        add_pagination(value, f"{path}.{key}")
-                elif isinstance(obj, list):
-                    for item in obj:
-                        add_pagination(item, path)
-
-            add_pagination(spec)
-
-            if not modified:
-                return None
-
-            new_content = yaml.dump(spec, default_flow_style=False, sort_keys=False)
-            return (new_content, [], [])
-
-        except Exception:
-            return None
+        return self._run_spec_fix("fix_pagination_structure", content)
 
     def fix_schema_depth(
         self, content: str, message: str, line_number: Optional[int]
@@ -1117,234 +1430,74 @@ class FixProposer:
         self, content: str, message: str, line_number: Optional[int]
     ) -> Optional[Tuple[str, List[str], List[str]]]:
         """Add standard error responses to OpenAPI spec"""
-        import yaml
-
-        try:
-            spec = yaml.safe_load(content)
-            if "paths" not in spec:
-                return None
-
-            modified = False
-
-            error_responses = {
-                "400": {
-                    "description": "Bad Request",
-                    "content": {
-                        "application/json": {
-                            "schema": {
-                                "type": "object",
-                                "properties": {
-                                    "error": {"type": "string"},
-                                    "message": {"type": "string"},
-                                },
-                            }
-                        }
-                    },
-                },
-                "404": {
-                    "description": "Not Found",
-                    "content": {
-                        "application/json": {
-                            "schema": {
-                                "type": "object",
-                                "properties": {
-                                    "error": {"type": "string"},
-                                    "message": {"type": "string"},
-                                },
-                            }
-                        }
-                    },
-                },
-                "500": {
-                    "description": "Internal Server Error",
-                    "content": {
-                        "application/json": {
-                            "schema": {
-                                "type": "object",
-                                "properties": {
-                                    "error": {"type": "string"},
-                                    "message": {"type": "string"},
-                                },
-                            }
-                        }
-                    },
-                },
-            }
-
-            for path, path_item in spec["paths"].items():
-                for method, operation in path_item.items():
-                    if method in [
-                        "get",
-                        "post",
-                        "put",
-                        "delete",
-                        "patch",
-                    ] and isinstance(operation, dict):
-                        if "responses" not in operation:
-                            operation["responses"] = {}
-
-                        # Add missing error responses
-                        for code, response in error_responses.items():
-                            if code not in operation["responses"]:
-                                operation["responses"][code] = response
-                                modified = True
-
-            if not modified:
-                return None
-
-            new_content = yaml.dump(spec, default_flow_style=False, sort_keys=False)
-            return (new_content, [], [])
-
-        except Exception:
-            return None
+        return self._run_spec_fix("fix_error_responses", content)
 
     def fix_description_required(
         self, content: str, message: str, line_number: Optional[int]
     ) -> Optional[Tuple[str, List[str], List[str]]]:
         """Add placeholder descriptions to OpenAPI spec"""
-        import yaml
-
-        try:
-            spec = yaml.safe_load(content)
-            modified = False
-
-            def add_descriptions(obj, context=""):
-                nonlocal modified
-                if isinstance(obj, dict):
-                    # Add description if missing and this is an operation or schema
-                    if "description" not in obj:
-                        if "operationId" in obj:
-                            obj["description"] = (
-                                f"TODO: Add description for {obj['operationId']}"
-                            )
-                            modified = True
-                        elif "type" in obj and context == "schema":
-                            obj["description"] = "TODO: Add description for this schema"
-                            modified = True
-                        elif "name" in obj and context == "parameter":
-                            obj["description"] = (
-                                f"TODO: Add description for parameter {obj['name']}"
-                            )
-                            modified = True
-
-                    # Add summary if missing for operations
-                    if "operationId" in obj and "summary" not in obj:
-                        obj["summary"] = f"TODO: Add summary for {obj['operationId']}"
-                        modified = True
-
-                    # Recurse with context
-                    for key, value in obj.items():
-                        new_context = context
-                        if key == "schemas":
-                            new_context = "schema"
-                        elif key == "parameters":
-                            new_context = "parameter"
-                        add_descriptions(value, new_context)
-                elif isinstance(obj, list):
-                    for item in obj:
-                        add_descriptions(item, context)
-
-            add_descriptions(spec)
-
-            if not modified:
-                return None
-
-            new_content = yaml.dump(spec, default_flow_style=False, sort_keys=False)
-            return (new_content, [], [])
-
-        except Exception:
-            return None
+        return self._run_spec_fix("fix_description_required", content)
 
     def fix_versioning_required(
         self, content: str, message: str, line_number: Optional[int]
     ) -> Optional[Tuple[str, List[str], List[str]]]:
         """Add version prefix to API paths in YAML and update Java controllers"""
-        try:
-            spec = yaml.safe_load(content)
-            if "paths" not in spec:
-                return None
-
-            modified = False
-            new_paths = {}
-            path_changes = {}
-
-            for path, path_item in spec["paths"].items():
-                # Check if path already has version
-                if not re.match(r"^/v\d+/", path):
-                    # Add /v1/ prefix
-                    new_path = "/v1" + path
-                    new_paths[new_path] = path_item
-                    path_changes[path] = new_path
-                    modified = True
-                else:
-                    new_paths[path] = path_item
-
-            if not modified:
-                return None
-
-            spec["paths"] = new_paths
-            new_content = yaml.dump(spec, default_flow_style=False, sort_keys=False)
-
-            # Find and update Java controllers
-            additional_files = []
-            try:
-                for old_path in path_changes.keys():
-                    controllers = self._find_java_controllers_for_path(old_path)
-                    for controller in controllers:
-                        updated_java = self._update_java_controller_paths(
-                            controller, path_changes
-                        )
-                        if updated_java:
-                            rel_path = controller.relative_to(self.project_path)
-                            additional_files.append((str(rel_path), updated_java))
-                            print(f"  ✓ Will update Java controller: {rel_path}")
-            except Exception as e:
-                print(f"  ⚠ Warning: Could not update Java controllers: {e}")
-
-            return (new_content, [], [])
-
-        except Exception:
-            return None
+        return self._run_spec_fix("fix_versioning_required", content)
 
     def fix_created_returns_resource(
         self, content: str, message: str, line_number: Optional[int]
     ) -> Optional[Tuple[str, List[str], List[str]]]:
         """Ensure POST operations return created resource"""
-        import yaml
+        return self._run_spec_fix("fix_created_returns_resource", content)
 
-        try:
-            spec = yaml.safe_load(content)
-            if "paths" not in spec:
-                return None
+    def _run_spec_fix(
+        self, fix_function: str, content: str
+    ) -> Optional[Tuple[str, List[str], List[str]]]:
+        """Run one spec transform on its own parse of the content"""
+        tree = SpecTree(content)
+        if not self._apply_spec_transform(tree, fix_function):
+            return None
+        return (tree.serialize(), [], [])
 
-            modified = False
-
-            for path, path_item in spec["paths"].items():
-                if "post" in path_item:
-                    post_op = path_item["post"]
-                    if "responses" in post_op:
-                        # Check if 201 response exists and has content
-                        if "201" in post_op["responses"]:
-                            response_201 = post_op["responses"]["201"]
-                            if "content" not in response_201:
-                                response_201["content"] = {
-                                    "application/json": {
-                                        "schema": {
-                                            "type": "object",
-                                            "description": "The created resource",
-                                        }
-                                    }
-                                }
-                                modified = True
-
-            if not modified:
-                return None
+    def _apply_spec_transform(self, tree: SpecTree, fix_function: str) -> bool:
+        """
+        Apply a spec fix to a shared parsed tree
 
-            new_content = yaml.dump(spec, default_flow_style=False, sort_keys=False)
-            return (new_content, [], [])
+        Args:
+            tree: Parsed spec shared by the file's fixes
+            fix_function: FixStrategy.fix_function of the fix
 
+        Returns:
+            True if the fix changed the spec
+        """
+        try:
+            result = tree.apply(get_spec_transform(fix_function))
         except Exception:
-            return None
+            return False
+
+        if result and fix_function in CONTROLLER_PATH_FIXES:
+            self._collect_controller_updates(result)
+        return bool(result)
+
+    def _collect_controller_updates(
+        self, path_changes: Dict[str, str]
+    ) -> List[Tuple[str, str]]:
+        """Find and update the Java controllers serving renamed paths"""
+        additional_files = []
+        try:
+            for old_path in path_changes.keys():
+                controllers = self._find_java_controllers_for_path(old_path)
+                for controller in controllers:
+                    updated_java = self._update_java_controller_paths(
+                        controller, path_changes
+                    )
+                    if updated_java:
+                        rel_path = controller.relative_to(self.project_path)
+                        additional_files.append((str(rel_path), updated_java))
+                        print(f"  ✓ Will update Java controller: {rel_path}")
+        except Exception as e:
+            print(f"  ⚠ Warning: Could not update Java controllers: {e}")
+        return additional_files
 
     # ========================================================================
     # JAVA CONTROLLER UPDATE FUNCTIONS
@@ -1352,37 +1505,14 @@ class FixProposer:
 
     def _find_java_controllers_for_path(self, api_path: str) -> List[Path]:
         """Find Java controller files that define a specific API path"""
-        controllers = []
-
-        # Search for Java files with @RequestMapping, @GetMapping, etc.
+        # Include test files - they need updates too
         try:
-            # Normalize path for search (remove version prefix, params)
-            search_path = re.sub(r"/v\d+", "", api_path)  # Remove /v1/
-            search_path = re.sub(r"\{[^}]+\}", "", search_path)  # Remove {id}
-            search_path = search_path.strip("/")
-
-            # Search for files containing this path (include test files - they need updates too)
-            for java_file in self.project_path.rglob("**/*Controller.java"):
-                try:
-                    with open(java_file, "r", encoding="utf-8") as f:
-                        content = f.read()
-
-                    # Check if this controller has the path
-                    # Look for @GetMapping("/path"), @PostMapping("/path"), etc.
-                    if search_path in content or api_path in content:
-                        # More precise check
-                        patterns = [
-                            rf'@\w+Mapping\(["\'].*{re.escape(search_path)}',
-                            rf'@RequestMapping\(["\'].*{re.escape(search_path)}',
-                        ]
-                        if any(re.search(p, content) for p in patterns):
-                            controllers.append(java_file)
-                except Exception:
-                    continue
+            return [
+                self.project_path / rel_path
+                for rel_path in self.route_index.controllers_for_path(api_path)
+            ]
         except Exception:
-            pass
-
-        return controllers
+            return []
 
     def _update_java_controller_paths(
         self, java_file: Path, path_changes: Dict[str, str]
@@ -1484,43 +1614,29 @@ class FixProposer:
             logger.warning(f"Failed to update Java controller {java_file}: {e}")
             return None
 
-    def _get_path_changes_from_yaml(
-        self, old_content: str, new_content: str
-    ) -> Dict[str, str]:
-        """
-        Extract path changes from YAML diff
 
-        Returns:
-            Dict of old_path -> new_path
-        """
+def _prepare_file_jobs_in_worker(
+    proposer_class: type,
+    project_path: str,
+    route_index: RouteIndex,
+    test_index: JavaTestIndex,
+    batches: List[Tuple[str, List[Dict]]],
+) -> List[Tuple[str, Optional[FileFixJob], Optional[str]]]:
+    """
+    Run the deterministic fixes of a chunk of files in a fix worker process
+
+    Returns:
+        (file path, job, error message) per file
+    """
+    proposer = proposer_class.for_deterministic_fixes(
+        project_path, route_index=route_index, test_index=test_index
+    )
+    results = []
+    for file_path, violations in batches:
         try:
-            old_spec = yaml.safe_load(old_content)
-            new_spec = yaml.safe_load(new_content)
-
-            path_changes = {}
-
-            old_paths = set(old_spec.get("paths", {}).keys())
-            new_paths = set(new_spec.get("paths", {}).keys())
-
-            # Simple approach: match by path similarity
-            for old_path in old_paths:
-                # Remove version and params for comparison
-                old_normalized = re.sub(r"/v\d+", "", old_path)
-                old_normalized = re.sub(r"\{[^}]+\}", "{id}", old_normalized)
-
-                for new_path in new_paths:
-                    new_normalized = re.sub(r"/v\d+", "", new_path)
-                    new_normalized = re.sub(r"\{[^}]+\}", "{id}", new_normalized)
-
-                    # If normalized paths are similar or match
-                    if old_normalized.lower().replace("_", "-").replace(
-                        " ", ""
-                    ) == new_normalized.lower().replace("_", "-").replace(" ", ""):
-                        if old_path != new_path:
-                            path_changes[old_path] = new_path
-                        break
-
-            return path_changes
-
-        except Exception:
-            return {}
+            results.append(
+                (file_path, proposer._prepare_file_job(file_path, violations), None)
+            )
+        except Exception as e:
+            results.append((file_path, None, str(e)))
+    return results
@@ -4,11 +4,16 @@ Review Gate - Manages human approval workflow
 Handles interactive review of proposed fixes with approval/rejection tracking.
 """
 
-from typing import List, Dict, Optional
+from collections.abc import MutableMapping
+from typing import Iterator, List, Dict, Optional, Set
 from dataclasses import dataclass, field
 from enum import Enum
+from pathlib import Path
+import fnmatch
 import json
+import re
 
+from .category_manager import CategoryManager
 from .proposer import ProposedFix
 from .diff_generator import FileDiff
 
@@ -31,60 +36,190 @@ class ReviewComment:
     timestamp: str
 
 
+class _DecisionMap(MutableMapping):
+    """
+    fix_id -> decision; keeps the owning ReviewState's index in sync
+
+    A mapping rather than a dict subclass, so every way of changing it
+    (assignment, del, pop, popitem, setdefault, update, clear) goes
+    through __setitem__ and __delitem__.
+    """
+
+    def __init__(self, state: "ReviewState", decisions: Dict[str, ReviewDecision]):
+        self._state = state
+        self._decisions: Dict[str, ReviewDecision] = {}
+        self.update(decisions)
+
+    def __getitem__(self, fix_id: str) -> ReviewDecision:
+        return self._decisions[fix_id]
+
+    def __setitem__(self, fix_id: str, decision: ReviewDecision):
+        old = self._decisions.get(fix_id)
+        self._decisions[fix_id] = decision
+        if old != decision:
+            self._state._reindex(fix_id, old, decision)
+
+    def __delitem__(self, fix_id: str):
+        old = self._decisions.pop(fix_id)
+        self._state._reindex(fix_id, old, None)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._decisions)
+
+    def __len__(self) -> int:
+        return len(self._decisions)
+
+    def __repr__(self) -> str:
+        return repr(self._decisions)
+
+
 @dataclass
 class ReviewState:
-    """Tracks review state for all fixes"""
+    """
+    Tracks review state for all fixes
+
+    Fixes are indexed by decision, rule, category, safety, complexity and
+    file path when the state is created, and the decision index is updated
+    on every decision, so the approved/pending lists, the summary and
+    select() don't re-scan all fixes.
+    """
 
     fixes: List[ProposedFix]
     decisions: Dict[str, ReviewDecision] = field(default_factory=dict)
     comments: List[ReviewComment] = field(default_factory=list)
 
     def __post_init__(self):
+        self._positions: Dict[str, List[int]] = {}
+        self._by_decision: Dict[ReviewDecision, Set[int]] = {
+            decision: set() for decision in ReviewDecision
+        }
+        self._indexes: Dict[str, Dict[str, Set[int]]] = {
+            "rule_id": {},
+            "category": {},
+            "safety": {},
+            "complexity": {},
+            "path": {},
+        }
+
+        categories = CategoryManager()
+        for position, fix in enumerate(self.fixes):
+            self._positions.setdefault(fix.fix_id, []).append(position)
+            keys = {
+                "rule_id": fix.rule_id,
+                "category": categories.categorize_violation({"rule_id": fix.rule_id}),
+                "safety": fix.strategy.safety.value,
+                "complexity": fix.strategy.complexity.value,
+                "path": Path(fix.file_path).as_posix(),
+            }
+            for name, key in keys.items():
+                self._indexes[name].setdefault(key, set()).add(position)
+
         # Initialize all fixes as pending
+        decisions = self.decisions
+        self.decisions = _DecisionMap(self, {})
         for fix in self.fixes:
-            if fix.fix_id not in self.decisions:
-                self.decisions[fix.fix_id] = ReviewDecision.PENDING
+            self.decisions[fix.fix_id] = decisions.get(
+                fix.fix_id, ReviewDecision.PENDING
+            )
+        self.decisions.update(
+            {k: v for k, v in decisions.items() if k not in self.decisions}
+        )
+
+    def _reindex(
+        self,
+        fix_id: str,
+        old: Optional[ReviewDecision],
+        new: Optional[ReviewDecision],
+    ):
+        """Move a fix between decision sets"""
+        for position in self._positions.get(fix_id, ()):
+            if old is not None:
+                self._by_decision[old].discard(position)
+            if new is not None:
+                self._by_decision[new].add(position)
+
+    def _fixes_at(self, positions: Set[int]) -> List[ProposedFix]:
+        """Fixes at index positions, in fix order"""
+        return [self.fixes[position] for position in sorted(positions)]
 
     @property
     def approved_fixes(self) -> List[ProposedFix]:
         """Get all approved fixes"""
-        return [
-            fix
-            for fix in self.fixes
-            if self.decisions.get(fix.fix_id) == ReviewDecision.APPROVED
-        ]
+        return self._fixes_at(self._by_decision[ReviewDecision.APPROVED])
 
     @property
     def rejected_fixes(self) -> List[ProposedFix]:
         """Get all rejected fixes"""
-        return [
-            fix
-            for fix in self.fixes
-            if self.decisions.get(fix.fix_id) == ReviewDecision.REJECTED
-        ]
+        return self._fixes_at(self._by_decision[ReviewDecision.REJECTED])
 
     @property
     def pending_fixes(self) -> List[ProposedFix]:
         """Get all pending fixes"""
-        return [
-            fix
-            for fix in self.fixes
-            if self.decisions.get(fix.fix_id) == ReviewDecision.PENDING
+        return self._fixes_at(self._by_decision[ReviewDecision.PENDING])
+
+    def select(
+        self,
+        rule_id: Optional[str] = None,
+        category: Optional[str] = None,
+        file_glob: Optional[str] = None,
+        safety: Optional[str] = None,
+        complexity: Optional[str] = None,
+        decision: Optional[ReviewDecision] = None,
+    ) -> List[ProposedFix]:
+        """
+        Fixes matching all given criteria
+
+        Args:
+            rule_id: Rule of the fix, e.g. "kebab-case-paths"
+            category: CategoryManager category, e.g. "RESOURCE_NAMING"
+            file_glob: fnmatch pattern on the file path, e.g. "src/main/**"
+                ("*" also matches "/")
+            safety: FixSafety (or its value, e.g. "safe")
+            complexity: FixComplexity (or its value, e.g. "simple")
+            decision: Current review decision
+
+        Returns:
+            Matching fixes, in fix order
+        """
+        candidates = [
+            self._indexes[name].get(getattr(value, "value", value), set())
+            for name, value in (
+                ("rule_id", rule_id),
+                ("category", category),
+                ("safety", safety),
+                ("complexity", complexity),
+            )
+            if value is not None
         ]
+        if file_glob is not None:
+            pattern = re.compile(fnmatch.translate(file_glob))
+            candidates.append(
+                {
+                    position
+                    for path, positions in self._indexes["path"].items()
+                    if pattern.match(path)
+                    for position in positions
+                }
+            )
+        if decision is not None:
+            candidates.append(self._by_decision[decision])
+
+        if not candidates:
+            return list(self.fixes)
+        candidates.sort(key=len)
+        return self._fixes_at(candidates[0].intersection(*candidates[1:]))
 
     def is_complete(self) -> bool:
         """Check if all fixes have been reviewed"""
-        return all(
-            decision != ReviewDecision.PENDING for decision in self.decisions.values()
-        )
+        return not self._by_decision[ReviewDecision.PENDING]
 
     def get_summary(self) -> Dict[str, int]:
         """Get review summary"""
         return {
             "total": len(self.fixes),
-            "approved": len(self.approved_fixes),
-            "rejected": len(self.rejected_fixes),
-            "pending": len(self.pending_fixes),
+            "approved": len(self._by_decision[ReviewDecision.APPROVED]),
+            "rejected": len(self._by_decision[ReviewDecision.REJECTED]),
+            "pending": len(self._by_decision[ReviewDecision.PENDING]),
         }
 
 
@@ -127,10 +262,7 @@ class ReviewGate:
 
     def approve_all(self):
         """Approve all pending fixes"""
-        if self.review_state:
-            for fix_id in self.review_state.decisions:
-                if self.review_state.decisions[fix_id] == ReviewDecision.PENDING:
-                    self.review_state.decisions[fix_id] = ReviewDecision.APPROVED
+        self.approve_where()
 
     def approve_safe_only(self):
         """Approve only safe-to-auto-apply fixes"""
@@ -141,10 +273,36 @@ class ReviewGate:
 
     def reject_all(self):
         """Reject all pending fixes"""
-        if self.review_state:
-            for fix_id in self.review_state.decisions:
-                if self.review_state.decisions[fix_id] == ReviewDecision.PENDING:
-                    self.review_state.decisions[fix_id] = ReviewDecision.REJECTED
+        self.reject_where()
+
+    def approve_where(self, pending_only: bool = True, **criteria) -> int:
+        """
+        Approve the fixes matching criteria (see ReviewState.select)
+
+        Args:
+            pending_only: Leave fixes that already have a decision alone
+            **criteria: rule_id, category, file_glob, safety, complexity
+
+        Returns:
+            Number of fixes approved
+        """
+        return self._decide_where(ReviewDecision.APPROVED, pending_only, criteria)
+
+    def reject_where(self, pending_only: bool = True, **criteria) -> int:
+        """Reject the fixes matching criteria (see approve_where)"""
+        return self._decide_where(ReviewDecision.REJECTED, pending_only, criteria)
+
+    def _decide_where(
+        self, decision: ReviewDecision, pending_only: bool, criteria: Dict
+    ) -> int:
+        if not self.review_state:
+            return 0
+        if pending_only:
+            criteria = {**criteria, "decision": ReviewDecision.PENDING}
+        matches = self.review_state.select(**criteria)
+        for fix in matches:
+            self.review_state.decisions[fix.fix_id] = decision
+        return len(matches)
 
     def interactive_review(self, diffs: List[FileDiff]) -> ReviewState:
         """
@@ -0,0 +1,440 @@
+"""
+Spec Transforms - OpenAPI fixes over a shared parsed tree
+
+Each spec fixer used to parse the whole spec with yaml.safe_load and
+re-serialize it with yaml.dump, so a file with eight rule hits was parsed
+and dumped eight times. The fixes are now transforms that edit one parsed
+tree in place; SpecTree parses the file once and serializes it once, after
+the last transform. Serializing applies only the changed keys and values to
+the original text (see yaml_edits), falling back to a full dump when a
+change can't be expressed as a targeted edit.
+
+A transform takes the spec dict and returns a truthy value if it changed
+anything. Transforms that rename paths return the {old: new} path changes,
+so callers can update the matching Java controllers.
+"""
+
+import copy
+import re
+from typing import Callable, Dict, Optional
+
+import yaml
+
+from utils.logger import logger
+from .yaml_edits import SpanEditError, load_with_spans, render_minimal_edits
+
+
+class SpecTree:
+    """One parsed spec shared by a file's transforms"""
+
+    def __init__(self, content: str):
+        """
+        Initialize spec tree
+
+        Args:
+            content: Spec file content (YAML or JSON); parsed on first use
+        """
+        self.content = content
+        self.modified = False
+        self.serialized_with = ""  # "minimal-edits" or "dump" once serialized
+        self._spec = None
+        self._node = None
+        self._parsed = False
+
+    @property
+    def spec(self) -> Dict:
+        """
+        Parsed spec (parsed once)
+
+        Raises:
+            ValueError: If the content isn't a YAML/JSON mapping
+        """
+        if not self._parsed:
+            self._spec, self._node = load_with_spans(self.content)
+            self._parsed = True
+        if not isinstance(self._spec, dict):
+            raise ValueError("Spec is not a mapping")
+        return self._spec
+
+    def apply(self, transform: Callable[[Dict], object]):
+        """
+        Run a transform on the tree
+
+        A transform that raises leaves the tree as it was: its partial
+        edits are rolled back.
+
+        Returns:
+            The transform's result (truthy if it changed the spec)
+        """
+        spec = self.spec
+        snapshot = copy.deepcopy(spec)
+        try:
+            result = transform(spec)
+        except Exception:
+            spec.clear()
+            spec.update(snapshot)
+            raise
+        if result:
+            self.modified = True
+        return result
+
+    def serialize(self) -> str:
+        """Spec text after all transforms (the original text if unchanged)"""
+        if not self.modified:
+            return self.content
+
+        if self._node is not None:
+            try:
+                text = render_minimal_edits(self.content, self._node, self._spec)
+                self.serialized_with = "minimal-edits"
+                return text
+            except SpanEditError as e:
+                logger.debug(f"Falling back to a full spec dump: {e}")
+
+        self.serialized_with = "dump"
+        return yaml.dump(self._spec, default_flow_style=False, sort_keys=False)
+
+
+# ============================================================================
+# PATH RENAMES
+# ============================================================================
+
+
+def _rename_paths(spec: Dict, rename: Callable[[str], str]) -> Dict[str, str]:
+    """
+    Rename spec paths, keeping their order
+
+    Returns:
+        {old_path: new_path} for every renamed path
+    """
+    if "paths" not in spec:
+        return {}
+
+    new_paths = {}
+    path_changes = {}
+    for path, path_item in spec["paths"].items():
+        new_path = rename(path)
+        if new_path != path:
+            path_changes[path] = new_path
+        new_paths[new_path] = path_item
+
+    if path_changes:
+        spec["paths"] = new_paths
+    return path_changes
+
+
+def kebab_case_paths(spec: Dict) -> Dict[str, str]:
+    """Convert camelCase or snake_case paths to kebab-case"""
+
+    def rename(path: str) -> str:
+        new_path = re.sub(r"([a-z0-9])([A-Z])", r"\1-\2", path).lower()
+        return new_path.replace("_", "-")
+
+    return _rename_paths(spec, rename)
+
+
+# Simple pluralization rules
+_PLURALS = {
+    "user": "users",
+    "product": "products",
+    "order": "orders",
+    "customer": "customers",
+    "item": "items",
+    "category": "categories",
+    "company": "companies",
+}
+
+
+def plural_resources(spec: Dict) -> Dict[str, str]:
+    """Convert singular resource names in paths to plural"""
+
+    def rename(path: str) -> str:
+        for singular, plural in _PLURALS.items():
+            # Match /singular/ or /singular{param}
+            path = re.sub(f"/{singular}(/|{{)", f"/{plural}\\1", path)
+        return path
+
+    return _rename_paths(spec, rename)
+
+
+# Common verbs to remove
+_PATH_VERBS = [
+    "get",
+    "create",
+    "update",
+    "delete",
+    "fetch",
+    "retrieve",
+    "list",
+    "add",
+    "remove",
+]
+
+
+def standard_http_verbs(spec: Dict) -> Dict[str, str]:
+    """Remove verbs from path segments"""
+
+    def rename(path: str) -> str:
+        for verb in _PATH_VERBS:
+            path = re.sub(f"/{verb}([A-Z])", lambda m: "/" + m.group(1).lower(), path)
+            path = re.sub(f"/-{verb}", "", path)
+            path = re.sub(f"/{verb}/", "/", path)
+        # Clean up double slashes
+        return re.sub(r"/+", "/", path)
+
+    return _rename_paths(spec, rename)
+
+
+def versioning_required(spec: Dict) -> Dict[str, str]:
+    """Add a /v1 prefix to unversioned paths"""
+
+    def rename(path: str) -> str:
+        return path if re.match(r"^/v\d+/", path) else "/v1" + path
+
+    return _rename_paths(spec, rename)
+
+
+# ============================================================================
+# SCHEMA AND OPERATION TRANSFORMS
+# ============================================================================
+
+
+def uuid_format(spec: Dict) -> bool:
+    """Add format: uuid to UUID string parameters"""
+    modified = False
+
+    def add_uuid_format(obj):
+        nonlocal modified
+        if isinstance(obj, dict):
+            # Check if this is a UUID parameter without format
+            if "type" in obj and obj["type"] == "string":
+                name = obj.get("name", "").lower()
+                description = obj.get("description", "").lower()
+                if (
+                    "id" in name or "uuid" in name or "uuid" in description
+                ) and "format" not in obj:
+                    obj["format"] = "uuid"
+                    modified = True
+
+            for value in obj.values():
+                add_uuid_format(value)
+        elif isinstance(obj, list):
+            for item in obj:
+                add_uuid_format(item)
+
+    add_uuid_format(spec)
+    return modified
+
+
+def camelcase_properties(spec: Dict) -> bool:
+    """Convert snake_case schema property names to camelCase"""
+    if "components" not in spec or "schemas" not in spec["components"]:
+        return False
+
+    modified = False
+
+    def to_camel_case(snake_str):
+        components = snake_str.split("_")
+        return components[0] + "".join(x.title() for x in components[1:])
+
+    def fix_properties(obj):
+        nonlocal modified
+        if isinstance(obj, dict):
+            if "properties" in obj:
+                new_props = {}
+                for prop_name, prop_value in obj["properties"].items():
+                    if "_" in prop_name:
+                        new_props[to_camel_case(prop_name)] = prop_value
+                        modified = True
+                    else:
+                        new_props[prop_name] = prop_value
+                obj["properties"] = new_props
+
+            for value in obj.values():
+                fix_properties(value)
+        elif isinstance(obj, list):
+            for item in obj:
+                fix_properties(item)
+
+    fix_properties(spec)
+    return modified
+
+
+_PAGINATION_PROPERTIES = {
+    "page": {"type": "integer", "description": "Current page number"},
+    "pageSize": {"type": "integer", "description": "Number of items per page"},
+    "totalItems": {"type": "integer", "description": "Total number of items"},
+    "totalPages": {"type": "integer", "description": "Total number of pages"},
+}
+
+
+def pagination_structure(spec: Dict) -> bool:
+    """Add standard pagination fields to list-like object schemas"""
+    modified = False
+
+    def add_pagination(obj):
+        nonlocal modified
+        if isinstance(obj, dict):
+            # Check if this looks like a paginated response
+            if "type" in obj and obj["type"] == "object" and "properties" in obj:
+                props = obj["properties"]
+                has_items = "items" in props or "data" in props or "results" in props
+                if has_items and "page" not in props:
+                    # Fresh copies so the dump doesn't emit YAML aliases
+                    props.update(
+                        {k: dict(v) for k, v in _PAGINATION_PROPERTIES.items()}
+                    )
+                    modified = True
+
+            for value in obj.values():
+                add_pagination(value)
+        elif isinstance(obj, list):
+            for item in obj:
+                add_pagination(item)
+
+    add_pagination(spec)
+    return modified
+
+
+def _error_response(description: str) -> Dict:
+    """Standard JSON error response"""
+    return {
+        "description": description,
+        "content": {
+            "application/json": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "error": {"type": "string"},
+                        "message": {"type": "string"},
+                    },
+                }
+            }
+        },
+    }
+
+
+_ERROR_RESPONSES = {
+    "400": "Bad Request",
+    "404": "Not Found",
+    "500": "Internal Server Error",
+}
+
+
+def error_responses(spec: Dict) -> bool:
+    """Add standard 400/404/500 responses to operations"""
+    if "paths" not in spec:
+        return False
+
+    modified = False
+    for path_item in spec["paths"].values():
+        for method, operation in path_item.items():
+            if method in ["get", "post", "put", "delete", "patch"] and isinstance(
+                operation, dict
+            ):
+                if "responses" not in operation:
+                    operation["responses"] = {}
+
+                # Add missing error responses
+                for code, description in _ERROR_RESPONSES.items():
+                    if code not in operation["responses"]:
+                        operation["responses"][code] = _error_response(description)
+                        modified = True
+    return modified
+
+
+def description_required(spec: Dict) -> bool:
+    """Add placeholder descriptions and summaries"""
+    modified = False
+
+    def add_descriptions(obj, context=""):
+        nonlocal modified
+        if isinstance(obj, dict):
+            # Add description if missing and this is an operation or schema
+            if "description" not in obj:
+                if "operationId" in obj:
+                    obj["description"] = (
+                        f"TODO: Add description for {obj['operationId']}"
+                    )
+                    modified = True
+                elif "type" in obj and context == "schema":
+                    obj["description"] = "TODO: Add description for this schema"
+                    modified = True
+                elif "name" in obj and context == "parameter":
+                    obj["description"] = (
+                        f"TODO: Add description for parameter {obj['name']}"
+                    )
+                    modified = True
+
+            # Add summary if missing for operations
+            if "operationId" in obj and "summary" not in obj:
+                obj["summary"] = f"TODO: Add summary for {obj['operationId']}"
+                modified = True
+
+            # Recurse with context
+            for key, value in list(obj.items()):
+                new_context = context
+                if key == "schemas":
+                    new_context = "schema"
+                elif key == "parameters":
+                    new_context = "parameter"
+                add_descriptions(value, new_context)
+        elif isinstance(obj, list):
+            for item in obj:
+                add_descriptions(item, context)
+
+    add_descriptions(spec)
+    return modified
+
+
+def created_returns_resource(spec: Dict) -> bool:
+    """Give POST 201 responses a created-resource body"""
+    if "paths" not in spec:
+        return False
+
+    modified = False
+    for path_item in spec["paths"].values():
+        if "post" not in path_item:
+            continue
+        post_op = path_item["post"]
+        if "responses" in post_op and "201" in post_op["responses"]:
+            response_201 = post_op["responses"]["201"]
+            if "content" not in response_201:
+                response_201["content"] = {
+                    "application/json": {
+                        "schema": {
+                            "type": "object",
+                            "description": "The created resource",
+                        }
+                    }
+                }
+                modified = True
+    return modified
+
+
+# Fix function name (FixStrategy.fix_function) -> transform
+SPEC_TRANSFORMS: Dict[str, Callable[[Dict], object]] = {
+    "fix_kebab_case_paths": kebab_case_paths,
+    "fix_plural_resources": plural_resources,
+    "fix_standard_http_verbs": standard_http_verbs,
+    "fix_versioning_required": versioning_required,
+    "fix_uuid_format": uuid_format,
+    "fix_camelcase_properties": camelcase_properties,
+    "fix_pagination_structure": pagination_structure,
+    "fix_error_responses": error_responses,
+    "fix_description_required": description_required,
+    "fix_created_returns_resource": created_returns_resource,
+}
+
+
+# Path renames whose Java controllers are updated as well
+CONTROLLER_PATH_FIXES = {
+    "fix_kebab_case_paths",
+    "fix_plural_resources",
+    "fix_versioning_required",
+}
+
+
+def get_spec_transform(fix_function: str) -> Optional[Callable[[Dict], object]]:
+    """Get the tree transform behind a spec fix function, if it has one"""
+    return SPEC_TRANSFORMS.get(fix_function)
@@ -0,0 +1,226 @@
+"""
+Worktree Validator - Validates fix batches in isolated git worktrees
+
+Validating fixes used to mean writing them into the developer's checkout
+and building and re-scanning that same tree, which blocks the workspace for
+the whole build and allows only one candidate at a time. WorktreeValidator
+commits each batch of fixes in its own temporary `git worktree` (detached
+at HEAD), runs the build and re-scan there, and validates several batches
+in parallel. Only batches that pass are brought into the main checkout:
+the first is fast-forwarded, the others are cherry-picked on top.
+"""
+
+import asyncio
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from .build_validator import BuildValidator, ValidationResult
+from .pr_creator import PRCreator
+from .proposer import ProposedFix
+
+
+@dataclass
+class BatchValidation:
+    """Result of validating one batch of fixes in a worktree"""
+
+    name: str
+    fixes: List[ProposedFix]
+    commit: Optional[str] = None  # Commit of the batch on top of the base
+    validation: Optional[ValidationResult] = None
+    error: Optional[str] = None
+    promoted: bool = False
+
+    @property
+    def success(self) -> bool:
+        """Whether the batch built and passed the re-scan"""
+        return (
+            self.error is None
+            and self.validation is not None
+            and self.validation.success
+        )
+
+
+class WorktreeValidator:
+    """Applies and validates fix batches outside the user's checkout"""
+
+    def __init__(
+        self,
+        project_path: str,
+        max_parallel: Optional[int] = None,
+        validator_factory: Optional[Callable[[str], BuildValidator]] = None,
+    ):
+        """
+        Initialize worktree validator
+
+        Args:
+            project_path: Root of the git checkout
+            max_parallel: Batches built at the same time (or
+                FIX_VALIDATION_WORKERS env, default: 2)
+            validator_factory: Creates the validator for a worktree path
+                (default: BuildValidator)
+        """
+        self.project_path = Path(project_path)
+        self.max_parallel = (
+            max_parallel
+            if max_parallel is not None
+            else int(os.getenv("FIX_VALIDATION_WORKERS", "2"))
+        )
+        self.validator_factory = validator_factory or BuildValidator
+        # git worktree add/remove update shared metadata under .git/worktrees
+        self._worktree_lock = threading.Lock()
+
+    def _run_git_command(
+        self, args: List[str], cwd: Optional[Path] = None, check: bool = True
+    ) -> subprocess.CompletedProcess:
+        """Run a git command (in the main checkout by default)"""
+        return subprocess.run(
+            ["git"] + args,
+            cwd=cwd or self.project_path,
+            capture_output=True,
+            text=True,
+            check=check,
+        )
+
+    @contextmanager
+    def worktree(self, base: str) -> Iterator[Path]:
+        """Temporary worktree detached at a commit, removed on exit"""
+        path = tempfile.mkdtemp(prefix="governance-worktree-")
+        with self._worktree_lock:
+            self._run_git_command(["worktree", "add", "--detach", path, base])
+        try:
+            yield Path(path)
+        finally:
+            with self._worktree_lock:
+                self._run_git_command(
+                    ["worktree", "remove", "--force", path], check=False
+                )
+                self._run_git_command(["worktree", "prune"], check=False)
+            shutil.rmtree(path, ignore_errors=True)
+
+    async def validate_batches(
+        self,
+        batches: Dict[str, List[ProposedFix]],
+        category: str,
+        violations_before: Optional[Dict[str, List[Dict]]] = None,
+        clean_build: bool = True,
+    ) -> List[BatchValidation]:
+        """
+        Validate batches of fixes in parallel, each in its own worktree
+
+        Args:
+            batches: Fixes per batch name (e.g. per rule ID); each batch is
+                committed on top of the current HEAD
+            category: Category passed to the re-scan
+            violations_before: Violations each batch addresses, by batch
+                name; the re-scan of a batch only counts violations of their
+                rules (a batch without them is compared against the whole
+                re-scan of the category)
+            clean_build: Whether to run clean before each build
+
+        Returns:
+            BatchValidation per batch, in batch order
+        """
+        base = self._run_git_command(["rev-parse", "HEAD"]).stdout.strip()
+        semaphore = asyncio.Semaphore(max(1, self.max_parallel))
+
+        async def validate(name: str, fixes: List[ProposedFix]) -> BatchValidation:
+            async with semaphore:
+                return await asyncio.to_thread(
+                    self._validate_batch,
+                    name,
+                    fixes,
+                    base,
+                    category,
+                    (violations_before or {}).get(name, []),
+                    clean_build,
+                )
+
+        return list(
+            await asyncio.gather(
+                *(validate(name, fixes) for name, fixes in batches.items())
+            )
+        )
+
+    def _validate_batch(
+        self,
+        name: str,
+        fixes: List[ProposedFix],
+        base: str,
+        category: str,
+        violations_before: List[Dict],
+        clean_build: bool,
+    ) -> BatchValidation:
+        """Commit and validate one batch (runs in a worker thread)"""
+        result = BatchValidation(name=name, fixes=fixes)
+        try:
+            with self.worktree(base) as path:
+                creator = PRCreator(str(path), source_root=str(self.project_path))
+                commits = creator._commit_fix_groups(
+                    [
+                        (
+                            name,
+                            f"Fix {len(fixes)} violation(s)",
+                            creator._determine_severity(name),
+                            fixes,
+                        )
+                    ]
+                )
+                if not commits:
+                    result.error = "Fixes don't change any file"
+                    return result
+                result.commit = commits[-1].hash
+
+                print(f"\n🧪 Validating batch {name} in {path}")
+                validator = self.validator_factory(str(path))
+                rules = {v.get("rule") or v.get("rule_id") for v in violations_before}
+                result.validation = asyncio.run(
+                    validator.validate_fixes(
+                        category=category,
+                        violations_before=violations_before,
+                        clean_build=clean_build,
+                        output_dir=str(path / "build" / "governance"),
+                        rules=rules or None,
+                    )
+                )
+        except Exception as e:
+            result.error = str(e)
+        return result
+
+    def promote(self, results: List[BatchValidation]) -> List[BatchValidation]:
+        """
+        Bring the batches that passed into the main checkout
+
+        The first passing batch is fast-forwarded; later ones are
+        cherry-picked on top of it. A batch that doesn't apply cleanly (it
+        touches the same lines as an earlier winner, or the checkout has
+        conflicting local changes) is skipped and keeps its error.
+
+        Returns:
+            The promoted batches
+        """
+        promoted = []
+        for result in results:
+            if not result.success:
+                continue
+            if not promoted:
+                args = ["merge", "--ff-only", "-q", result.commit]
+            else:
+                args = ["cherry-pick", "--allow-empty", result.commit]
+            outcome = self._run_git_command(args, check=False)
+            if outcome.returncode != 0:
+                if promoted:
+                    self._run_git_command(["cherry-pick", "--abort"], check=False)
+                result.error = (
+                    f"Could not apply validated batch: {outcome.stderr.strip()}"
+                )
+                continue
+            result.promoted = True
+            promoted.append(result)
+        return promoted
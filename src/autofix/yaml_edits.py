@@ -0,0 +1,230 @@
+"""
+YAML Edits - Minimal text edits for changed specs
+
+Dumping a fixed spec with yaml.dump rewrites the whole file: comments are
+lost, quoting and indentation change, and a one-key fix produces a diff the
+size of the spec. This module keeps the source spans of every node from the
+original parse and turns the difference between the original and the fixed
+tree into targeted text edits on the original text:
+
+- renamed mapping keys (e.g. a path renamed to kebab-case)
+- keys added to an existing mapping (e.g. ``format: uuid``)
+- replaced scalar values
+
+Anything else (removed or reordered keys, resized sequences, type changes,
+merge keys, block scalars) raises SpanEditError so callers can fall back to
+a full dump. Edit size scales with the number of changes, not the file size.
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import yaml
+from yaml.nodes import MappingNode, Node, ScalarNode, SequenceNode
+
+# (start index, end index, replacement text) in the original content
+TextEdit = Tuple[int, int, str]
+
+
+class SpanEditError(Exception):
+    """Raised when a change can't be expressed as a targeted text edit"""
+
+
+def load_with_spans(content: str) -> Tuple[Any, Optional[Node]]:
+    """
+    Parse YAML/JSON once, keeping the node tree with source positions
+
+    Returns:
+        (data, root node); the node is None if spans can't be used
+    """
+    loader = yaml.SafeLoader(content)
+    try:
+        node = loader.get_single_node()
+        data = loader.construct_document(node) if node is not None else None
+    finally:
+        loader.dispose()
+
+    # Merge keys are flattened into the node tree during construction, so
+    # their spans no longer describe the text
+    if node is None or "<<" in content:
+        return data, None
+    return data, node
+
+
+def render_minimal_edits(content: str, node: Node, data: Any) -> str:
+    """
+    Apply the changes between the original tree and data as text edits
+
+    Args:
+        content: Original text the node tree was parsed from
+        node: Root node from load_with_spans
+        data: Fixed data (the original data after in-place transforms)
+
+    Returns:
+        Edited text
+
+    Raises:
+        SpanEditError: If a change needs a full re-dump
+    """
+    edits = _SpanDiff(content).diff(node, data)
+    return apply_text_edits(content, edits)
+
+
+def apply_text_edits(content: str, edits: List[TextEdit]) -> str:
+    """
+    Apply non-overlapping text edits
+
+    Raises:
+        SpanEditError: If edits overlap
+    """
+    ordered = sorted(edits, key=lambda edit: (edit[0], edit[1]))
+    for previous, current in zip(ordered, ordered[1:]):
+        if current[0] < previous[1]:
+            raise SpanEditError("Overlapping edits")
+
+    parts = []
+    position = 0
+    for start, end, text in ordered:
+        parts.append(content[position:start])
+        parts.append(text)
+        position = end
+    parts.append(content[position:])
+    return "".join(parts)
+
+
+class _SpanDiff:
+    """Walks the original node tree alongside the fixed data"""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.edits: List[TextEdit] = []
+        self._visited: Set[int] = set()
+        self._constructor = yaml.SafeLoader("")
+
+    def diff(self, node: Node, data: Any) -> List[TextEdit]:
+        """Collect the edits turning node's text into data"""
+        try:
+            self._diff_node(node, data)
+        finally:
+            self._constructor.dispose()
+        return self.edits
+
+    def _original_scalar(self, node: ScalarNode) -> Any:
+        """Value of a scalar node as the safe loader constructs it"""
+        return self._constructor.construct_object(node)
+
+    def _diff_node(self, node: Node, data: Any):
+        # Aliased nodes are shared; their text lives at the anchor
+        if id(node) in self._visited:
+            return
+        self._visited.add(id(node))
+
+        if isinstance(node, MappingNode):
+            if not isinstance(data, dict):
+                raise SpanEditError("Mapping replaced by another type")
+            self._diff_mapping(node, data)
+        elif isinstance(node, SequenceNode):
+            if not isinstance(data, list) or len(data) != len(node.value):
+                raise SpanEditError("Sequence resized or replaced")
+            for item_node, item in zip(node.value, data):
+                self._diff_node(item_node, item)
+        else:
+            original = self._original_scalar(node)
+            if type(original) is type(data) and original == data:
+                return
+            if isinstance(data, (dict, list)) or node.style in ("|", ">"):
+                raise SpanEditError("Scalar can't be replaced in place")
+            self._replace(node, _render_scalar(data, node.style))
+
+    def _diff_mapping(self, node: MappingNode, data: Dict):
+        for key_node, _ in node.value:
+            if not isinstance(key_node, ScalarNode):
+                raise SpanEditError("Complex mapping key")
+
+        original_keys = [self._original_scalar(k) for k, _ in node.value]
+        new_keys = list(data.keys())
+        if len(new_keys) < len(original_keys):
+            raise SpanEditError("Keys removed")
+
+        known = set(original_keys)
+        for (key_node, value_node), old_key, new_key in zip(
+            node.value, original_keys, new_keys
+        ):
+            if new_key != old_key:
+                if new_key in known:
+                    raise SpanEditError("Keys reordered")
+                self._replace(key_node, _render_scalar(new_key, key_node.style))
+            self._diff_node(value_node, data[new_key])
+
+        added = new_keys[len(original_keys) :]
+        if any(key in known for key in added):
+            raise SpanEditError("Keys reordered")
+        if added:
+            self._insert_entries(node, {key: data[key] for key in added})
+
+    def _replace(self, node: Node, text: str):
+        self.edits.append((node.start_mark.index, node.end_mark.index, text))
+
+    def _insert_entries(self, node: MappingNode, entries: Dict):
+        """Add entries after the last item of a mapping"""
+        if not node.value:
+            raise SpanEditError("Empty mapping")
+        first_key, _ = node.value[0]
+        _, last_value = node.value[-1]
+
+        if node.flow_style:
+            text = "".join(
+                f", {json.dumps(key)}: {json.dumps(value)}"
+                for key, value in entries.items()
+            )
+            position = last_value.end_mark.index
+            self.edits.append((position, position, text))
+            return
+
+        indent = " " * first_key.start_mark.column
+        block = yaml.dump(entries, default_flow_style=False, sort_keys=False)
+        text = "".join(
+            indent + line if line.strip() else line
+            for line in block.splitlines(keepends=True)
+        )
+
+        # After the line holding the end of the last value; a block value
+        # ends after the comments that follow it, and comments indented less
+        # than this mapping belong to an enclosing level
+        position = self._skip_back_whitespace(last_value.end_mark.index)
+        while position > 0:
+            line_start = self.content.rfind("\n", 0, position) + 1
+            line = self.content[line_start:position]
+            stripped = line.lstrip()
+            if not stripped.startswith("#") or len(line) - len(stripped) >= len(indent):
+                break
+            position = self._skip_back_whitespace(line_start)
+        newline = self.content.find("\n", position)
+        if newline == -1:
+            self.edits.append((len(self.content), len(self.content), "\n" + text))
+        else:
+            self.edits.append((newline + 1, newline + 1, text))
+
+    def _skip_back_whitespace(self, position: int) -> int:
+        """Move a position back over whitespace and line breaks"""
+        while position > 0 and self.content[position - 1] in " \t\r\n":
+            position -= 1
+        return position
+
+
+def _render_scalar(value: Any, style: Optional[str]) -> str:
+    """Inline YAML text for a scalar, keeping the original quoting if possible"""
+    if isinstance(value, str):
+        if style == '"':
+            return json.dumps(value)
+        if style == "'":
+            return "'" + value.replace("'", "''") + "'"
+        try:
+            if value and value.strip() == value and yaml.safe_load(value) == value:
+                return value
+        except yaml.YAMLError:
+            pass
+        return json.dumps(value)
+
+    text = yaml.safe_dump(value, default_flow_style=True)
+    return text.split("\n", 1)[0]
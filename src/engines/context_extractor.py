@@ -0,0 +1,565 @@
+"""
+Context-window slicing for LLM fix prompts
+
+Fix prompts used to embed the whole file even though violations carry a
+line (or, for Spectral, a spec path). The extractor narrows the editable
+region to what the model actually needs:
+
+- Java: the enclosing method/member (with its javadoc and annotations),
+  plus a read-only outline of package, imports, fields and signatures.
+- OpenAPI YAML: the subtree at the violation path (e.g. one path item or
+  one schema), plus its ancestor keys.
+
+The model returns a replacement for the region only, which is spliced back
+at the original line offsets.
+"""
+
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+from utils.logger import logger
+
+SLICE_INSTRUCTIONS = (
+    "Return ONLY the complete fixed version of the **Code to Fix** section, "
+    "not the whole file. Keep its indentation. The outline is read-only "
+    "context. If new imports are required, list the import statements first, "
+    "before the code."
+)
+
+_JAVA_IMPORT_RE = re.compile(r"^\s*import\s+(static\s+)?[\w.*]+\s*;\s*$")
+
+# How deep below the root a YAML slice starts, by top-level key
+# (paths./users -> the path item, components.schemas.User -> the schema)
+_YAML_SLICE_DEPTH = {"paths": 2, "components": 3}
+
+
+@dataclass
+class ContextSlice:
+    """Editable line range of a file plus read-only context for the prompt"""
+
+    start_line: int  # 0-based, inclusive
+    end_line: int  # 0-based, exclusive
+    text: str
+    outline: str
+    language: str
+
+    @property
+    def first_line(self) -> int:
+        """1-based first line of the region"""
+        return self.start_line + 1
+
+    @property
+    def last_line(self) -> int:
+        """1-based last line of the region"""
+        return self.end_line
+
+    def render(self, file_ext: str) -> str:
+        """Render the outline and editable region as prompt sections"""
+        return (
+            f"**File Outline (read-only)**:\n"
+            f"```{file_ext}\n{self.outline}\n```\n\n"
+            f"**Code to Fix** (lines {self.first_line}-{self.last_line}):\n"
+            f"```{file_ext}\n{self.text}\n```\n\n"
+        )
+
+    def splice(self, original: str, edited: str) -> str:
+        """
+        Put an edited region back into the original file
+
+        Args:
+            original: Full original file content
+            edited: Model output replacing the region
+
+        Returns:
+            Full file content with the region replaced
+        """
+        new_imports: List[str] = []
+        if self.language == "java":
+            edited, new_imports = _split_leading_imports(edited)
+
+        edited = edited.strip("\n")
+        edited = _restore_first_line_indent(self.text, edited)
+
+        lines = original.splitlines(keepends=True)
+        region = "".join(lines[self.start_line : self.end_line])
+        if region.endswith("\n") and not edited.endswith("\n"):
+            edited += "\n"
+
+        result = (
+            "".join(lines[: self.start_line]) + edited + "".join(lines[self.end_line :])
+        )
+        if new_imports:
+            result = _add_java_imports(result, new_imports)
+        return result
+
+
+class ContextExtractor:
+    """
+    Finds the smallest useful region of a file for a set of violations
+    """
+
+    def __init__(
+        self,
+        min_file_lines: int = 150,
+        max_fraction: float = 0.6,
+        context_lines: int = 10,
+    ):
+        """
+        Initialize context extractor
+
+        Args:
+            min_file_lines: Files shorter than this are always sent whole
+            max_fraction: Send the whole file if the slice would be larger
+                than this fraction of it
+            context_lines: Lines around the violation when no enclosing
+                member can be found
+        """
+        self.min_file_lines = min_file_lines
+        self.max_fraction = max_fraction
+        self.context_lines = context_lines
+        self.stats = {"sliced": 0, "whole_file": 0, "chars_saved": 0}
+
+    def extract(
+        self, content: str, violations: List[Dict], file_ext: Optional[str] = None
+    ) -> Optional[ContextSlice]:
+        """
+        Extract the region covering all violations
+
+        Args:
+            content: Full file content
+            violations: Violations to fix (need a line or a spec path)
+            file_ext: File extension hint (detected from content if missing)
+
+        Returns:
+            ContextSlice, or None if the whole file should be sent
+        """
+        lines = content.splitlines()
+        language = _detect_language(content, violations, file_ext)
+
+        if len(lines) < self.min_file_lines or not language or not violations:
+            return self._whole_file()
+
+        blocks = _java_blocks(lines) if language == "java" else []
+        ranges = []
+        for violation in violations:
+            if language == "java":
+                line = _violation_line(violation) or _find_java_member_line(
+                    lines, violation.get("message", "")
+                )
+                found = self._java_range(lines, blocks, line)
+            else:
+                found = self._yaml_range(content, lines, violation)
+            if found is None:
+                return self._whole_file()
+            ranges.append(found)
+
+        start = min(r[0] for r in ranges)
+        end = max(r[1] for r in ranges)
+        if (end - start) > self.max_fraction * len(lines):
+            return self._whole_file()
+
+        if language == "java":
+            outline = _java_outline(lines, blocks, start, end)
+        else:
+            outline = _yaml_outline(lines, start)
+
+        text = "\n".join(lines[start:end])
+        self.stats["sliced"] += 1
+        self.stats["chars_saved"] += max(0, len(content) - len(text) - len(outline))
+        logger.debug(
+            f"Sliced {language} context to lines {start + 1}-{end} of {len(lines)}"
+        )
+        return ContextSlice(
+            start_line=start,
+            end_line=end,
+            text=text,
+            outline=outline,
+            language=language,
+        )
+
+    def _whole_file(self) -> None:
+        """Record that the whole file will be sent"""
+        self.stats["whole_file"] += 1
+        return None
+
+    def _java_range(
+        self,
+        lines: List[str],
+        blocks: List[Tuple[int, int, int]],
+        line: Optional[int],
+    ) -> Optional[Tuple[int, int]]:
+        """Line range of the member enclosing a 1-based line"""
+        if not line or line < 1 or line > len(lines):
+            return None
+        target = line - 1
+
+        members = [
+            (_member_start(lines, start), end + 1)
+            for start, end, depth in blocks
+            if depth == 1
+        ]
+        enclosing = [r for r in members if r[0] <= target < r[1]]
+        if enclosing:
+            return min(enclosing, key=lambda r: r[1] - r[0])
+
+        # Field or class-level annotation: a window around the line
+        return (
+            max(0, target - self.context_lines),
+            min(len(lines), target + self.context_lines + 1),
+        )
+
+    def _yaml_range(
+        self, content: str, lines: List[str], violation: Dict
+    ) -> Optional[Tuple[int, int]]:
+        """Line range of the subtree at the violation path (or line)"""
+        path = violation.get("path") or ""
+        if path:
+            found = _yaml_range_for_path(content, lines, path.split("."))
+            if found:
+                return found
+
+        line = _violation_line(violation)
+        if not line or line > len(lines):
+            return None
+        if violation.get("engine") == "spectral":
+            line += 1  # Spectral ranges are 0-based
+        return _yaml_range_for_line(lines, min(line, len(lines)) - 1)
+
+
+def _detect_language(
+    content: str, violations: List[Dict], file_ext: Optional[str]
+) -> Optional[str]:
+    """Detect whether content is Java or YAML"""
+    ext = (file_ext or "").lstrip(".").lower()
+    if not ext:
+        for violation in violations:
+            source = violation.get("file") or violation.get("source")
+            if source:
+                ext = Path(source).suffix.lstrip(".").lower()
+                break
+
+    if ext == "java":
+        return "java"
+    if ext in ("yaml", "yml"):
+        return "yaml"
+    if not ext:
+        if re.search(r"^(openapi|swagger)\s*:", content, re.MULTILINE):
+            return "yaml"
+        if re.search(r"^\s*(package|import)\s+[\w.]+\s*;", content, re.MULTILINE):
+            return "java"
+    return None
+
+
+def _violation_line(violation: Dict) -> Optional[int]:
+    """Get the violation line from the line field or the message"""
+    line = violation.get("line") or violation.get("line_number")
+    if line:
+        try:
+            return int(line)
+        except (TypeError, ValueError):
+            pass
+    match = re.search(r"line (\d+)", violation.get("message", ""), re.IGNORECASE)
+    return int(match.group(1)) if match else None
+
+
+def _find_java_member_line(lines: List[str], message: str) -> Optional[int]:
+    """Locate a method named in an ArchUnit message like <pkg.Cls.method(..)>"""
+    for name in re.findall(r"\.(\w+)\(", message):
+        declaration = re.compile(rf"^\s*[\w<>\[\],.?@\s]*\s{name}\s*\(")
+        for i, line in enumerate(lines):
+            if declaration.match(line) and not line.rstrip().endswith(";"):
+                return i + 1
+    return None
+
+
+def _java_blocks(lines: List[str]) -> List[Tuple[int, int, int]]:
+    """
+    Find brace blocks, skipping strings, chars and comments
+
+    Returns:
+        List of (open_line, close_line, depth) tuples, 0-based
+    """
+    blocks = []
+    stack: List[int] = []
+    in_comment = False
+    in_text_block = False
+
+    for i, line in enumerate(lines):
+        j = 0
+        n = len(line)
+        while j < n:
+            if in_comment:
+                end = line.find("*/", j)
+                if end == -1:
+                    break
+                in_comment = False
+                j = end + 2
+                continue
+            if in_text_block:
+                end = line.find('"""', j)
+                if end == -1:
+                    break
+                in_text_block = False
+                j = end + 3
+                continue
+
+            if line.startswith("//", j):
+                break
+            if line.startswith("/*", j):
+                in_comment = True
+                j += 2
+                continue
+            if line.startswith('"""', j):
+                in_text_block = True
+                j += 3
+                continue
+
+            char = line[j]
+            if char in "\"'":
+                k = j + 1
+                while k < n and line[k] != char:
+                    k += 2 if line[k] == "\\" else 1
+                j = k + 1
+                continue
+            if char == "{":
+                stack.append(i)
+            elif char == "}" and stack:
+                start = stack.pop()
+                blocks.append((start, i, len(stack)))
+            j += 1
+
+    return blocks
+
+
+def _member_start(lines: List[str], brace_line: int) -> int:
+    """Walk back from a member's opening brace over its signature, annotations and javadoc"""
+    start = brace_line
+    while start > 0:
+        previous = lines[start - 1].strip()
+        if not previous or previous.endswith((";", "{", "}")):
+            break
+        start -= 1
+    return start
+
+
+def _java_outline(
+    lines: List[str], blocks: List[Tuple[int, int, int]], start: int, end: int
+) -> str:
+    """Package, imports, type declarations, fields and member signatures"""
+    member_bodies = set()
+    signatures = set()
+    for open_line, close_line, depth in blocks:
+        if depth > 1:
+            continue
+        # Signature lines, without the javadoc and annotations above them
+        signature_start = _member_start(lines, open_line)
+        while signature_start < open_line and lines[signature_start].strip().startswith(
+            ("/**", "*", "//", "@")
+        ):
+            signature_start += 1
+        signatures.update(range(signature_start, open_line + 1))
+        if depth == 1:
+            member_bodies.update(range(open_line + 1, close_line + 1))
+
+    depth_at = _java_line_depths(lines, blocks)
+    keep = []
+    for i, line in enumerate(lines):
+        if start <= i < end:
+            continue
+        stripped = line.strip()
+        if not stripped or stripped.startswith(("//", "/*", "*")):
+            continue
+        if depth_at[i] == 0 and stripped.startswith(("package ", "import ")):
+            keep.append(i)
+        elif i in signatures:
+            keep.append(i)
+        elif depth_at[i] == 1 and i not in member_bodies and stripped.endswith(";"):
+            keep.append(i)  # Field declaration
+
+    return _join_with_gaps(lines, keep, "// ...")
+
+
+def _java_line_depths(
+    lines: List[str], blocks: List[Tuple[int, int, int]]
+) -> List[int]:
+    """Brace depth at the start of each line"""
+    delta = [0] * (len(lines) + 1)
+    for open_line, close_line, _ in blocks:
+        delta[open_line + 1] += 1
+        delta[close_line] -= 1
+    depths = []
+    depth = 0
+    for i in range(len(lines)):
+        depth += delta[i]
+        depths.append(depth)
+    return depths
+
+
+def _yaml_range_for_path(
+    content: str, lines: List[str], parts: List[str]
+) -> Optional[Tuple[int, int]]:
+    """Resolve a dotted spec path with yaml.compose marks"""
+    try:
+        node = yaml.compose(content)
+    except yaml.YAMLError:
+        return None
+    if not isinstance(node, yaml.MappingNode) or not parts:
+        return None
+
+    depth = _YAML_SLICE_DEPTH.get(parts[0], 1)
+    key_node = None
+    resolved = 0
+    index = 0
+    while index < len(parts) and resolved < depth:
+        if not isinstance(node, yaml.MappingNode):
+            break
+        # Keys may contain dots ("/v1.0/users"), so try joining segments
+        match = None
+        for stop in range(index + 1, len(parts) + 1):
+            wanted = ".".join(parts[index:stop])
+            for k, v in node.value:
+                if str(k.value) == wanted:
+                    match = (k, v, stop)
+                    break
+            if match:
+                break
+        if not match:
+            break
+        key_node, node, index = match
+        resolved += 1
+
+    if key_node is None:
+        return None
+
+    start = key_node.start_mark.line
+    # Block nodes end where the next token starts; scalars end mid-line
+    end = node.end_mark.line
+    if end < len(lines) and lines[end][: node.end_mark.column].strip():
+        end += 1
+    end = max(start + 1, min(end, len(lines)))
+    while end > start + 1 and not lines[end - 1].strip():
+        end -= 1
+    return (start, end)
+
+
+def _yaml_range_for_line(lines: List[str], target: int) -> Optional[Tuple[int, int]]:
+    """Find the subtree containing a line using indentation"""
+    ancestors = []  # (line, indent) from the target up to the root
+    indent = None
+    for i in range(target, -1, -1):
+        stripped = lines[i].strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        current = len(lines[i]) - len(lines[i].lstrip())
+        if indent is None or current < indent:
+            ancestors.append(i)
+            indent = current
+            if current == 0:
+                break
+
+    if not ancestors:
+        return None
+    ancestors.reverse()
+    root_key = lines[ancestors[0]].split(":", 1)[0].strip()
+    depth = _YAML_SLICE_DEPTH.get(root_key, 1)
+    start = ancestors[min(depth, len(ancestors)) - 1]
+
+    start_indent = len(lines[start]) - len(lines[start].lstrip())
+    end = start + 1
+    while end < len(lines):
+        stripped = lines[end].strip()
+        if stripped and not stripped.startswith("#"):
+            if len(lines[end]) - len(lines[end].lstrip()) <= start_indent:
+                break
+        end += 1
+    while end > start + 1 and not lines[end - 1].strip():
+        end -= 1
+    return (start, end)
+
+
+def _yaml_outline(lines: List[str], start: int) -> str:
+    """Spec version plus the ancestor keys of the region"""
+    keep = []
+    indent = len(lines[start]) - len(lines[start].lstrip())
+    for i in range(start - 1, -1, -1):
+        stripped = lines[i].strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        current = len(lines[i]) - len(lines[i].lstrip())
+        if current < indent:
+            keep.append(i)
+            indent = current
+            if current == 0:
+                break
+
+    for i, line in enumerate(lines[:start]):
+        if re.match(r"^(openapi|swagger)\s*:", line):
+            keep.append(i)
+            break
+
+    return _join_with_gaps(lines, sorted(set(keep)), "# ...")
+
+
+def _join_with_gaps(lines: List[str], keep: List[int], marker: str) -> str:
+    """Join selected lines, marking skipped stretches"""
+    output = []
+    previous = -1
+    for i in keep:
+        if previous != -1 and i != previous + 1:
+            indent = lines[i][: len(lines[i]) - len(lines[i].lstrip())]
+            output.append(f"{indent}{marker}")
+        output.append(lines[i])
+        previous = i
+    return "\n".join(output)
+
+
+def _split_leading_imports(edited: str) -> Tuple[str, List[str]]:
+    """Separate import statements the model put before the fixed code"""
+    lines = edited.splitlines()
+    imports = []
+    index = 0
+    while index < len(lines):
+        stripped = lines[index].strip()
+        if _JAVA_IMPORT_RE.match(stripped):
+            imports.append(stripped)
+        elif stripped:
+            break
+        index += 1
+    if not imports:
+        return edited, []
+    return "\n".join(lines[index:]), imports
+
+
+def _add_java_imports(content: str, imports: List[str]) -> str:
+    """Add missing imports after the last existing import (or the package line)"""
+    lines = content.splitlines(keepends=True)
+    existing = {line.strip() for line in lines if _JAVA_IMPORT_RE.match(line)}
+    missing = [imp for imp in dict.fromkeys(imports) if imp not in existing]
+    if not missing:
+        return content
+
+    insert_at = 0
+    for i, line in enumerate(lines):
+        if _JAVA_IMPORT_RE.match(line):
+            insert_at = i + 1
+        elif line.strip().startswith("package ") and insert_at == 0:
+            insert_at = i + 1
+        elif re.match(r"^\s*(public|final|abstract|class|interface|@)", line):
+            break
+
+    added = "".join(f"{imp}\n" for imp in missing)
+    return "".join(lines[:insert_at]) + added + "".join(lines[insert_at:])
+
+
+def _restore_first_line_indent(region: str, edited: str) -> str:
+    """Re-indent the first line if response cleanup stripped it"""
+    if not region or not edited:
+        return edited
+    region_indent = region[: len(region) - len(region.lstrip(" \t"))]
+    if region_indent and not edited[:1].isspace():
+        return region_indent + edited
+    return edited
@@ -10,6 +10,7 @@ from pathlib import Path
 import re
 
 from utils.logger import logger
+from utils.route_index import RouteIndex
 
 
 class ControllerChangeGenerator:
@@ -22,6 +23,7 @@ class ControllerChangeGenerator:
 
     def __init__(self, project_path: str):
         self.project_path = Path(project_path)
+        self.route_index = RouteIndex.for_project(project_path)
 
     def generate_controller_fixes(
         self, violation: Dict, openapi_file: str, related_controllers: List[str]
@@ -377,6 +379,11 @@ import java.util.UUID;
             if changed_segments or (
                 old_resource and new_resource and old_resource != new_resource
             ):
+                if not controllers:
+                    controllers = self.route_index.controllers_for_path(
+                        old_path, include_tests=False
+                    )
+
                 if controllers:
                     # We found specific controllers - generate targeted fixes
                     logger.info(
@@ -523,6 +530,11 @@ NEW: {new_path}
             Method name if found, None otherwise
         """
         try:
+            # Indexed routes first; the regex below handles unindexed files
+            for route in self.route_index.find_routes(endpoint, http_method):
+                if route.file == Path(controller_file).as_posix() and route.method_name:
+                    return route.method_name
+
             controller_path = self.project_path / controller_file
             if not controller_path.exists():
                 return None
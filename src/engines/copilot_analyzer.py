@@ -11,9 +11,31 @@ import os
 import asyncio
 import aiohttp
 import json
-from typing import Dict, List, Optional
+import re
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 from utils.logger import logger
+from engines.rate_limiter import (
+    RateLimitExceeded,
+    TokenBucketRateLimiter,
+    get_shared_rate_limiter,
+    estimate_tokens,
+    report_overload,
+)
+from engines.context_extractor import SLICE_INSTRUCTIONS, ContextExtractor, ContextSlice
+from engines.patch_format import (
+    PATCH_FORMAT_INSTRUCTIONS,
+    PatchApplyError,
+    apply_patch_response,
+)
+
+# Delimiters for packed multi-file requests
+MULTI_FILE_START = "=== FILE: {path} ==="
+MULTI_FILE_END = "=== END FILE ==="
+MULTI_FILE_UNCHANGED = "UNCHANGED"
+_MULTI_FILE_RE = re.compile(
+    r"^=== FILE: (.+?) ===[ \t]*\n(.*?)\n?^=== END FILE ===", re.MULTILINE | re.DOTALL
+)
 
 
 class CopilotAnalyzer:
@@ -30,13 +52,28 @@ class CopilotAnalyzer:
         GITHUB_TOKEN environment variable with Copilot API access
     """
 
-    def __init__(self, api_token: Optional[str] = None, model: str = "gpt-4"):
+    # Bump whenever fix prompts change so cached fixes are regenerated
+    PROMPT_TEMPLATE_VERSION = "3"
+
+    def __init__(
+        self,
+        api_token: Optional[str] = None,
+        model: str = "gpt-4",
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        fix_format: Optional[str] = None,
+    ):
         """
         Initialize Copilot analyzer
 
         Args:
             api_token: GitHub token with Copilot access (or from GITHUB_TOKEN env)
             model: Model to use ("gpt-4" for quality, "gpt-3.5-turbo" for speed)
+            rate_limiter: Optional limiter; defaults to the process-wide limiter
+                for the Copilot endpoint (COPILOT_RPM / COPILOT_TPM env)
+            fix_format: "full" (return whole file), "patch" (return
+                search/replace hunks) or "auto" (patch for files of at least
+                COPILOT_PATCH_MIN_LINES lines). Defaults to COPILOT_FIX_FORMAT
+                env or "auto".
         """
         self.api_token = api_token or os.getenv("GITHUB_TOKEN")
         if not self.api_token:
@@ -51,8 +88,42 @@ class CopilotAnalyzer:
             total=20
         )  # Increased from 15s for better reliability
         self.max_retries = 2
+        self.max_rate_limit_retries = 5  # 429s wait for the window, not an attempt
+        self.max_tokens = 4096
+        self.patch_max_tokens = 2048  # Hunks are small; reserve less budget
         self.session: Optional[aiohttp.ClientSession] = None
         self.use_fallback = True  # Enable heuristic fallback if API fails
+        self.overload_events = 0  # 429s and timeouts, read by adaptive concurrency
+
+        # Shared across analyzers so concurrent fix tasks queue fairly
+        self.rate_limiter = rate_limiter or get_shared_rate_limiter(
+            self.api_endpoint,
+            requests_per_minute=int(os.getenv("COPILOT_RPM", "60")),
+            tokens_per_minute=int(os.getenv("COPILOT_TPM", "0")) or None,
+        )
+
+        # Patch-format responses avoid echoing large files back
+        self.fix_format = (
+            fix_format or os.getenv("COPILOT_FIX_FORMAT", "auto")
+        ).lower()
+        if self.fix_format not in ("full", "patch", "auto"):
+            logger.warning(f"Unknown fix format '{self.fix_format}', using 'auto'")
+            self.fix_format = "auto"
+        self.patch_min_lines = int(os.getenv("COPILOT_PATCH_MIN_LINES", "200"))
+        self.patch_stats = {"applied": 0, "fallbacks": 0}
+
+        # Only the enclosing method / spec subtree is sent for large files
+        self.context_extractor = ContextExtractor(
+            min_file_lines=int(os.getenv("FIX_CONTEXT_MIN_LINES", "150"))
+        )
+
+    @property
+    def fix_settings(self) -> str:
+        """Settings that shape fix prompts and parsing (part of the fix cache key)"""
+        return (
+            f"format={self.fix_format},patch_min={self.patch_min_lines},"
+            f"context_min={self.context_extractor.min_file_lines}"
+        )
 
     async def _get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session"""
@@ -67,7 +138,11 @@ class CopilotAnalyzer:
         return self.session
 
     async def _call_copilot(
-        self, prompt: str, system_prompt: Optional[str] = None, temperature: float = 0.3
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.3,
+        max_tokens: Optional[int] = None,
     ) -> str:
         """
         Call GitHub Copilot API with retry logic
@@ -76,6 +151,7 @@ class CopilotAnalyzer:
             prompt: User prompt for code generation
             system_prompt: Optional system context
             temperature: Creativity level (0.3 = focused, 0.7 = creative)
+            max_tokens: Completion limit (defaults to self.max_tokens)
 
         Returns:
             Generated response text
@@ -89,19 +165,45 @@ class CopilotAnalyzer:
         if system_prompt:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
+        max_tokens = max_tokens or self.max_tokens
 
         payload = {
             "model": self.model,
             "messages": messages,
             "temperature": temperature,
-            "max_tokens": 4096,
+            "max_tokens": max_tokens,
             "stream": False,
         }
 
-        for attempt in range(self.max_retries):
+        # Budget the prompt plus the completion we allow
+        estimated_tokens = (
+            estimate_tokens(prompt) + estimate_tokens(system_prompt or "") + max_tokens
+        )
+
+        attempt = 0
+        rate_limited = 0
+        while attempt < self.max_retries:
+            await self.rate_limiter.acquire(estimated_tokens)
             try:
                 session = await self._get_session()
                 async with session.post(self.api_endpoint, json=payload) as response:
+                    if response.status == 429:
+                        # Rate limit - hold every caller until the window reopens
+                        rate_limited += 1
+                        self.overload_events += 1
+                        report_overload()
+                        if rate_limited > self.max_rate_limit_retries:
+                            raise RateLimitExceeded("Rate limit retries exhausted")
+                        wait_time = self.rate_limiter.report_rate_limited(
+                            response.headers, fallback=2**rate_limited
+                        )
+                        logger.warning(
+                            f"Rate limited. Retrying in {wait_time:.1f}s "
+                            f"({self.rate_limiter.metrics.queue_depth} request(s) queued)..."
+                        )
+                        continue
+
+                    self.rate_limiter.update_from_headers(response.headers)
                     if response.status == 200:
                         data = await response.json()
                         return data["choices"][0]["message"]["content"]
@@ -109,12 +211,6 @@ class CopilotAnalyzer:
                         raise ValueError(
                             "Invalid GitHub token. Check GITHUB_TOKEN environment variable."
                         )
-                    elif response.status == 429:
-                        # Rate limit - wait and retry
-                        wait_time = 2**attempt
-                        logger.warning(f"Rate limited. Retrying in {wait_time}s...")
-                        await asyncio.sleep(wait_time)
-                        continue
                     else:
                         error_text = await response.text()
                         logger.error(
@@ -122,16 +218,22 @@ class CopilotAnalyzer:
                         )
                         raise Exception(f"API error: {response.status}")
 
+            except RateLimitExceeded:
+                raise
             except asyncio.TimeoutError:
+                attempt += 1
+                self.overload_events += 1
+                report_overload()
                 logger.warning(
-                    f"Copilot API timeout (attempt {attempt + 1}/{self.max_retries})"
+                    f"Copilot API timeout (attempt {attempt}/{self.max_retries})"
                 )
-                if attempt == self.max_retries - 1:
+                if attempt == self.max_retries:
                     raise
                 await asyncio.sleep(1)
             except Exception as e:
+                attempt += 1
                 logger.error(f"Copilot API call failed: {e}")
-                if attempt == self.max_retries - 1:
+                if attempt == self.max_retries:
                     raise
                 await asyncio.sleep(1)
 
@@ -162,10 +264,14 @@ class CopilotAnalyzer:
             "while maintaining code integrity and style."
         )
 
-        prompt = (
+        task = (
             f"Fix the following {file_ext} code violation:\n\n"
             f"**Violation Rule**: {rule_id}\n"
             f"**Issue**: {message}\n\n"
+        )
+
+        prompt = (
+            f"{task}"
             f"**Original Code**:\n"
             f"```{file_ext}\n{file_content}\n```\n\n"
             f"**Instructions**:\n"
@@ -179,6 +285,17 @@ class CopilotAnalyzer:
         )
 
         try:
+            targeted = await self._generate_targeted_fix(
+                task,
+                file_content,
+                file_ext,
+                system_prompt,
+                "Fix ONLY the specific violation mentioned above",
+                [violation],
+            )
+            if targeted is not None:
+                return targeted
+
             response = await self._call_copilot(prompt, system_prompt, temperature=0.3)
 
             # Clean up response (remove markdown if present despite instructions)
@@ -236,9 +353,13 @@ class CopilotAnalyzer:
             "efficiently while maintaining code quality and consistency."
         )
 
-        prompt = (
+        task = (
             f"Fix ALL of the following violations in this {file_ext} file:\n\n"
             f"**Violations**:\n{violations_text}\n\n"
+        )
+
+        prompt = (
+            f"{task}"
             f"**Original Code**:\n"
             f"```{file_ext}\n{file_content}\n```\n\n"
             f"**Instructions**:\n"
@@ -251,6 +372,18 @@ class CopilotAnalyzer:
         )
 
         try:
+            targeted = await self._generate_targeted_fix(
+                task,
+                file_content,
+                file_ext,
+                system_prompt,
+                f"Fix ALL {len(violations)} violations listed above so the "
+                f"fixes work together",
+                violations,
+            )
+            if targeted is not None:
+                return targeted
+
             response = await self._call_copilot(prompt, system_prompt, temperature=0.3)
             fixed_content = self._clean_code_response(response)
 
@@ -267,6 +400,95 @@ class CopilotAnalyzer:
             logger.error(f"Copilot batch fix failed: {e}")
             return file_content
 
+    async def generate_multi_file_fix(
+        self, files: Dict[str, str], violations: Dict[str, List[Dict]]
+    ) -> Dict[str, str]:
+        """
+        Fix several small, independent files in one request
+
+        Packing amortizes the per-request overhead when many small files
+        (e.g. DTOs) each have a violation or two.
+
+        Args:
+            files: Dictionary of file_path -> file_content
+            violations: Dictionary of file_path -> violations in that file
+
+        Returns:
+            Dictionary of file_path -> fixed_content for every file the model
+            answered for validly (unchanged files map to their original
+            content). Files missing from the result should be retried alone.
+        """
+        if not files:
+            return {}
+
+        sections = ""
+        for i, (path, content) in enumerate(files.items(), 1):
+            ext = Path(path).suffix.lstrip(".") or "txt"
+            violations_text = ""
+            for j, v in enumerate(violations.get(path, []), 1):
+                rule_id = v.get("rule") or v.get("rule_id", "unknown")
+                violations_text += f"{j}. {rule_id}: {v.get('message', '')}\n"
+            sections += (
+                f"### File {i}: {path}\n"
+                f"**Violations**:\n{violations_text}\n"
+                f"```{ext}\n{content}\n```\n\n"
+            )
+
+        system_prompt = (
+            "You are an expert code quality engineer. Fix code violations in "
+            "several independent files while maintaining code quality."
+        )
+
+        prompt = (
+            f"Fix the listed violations in each of the following {len(files)} files.\n\n"
+            f"{sections}"
+            f"**Instructions**:\n"
+            f"1. Fix ONLY the violations listed for each file\n"
+            f"2. Return EVERY file, each wrapped exactly like this:\n"
+            f"{MULTI_FILE_START.format(path='path/of/file')}\n"
+            f"<complete fixed file content>\n"
+            f"{MULTI_FILE_END}\n"
+            f"3. If a file needs no change, put only {MULTI_FILE_UNCHANGED} inside its block\n"
+            f"4. Do NOT add markdown code blocks or explanations\n"
+            f"5. Maintain code style and structure\n\n"
+            f"**Fixed Files**:"
+        )
+
+        try:
+            response = await self._call_copilot(prompt, system_prompt, temperature=0.3)
+        except Exception as e:
+            logger.error(f"Copilot multi-file fix failed: {e}")
+            return {}
+
+        result = {}
+        for path, block in _split_multi_file_response(response):
+            matched = path if path in files else None
+            if matched is None:
+                for orig_path in files:
+                    if orig_path.endswith(path) or path.endswith(orig_path):
+                        matched = orig_path
+                        break
+            if matched is None:
+                continue
+
+            original = files[matched]
+            if block.strip() == MULTI_FILE_UNCHANGED:
+                result[matched] = original
+                continue
+
+            fixed_content = self._clean_code_response(block)
+            if not fixed_content.strip() or len(fixed_content) < len(original) * 0.5:
+                logger.warning(f"Copilot packed fix for {matched} invalid, retrying")
+                continue
+            if original.endswith("\n") and not fixed_content.endswith("\n"):
+                fixed_content += "\n"
+            result[matched] = fixed_content
+
+        missing = len(files) - len(result)
+        if missing:
+            logger.warning(f"Copilot packed fix missed {missing} of {len(files)} files")
+        return result
+
     async def generate_cross_file_fix(
         self, files: Dict[str, str], violation: Dict
     ) -> Dict[str, str]:
@@ -343,6 +565,138 @@ class CopilotAnalyzer:
             logger.error(f"Copilot cross-file fix failed: {e}")
             return {}
 
+    def _use_patch_format(self, file_content: str) -> bool:
+        """Decide whether to ask for hunks instead of the whole file"""
+        if self.fix_format == "patch":
+            return True
+        if self.fix_format == "auto":
+            return file_content.count("\n") + 1 >= self.patch_min_lines
+        return False
+
+    async def _generate_targeted_fix(
+        self,
+        task: str,
+        file_content: str,
+        file_ext: str,
+        system_prompt: str,
+        goal: str,
+        violations: List[Dict],
+    ) -> Optional[str]:
+        """
+        Try the cheap fix modes before whole-file regeneration
+
+        Patch mode (if enabled) runs first, then a whole-region rewrite of
+        the context slice.
+
+        Returns:
+            The fixed file content, or None to fall back to whole-file mode
+        """
+        context = self.context_extractor.extract(file_content, violations)
+
+        if self._use_patch_format(file_content):
+            patched = await self._generate_patch_fix(
+                task, file_content, file_ext, system_prompt, goal, context
+            )
+            if patched is not None:
+                return patched
+
+        if context is not None:
+            return await self._generate_slice_fix(
+                task, file_content, file_ext, system_prompt, goal, context
+            )
+
+        return None
+
+    async def _generate_patch_fix(
+        self,
+        task: str,
+        file_content: str,
+        file_ext: str,
+        system_prompt: str,
+        goal: str,
+        context: Optional[ContextSlice] = None,
+    ) -> Optional[str]:
+        """
+        Ask for search/replace hunks and apply them locally
+
+        Args:
+            task: Violation description that starts the prompt
+            file_content: The full content of the file
+            file_ext: Language hint for the code block
+            system_prompt: System context
+            goal: First instruction line describing what to fix
+            context: Optional slice to show instead of the whole file
+
+        Returns:
+            The patched file content, or None if the hunks didn't apply
+            cleanly and the caller should fall back to whole-file mode
+        """
+        if context is not None:
+            code_view = context.render(file_ext)
+        else:
+            code_view = f"**Original Code**:\n```{file_ext}\n{file_content}\n```\n\n"
+
+        prompt = (
+            f"{task}"
+            f"{code_view}"
+            f"**Instructions**:\n"
+            f"{goal}. Maintain formatting, imports and style.\n"
+            f"{PATCH_FORMAT_INSTRUCTIONS}\n"
+            f"**Edits**:"
+        )
+
+        response = await self._call_copilot(
+            prompt, system_prompt, temperature=0.3, max_tokens=self.patch_max_tokens
+        )
+        try:
+            patched = apply_patch_response(file_content, response)
+        except PatchApplyError as e:
+            self.patch_stats["fallbacks"] += 1
+            logger.warning(f"Patch response did not apply ({e}), using whole-file fix")
+            return None
+
+        self.patch_stats["applied"] += 1
+        return patched
+
+    async def _generate_slice_fix(
+        self,
+        task: str,
+        file_content: str,
+        file_ext: str,
+        system_prompt: str,
+        goal: str,
+        context: ContextSlice,
+    ) -> Optional[str]:
+        """
+        Rewrite only the context slice and splice it back into the file
+
+        Returns:
+            The fixed file content, or None if the response was unusable
+        """
+        prompt = (
+            f"{task}"
+            f"{context.render(file_ext)}"
+            f"**Instructions**:\n"
+            f"1. {goal}\n"
+            f"2. {SLICE_INSTRUCTIONS}\n"
+            f"3. Do NOT add markdown code blocks\n"
+            f"4. Maintain formatting and style\n\n"
+            f"**Fixed Code**:"
+        )
+
+        # Completion only needs to cover the region, not the whole file
+        max_tokens = min(self.max_tokens, 2 * estimate_tokens(context.text) + 256)
+        response = await self._call_copilot(
+            prompt, system_prompt, temperature=0.3, max_tokens=max_tokens
+        )
+        edited = self._clean_code_response(response)
+
+        if not edited.strip() or len(edited) < len(context.text) * 0.5:
+            logger.warning("Copilot returned invalid slice fix, using whole-file fix")
+            return None
+
+        return context.splice(file_content, edited)
+
     def _clean_code_response(self, response: str) -> str:
         """
         Clean code response from markdown artifacts
@@ -381,6 +735,14 @@ class CopilotAnalyzer:
 
         return None
 
+    def get_rate_limit_metrics(self) -> Dict:
+        """Get queue depth and throttle metrics of the shared rate limiter"""
+        return self.rate_limiter.get_metrics()
+
+    def get_patch_stats(self) -> Dict:
+        """Get how often patch responses applied vs fell back to whole-file"""
+        return dict(self.patch_stats)
+
     async def close(self):
         """Close the aiohttp session"""
         if self.session and not self.session.closed:
@@ -395,6 +757,14 @@ class CopilotAnalyzer:
         await self.close()
 
 
+def _split_multi_file_response(response: str) -> List[Tuple[str, str]]:
+    """Split a delimited multi-file response into (path, content) pairs"""
+    return [
+        (match.group(1).strip().strip("`"), match.group(2))
+        for match in _MULTI_FILE_RE.finditer(response)
+    ]
+
+
 # Convenience function for quick testing
 async def test_copilot_analyzer():
     """Test Copilot analyzer with sample code"""
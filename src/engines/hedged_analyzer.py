@@ -0,0 +1,307 @@
+"""
+Hedged requests across LLM backends
+
+Tail latency of fix generation is dominated by the occasional slow response
+from one backend. HedgedAnalyzer sends each request to the primary analyzer
+and, if it hasn't answered within the observed p90 latency, sends the same
+request to a secondary backend. The first valid response wins and the other
+request is cancelled.
+
+Hedging at p90 adds roughly 10% extra requests in exchange for cutting the
+slowest 10% short.
+"""
+
+import asyncio
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, List, Optional
+
+from utils.logger import logger
+
+
+def supports_multi_file_fix(analyzer) -> bool:
+    """
+    Whether an analyzer can fix several files in one packed request
+
+    Wrapping analyzers always define generate_multi_file_fix and report
+    what their backends support through supports_multi_file_fix.
+    """
+    return getattr(
+        analyzer,
+        "supports_multi_file_fix",
+        hasattr(analyzer, "generate_multi_file_fix"),
+    )
+
+
+class HedgedAnalyzer:
+    """Drop-in analyzer that hedges slow primary requests to a secondary"""
+
+    def __init__(
+        self,
+        primary,
+        secondary,
+        percentile: float = 0.9,
+        min_samples: int = 5,
+        initial_delay: float = 10.0,
+        min_delay: float = 0.5,
+        window: int = 100,
+    ):
+        """
+        Initialize hedged analyzer
+
+        Args:
+            primary: Analyzer every request goes to first
+            secondary: Analyzer that receives hedged requests
+            percentile: Primary latency percentile after which to hedge
+            min_samples: Primary latencies needed before the percentile is used
+            initial_delay: Hedge delay (seconds) until enough samples exist
+            min_delay: Never hedge sooner than this
+            window: Number of recent primary latencies kept
+        """
+        self.primary = primary
+        self.secondary = secondary
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self._latencies: Deque[float] = deque(maxlen=window)
+
+        self.requests = 0
+        self.hedged = 0
+        self.secondary_wins = 0
+        self.estimated_seconds_saved = 0.0
+
+    @classmethod
+    def from_env(cls, primary) -> Optional["HedgedAnalyzer"]:
+        """
+        Build a hedged analyzer if FIX_HEDGE=1, hedging to the local LLM
+
+        The secondary is an LLMAnalyzer at LLM_ENDPOINT; FIX_HEDGE_INITIAL_DELAY
+        sets the delay used before enough latencies are observed.
+        """
+        if os.getenv("FIX_HEDGE", "0") != "1" or primary is None:
+            return None
+
+        from engines.llm_analyzer import LLMAnalyzer
+
+        secondary = LLMAnalyzer(os.getenv("LLM_ENDPOINT", "http://localhost:11434"))
+        logger.info(
+            f"Hedging {getattr(primary, 'model', '?')} requests to "
+            f"{secondary.model} at {secondary.api_endpoint}"
+        )
+        return cls(
+            primary,
+            secondary,
+            initial_delay=float(os.getenv("FIX_HEDGE_INITIAL_DELAY", "10")),
+        )
+
+    # Analyzer identity, used by the fix cache and logging
+
+    @property
+    def model(self) -> str:
+        """Models behind this analyzer"""
+        return (
+            f"{getattr(self.primary, 'model', '?')}"
+            f"~{getattr(self.secondary, 'model', '?')}"
+        )
+
+    @property
+    def PROMPT_TEMPLATE_VERSION(self) -> str:
+        """Prompt versions of both backends"""
+        return (
+            f"{getattr(self.primary, 'PROMPT_TEMPLATE_VERSION', '0')}~"
+            f"{getattr(self.secondary, 'PROMPT_TEMPLATE_VERSION', '0')}"
+        )
+
+    @property
+    def fix_settings(self) -> str:
+        """Fix settings of both backends"""
+        return (
+            f"{getattr(self.primary, 'fix_settings', '')}~"
+            f"{getattr(self.secondary, 'fix_settings', '')}"
+        )
+
+    @property
+    def supports_multi_file_fix(self) -> bool:
+        """Packed requests are sent to the primary"""
+        return supports_multi_file_fix(self.primary)
+
+    @property
+    def overload_events(self) -> int:
+        """Overload signals from both backends (read by adaptive concurrency)"""
+        return getattr(self.primary, "overload_events", 0) + getattr(
+            self.secondary, "overload_events", 0
+        )
+
+    def get_rate_limit_metrics(self) -> Optional[Dict]:
+        """Rate limiter metrics of the primary analyzer"""
+        get_metrics = getattr(self.primary, "get_rate_limit_metrics", None)
+        return get_metrics() if get_metrics else None
+
+    # Hedging
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary before hedging"""
+        if len(self._latencies) < self.min_samples:
+            return self.initial_delay
+        ordered = sorted(self._latencies)
+        index = min(len(ordered) - 1, int(self.percentile * len(ordered)))
+        return max(self.min_delay, ordered[index])
+
+    def _expected_slow_latency(self, delay: float) -> float:
+        """Mean primary latency of calls slower than the hedge delay"""
+        slow = [latency for latency in self._latencies if latency > delay]
+        return sum(slow) / len(slow) if slow else 0.0
+
+    async def _hedged_call(self, method: str, original, *args, file_ext: str = ""):
+        """
+        Run a request with hedging
+
+        Args:
+            method: Analyzer method name
+            original: Input the analyzers return when they fail (used to
+                tell valid responses from fallbacks and truncated ones)
+            *args: Method arguments
+            file_ext: Extension of the fixed file (for one-file requests)
+
+        Returns:
+            First valid response, or the primary's response if neither is valid
+        """
+        self.requests += 1
+        start = time.monotonic()
+        delay = self.hedge_delay()
+        primary_task = asyncio.ensure_future(getattr(self.primary, method)(*args))
+
+        done, _ = await asyncio.wait({primary_task}, timeout=delay)
+        if done:
+            self._latencies.append(time.monotonic() - start)
+            return primary_task.result()
+
+        self.hedged += 1
+        secondary_task = asyncio.ensure_future(getattr(self.secondary, method)(*args))
+        pending = {primary_task, secondary_task}
+        results = {}
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        continue
+                    results[task] = task.result()
+                    if _is_valid(task.result(), original, file_ext):
+                        return self._finish(task, primary_task, start, delay)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        # Neither answered validly: prefer the primary's (fallback) answer
+        self._latencies.append(time.monotonic() - start)
+        if primary_task in results:
+            return results[primary_task]
+        if secondary_task in results:
+            return results[secondary_task]
+        return primary_task.result()  # Re-raise the primary's error
+
+    def _finish(self, winner: asyncio.Task, primary_task: asyncio.Task, start, delay):
+        """Record the outcome of a hedged request"""
+        elapsed = time.monotonic() - start
+        # When the primary loses, elapsed is a lower bound of its latency;
+        # leaving it out would only keep fast samples and shrink the delay
+        self._latencies.append(elapsed)
+        if winner is not primary_task:
+            self.secondary_wins += 1
+            saved = max(0.0, self._expected_slow_latency(delay) - elapsed)
+            self.estimated_seconds_saved += saved
+            logger.info(
+                f"Hedged request won by {getattr(self.secondary, 'model', '?')} "
+                f"after {elapsed:.1f}s (hedged at {delay:.1f}s)"
+            )
+        return winner.result()
+
+    async def generate_fix(self, file_content: str, violation: Dict) -> str:
+        """Generate a fix for one violation, hedging slow requests"""
+        return await self._hedged_call(
+            "generate_fix",
+            file_content,
+            file_content,
+            violation,
+            file_ext=_violations_file_ext([violation]),
+        )
+
+    async def generate_batch_fix(
+        self, file_content: str, violations: List[Dict]
+    ) -> str:
+        """Generate a fix for a file's violations, hedging slow requests"""
+        return await self._hedged_call(
+            "generate_batch_fix",
+            file_content,
+            file_content,
+            violations,
+            file_ext=_violations_file_ext(violations),
+        )
+
+    async def generate_cross_file_fix(
+        self, files: Dict[str, str], violation: Dict
+    ) -> Dict[str, str]:
+        """Generate a cross-file fix, hedging slow requests"""
+        return await self._hedged_call(
+            "generate_cross_file_fix", files, files, violation
+        )
+
+    async def generate_multi_file_fix(
+        self, files: Dict[str, str], violations: Dict[str, List[Dict]]
+    ) -> Dict[str, str]:
+        """Packed requests only go to the primary (the secondary may lack them)"""
+        if not supports_multi_file_fix(self.primary):
+            return {}
+        if not supports_multi_file_fix(self.secondary):
+            return await self.primary.generate_multi_file_fix(files, violations)
+        return await self._hedged_call(
+            "generate_multi_file_fix", files, files, violations
+        )
+
+    def get_hedge_stats(self) -> Dict:
+        """Hedge rate, secondary wins and estimated latency savings"""
+        return {
+            "requests": self.requests,
+            "hedged": self.hedged,
+            "hedge_rate": round(self.hedged / self.requests, 3) if self.requests else 0,
+            "secondary_wins": self.secondary_wins,
+            "hedge_delay": round(self.hedge_delay(), 3),
+            "estimated_seconds_saved": round(self.estimated_seconds_saved, 3),
+        }
+
+
+def _is_valid(result, original, file_ext: str = "") -> bool:
+    """
+    A response is valid if it isn't the analyzers' failure fallback and
+    passes the structural check (output capped by num_predict or max_tokens
+    comes back truncated)
+    """
+    # Imported here: model_router imports this module
+    from engines.model_router import validate_fix_structure
+
+    if isinstance(result, str):
+        return result != original and validate_fix_structure(original, result, file_ext)
+    if isinstance(result, dict) and isinstance(original, dict):
+        return bool(result) and all(
+            validate_fix_structure(
+                original.get(path, ""), content, Path(path).suffix.lstrip(".").lower()
+            )
+            for path, content in result.items()
+        )
+    return bool(result)
+
+
+def _violations_file_ext(violations: List[Dict]) -> str:
+    """Extension of the file the violations belong to"""
+    for violation in violations:
+        source = violation.get("file") or violation.get("source")
+        if source:
+            return Path(source).suffix.lstrip(".").lower()
+    return ""
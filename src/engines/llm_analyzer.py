@@ -2,18 +2,40 @@ import os
 from pathlib import Path
 from typing import Optional, List, Dict
 import asyncio
+import threading
+import time
 import aiohttp
 import json
 from utils.logger import logger
+from engines.context_extractor import SLICE_INSTRUCTIONS, ContextExtractor, ContextSlice
+from engines.rate_limiter import report_overload
 
 
 class LLMAnalyzer:
     """Performs semantic analysis using LLM via Ollama"""
 
+    # Bump whenever fix prompts change so cached fixes are regenerated
+    PROMPT_TEMPLATE_VERSION = "2"
+
     def __init__(self, api_endpoint: str, api_key: Optional[str] = None):
         self.api_endpoint = api_endpoint
         self.api_key = api_key or os.getenv("LLM_API_KEY")
         self.model = os.getenv("LLM_MODEL", "mistral")
+        self.overload_events = 0  # 429s/503s and timeouts, read by adaptive concurrency
+        # How long Ollama keeps the model loaded after each request; without
+        # it the model unloads after 5 idle minutes and the next prompt pays
+        # a multi-second reload
+        self.keep_alive = _parse_keep_alive(os.getenv("LLM_KEEP_ALIVE", "30m"))
+        self.cold_load_threshold = float(os.getenv("LLM_COLD_LOAD_THRESHOLD", "1.0"))
+        self.cold_loads = 0
+        self.context_extractor = ContextExtractor(
+            min_file_lines=int(os.getenv("FIX_CONTEXT_MIN_LINES", "150"))
+        )
+
+    @property
+    def fix_settings(self) -> str:
+        """Settings that shape fix prompts (part of the fix cache key)"""
+        return f"context_min={self.context_extractor.min_file_lines}"
 
     async def analyze_spec(self, spec_path: Path, spec_content: Dict) -> List[Dict]:
         """Perform semantic analysis on OpenAPI spec"""
@@ -217,6 +239,7 @@ class LLMAnalyzer:
                     "model": self.model,
                     "prompt": prompt,
                     "stream": False,
+                    "keep_alive": self.keep_alive,
                     "temperature": 0.3,
                     "options": {
                         "num_predict": 200,  # Limit response length
@@ -231,13 +254,20 @@ class LLMAnalyzer:
                 ) as response:
                     if response.status == 200:
                         data = await response.json()
+                        self._check_cold_load(data)
                         return data.get("response", "").strip()
                     else:
+                        if response.status in (429, 503):
+                            self.overload_events += 1
+                            report_overload()
                         logger.warning(f"LLM API returned status {response.status}")
                         return ""
         except asyncio.TimeoutError:
+            self.overload_events += 1
+            report_overload()
             logger.warning(
-                f"LLM API call timed out after {timeout}s - falling back to heuristics"
+                f"LLM API call timed out after {timeout}s - falling back to heuristics "
+                f"(if {self.model} was not loaded, warm it up or raise LLM_KEEP_ALIVE)"
             )
             return ""
         except Exception as e:
@@ -246,6 +276,81 @@ class LLMAnalyzer:
             )
             return ""
 
+    def _check_cold_load(self, data: Dict) -> float:
+        """
+        Log requests that paid for loading the model
+
+        Args:
+            data: Ollama /api/generate response (durations in nanoseconds)
+
+        Returns:
+            Model load time in seconds
+        """
+        load_seconds = (data.get("load_duration") or 0) / 1e9
+        if load_seconds >= self.cold_load_threshold:
+            self.cold_loads += 1
+            logger.warning(
+                f"Cold start: loading {self.model} took {load_seconds:.1f}s "
+                f"(keep_alive={self.keep_alive})"
+            )
+        return load_seconds
+
+    async def warm_up(self, timeout: float = 120) -> bool:
+        """
+        Pre-load the model so the first real prompt doesn't pay the load
+
+        Sends Ollama a prompt-less generate request, which loads the model
+        and keeps it resident for keep_alive.
+
+        Args:
+            timeout: Seconds to wait for the model to load
+
+        Returns:
+            True if the model is loaded
+        """
+        start = time.monotonic()
+        try:
+            async with aiohttp.ClientSession() as session:
+                url = f"{self.api_endpoint}/api/generate"
+                payload = {"model": self.model, "keep_alive": self.keep_alive}
+                timeout_config = aiohttp.ClientTimeout(total=timeout)
+                async with session.post(
+                    url, json=payload, timeout=timeout_config
+                ) as response:
+                    if response.status != 200:
+                        logger.warning(
+                            f"LLM warm-up of {self.model} returned status {response.status}"
+                        )
+                        return False
+                    await response.read()
+        except asyncio.TimeoutError:
+            logger.warning(f"LLM warm-up of {self.model} timed out after {timeout}s")
+            return False
+        except Exception as e:
+            logger.debug(f"LLM warm-up skipped, {self.api_endpoint} unavailable: {e}")
+            return False
+
+        logger.info(
+            f"Warmed up {self.model} in {time.monotonic() - start:.1f}s "
+            f"(keep_alive={self.keep_alive})"
+        )
+        return True
+
+    def start_warm_up(self) -> threading.Thread:
+        """
+        Warm up the model in a daemon thread
+
+        Nothing waits for it: callers keep working (and may exit) while the
+        model loads.
+        """
+        thread = threading.Thread(
+            target=lambda: asyncio.run(self.warm_up()),
+            name="llm-warm-up",
+            daemon=True,
+        )
+        thread.start()
+        return thread
+
     async def _suggest_reified_resource(self, verb: str) -> str:
         """Suggest a reified resource name"""
         # Use LLM to suggest resource name and code snippet
@@ -372,6 +477,18 @@ class LLMAnalyzer:
         )
 
         try:
+            # Large files: rewrite only the enclosing method / spec subtree
+            context = self.context_extractor.extract(file_content, [violation])
+            if context is not None:
+                fixed = await self._generate_slice_fix(
+                    file_content,
+                    context,
+                    f"Rule: {rule_id}\nMessage: {message}\n\n",
+                    timeout=60,
+                )
+                if fixed is not None:
+                    return fixed
+
             # Increase timeout for code generation
             response = await self._call_llm(prompt, timeout=60)
 
@@ -422,6 +539,14 @@ class LLMAnalyzer:
         )
 
         try:
+            context = self.context_extractor.extract(file_content, violations)
+            if context is not None:
+                fixed = await self._generate_slice_fix(
+                    file_content, context, violations_text, timeout=90
+                )
+                if fixed is not None:
+                    return fixed
+
             response = await self._call_llm(prompt, timeout=90)
 
             # Strip markdown blocks
@@ -438,6 +563,46 @@ class LLMAnalyzer:
             logger.error(f"LLM batch fix generation failed: {e}")
             return file_content
 
+    async def _generate_slice_fix(
+        self,
+        file_content: str,
+        context: ContextSlice,
+        violations_text: str,
+        timeout: int,
+    ) -> Optional[str]:
+        """
+        Rewrite only the context slice and splice it back into the file.
+
+        Returns:
+            The fixed file content, or None to fall back to the whole file.
+        """
+        if context.language == "java":
+            file_ext, role = "java", "an expert Java and API developer"
+        else:
+            file_ext, role = "yaml", "an expert in OpenAPI specifications"
+        prompt = (
+            f"You are {role}. Fix the following violations.\n"
+            f"{violations_text}"
+            f"{context.render(file_ext)}"
+            f"Instructions:\n"
+            f"1. Fix the violations within the Code to Fix section.\n"
+            f"2. {SLICE_INSTRUCTIONS}\n"
+            f"3. Do NOT add markdown formatting, just the raw code.\n"
+        )
+
+        response = await self._call_llm(prompt, timeout=timeout)
+        if response.startswith("```"):
+            lines = response.splitlines()[1:]
+            if lines and lines[-1].startswith("```"):
+                lines = lines[:-1]
+            response = "\n".join(lines)
+
+        if not response.strip() or len(response) < len(context.text) * 0.5:
+            logger.warning("LLM returned invalid slice fix, using whole file")
+            return None
+
+        return context.splice(file_content, response)
+
     async def generate_cross_file_fix(
         self, files: Dict[str, str], violation: Dict
     ) -> Dict[str, str]:
@@ -510,3 +675,17 @@ class LLMAnalyzer:
         except Exception as e:
             logger.error(f"LLM cross-file fix generation failed: {e}")
             return {}
+
+
+def _parse_keep_alive(value: str):
+    """
+    Ollama keep_alive from an env value
+
+    Durations ("30m", "1h") are passed through; plain numbers are seconds and
+    must be sent as numbers ("-1" keeps the model loaded indefinitely).
+    """
+    value = value.strip()
+    try:
+        return int(value)
+    except ValueError:
+        return value
@@ -0,0 +1,356 @@
+"""
+Complexity-based model routing for fix generation
+
+Trivial fixes (a System.out swap) don't need the large model that complex
+layering refactors do. ModelRouter is a drop-in analyzer that looks up the
+FixComplexity of each request's rules and sends it to a fast, cheap model
+(a small Copilot model or a local Ollama model) unless the work is complex.
+Requests the fast model can't handle - no change, or output that fails a
+cheap structural check - are escalated to the strong model.
+
+Every routing decision is logged with its latency.
+"""
+
+import os
+import time
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import yaml
+
+from autofix.fix_strategies import FixComplexity, get_strategy
+from engines.hedged_analyzer import supports_multi_file_fix
+from utils.logger import logger
+
+_COMPLEXITY_ORDER = [
+    FixComplexity.SIMPLE,
+    FixComplexity.MODERATE,
+    FixComplexity.COMPLEX,
+]
+
+
+@dataclass
+class RoutingDecision:
+    """One routed analyzer call"""
+
+    method: str
+    complexity: str
+    tier: str
+    model: str
+    latency: float
+    escalated: bool = False
+    reason: str = ""
+
+
+class ModelRouter:
+    """
+    Routes fix requests between a fast and a strong analyzer
+
+    Exposes the same fix-generation interface as CopilotAnalyzer, so it can
+    be used anywhere an analyzer is expected.
+    """
+
+    def __init__(
+        self,
+        fast_analyzer,
+        strong_analyzer,
+        escalate_at: FixComplexity = FixComplexity.COMPLEX,
+        unknown_complexity: FixComplexity = FixComplexity.MODERATE,
+        validator: Optional[Callable[[str, str, str], bool]] = None,
+    ):
+        """
+        Initialize model router
+
+        Args:
+            fast_analyzer: Analyzer for simple work (cheap model / local Ollama)
+            strong_analyzer: Analyzer for complex work and escalations
+            escalate_at: Lowest complexity sent straight to the strong model
+            unknown_complexity: Complexity assumed for rules without a strategy
+            validator: Optional (original, fixed, file_ext) -> bool check; the
+                default checks brace balance for Java and parsing for YAML
+        """
+        self.fast = fast_analyzer
+        self.strong = strong_analyzer
+        self.escalate_at = escalate_at
+        self.unknown_complexity = unknown_complexity
+        self.validator = validator or validate_fix_structure
+        self.decisions: List[RoutingDecision] = []
+
+    @classmethod
+    def from_env(cls, strong_analyzer) -> Optional["ModelRouter"]:
+        """
+        Build a router from FIX_FAST_MODEL, or None if routing isn't configured
+
+        FIX_FAST_MODEL is either a Copilot model name (e.g. "gpt-4o-mini") or
+        "ollama:<model>" for a local model at LLM_ENDPOINT.
+        """
+        fast_model = os.getenv("FIX_FAST_MODEL", "").strip()
+        if not fast_model or strong_analyzer is None:
+            return None
+
+        if fast_model.startswith("ollama:"):
+            from engines.llm_analyzer import LLMAnalyzer
+
+            fast = LLMAnalyzer(os.getenv("LLM_ENDPOINT", "http://localhost:11434"))
+            fast.model = fast_model.split(":", 1)[1] or fast.model
+        else:
+            from engines.copilot_analyzer import CopilotAnalyzer
+
+            fast = CopilotAnalyzer(model=fast_model)
+
+        escalate_at = os.getenv("FIX_ESCALATE_AT", FixComplexity.COMPLEX.value)
+        logger.info(
+            f"Model routing: fast={fast.model}, strong="
+            f"{getattr(strong_analyzer, 'model', '?')}, escalate at {escalate_at}"
+        )
+        return cls(fast, strong_analyzer, escalate_at=FixComplexity(escalate_at))
+
+    # Analyzer identity, used by the fix cache and logging
+
+    @property
+    def model(self) -> str:
+        """Models behind this router"""
+        return (
+            f"{getattr(self.fast, 'model', '?')}|{getattr(self.strong, 'model', '?')}"
+        )
+
+    @property
+    def PROMPT_TEMPLATE_VERSION(self) -> str:
+        """Prompt versions of both tiers"""
+        return (
+            f"{getattr(self.fast, 'PROMPT_TEMPLATE_VERSION', '0')}|"
+            f"{getattr(self.strong, 'PROMPT_TEMPLATE_VERSION', '0')}"
+        )
+
+    @property
+    def fix_settings(self) -> str:
+        """Fix settings of both tiers"""
+        return (
+            f"{getattr(self.fast, 'fix_settings', '')}|"
+            f"{getattr(self.strong, 'fix_settings', '')}"
+        )
+
+    @property
+    def supports_multi_file_fix(self) -> bool:
+        """Whether either tier can take packed requests"""
+        return supports_multi_file_fix(self.fast) or supports_multi_file_fix(
+            self.strong
+        )
+
+    @property
+    def overload_events(self) -> int:
+        """Overload signals from both tiers (read by adaptive concurrency)"""
+        return getattr(self.fast, "overload_events", 0) + getattr(
+            self.strong, "overload_events", 0
+        )
+
+    def get_rate_limit_metrics(self) -> Optional[Dict]:
+        """Rate limiter metrics of the strong (remote) analyzer"""
+        get_metrics = getattr(self.strong, "get_rate_limit_metrics", None)
+        return get_metrics() if get_metrics else None
+
+    # Routing
+
+    def classify(self, violations: List[Dict]) -> FixComplexity:
+        """Highest complexity among the violations' fix strategies"""
+        level = 0
+        for violation in violations:
+            rule_id = violation.get("rule") or violation.get("rule_id", "")
+            strategy = get_strategy(rule_id)
+            complexity = strategy.complexity if strategy else self.unknown_complexity
+            level = max(level, _COMPLEXITY_ORDER.index(complexity))
+        return _COMPLEXITY_ORDER[level]
+
+    def _first_tier(self, complexity: FixComplexity) -> str:
+        """Tier a request of this complexity starts at"""
+        if _COMPLEXITY_ORDER.index(complexity) >= _COMPLEXITY_ORDER.index(
+            self.escalate_at
+        ):
+            return "strong"
+        return "fast"
+
+    def _analyzer(self, tier: str):
+        """Analyzer for a tier"""
+        return self.fast if tier == "fast" else self.strong
+
+    async def _timed_call(
+        self, tier: str, method: str, complexity: FixComplexity, *args, reason: str = ""
+    ):
+        """
+        Call an analyzer method, then record and log the routing decision
+
+        Args:
+            reason: Why the call was escalated ('' if it wasn't)
+        """
+        analyzer = self._analyzer(tier)
+        start = time.monotonic()
+        try:
+            return await getattr(analyzer, method)(*args)
+        finally:
+            decision = RoutingDecision(
+                method=method,
+                complexity=complexity.value,
+                tier=tier,
+                model=str(getattr(analyzer, "model", "?")),
+                latency=round(time.monotonic() - start, 3),
+                escalated=bool(reason),
+                reason=reason,
+            )
+            self.decisions.append(decision)
+            suffix = f" (escalated: {reason})" if reason else ""
+            logger.info(
+                f"Routed {method} [{complexity.value}] to {tier} model "
+                f"{decision.model} in {decision.latency:.2f}s{suffix}"
+            )
+
+    async def _attempt(
+        self,
+        tier: str,
+        method: str,
+        complexity: FixComplexity,
+        file_content: str,
+        file_ext: str,
+        *args,
+        reason: str = "",
+    ):
+        """
+        Run one tier and judge the result
+
+        Returns:
+            (fixed_content, failure reason or '')
+        """
+        try:
+            fixed = await self._timed_call(
+                tier, method, complexity, *args, reason=reason
+            )
+        except Exception as e:
+            return file_content, f"error: {e}"
+        return fixed, self._validation_failure(file_content, fixed, file_ext)
+
+    async def _route_single_file(
+        self, method: str, file_content: str, violations: List[Dict], *args
+    ) -> str:
+        """Route a one-file fix, escalating if the fast tier fails"""
+        complexity = self.classify(violations)
+        tier = self._first_tier(complexity)
+        file_ext = _file_ext(violations)
+
+        fixed, failure = await self._attempt(
+            tier, method, complexity, file_content, file_ext, *args
+        )
+        if tier == "strong" or not failure:
+            return fixed
+
+        fixed, _ = await self._attempt(
+            "strong", method, complexity, file_content, file_ext, *args, reason=failure
+        )
+        return fixed
+
+    async def generate_fix(self, file_content: str, violation: Dict) -> str:
+        """Generate a fix for one violation on the tier its complexity needs"""
+        return await self._route_single_file(
+            "generate_fix", file_content, [violation], file_content, violation
+        )
+
+    async def generate_batch_fix(
+        self, file_content: str, violations: List[Dict]
+    ) -> str:
+        """Generate a fix for all violations in a file on the tier they need"""
+        return await self._route_single_file(
+            "generate_batch_fix", file_content, violations, file_content, violations
+        )
+
+    async def generate_cross_file_fix(
+        self, files: Dict[str, str], violation: Dict
+    ) -> Dict[str, str]:
+        """Cross-file fixes are structural: always the strong model"""
+        return await self._timed_call(
+            "strong", "generate_cross_file_fix", FixComplexity.COMPLEX, files, violation
+        )
+
+    async def generate_multi_file_fix(
+        self, files: Dict[str, str], violations: Dict[str, List[Dict]]
+    ) -> Dict[str, str]:
+        """
+        Route a packed multi-file request
+
+        Files whose fast-tier result fails validation are left out of the
+        result; the proposer retries them alone, which escalates them.
+        """
+        all_violations = [v for v_list in violations.values() for v in v_list]
+        complexity = self.classify(all_violations)
+        tier = self._first_tier(complexity)
+        if not supports_multi_file_fix(self._analyzer(tier)):
+            tier = "strong" if tier == "fast" else "fast"
+            if not supports_multi_file_fix(self._analyzer(tier)):
+                return {}
+
+        fixed_files = await self._timed_call(
+            tier, "generate_multi_file_fix", complexity, files, violations
+        )
+
+        if tier == "strong":
+            return fixed_files
+
+        accepted = {}
+        for path, fixed in fixed_files.items():
+            original = files.get(path, "")
+            if fixed == original or self.validator(
+                original, fixed, _file_ext(violations.get(path, []))
+            ):
+                accepted[path] = fixed
+        return accepted
+
+    def _validation_failure(self, original: str, fixed: str, file_ext: str) -> str:
+        """Why a fast-tier result needs escalation ('' if it's fine)"""
+        if not fixed or fixed == original:
+            return "no change"
+        if not self.validator(original, fixed, file_ext):
+            return "failed validation"
+        return ""
+
+    def get_routing_stats(self) -> Dict:
+        """Calls, escalations and latency per tier"""
+        stats: Dict[str, Dict] = {}
+        for decision in self.decisions:
+            tier = stats.setdefault(
+                decision.tier, {"calls": 0, "escalations": 0, "total_latency": 0.0}
+            )
+            tier["calls"] += 1
+            tier["escalations"] += int(decision.escalated)
+            tier["total_latency"] = round(tier["total_latency"] + decision.latency, 3)
+        return stats
+
+    def get_decisions(self) -> List[Dict]:
+        """All routing decisions as dictionaries"""
+        return [asdict(d) for d in self.decisions]
+
+
+def validate_fix_structure(original: str, fixed: str, file_ext: str) -> bool:
+    """
+    Cheap structural check of a model's fix
+
+    Java keeps the original brace balance; YAML/JSON specs still parse.
+    """
+    if not fixed.strip():
+        return False
+    if file_ext == "java":
+        return fixed.count("{") - fixed.count("}") == original.count(
+            "{"
+        ) - original.count("}")
+    if file_ext in ("yaml", "yml", "json"):
+        try:
+            return isinstance(yaml.safe_load(fixed), dict)
+        except yaml.YAMLError:
+            return False
+    return True
+
+
+def _file_ext(violations: List[Dict]) -> str:
+    """File extension of the violations' file"""
+    for violation in violations:
+        source = violation.get("file") or violation.get("source")
+        if source:
+            return Path(source).suffix.lstrip(".").lower()
+    return ""
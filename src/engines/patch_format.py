@@ -0,0 +1,232 @@
+"""
+Patch-format LLM responses
+
+Instead of asking the model to echo back an entire (possibly 2,000-line)
+file, fix prompts can ask for a compact list of edits. This module parses
+the two formats we accept and applies them locally:
+
+1. Search/replace blocks:
+
+    <<<<<<< SEARCH
+    exact original lines
+    =======
+    replacement lines
+    >>>>>>> REPLACE
+
+2. Unified diff hunks (``@@ -a,b +c,d @@``), with or without file headers.
+
+Any block that doesn't apply cleanly raises PatchApplyError so the caller
+can fall back to whole-file regeneration.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+NO_CHANGES_MARKER = "NO_CHANGES"
+
+PATCH_FORMAT_INSTRUCTIONS = (
+    "Return ONLY search/replace blocks, one per change, in exactly this format:\n"
+    "<<<<<<< SEARCH\n"
+    "<lines copied verbatim from the original, enough to be unique>\n"
+    "=======\n"
+    "<replacement lines>\n"
+    ">>>>>>> REPLACE\n"
+    "Rules:\n"
+    "- SEARCH text must match the original exactly, including indentation\n"
+    "- Keep each block as small as possible; do NOT repeat unchanged code\n"
+    "- To add lines, include a nearby existing line in SEARCH and REPLACE\n"
+    "- Do NOT return the complete file and do NOT add explanations\n"
+    f"- If nothing needs to change, return {NO_CHANGES_MARKER}\n"
+)
+
+_SEARCH_REPLACE_RE = re.compile(
+    r"^<{5,9} ?SEARCH[^\n]*\n(.*?)^={5,9}[^\n]*\n(.*?)^>{5,9} ?REPLACE[^\n]*$",
+    re.MULTILINE | re.DOTALL,
+)
+_HUNK_HEADER_RE = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+
+
+class PatchApplyError(Exception):
+    """Raised when a patch response can't be applied cleanly"""
+
+
+@dataclass
+class DiffHunk:
+    """One hunk of a unified diff"""
+
+    old_start: int
+    old_lines: List[str] = field(default_factory=list)
+    new_lines: List[str] = field(default_factory=list)
+
+
+def is_no_changes(response: str) -> bool:
+    """Check whether the model reported that nothing needs to change"""
+    return response.strip().strip("`").strip() == NO_CHANGES_MARKER
+
+
+def parse_search_replace_blocks(response: str) -> List[Tuple[str, str]]:
+    """
+    Parse search/replace blocks from a model response
+
+    Returns:
+        List of (search, replace) text pairs
+    """
+    blocks = []
+    for match in _SEARCH_REPLACE_RE.finditer(response):
+        blocks.append((match.group(1), match.group(2)))
+    return blocks
+
+
+def parse_unified_diff(response: str) -> List[DiffHunk]:
+    """
+    Parse unified diff hunks from a model response
+
+    File headers (---/+++/diff --git) and markdown fences are ignored.
+    """
+    hunks: List[DiffHunk] = []
+    current: Optional[DiffHunk] = None
+
+    for line in response.splitlines():
+        header = _HUNK_HEADER_RE.match(line)
+        if header:
+            current = DiffHunk(old_start=int(header.group(1)))
+            hunks.append(current)
+            continue
+        if current is None or line.startswith(("---", "+++", "```")):
+            continue
+        if line.startswith("\\"):
+            continue  # "\ No newline at end of file"
+        if line.startswith("+"):
+            current.new_lines.append(line[1:])
+        elif line.startswith("-"):
+            current.old_lines.append(line[1:])
+        elif line.startswith(" ") or line == "":
+            text = line[1:] if line else ""
+            current.old_lines.append(text)
+            current.new_lines.append(text)
+        else:
+            # Anything else ends the hunk (trailing prose, etc.)
+            current = None
+
+    return hunks
+
+
+def apply_search_replace(content: str, blocks: List[Tuple[str, str]]) -> str:
+    """
+    Apply search/replace blocks in order
+
+    Raises:
+        PatchApplyError: If a SEARCH text is missing, empty or ambiguous
+    """
+    for index, (search, replace) in enumerate(blocks, 1):
+        if not search.strip():
+            raise PatchApplyError(f"Block {index}: empty SEARCH section")
+
+        count = content.count(search)
+        if count == 1:
+            content = content.replace(search, replace, 1)
+            continue
+        if count > 1:
+            raise PatchApplyError(f"Block {index}: SEARCH text is ambiguous")
+
+        # Models often drop trailing whitespace; retry line-wise ignoring it
+        content = _replace_lines_loosely(content, search, replace, index)
+
+    return content
+
+
+def _replace_lines_loosely(content: str, search: str, replace: str, index: int) -> str:
+    """Match SEARCH line-by-line ignoring trailing whitespace"""
+    lines = content.splitlines(keepends=True)
+    wanted = [line.rstrip() for line in search.splitlines()]
+    stripped = [line.rstrip() for line in lines]
+
+    matches = [
+        start
+        for start in range(len(lines) - len(wanted) + 1)
+        if stripped[start : start + len(wanted)] == wanted
+    ]
+    if not matches:
+        raise PatchApplyError(f"Block {index}: SEARCH text not found")
+    if len(matches) > 1:
+        raise PatchApplyError(f"Block {index}: SEARCH text is ambiguous")
+
+    start = matches[0]
+    end = start + len(wanted)
+    replacement = replace
+    if replacement and not replacement.endswith("\n") and end < len(lines):
+        replacement += "\n"
+    return "".join(lines[:start]) + replacement + "".join(lines[end:])
+
+
+def apply_unified_diff(content: str, hunks: List[DiffHunk]) -> str:
+    """
+    Apply unified diff hunks, tolerating line-number drift
+
+    Each hunk's old lines are located exactly (ignoring trailing whitespace);
+    when they occur more than once the occurrence nearest the hunk header
+    wins.
+
+    Raises:
+        PatchApplyError: If a hunk's context can't be found
+    """
+    lines = content.splitlines()
+    trailing_newline = content.endswith("\n")
+    offset = 0
+    cursor = 0
+
+    for index, hunk in enumerate(hunks, 1):
+        old = [line.rstrip() for line in hunk.old_lines]
+        expected = max(0, hunk.old_start - 1 + offset)
+
+        if not old:
+            # Pure insertion: trust the header position
+            position = min(expected, len(lines))
+        else:
+            stripped = [line.rstrip() for line in lines]
+            candidates = [
+                start
+                for start in range(cursor, len(lines) - len(old) + 1)
+                if stripped[start : start + len(old)] == old
+            ]
+            if not candidates:
+                raise PatchApplyError(f"Hunk {index}: context not found")
+            position = min(candidates, key=lambda start: abs(start - expected))
+
+        lines[position : position + len(old)] = hunk.new_lines
+        offset += len(hunk.new_lines) - len(old)
+        cursor = position + len(hunk.new_lines)
+
+    result = "\n".join(lines)
+    if trailing_newline:
+        result += "\n"
+    return result
+
+
+def apply_patch_response(content: str, response: str) -> str:
+    """
+    Apply a patch-format model response to the original content
+
+    Args:
+        content: Original text the model was shown
+        response: Model response (search/replace blocks or unified diff)
+
+    Returns:
+        Patched content (unchanged if the model returned NO_CHANGES)
+
+    Raises:
+        PatchApplyError: If the response has no usable edits or they don't apply
+    """
+    if is_no_changes(response):
+        return content
+
+    blocks = parse_search_replace_blocks(response)
+    if blocks:
+        return apply_search_replace(content, blocks)
+
+    hunks = parse_unified_diff(response)
+    if hunks:
+        return apply_unified_diff(content, hunks)
+
+    raise PatchApplyError("Response contains no search/replace blocks or diff hunks")
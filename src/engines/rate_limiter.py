@@ -0,0 +1,354 @@
+"""
+Shared async rate limiter for remote LLM APIs
+
+Implements a token bucket over both requests-per-minute and tokens-per-minute.
+All analyzer instances talking to the same endpoint share one limiter, so
+concurrent fix tasks queue up fairly instead of each retrying on its own and
+thundering-herding the API after a 429.
+
+The bucket is kept in sync with the server's view of the world by feeding it
+the response headers (Retry-After and the x-ratelimit-* family).
+"""
+
+import asyncio
+import re
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterator, Mapping, Optional
+
+from utils.logger import logger
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a request keeps getting 429s after all rate-limit retries"""
+
+
+@dataclass
+class RateLimiterMetrics:
+    """Counters exposed by a rate limiter"""
+
+    requests_granted: int = 0
+    requests_throttled: int = 0  # Callers that had to wait for capacity
+    rate_limited_responses: int = 0  # 429s reported by the API
+    total_throttle_seconds: float = 0.0
+    queue_depth: int = 0  # Callers currently waiting
+    max_queue_depth: int = 0
+
+
+class TokenBucketRateLimiter:
+    """
+    Async token bucket limiting requests and tokens per minute.
+
+    Waiting callers are served strictly in arrival order (FIFO), so a burst
+    of fix tasks drains at the permitted rate instead of racing each other.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 60,
+        tokens_per_minute: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize rate limiter
+
+        Args:
+            requests_per_minute: Request budget per minute
+            tokens_per_minute: Token budget per minute (None = unlimited)
+            clock: Monotonic clock, injectable for tests
+        """
+        self.requests_per_minute = max(1, int(requests_per_minute))
+        self.tokens_per_minute = int(tokens_per_minute) if tokens_per_minute else None
+        self._clock = clock
+
+        self._request_level = float(self.requests_per_minute)
+        self._token_level = float(self.tokens_per_minute or 0)
+        self._last_refill = clock()
+        self._blocked_until = 0.0
+
+        self._lock: Optional[asyncio.Lock] = None
+        self._lock_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.metrics = RateLimiterMetrics()
+
+    def _get_lock(self) -> asyncio.Lock:
+        """Get the FIFO lock for the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _refill(self):
+        """Top up both buckets for the time elapsed since the last refill"""
+        now = self._clock()
+        elapsed = max(0.0, now - self._last_refill)
+        self._last_refill = now
+
+        self._request_level = min(
+            float(self.requests_per_minute),
+            self._request_level + elapsed * self.requests_per_minute / 60.0,
+        )
+        if self.tokens_per_minute:
+            self._token_level = min(
+                float(self.tokens_per_minute),
+                self._token_level + elapsed * self.tokens_per_minute / 60.0,
+            )
+
+    def _seconds_until_available(self, tokens: int) -> float:
+        """Seconds until a request costing `tokens` fits in both buckets"""
+        now = self._clock()
+        wait = max(0.0, self._blocked_until - now)
+
+        if self._request_level < 1:
+            deficit = 1 - self._request_level
+            wait = max(wait, deficit * 60.0 / self.requests_per_minute)
+
+        if self.tokens_per_minute:
+            # A single oversized request may use the whole bucket, never more
+            needed = min(tokens, self.tokens_per_minute)
+            if self._token_level < needed:
+                deficit = needed - self._token_level
+                wait = max(wait, deficit * 60.0 / self.tokens_per_minute)
+
+        return wait
+
+    async def acquire(self, tokens: int = 1) -> float:
+        """
+        Wait until the request fits the budget, then consume it
+
+        Args:
+            tokens: Estimated tokens the request will use (prompt + completion)
+
+        Returns:
+            Seconds spent waiting
+        """
+        self.metrics.queue_depth += 1
+        self.metrics.max_queue_depth = max(
+            self.metrics.max_queue_depth, self.metrics.queue_depth
+        )
+        start = self._clock()
+
+        try:
+            async with self._get_lock():
+                while True:
+                    self._refill()
+                    wait = self._seconds_until_available(tokens)
+                    if wait <= 0:
+                        break
+                    await asyncio.sleep(wait)
+
+                self._request_level -= 1
+                if self.tokens_per_minute:
+                    self._token_level -= min(tokens, self.tokens_per_minute)
+        finally:
+            self.metrics.queue_depth -= 1
+
+        waited = self._clock() - start
+        self.metrics.requests_granted += 1
+        if waited > 0.001:
+            self.metrics.requests_throttled += 1
+            self.metrics.total_throttle_seconds += waited
+        return waited
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """
+        Synchronize the buckets with rate-limit headers from a response
+
+        Understands the OpenAI-style x-ratelimit-{limit,remaining,reset}-{requests,tokens}
+        headers, the GitHub-style x-ratelimit-{remaining,reset} pair and Retry-After.
+        """
+        if not headers:
+            return
+
+        lowered = {k.lower(): v for k, v in headers.items()}
+        now = self._clock()
+
+        retry_after = _parse_retry_after(lowered.get("retry-after"))
+        if retry_after is not None:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+
+        for kind in ("requests", "tokens"):
+            limit = _parse_int(lowered.get(f"x-ratelimit-limit-{kind}"))
+            remaining = _parse_int(lowered.get(f"x-ratelimit-remaining-{kind}"))
+            reset = _parse_duration(lowered.get(f"x-ratelimit-reset-{kind}"))
+
+            if kind == "requests":
+                if limit:
+                    self.requests_per_minute = limit
+                if remaining is not None:
+                    self._request_level = min(self._request_level, float(remaining))
+            else:
+                if limit:
+                    if not self.tokens_per_minute:
+                        self._token_level = float(limit)
+                    self.tokens_per_minute = limit
+                if remaining is not None and self.tokens_per_minute:
+                    self._token_level = min(self._token_level, float(remaining))
+
+            if remaining == 0 and reset is not None:
+                self._blocked_until = max(self._blocked_until, now + reset)
+
+        # GitHub REST style: remaining count plus reset as epoch seconds
+        remaining = _parse_int(lowered.get("x-ratelimit-remaining"))
+        reset_epoch = _parse_int(lowered.get("x-ratelimit-reset"))
+        if remaining == 0 and reset_epoch:
+            delay = max(0.0, reset_epoch - time.time())
+            self._blocked_until = max(self._blocked_until, now + delay)
+
+    def report_rate_limited(
+        self, headers: Optional[Mapping[str, str]] = None, fallback: float = 1.0
+    ) -> float:
+        """
+        Record a 429 response and pause every caller until the window reopens
+
+        Args:
+            headers: Response headers of the 429
+            fallback: Pause in seconds when the server gave no hint
+
+        Returns:
+            Seconds until requests are admitted again
+        """
+        self.metrics.rate_limited_responses += 1
+        now = self._clock()
+        previous_block = self._blocked_until
+
+        self.update_from_headers(headers or {})
+        if self._blocked_until <= max(previous_block, now):
+            self._blocked_until = max(self._blocked_until, now + fallback)
+
+        # The rejected request consumed nothing server-side; drain our estimate
+        # so queued callers don't immediately fire into the same wall.
+        self._request_level = min(self._request_level, 0.0)
+
+        return max(0.0, self._blocked_until - now)
+
+    def get_metrics(self) -> Dict:
+        """Get a snapshot of limiter metrics"""
+        snapshot = asdict(self.metrics)
+        snapshot["total_throttle_seconds"] = round(
+            snapshot["total_throttle_seconds"], 3
+        )
+        return snapshot
+
+
+# Limiters shared by every analyzer talking to the same endpoint
+_shared_limiters: Dict[str, TokenBucketRateLimiter] = {}
+
+
+def get_shared_rate_limiter(
+    key: str,
+    requests_per_minute: int = 60,
+    tokens_per_minute: Optional[int] = None,
+) -> TokenBucketRateLimiter:
+    """
+    Get (or create) the process-wide limiter for an endpoint
+
+    Args:
+        key: Endpoint identifier (usually the API URL)
+        requests_per_minute: Budget used when the limiter is first created
+        tokens_per_minute: Token budget used when the limiter is first created
+
+    Returns:
+        Shared TokenBucketRateLimiter
+    """
+    limiter = _shared_limiters.get(key)
+    if limiter is None:
+        limiter = TokenBucketRateLimiter(requests_per_minute, tokens_per_minute)
+        _shared_limiters[key] = limiter
+        logger.debug(
+            f"Created rate limiter for {key}: {requests_per_minute} rpm, "
+            f"{tokens_per_minute or 'unlimited'} tpm"
+        )
+    return limiter
+
+
+@dataclass
+class OverloadCounter:
+    """Overload signals (429s/503s, timeouts) seen by one tracked call"""
+
+    count: int = 0
+
+
+# Counter of the call being tracked; tasks started by the call share it
+_current_overloads: ContextVar[Optional[OverloadCounter]] = ContextVar(
+    "current_overloads", default=None
+)
+
+
+@contextmanager
+def track_overloads() -> Iterator[OverloadCounter]:
+    """
+    Count the overload signals of the calls made inside the block
+
+    Unlike an analyzer's overload_events total, the count only includes
+    signals reported by this caller's requests, not by concurrent ones.
+
+    Usage:
+        with track_overloads() as overloads:
+            result = await analyzer.generate_batch_fix(...)
+        saw_overload = overloads.count > 0
+    """
+    counter = OverloadCounter()
+    token = _current_overloads.set(counter)
+    try:
+        yield counter
+    finally:
+        _current_overloads.reset(token)
+
+
+def report_overload():
+    """Record an overload signal against the tracked call (if any)"""
+    counter = _current_overloads.get()
+    if counter is not None:
+        counter.count += 1
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    """Parse an integer header value"""
+    if value is None:
+        return None
+    try:
+        return int(float(str(value).strip()))
+    except ValueError:
+        return None
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse Retry-After as delta-seconds or an HTTP date"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_duration(value: Optional[str]) -> Optional[float]:
+    """Parse reset durations like '1s', '6m0s', '250ms' or plain seconds"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|h|m|s)", value)
+    if not parts:
+        return None
+    scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    return sum(float(number) * scale[unit] for number, unit in parts)
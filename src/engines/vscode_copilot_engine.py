@@ -19,6 +19,9 @@ import json
 from autofix.fix_strategies import FixStrategy, ALL_STRATEGIES
 from utils.logger import logger
 from engines.controller_change_generator import ControllerChangeGenerator  # ⭐ NEW
+from engines.context_extractor import ContextExtractor
+from utils.route_index import RouteIndex
+from utils.test_index import JavaTestIndex
 
 
 @dataclass
@@ -307,6 +310,12 @@ class VSCodeCopilotEngine:
     def __init__(self, project_path: str):
         self.project_path = Path(project_path)
         self.controller_generator = ControllerChangeGenerator(project_path)  # ⭐ NEW
+        # Any file size, any slice size: we only want the enclosing member range
+        self.context_extractor = ContextExtractor(min_file_lines=0, max_fraction=1.0)
+        # Spring routes -> controllers, parsed once per run
+        self.route_index = RouteIndex.for_project(project_path)
+        # Test sources by class name, walked once per run
+        self.test_index = JavaTestIndex.for_project(project_path)
 
     def _find_test_files_for_java_class(self, java_class_path: str) -> List[str]:
         """
@@ -326,48 +335,17 @@ class VSCodeCopilotEngine:
         Returns:
             List of test file paths (relative to project root)
         """
-        test_files = []
-        java_path_obj = Path(java_class_path)
-
         # Extract class name (e.g., "UserService")
-        class_name = java_path_obj.stem
+        class_name = Path(java_class_path).stem
 
         # For controllers, also try without "Controller" suffix
         base_name = class_name.replace("Controller", "")
 
-        # Common test file patterns - covers all standard naming conventions
-        test_patterns = [
-            # Exact class name tests
-            f"**/{class_name}Test.java",
-            f"**/{class_name}Tests.java",
-            f"**/{class_name}TestCase.java",
-            # Integration tests
-            f"**/{class_name}IntegrationTest.java",
-            f"**/{class_name}IT.java",
-            f"**/{class_name}IntegrationTests.java",
-            # For controllers, also try base name patterns
-            f"**/{base_name}ControllerTest.java",
-            f"**/{base_name}ControllerTests.java",
-            f"**/{base_name}ControllerIT.java",
-            # Test directories with wildcard (catches custom naming)
-            f"**/test/**/{class_name}*.java",
-            f"**/tests/**/{class_name}*.java",
-            f"**/src/test/**/{class_name}*.java",
-        ]
-
-        project_path = Path(self.project_path)
-        for pattern in test_patterns:
-            for test_file in project_path.rglob(pattern):
-                # Verify it's actually in a test directory
-                test_file_str = str(test_file)
-                if (
-                    "/test/" in test_file_str or "/tests/" in test_file_str
-                ) and "Test" in test_file.stem:
-                    rel_path = str(test_file.relative_to(project_path))
-                    if rel_path not in test_files:
-                        test_files.append(rel_path)
-
-        return test_files
+        # Naming-convention variants, plus any test class in a test directory
+        # whose name starts with the class name (catches custom naming)
+        return self.test_index.tests_for_class(
+            class_name, base_name=base_name, prefix_matches=True
+        )
 
     def _find_test_files_for_controller(self, controller_path: str) -> List[str]:
         """
@@ -438,49 +416,25 @@ class VSCodeCopilotEngine:
                     logger.info(f"   📍 Found API endpoints for resources: {resources}")
 
                     # Find controllers that handle these resources
-                    for controller_file in self.project_path.rglob("*Controller.java"):
-                        try:
-                            with open(controller_file, "r", encoding="utf-8") as f:
-                                content = f.read()
-
-                            # Check if controller handles any of our resources
-                            for resource in resources:
-                                # Match @RequestMapping annotations with this path
-                                if (
-                                    f'@RequestMapping("/{resource}"' in content
-                                    or f'@RequestMapping(value = "/{resource}"'
-                                    in content
-                                    or f'@RequestMapping(path = "/{resource}"'
-                                    in content
-                                ):
-                                    rel_path = str(
-                                        controller_file.relative_to(self.project_path)
+                    for resource in sorted(resources):
+                        for rel_path in self.route_index.controllers_for_resource(
+                            resource
+                        ):
+                            if rel_path in related_files or rel_path == file_path_rel:
+                                continue
+                            related_files.append(rel_path)
+                            logger.info(
+                                f"   🔗 Matched controller: {Path(rel_path).name} handles /{resource}"
+                            )
+
+                            # Now find test files for this controller
+                            test_files = self._find_test_files_for_java_class(rel_path)
+                            for test_file in test_files:
+                                if test_file not in related_files:
+                                    related_files.append(test_file)
+                                    logger.info(
+                                        f"   🧪 Matched test: {Path(test_file).name}"
                                     )
-                                    if (
-                                        rel_path not in related_files
-                                        and rel_path != file_path_rel
-                                        and "/test/" not in rel_path
-                                    ):
-                                        related_files.append(rel_path)
-                                        logger.info(
-                                            f"   🔗 Matched controller: {controller_file.name} handles /{resource}"
-                                        )
-
-                                        # Now find test files for this controller
-                                        test_files = (
-                                            self._find_test_files_for_java_class(
-                                                rel_path
-                                            )
-                                        )
-                                        for test_file in test_files:
-                                            if test_file not in related_files:
-                                                related_files.append(test_file)
-                                                logger.info(
-                                                    f"   🧪 Matched test: {Path(test_file).name}"
-                                                )
-                                        break
-                        except Exception:
-                            continue
             except Exception as e:
                 logger.debug(f"   ⚠️ Could not parse OpenAPI spec: {e}")
 
@@ -491,22 +445,12 @@ class VSCodeCopilotEngine:
             and "/test/" not in file_path
         ):
             try:
-                with open(file_path_obj, "r", encoding="utf-8") as f:
-                    content = f.read()
-
-                # Extract @RequestMapping paths
-                import re
-
+                # Class-level @RequestMapping paths from the route index
                 paths = []
-                patterns = [
-                    r'@RequestMapping\s*\(\s*"([^"]+)"\s*\)',
-                    r'@RequestMapping\s*\(\s*value\s*=\s*"([^"]+)"\s*\)',
-                    r'@RequestMapping\s*\(\s*path\s*=\s*"([^"]+)"\s*\)',
-                ]
-
-                for pattern in patterns:
-                    matches = re.findall(pattern, content)
-                    paths.extend([m.strip("/").lower() for m in matches])
+                for route in self.route_index.routes_for_file(file_path_rel):
+                    path = route.class_prefix.strip("/").lower()
+                    if path and path not in paths:
+                        paths.append(path)
 
                 if paths:
                     logger.info(f"   📍 Found controller paths: {paths}")
@@ -723,11 +667,27 @@ class VSCodeCopilotEngine:
     ) -> Tuple[int, int]:
         """
         Get line range for context around the violation.
-        Returns (start_line, end_line) for Copilot to focus on.
+        Returns (start_line, end_line) for Copilot to focus on: the enclosing
+        method for Java files, otherwise 10 lines either side.
         """
         if line_num is None:
             return (1, 999999)  # Whole file
 
+        # Java: focus on the enclosing method rather than a fixed window
+        full_path = Path(file_path)
+        if not full_path.is_absolute():
+            full_path = self.project_path / file_path
+        if full_path.suffix == ".java" and full_path.exists():
+            try:
+                content = full_path.read_text(encoding="utf-8")
+                context = self.context_extractor.extract(
+                    content, [{"line": line_num}], "java"
+                )
+                if context:
+                    return (context.first_line, context.last_line)
+            except (OSError, UnicodeDecodeError):
+                pass
+
         # Provide 10 lines of context before and after
         start = max(1, line_num - 10)
         end = line_num + 10
@@ -41,7 +41,7 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 try:
-    from mcp.server.fastmcp import FastMCP
+    from mcp.server.fastmcp import Context, FastMCP
 except ImportError as e:
     print(
         f"Error: fastmcp import failed: {e}. Run: pip install fastmcp", file=sys.stderr
@@ -51,10 +51,10 @@ except ImportError as e:
 from autofix.category_manager import CategoryManager
 from autofix.engine import AutoFixEngine
 from autofix.proposer import ProposedFix
-from autofix.review_gate import ReviewState
 from autofix.subcategory_manager import SubcategoryManager
 from engines.arch_unit_engine import ArchUnitEngine
 from mcp_server.output_normalizer import OutputNormalizer
+from mcp_server.session_store import FixSessionStore
 from mcp_server.tool_schemas import (
     CreateGovernancePROutput,
     GovernanceSummaryInput,
@@ -271,6 +271,22 @@ logger.info("=" * 80)
 # ========================================
 
 
+def start_llm_warm_up():
+    """
+    Load the local LLM in the background so the first fix request is warm
+
+    Runs in a daemon thread so the server starts answering immediately.
+    Disabled with LLM_WARM_UP=0.
+    """
+    if os.getenv("LLM_WARM_UP", "1") != "1":
+        return None
+
+    from engines.llm_analyzer import LLMAnalyzer
+
+    analyzer = LLMAnalyzer(os.getenv("LLM_ENDPOINT", "http://localhost:11434"))
+    return analyzer.start_warm_up()
+
+
 @mcp.tool()
 async def validate_openapi(spec_path: str, ruleset: str = None) -> Dict:
     """
@@ -698,8 +714,30 @@ async def governance_summary(project_path: str, spec_path: str = None) -> Dict:
 # AUTO-FIX TOOLS
 # ============================================================================
 
-# Global storage for fix sessions (in production, use Redis or database)
-_fix_sessions: Dict[str, tuple[AutoFixEngine, List[ProposedFix], ReviewState]] = {}
+# Fix sessions, persisted across restarts and bounded in memory
+_fix_sessions = FixSessionStore()
+
+
+async def _report_fix_progress(
+    ctx: Context, fix: ProposedFix, diff, done: int, total: int
+):
+    """
+    Send an MCP progress notification for a streamed fix
+
+    The diff isn't read: it's computed for all fixes at once when the
+    stream ends.
+    """
+    if ctx is None:
+        return
+    try:
+        await ctx.report_progress(done, max(total, done))
+        await ctx.info(
+            f"Proposed fix {done}/{max(total, done)}: {fix.file_path} "
+            f"({fix.rule_id})"
+        )
+    except Exception as e:
+        # Progress is best effort; the client may not have asked for it
+        logger.debug(f"Could not report fix progress: {e}")
 
 
 @mcp.tool()
@@ -708,15 +746,20 @@ async def propose_fixes(
     project_path: str,
     output_dir: str = None,
     use_copilot: bool = True,
+    ctx: Context = None,
 ) -> Dict:
     """
     Propose fixes for governance violations from a report.
 
+    Fixes are streamed: a progress notification is sent as each file's fix
+    is ready, and fix-preview.md in output_dir grows as they arrive.
+
     Args:
         report_path: Path to governance report JSON file
         project_path: Path to project directory
         output_dir: Optional directory for output files
         use_copilot: Use GitHub Copilot for fast fix generation (default: True, 80-90% faster)
+        ctx: MCP request context (injected; used for progress notifications)
 
     Returns:
         Proposed fixes with diff previews and metadata
@@ -759,8 +802,13 @@ async def propose_fixes(
         # Load violations
         violations = engine.load_governance_report(str(report_file))
 
-        # Propose fixes
-        fixes, diffs = await engine.propose_fixes(violations, output_dir)
+        # Propose fixes, reporting each one as soon as it's ready
+        total_files = len(engine.proposer.group_by_file(violations))
+        fixes = []
+        async for fix, diff in engine.iter_fixes(violations, output_dir):
+            fixes.append(fix)
+            await _report_fix_progress(ctx, fix, diff, len(fixes), total_files)
+        fixes = engine.in_report_order(fixes, violations)
 
         elapsed_time = time.time() - start_time
         print(f"\n✓ Fix proposal completed in {elapsed_time:.2f} seconds")
@@ -784,7 +832,7 @@ async def propose_fixes(
         review_state = engine.review_gate.start_review(fixes)
 
         # Store session
-        _fix_sessions[session_id] = (engine, fixes, review_state)
+        _fix_sessions.put(session_id, engine, fixes, review_state)
 
         # Convert fixes to output format
         fix_infos = []
@@ -857,22 +905,32 @@ async def review_fixes(
     approved_fix_ids: List[str] = None,
     rejected_fix_ids: List[str] = None,
     comments: Dict[str, str] = None,
+    approve_where: Dict[str, str] = None,
+    reject_where: Dict[str, str] = None,
 ) -> Dict:
     """
     Review proposed fixes by approving or rejecting them.
 
+    Fixes can be listed by ID or selected in bulk with criteria: rule_id,
+    category, file_glob, safety and complexity (all given criteria must
+    match; only pending fixes are affected).
+
     Args:
         fix_session_id: Fix session identifier from propose_fixes
         approved_fix_ids: List of fix IDs to approve
         rejected_fix_ids: List of fix IDs to reject
         comments: Optional comments per fix_id
+        approve_where: Approve pending fixes matching these criteria,
+            e.g. {"rule_id": "kebab-case-paths", "file_glob": "src/main/*"}
+        reject_where: Reject pending fixes matching these criteria
 
     Returns:
         Review status with counts
     """
     try:
-        # Get session
-        if fix_session_id not in _fix_sessions:
+        # Get session (rehydrated if it was evicted or the server restarted)
+        session = _fix_sessions.get(fix_session_id)
+        if session is None:
             return {
                 "approved_count": 0,
                 "rejected_count": 0,
@@ -881,7 +939,7 @@ async def review_fixes(
                 "error": f"Invalid session ID: {fix_session_id}",
             }
 
-        engine, fixes, review_state = _fix_sessions[fix_session_id]
+        engine, fixes, review_state = session
 
         # Apply approvals
         if approved_fix_ids:
@@ -893,11 +951,19 @@ async def review_fixes(
             for fix_id in rejected_fix_ids:
                 engine.review_gate.reject_fix(fix_id)
 
+        # Bulk decisions
+        if approve_where:
+            engine.review_gate.approve_where(**approve_where)
+        if reject_where:
+            engine.review_gate.reject_where(**reject_where)
+
         # Add comments
         if comments:
             for fix_id, comment in comments.items():
                 engine.review_gate.add_comment(fix_id, comment)
 
+        _fix_sessions.save(fix_session_id)
+
         # Get summary
         summary = review_state.get_summary()
 
@@ -936,11 +1002,12 @@ async def create_governance_pr(
         PR information including title, description, and metadata
     """
     try:
-        # Get session
-        if fix_session_id not in _fix_sessions:
+        # Get session (rehydrated if it was evicted or the server restarted)
+        session = _fix_sessions.get(fix_session_id)
+        if session is None:
             return {"error": f"Invalid session ID: {fix_session_id}"}
 
-        engine, fixes, review_state = _fix_sessions[fix_session_id]
+        engine, fixes, review_state = session
 
         # Check if fixes were applied
         if not hasattr(engine, "pr_creator") or not engine.pr_creator:
@@ -2653,5 +2720,7 @@ async def get_next_category_to_fix(project_path: str = ".") -> Dict:
 
 
 if __name__ == "__main__":
+    start_llm_warm_up()
+
     # Run MCP server with stdio transport
     mcp.run(transport="stdio")
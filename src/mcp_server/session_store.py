@@ -0,0 +1,351 @@
+"""
+Fix session store for the MCP server.
+
+propose_fixes used to keep every session (engine, proposed fixes with full
+file contents, review state) in a module-level dict for the life of the
+server. FixSessionStore persists sessions in a SQLite database and keeps
+only recently used ones in memory:
+
+- in memory: LRU of live sessions, bounded by count; evicted sessions
+  stay on disk
+- on disk: sessions expire after a TTL (since last use), and only the most
+  recently used ones are kept
+
+File contents aren't part of a session: fixes hold content hashes and
+the contents live in the shared BlobStore, so sessions stay small and
+repeated contents are stored once. The memory used by contents is bounded
+by the BlobStore's cache (FIX_BLOB_CACHE_MB). Each stored session pins the
+blobs it references; deleting or expiring it releases them for collection.
+
+A session that isn't in memory (evicted, or from before a server restart)
+is rehydrated on first use: its fixes and review state are loaded and a new
+AutoFixEngine is created for its project.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from autofix.blob_store import BlobStore
+from autofix.engine import AutoFixEngine
+from autofix.fix_strategies import FixComplexity, FixSafety, FixStrategy
+from autofix.pr_creator import CommitInfo, PRCreator, PullRequestInfo
+from autofix.proposer import ProposedFix
+from autofix.review_gate import ReviewComment, ReviewDecision, ReviewState
+from utils.logger import logger
+
+# Bump when the persisted session layout changes
+SESSION_FORMAT_VERSION = "3"
+
+Session = Tuple[AutoFixEngine, List[ProposedFix], ReviewState]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS fix_sessions (
+    session_id TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    project_path TEXT NOT NULL,
+    use_copilot INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    fixes BLOB NOT NULL,
+    state TEXT NOT NULL
+)
+"""
+
+
+def _fix_to_dict(fix: ProposedFix) -> Dict:
+    """JSON-serializable form of a proposed fix"""
+    data = asdict(fix)
+    data["strategy"]["complexity"] = fix.strategy.complexity.value
+    data["strategy"]["safety"] = fix.strategy.safety.value
+    return data
+
+
+def _fix_from_dict(data: Dict, blob_store: BlobStore) -> ProposedFix:
+    """Proposed fix from its serialized form"""
+    strategy = dict(data["strategy"])
+    strategy["complexity"] = FixComplexity(strategy["complexity"])
+    strategy["safety"] = FixSafety(strategy["safety"])
+    return ProposedFix.from_hashes(
+        blob_store, **{**data, "strategy": FixStrategy(**strategy)}
+    )
+
+
+def _fix_blobs(fixes: List[ProposedFix]) -> List[str]:
+    """Hashes of every content a session's fixes reference"""
+    blobs = []
+    for fix in fixes:
+        blobs += [fix.original_hash, fix.proposed_hash]
+        blobs += [blob for _, blob in fix.additional_file_hashes]
+    return blobs
+
+
+class FixSessionStore:
+    """Bounded, persistent store of propose_fixes sessions"""
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
+        max_sessions: Optional[int] = None,
+        max_cached: Optional[int] = None,
+        engine_factory: Optional[Callable[[str, bool], AutoFixEngine]] = None,
+        blob_store: Optional[BlobStore] = None,
+    ):
+        """
+        Initialize session store
+
+        Args:
+            db_path: SQLite database (or FIX_SESSION_DB env, default:
+                ~/.governance-cache/fix-sessions.db)
+            ttl_seconds: Sessions unused for this long are deleted (or
+                FIX_SESSION_TTL_SECONDS env, default: 1 day)
+            max_sessions: Sessions kept on disk, most recently used first (or
+                FIX_SESSION_MAX env, default: 200)
+            max_cached: Live sessions kept in memory (or FIX_SESSION_CACHE_SIZE
+                env, default: 8)
+            engine_factory: Creates the engine of a rehydrated session from
+                (project_path, use_copilot) (default: AutoFixEngine)
+            blob_store: Store of the fix contents (default: the shared
+                BlobStore)
+        """
+        self.db_path = Path(
+            db_path
+            or os.getenv(
+                "FIX_SESSION_DB",
+                str(Path.home() / ".governance-cache" / "fix-sessions.db"),
+            )
+        )
+        self.ttl_seconds = (
+            ttl_seconds
+            if ttl_seconds is not None
+            else int(os.getenv("FIX_SESSION_TTL_SECONDS", "86400"))
+        )
+        self.max_sessions = (
+            max_sessions
+            if max_sessions is not None
+            else int(os.getenv("FIX_SESSION_MAX", "200"))
+        )
+        self.max_cached = (
+            max_cached
+            if max_cached is not None
+            else int(os.getenv("FIX_SESSION_CACHE_SIZE", "8"))
+        )
+        self.blob_store = blob_store or BlobStore.default()
+        self.engine_factory = engine_factory or (
+            lambda project_path, use_copilot: AutoFixEngine(
+                project_path, use_copilot=use_copilot
+            )
+        )
+
+        self._cache: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._conn = None
+        self.rehydrated = 0
+
+    def _db(self) -> sqlite3.Connection:
+        """Open the database on first use"""
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute(_SCHEMA)
+            self._conn.commit()
+        return self._conn
+
+    def put(
+        self,
+        session_id: str,
+        engine: AutoFixEngine,
+        fixes: List[ProposedFix],
+        review_state: ReviewState,
+    ):
+        """Store a new session (persisted and kept in memory)"""
+        fixes_blob = zlib.compress(
+            json.dumps([_fix_to_dict(fix) for fix in fixes]).encode("utf-8")
+        )
+        now = time.time()
+        with self._lock:
+            self.blob_store.pin(f"session-{session_id}", _fix_blobs(fixes))
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO fix_sessions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    session_id,
+                    SESSION_FORMAT_VERSION,
+                    str(engine.project_path),
+                    int(engine.use_copilot),
+                    now,
+                    now,
+                    fixes_blob,
+                    self._state_json(engine, review_state),
+                ),
+            )
+            db.commit()
+            self._cache_session(session_id, (engine, fixes, review_state))
+            self._evict_expired(now)
+
+    def get(self, session_id: str) -> Optional[Session]:
+        """
+        Session by ID, rehydrated from disk if it isn't in memory
+
+        Returns:
+            (engine, fixes, review_state), or None if unknown or expired
+        """
+        now = time.time()
+        with self._lock:
+            self._evict_expired(now)
+            db = self._db()
+            if session_id in self._cache:
+                self._cache.move_to_end(session_id)
+                db.execute(
+                    "UPDATE fix_sessions SET accessed_at = ? WHERE session_id = ?",
+                    (now, session_id),
+                )
+                db.commit()
+                return self._cache[session_id]
+
+            row = db.execute(
+                "SELECT version, project_path, use_copilot, fixes, state "
+                "FROM fix_sessions WHERE session_id = ?",
+                (session_id,),
+            ).fetchone()
+            if row is None:
+                return None
+            if row[0] != SESSION_FORMAT_VERSION:
+                self.delete(session_id)
+                return None
+
+            session = self._rehydrate(*row[1:])
+            db.execute(
+                "UPDATE fix_sessions SET accessed_at = ? WHERE session_id = ?",
+                (now, session_id),
+            )
+            db.commit()
+            self._cache_session(session_id, session)
+            self.rehydrated += 1
+            return session
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def save(self, session_id: str):
+        """Persist the review state of a live session after it changed"""
+        with self._lock:
+            if session_id not in self._cache:
+                return
+            engine, _, review_state = self._cache[session_id]
+            db = self._db()
+            db.execute(
+                "UPDATE fix_sessions SET state = ?, accessed_at = ? "
+                "WHERE session_id = ?",
+                (self._state_json(engine, review_state), time.time(), session_id),
+            )
+            db.commit()
+
+    def delete(self, session_id: str):
+        """Remove a session from memory and disk"""
+        with self._lock:
+            self._cache.pop(session_id, None)
+            self.blob_store.unpin(f"session-{session_id}")
+            db = self._db()
+            db.execute("DELETE FROM fix_sessions WHERE session_id = ?", (session_id,))
+            db.commit()
+
+    def close(self):
+        """Close the database (sessions stay on disk)"""
+        with self._lock:
+            self._cache.clear()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _cache_session(self, session_id: str, session: Session):
+        """Keep a session in memory, evicting least recently used ones"""
+        self._cache.pop(session_id, None)
+        self._cache[session_id] = session
+        while len(self._cache) > max(1, self.max_cached):
+            evicted_id, _ = self._cache.popitem(last=False)
+            logger.debug(f"Fix session {evicted_id} evicted from memory")
+
+    def _evict_expired(self, now: float):
+        """Delete sessions past their TTL and beyond the on-disk limit"""
+        db = self._db()
+        expired = [
+            row[0]
+            for row in db.execute(
+                "SELECT session_id FROM fix_sessions WHERE accessed_at < ?",
+                (now - self.ttl_seconds,),
+            )
+        ]
+        expired += [
+            row[0]
+            for row in db.execute(
+                "SELECT session_id FROM fix_sessions WHERE accessed_at >= ? "
+                "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?",
+                (now - self.ttl_seconds, self.max_sessions),
+            )
+        ]
+        if not expired:
+            return
+        for session_id in expired:
+            self._cache.pop(session_id, None)
+            self.blob_store.unpin(f"session-{session_id}")
+        db.executemany(
+            "DELETE FROM fix_sessions WHERE session_id = ?",
+            [(session_id,) for session_id in expired],
+        )
+        db.commit()
+        self.blob_store.gc()
+        logger.debug(f"Deleted {len(expired)} expired fix session(s)")
+
+    @staticmethod
+    def _state_json(engine: AutoFixEngine, review_state: ReviewState) -> str:
+        """Serialized review decisions, comments and PR info"""
+        pr_info = getattr(engine, "last_pr_info", None)
+        return json.dumps(
+            {
+                "decisions": {
+                    fix_id: decision.value
+                    for fix_id, decision in review_state.decisions.items()
+                },
+                "comments": [asdict(comment) for comment in review_state.comments],
+                "pr_info": asdict(pr_info) if pr_info else None,
+            }
+        )
+
+    def _rehydrate(
+        self, project_path: str, use_copilot: int, fixes_blob: bytes, state_json: str
+    ) -> Session:
+        """Rebuild a session from its persisted form"""
+        fixes = [
+            _fix_from_dict(data, self.blob_store)
+            for data in json.loads(zlib.decompress(fixes_blob).decode("utf-8"))
+        ]
+        state = json.loads(state_json)
+
+        engine = self.engine_factory(project_path, bool(use_copilot))
+        review_state = engine.review_gate.start_review(fixes)
+        review_state.decisions.update(
+            {
+                fix_id: ReviewDecision(decision)
+                for fix_id, decision in state["decisions"].items()
+            }
+        )
+        review_state.comments = [ReviewComment(**c) for c in state["comments"]]
+
+        if state["pr_info"]:
+            pr_info = dict(state["pr_info"])
+            pr_info["commits"] = [CommitInfo(**c) for c in pr_info["commits"]]
+            engine.last_pr_info = PullRequestInfo(**pr_info)
+            try:
+                engine.pr_creator = PRCreator(project_path)
+            except ValueError as e:
+                logger.warning(f"Rehydrated fix session has no git repository: {e}")
+        return engine, fixes, review_state
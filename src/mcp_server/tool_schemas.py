@@ -171,6 +171,14 @@ class ReviewFixesInput(BaseModel):
         default_factory=list, description="List of rejected fix IDs"
     )
     comments: Optional[dict] = Field(None, description="Optional comments per fix_id")
+    approve_where: Optional[dict] = Field(
+        None,
+        description="Approve pending fixes matching criteria (rule_id, category, "
+        "file_glob, safety, complexity)",
+    )
+    reject_where: Optional[dict] = Field(
+        None, description="Reject pending fixes matching criteria"
+    )
 
 
 class ReviewFixesOutput(BaseModel):
@@ -1,3 +1,5 @@
+import asyncio
+import os
 from typing import Optional, NamedTuple, List, Dict
 from pathlib import Path
 
@@ -40,6 +42,7 @@ class GovernanceScanner:
         self.detector = ProjectDetector(project_path)
         self.spectral = SpectralRunner(ruleset_path)
         self.llm = LLMAnalyzer(llm_endpoint)
+        self.warm_up_llm = os.getenv("LLM_WARM_UP", "1") == "1"
 
     async def scan(
         self,
@@ -56,6 +59,11 @@ class GovernanceScanner:
         """
         logger.info("Starting API Governance Scan...")
 
+        # Load the LLM in the background so the fix phase starts warm; the
+        # scan itself doesn't use the LLM, so it never waits for it
+        if self.warm_up_llm:
+            self.llm.start_warm_up()
+
         # Step 1: Detect project type
         is_java, build_tool = self.detector.is_java_project()
         if not is_java:
@@ -165,7 +173,7 @@ class GovernanceScanner:
 
             # Run Spectral
             logger.info(f"Running Spectral analysis on {spec.name}...")
-            spectral_results = self.spectral.run_spectral(spec)
+            spectral_results = await asyncio.to_thread(self.spectral.run_spectral, spec)
             logger.info(f"Spectral found {len(spectral_results)} violations")
 
             # Check if Spectral failed silently (returns empty list when binary not found)
@@ -10,6 +10,10 @@ from pathlib import Path
 import json
 import logging
 
+import yaml
+
+from utils.route_index import RouteIndex, routes_match
+
 logger = logging.getLogger(__name__)
 
 
@@ -45,6 +49,7 @@ class SpecControllerSyncValidator:
         self,
         spectral_results: List[Dict],
         archunit_results: Optional[List[Dict]] = None,
+        project_path: Optional[str] = None,
     ):
         """
         Initialize validator with results from both tools.
@@ -52,9 +57,16 @@ class SpecControllerSyncValidator:
         Args:
             spectral_results: List of Spectral violations
             archunit_results: List of ArchUnit violations (optional)
+            project_path: Project root; enables matching specs to controllers
+                through the Spring route index (optional)
         """
         self.spectral_results = spectral_results
         self.archunit_results = archunit_results or []
+        self.project_path = Path(project_path) if project_path else None
+        self.route_index = (
+            RouteIndex.for_project(project_path) if project_path else None
+        )
+        self._spec_paths_cache: Dict[str, List[str]] = {}
 
     def validate_sync(self) -> Dict:
         """
@@ -281,18 +293,63 @@ class SpecControllerSyncValidator:
         Find Java controllers related to an OpenAPI spec file.
 
         Uses content-based detection (parsing OpenAPI paths and matching
-        to @RequestMapping annotations).
+        them to the routes of the project's Spring route index).
         """
-        # This would use the existing RelatedFileDetector
-        # For now, return placeholder
-        # TODO: Integrate with existing detection logic
-        return []
+        if not self.route_index:
+            return []
+
+        controllers = []
+        for api_path in self._spec_paths(spec_file):
+            for controller in self.route_index.controllers_for_path(
+                api_path, include_tests=False
+            ):
+                if controller not in controllers:
+                    controllers.append(controller)
+        return controllers
 
     def _find_spec_for_controller(self, controller: str) -> Optional[str]:
         """Find OpenAPI spec file for a controller."""
-        # TODO: Implement reverse lookup
+        if not self.route_index:
+            return None
+
+        # ArchUnit reports either a file path or a fully qualified class name
+        suffix = (
+            controller
+            if controller.endswith(".java")
+            else controller.replace(".", "/") + ".java"
+        )
+        routes = [
+            route
+            for route in self.route_index.routes()
+            if route.file == suffix or route.file.endswith("/" + suffix)
+        ]
+
+        for spec_file in self._group_spectral_by_file():
+            spec_paths = self._spec_paths(spec_file)
+            if any(
+                routes_match(route.template, api_path)
+                for route in routes
+                for api_path in spec_paths
+            ):
+                return spec_file
         return None
 
+    def _spec_paths(self, spec_file: str) -> List[str]:
+        """API paths defined by a spec file (parsed once)"""
+        if spec_file not in self._spec_paths_cache:
+            spec_path = Path(spec_file)
+            if not spec_path.is_absolute() and self.project_path:
+                spec_path = self.project_path / spec_path
+            try:
+                with open(spec_path, "r", encoding="utf-8") as f:
+                    spec = yaml.safe_load(f)
+                paths = list((spec or {}).get("paths", {}).keys())
+            except Exception as e:
+                logger.debug(f"Could not read paths from {spec_file}: {e}")
+                paths = []
+            self._spec_paths_cache[spec_file] = paths
+        return self._spec_paths_cache[spec_file]
+
     def _generate_summary(self, sync_report: Dict) -> Dict:
         """Generate summary statistics."""
         return {
@@ -421,7 +478,9 @@ def main():
             archunit_results = json.load(f)
 
     # Validate sync
-    validator = SpecControllerSyncValidator(spectral_results, archunit_results)
+    validator = SpecControllerSyncValidator(
+        spectral_results, archunit_results, project_path="."
+    )
     sync_report = validator.validate_sync()
 
     # Export report
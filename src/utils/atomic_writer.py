@@ -0,0 +1,333 @@
+"""
+Atomic batch file writer.
+
+Fixes used to be applied with one plain open(..., "w") per file: a crash
+could leave half-written sources, and writing file by file is slow on
+network filesystems. AtomicFileWriter applies a batch of writes
+all-or-nothing:
+
+1. Stage: every content is written to a temp file next to its target, in
+   a thread pool
+2. Sync: all temp files are fsynced, again in the pool, before any target
+   changes
+3. Journal: targets that already exist are linked (or copied) into a
+   journal directory, and the journal is recorded on disk
+4. Commit: temp files are renamed over their targets; if a rename fails,
+   the journal restores every target already replaced
+
+After a crash during step 4, recover() restores the journaled originals;
+a writer with a journal_dir runs it before each batch.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from utils.logger import logger
+
+JOURNAL_FILE = "journal.json"
+
+
+def _read_umask() -> int:
+    """Process umask (os.umask can only read it by setting it)"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Read once: changing the umask, even briefly, races with other threads
+# creating files
+_UMASK = _read_umask()
+
+
+class AtomicWriteError(Exception):
+    """A batch write failed; no target was changed"""
+
+
+class AtomicFileWriter:
+    """Writes a batch of files atomically, with rollback"""
+
+    def __init__(
+        self,
+        journal_dir: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        fsync: bool = True,
+    ):
+        """
+        Initialize writer
+
+        Args:
+            journal_dir: Directory for the rollback journal (default: a new
+                temp directory); on the targets' filesystem, originals are
+                hard-linked rather than copied
+            max_workers: Threads staging and syncing files (or
+                FILE_WRITE_WORKERS env, default: the ThreadPoolExecutor default)
+            fsync: Sync temp files and directories before renaming (disable
+                only for throwaway trees)
+        """
+        self.journal_dir = Path(journal_dir) if journal_dir else None
+        self.max_workers = (
+            max_workers
+            if max_workers is not None
+            else int(os.getenv("FILE_WRITE_WORKERS", "0")) or None
+        )
+        self.fsync = fsync
+        self._pending: Dict[Path, bytes] = {}
+
+    def add(self, path: Union[str, Path], content: Union[str, bytes]):
+        """Queue a write (a later write to the same path replaces it)"""
+        if isinstance(content, str):
+            content = content.encode("utf-8")
+        self._pending[Path(path)] = content
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def commit(self) -> List[Path]:
+        """
+        Write all queued files
+
+        Returns:
+            Paths written
+
+        Raises:
+            AtomicWriteError: If any write failed (all targets are left as
+                they were)
+        """
+        pending, self._pending = self._pending, {}
+        if not pending:
+            return []
+        if self.journal_dir:
+            restored = self.recover(str(self.journal_dir))
+            if restored:
+                logger.warning(
+                    f"Rolled back {restored} file(s) of an interrupted batch write"
+                )
+
+        new_file_mode = _new_file_mode()
+        staged: Dict[Path, Path] = {}
+        journal_dir = None
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = {
+                    target: pool.submit(self._stage, target, content, new_file_mode)
+                    for target, content in pending.items()
+                }
+                # Collect every staged file (so all are cleaned up) before
+                # raising the first error
+                error = None
+                for target, future in futures.items():
+                    try:
+                        staged[target] = future.result()
+                    except OSError as e:
+                        error = error or e
+                if error:
+                    raise error
+                if self.fsync:
+                    list(pool.map(_fsync_path, staged.values()))
+
+            journal_dir = self._write_journal(list(staged))
+            replaced = []
+            try:
+                for target, tmp_path in staged.items():
+                    os.replace(tmp_path, target)
+                    replaced.append(target)
+            except OSError as e:
+                restored = _restore(journal_dir, replaced)
+                shutil.rmtree(journal_dir, ignore_errors=True)
+                raise AtomicWriteError(
+                    f"Could not write {target}: {e} "
+                    f"(rolled back {restored} file(s))"
+                ) from e
+
+            if self.fsync:
+                for directory in {target.parent for target in staged}:
+                    _fsync_dir(directory)
+        except OSError as e:
+            raise AtomicWriteError(
+                f"Could not stage {len(pending)} file(s): {e}"
+            ) from e
+        finally:
+            for tmp_path in staged.values():
+                if tmp_path.exists():
+                    tmp_path.unlink()
+
+        shutil.rmtree(journal_dir, ignore_errors=True)
+        return list(staged)
+
+    @staticmethod
+    def _stage(target: Path, content: bytes, new_file_mode: int) -> Path:
+        """Write content to a temp file next to its target (mode of the target)"""
+        target.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(
+            prefix=f".{target.name}.", suffix=".tmp", dir=target.parent
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(content)
+            # mkstemp creates files 0600; keep the mode open() would give
+            if target.exists():
+                os.chmod(tmp_name, target.stat().st_mode & 0o7777)
+            else:
+                os.chmod(tmp_name, new_file_mode)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+        return Path(tmp_name)
+
+    def _write_journal(self, targets: List[Path]) -> Path:
+        """Save the originals of the targets and record them"""
+        if self.journal_dir:
+            self.journal_dir.mkdir(parents=True, exist_ok=True)
+            pid = os.getpid()
+            journal_dir = Path(
+                tempfile.mkdtemp(
+                    prefix=f"batch-{pid}-{_process_start_time(pid)}-",
+                    dir=self.journal_dir,
+                )
+            )
+        else:
+            journal_dir = Path(tempfile.mkdtemp(prefix="governance-journal-"))
+
+        entries = []
+        for index, target in enumerate(targets):
+            backup = None
+            if target.exists():
+                backup = journal_dir / str(index)
+                try:
+                    os.link(target, backup)
+                except OSError:
+                    shutil.copy2(target, backup)
+            entries.append(
+                {"target": str(target), "backup": backup.name if backup else None}
+            )
+
+        journal_path = journal_dir / JOURNAL_FILE
+        with open(journal_path, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        return journal_dir
+
+    @staticmethod
+    def recover(journal_root: str) -> int:
+        """
+        Roll back batches interrupted by a crash
+
+        Batches of processes that are still running are left alone; a
+        process is identified by its PID and start time, so batches of a
+        crashed process whose PID was reused are rolled back.
+
+        Args:
+            journal_root: The writer's journal_dir
+
+        Returns:
+            Number of files restored
+        """
+        restored = 0
+        root = Path(journal_root)
+        if not root.is_dir():
+            return 0
+        for journal_dir in sorted(root.glob("batch-*")):
+            if _writer_running(journal_dir.name):
+                continue
+            if (journal_dir / JOURNAL_FILE).exists():
+                restored += _restore(journal_dir)
+            shutil.rmtree(journal_dir, ignore_errors=True)
+        return restored
+
+
+def _restore(journal_dir: Path, targets: Optional[List[Path]] = None) -> int:
+    """Put back the journaled originals (of the given targets, or all)"""
+    with open(journal_dir / JOURNAL_FILE, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    wanted = {str(t) for t in targets} if targets is not None else None
+
+    restored = 0
+    for entry in entries:
+        if wanted is not None and entry["target"] not in wanted:
+            continue
+        try:
+            if entry["backup"]:
+                os.replace(journal_dir / entry["backup"], entry["target"])
+            elif os.path.exists(entry["target"]):
+                os.unlink(entry["target"])  # Created by the batch
+            restored += 1
+        except OSError as e:
+            logger.error(f"Could not restore {entry['target']}: {e}")
+    return restored
+
+
+def _writer_running(batch_name: str) -> bool:
+    """
+    Whether the process that started a batch is alive
+
+    Batches are named "batch-<pid>-<start time>-..."; a live process with
+    the same PID but another start time reused the PID of a crashed writer.
+    """
+    parts = batch_name.split("-")
+    try:
+        pid, started = int(parts[1]), int(parts[2])
+    except (IndexError, ValueError):
+        return False
+    if pid != os.getpid():
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except OSError:
+            pass  # Exists, owned by another user
+    # Start times are unknown (0) without /proc; then any live PID counts
+    start_time = _process_start_time(pid)
+    return not started or not start_time or start_time == started
+
+
+def _process_start_time(pid: int) -> int:
+    """Start time of a process in clock ticks after boot (0 if unknown)"""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except OSError:
+        return 0
+    # Fields after the command name, which may contain spaces; starttime
+    # is field 22 of the file
+    fields = stat[stat.rfind(b")") + 2 :].split()
+    try:
+        return int(fields[19])
+    except (IndexError, ValueError):
+        return 0
+
+
+def _new_file_mode() -> int:
+    """Mode of a new file under the process umask (as open() creates it)"""
+    return 0o666 & ~_UMASK
+
+
+def _fsync_path(path: Path):
+    """Flush a file to disk"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_dir(directory: Path):
+    """Flush a directory entry (renames) to disk where supported"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -199,3 +199,26 @@ class FileUtils:
         path = Path(dir_path)
         path.mkdir(parents=True, exist_ok=True)
         return path
+
+    @staticmethod
+    def project_cache_dir(project_root: str) -> Path:
+        """
+        Get the project's .governance-cache directory, creating it if necessary.
+
+        The directory holds a .gitignore that ignores everything in it, so
+        caches and write journals never show up as untracked files.
+
+        Args:
+          project_root: Project root directory
+
+        Returns:
+          Path object for the cache directory
+        """
+        path = Path(project_root) / ".governance-cache"
+        gitignore = path / ".gitignore"
+        if not gitignore.exists():
+            path.mkdir(parents=True, exist_ok=True)
+            gitignore.write_text(
+                "# Created by the governance tools\n*\n", encoding="utf-8"
+            )
+        return path
@@ -6,6 +6,8 @@ from pathlib import Path
 from typing import List, Optional
 import re
 
+from utils.test_index import JavaTestIndex
+
 
 class PathUtils:
     """Utility class for path operations and file searching"""
@@ -82,7 +84,6 @@ class PathUtils:
           List of test file paths
         """
         root = Path(project_root)
-        test_files = []
 
         # Remove common suffixes to get base name
         base_name = (
@@ -91,27 +92,13 @@ class PathUtils:
             .replace("Repository", "")
         )
 
-        # Common test patterns
-        patterns = [
-            f"**/{class_name}Test.java",
-            f"**/{class_name}Tests.java",
-            f"**/{class_name}TestCase.java",
-            f"**/{class_name}IT.java",
-            f"**/{class_name}IntegrationTest.java",
-            f"**/{base_name}ControllerTest.java",
-            f"**/{base_name}ControllerTests.java",
+        # Lookups share one walk of the project's test sources
+        index = JavaTestIndex.for_project(project_root, rescan=False)
+        return [
+            root / rel_path
+            for rel_path in index.tests_for_class(class_name, base_name=base_name)
         ]
 
-        for pattern in patterns:
-            matches = PathUtils.find_files(project_root, pattern)
-            for match in matches:
-                # Verify it's in a test directory
-                if "/test/" in str(match) or "/tests/" in str(match):
-                    if match not in test_files:
-                        test_files.append(match)
-
-        return test_files
-
     @staticmethod
     def resolve_java_file_path(project_root: str, class_fqcn: str) -> Optional[Path]:
         """
@@ -224,6 +211,34 @@ class PathUtils:
             # Path is not relative to base
             return str(path)
 
+    @staticmethod
+    def repo_relative_path(path: str, root: Path) -> str:
+        """
+        Posix path of a file relative to a repository root.
+
+        Paths are relative to the root or absolute (ArchUnit reports resolved
+        paths); git only accepts relative ones.
+
+        Args:
+          path: Relative or absolute file path
+          root: Repository root
+
+        Returns:
+          Path relative to root, with forward slashes
+
+        Raises:
+          ValueError: If the path is outside the root or contains ".."
+        """
+        file_path = Path(path)
+        if ".." in file_path.parts:
+            raise ValueError(f"Path must not contain '..': {path}")
+        if not file_path.is_absolute():
+            return file_path.as_posix()
+        try:
+            return file_path.resolve().relative_to(Path(root).resolve()).as_posix()
+        except ValueError:
+            raise ValueError(f"Path is outside the repository {root}: {path}")
+
     @staticmethod
     def is_build_artifact(path: str) -> bool:
         """
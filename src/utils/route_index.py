@@ -0,0 +1,398 @@
+"""
+Spring controller route index.
+
+Finding the controller that serves an API path used to mean globbing every
+*Controller.java file and regex-searching it, once per changed path or
+violation. RouteIndex parses the Spring mapping annotations of a project
+once, combining class-level @RequestMapping prefixes with method-level
+@GetMapping/@PostMapping/... paths, and maps each normalized route template
+to its controller file and method.
+
+The index is persisted in .governance-cache/route-index.json (git-ignored)
+and only re-parses files whose mtime or size changed since the last scan.
+"""
+
+import json
+import os
+import re
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from utils.file_utils import FileUtils
+from utils.logger import logger
+
+# Bump when the parser or the persisted layout changes
+INDEX_FORMAT_VERSION = "1"
+
+SKIP_DIRS = {
+    ".git",
+    ".gradle",
+    ".governance-cache",
+    ".idea",
+    "build",
+    "node_modules",
+    "out",
+    "target",
+}
+
+_MAPPING_RE = re.compile(
+    r"@(Get|Post|Put|Delete|Patch|Request)Mapping\b\s*(\((?:[^()]|\([^()]*\))*\))?"
+)
+_CLASS_RE = re.compile(
+    r"^\s*(?:(?:public|protected|private|final|abstract|static)\s+)*"
+    r"(?:class|interface)\s+\w+",
+    re.MULTILINE,
+)
+_ANNOTATION_RE = re.compile(r"@\w+(?:\s*\((?:[^()]|\([^()]*\))*\))?")
+_METHOD_NAME_RE = re.compile(r"\b(\w+)\s*\(")
+_STRING_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_PARAM_RE = re.compile(r"\{[^}]*\}")
+_VERSION_RE = re.compile(r"^v\d+$")
+
+
+@dataclass
+class Route:
+    """One HTTP route served by a controller method"""
+
+    template: str  # As written, e.g. "/api/users/{userId}"
+    normalized: str  # Path parameters collapsed, e.g. "/api/users/{}"
+    http_method: str  # GET, POST, ... or ANY
+    file: str  # Controller path relative to the project
+    method_name: str  # Java method name
+    line: int
+    class_prefix: str  # Class-level @RequestMapping path ("" if none)
+
+
+def normalize_route(path: str) -> str:
+    """
+    Normalize a route template for comparison
+
+    Collapses path parameters to {}, duplicate slashes and trailing slashes.
+    """
+    path = _PARAM_RE.sub("{}", path.strip())
+    path = "/" + "/".join(segment for segment in path.split("/") if segment)
+    return path
+
+
+def _segments(normalized: str, drop_versions: bool = False) -> List[str]:
+    """Path segments of a normalized route"""
+    segments = [s for s in normalized.split("/") if s]
+    if drop_versions:
+        segments = [s for s in segments if not _VERSION_RE.match(s)]
+    return segments
+
+
+def routes_match(route: str, api_path: str) -> bool:
+    """
+    Check whether a controller route serves an API path
+
+    Matches exactly, ignoring version segments, or when one is a suffix of
+    the other (a server base path such as /api on either side).
+    """
+    route_norm, path_norm = normalize_route(route), normalize_route(api_path)
+    if route_norm == path_norm:
+        return True
+
+    a = _segments(route_norm, drop_versions=True)
+    b = _segments(path_norm, drop_versions=True)
+    if not a or not b:
+        return False
+    shorter, longer = (a, b) if len(a) <= len(b) else (b, a)
+    if not any(segment != "{}" for segment in shorter):
+        return False
+    return longer[len(longer) - len(shorter) :] == shorter
+
+
+def parse_controller_routes(content: str, rel_path: str) -> List[Route]:
+    """
+    Parse the routes declared in one Java source file
+
+    Args:
+        content: Java source
+        rel_path: File path relative to the project (stored on each route)
+
+    Returns:
+        Routes declared by the file's top-level class
+    """
+    if "Mapping" not in content:
+        return []
+
+    class_match = _CLASS_RE.search(content)
+    class_start = class_match.start() if class_match else 0
+
+    prefixes = [""]
+    routes = []
+    for match in _MAPPING_RE.finditer(content):
+        kind, args = match.group(1), match.group(2)
+        paths = _mapping_paths(args)
+        if paths is None:
+            continue  # Path is a constant expression we can't resolve
+
+        if match.start() < class_start:
+            if kind == "Request":
+                prefixes = paths
+            continue
+
+        method_name = _method_name_after(content, match.end())
+        line = content.count("\n", 0, match.start()) + 1
+        for http_method in _http_methods(kind, args):
+            for prefix in prefixes:
+                for path in paths:
+                    template = _join_paths(prefix, path)
+                    routes.append(
+                        Route(
+                            template=template,
+                            normalized=normalize_route(template),
+                            http_method=http_method,
+                            file=rel_path,
+                            method_name=method_name,
+                            line=line,
+                            class_prefix=prefix,
+                        )
+                    )
+    return routes
+
+
+def _mapping_paths(args: Optional[str]) -> Optional[List[str]]:
+    """Paths from mapping annotation arguments (None if not a literal)"""
+    if not args:
+        return [""]
+    inner = args[1:-1].strip()
+
+    keyword = re.search(r"\b(?:value|path)\s*=\s*", inner)
+    if keyword:
+        rest = inner[keyword.end() :]
+    elif inner and not re.match(r"\w+\s*=", inner):
+        rest = inner  # Positional value
+    else:
+        return [""]  # Only other attributes (produces, method, ...)
+
+    if rest.startswith("{"):
+        return _STRING_RE.findall(rest[: rest.find("}") + 1]) or [""]
+    if rest.startswith('"'):
+        return [_STRING_RE.match(rest).group(1)]
+    return None
+
+
+def _http_methods(kind: str, args: Optional[str]) -> List[str]:
+    """HTTP methods of a mapping annotation"""
+    if kind != "Request":
+        return [kind.upper()]
+    methods = re.findall(r"RequestMethod\.(\w+)", args or "")
+    return methods or ["ANY"]
+
+
+def _method_name_after(content: str, position: int) -> str:
+    """Name of the method declared after an annotation"""
+    tail = _ANNOTATION_RE.sub(" ", content[position : position + 600])
+    match = _METHOD_NAME_RE.search(tail)
+    return match.group(1) if match else ""
+
+
+def _join_paths(prefix: str, path: str) -> str:
+    """Combine a class-level prefix with a method-level path"""
+    joined = "/".join(part.strip("/") for part in (prefix, path) if part.strip("/"))
+    return "/" + joined
+
+
+class RouteIndex:
+    """Index of Spring routes to controller files and methods"""
+
+    _instances: Dict[str, "RouteIndex"] = {}
+
+    def __init__(self, project_path: str, cache_path: Optional[str] = None):
+        """
+        Initialize route index
+
+        Args:
+            project_path: Project root
+            cache_path: Persisted index file (default:
+                <project>/.governance-cache/route-index.json)
+        """
+        self.project_path = Path(project_path)
+        self._default_cache_path = not cache_path
+        self.cache_path = (
+            Path(cache_path)
+            if cache_path
+            else self.project_path / ".governance-cache" / "route-index.json"
+        )
+        self._files: Dict[str, Dict] = {}
+        self._routes: List[Route] = []
+        self._loaded = False
+        self.parsed_files = 0
+
+    @classmethod
+    def for_project(cls, project_path: str) -> "RouteIndex":
+        """
+        Shared index for a project
+
+        Each call starts a new scan: the shared index is re-validated
+        against the file system (mtime/size) on its next query, then reused
+        until the next call.
+        """
+        key = str(Path(project_path).resolve())
+        if key not in cls._instances:
+            cls._instances[key] = cls(project_path)
+        index = cls._instances[key]
+        index._loaded = False
+        return index
+
+    def refresh(self) -> "RouteIndex":
+        """
+        Bring the index up to date with the project
+
+        Loads the persisted index, re-parses Java files whose mtime or size
+        changed, drops deleted files and saves the result.
+        """
+        if not self._files:
+            self._files = self._load()
+
+        seen = set()
+        changed = False
+        for java_file in self._java_files():
+            rel_path = java_file.relative_to(self.project_path).as_posix()
+            seen.add(rel_path)
+            try:
+                stat = java_file.stat()
+            except OSError:
+                continue
+            entry = self._files.get(rel_path)
+            if (
+                entry
+                and entry["mtime_ns"] == stat.st_mtime_ns
+                and entry["size"] == stat.st_size
+            ):
+                continue
+
+            try:
+                content = java_file.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                continue
+            routes = parse_controller_routes(content, rel_path)
+            self._files[rel_path] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "routes": [asdict(route) for route in routes],
+            }
+            self.parsed_files += 1
+            changed = True
+
+        for rel_path in set(self._files) - seen:
+            del self._files[rel_path]
+            changed = True
+
+        self._routes = [
+            Route(**route)
+            for entry in self._files.values()
+            for route in entry["routes"]
+        ]
+        self._loaded = True
+        if changed:
+            self._save()
+        return self
+
+    def _java_files(self) -> Iterable[Path]:
+        """Java sources outside build and VCS directories"""
+        for root, dirs, files in os.walk(self.project_path):
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+            for name in files:
+                if name.endswith(".java"):
+                    yield Path(root) / name
+
+    def _load(self) -> Dict[str, Dict]:
+        """Persisted per-file entries (empty if missing or stale)"""
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != INDEX_FORMAT_VERSION:
+            return {}
+        return data.get("files", {})
+
+    def _save(self):
+        """Persist the index atomically"""
+        try:
+            if self._default_cache_path:
+                FileUtils.project_cache_dir(self.project_path)
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.cache_path.with_suffix(f".{os.getpid()}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_FORMAT_VERSION, "files": self._files}, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            logger.debug(f"Could not persist route index: {e}")
+
+    def routes(self) -> List[Route]:
+        """All indexed routes"""
+        if not self._loaded:
+            self.refresh()
+        return self._routes
+
+    def find_routes(
+        self, api_path: str, http_method: Optional[str] = None
+    ) -> List[Route]:
+        """
+        Routes serving an API path
+
+        Args:
+            api_path: Spec path, e.g. "/v1/users/{id}"
+            http_method: Only routes for this method (ANY routes always match)
+        """
+        wanted = http_method.upper() if http_method else None
+        return [
+            route
+            for route in self.routes()
+            if routes_match(route.template, api_path)
+            and (not wanted or route.http_method in (wanted, "ANY"))
+        ]
+
+    def controllers_for_path(
+        self, api_path: str, include_tests: bool = True
+    ) -> List[str]:
+        """
+        Controller files serving an API path (or its class-level prefix)
+
+        Returns:
+            Relative paths, in index order
+        """
+        literal = normalize_route(_PARAM_RE.sub("", api_path))
+        files = []
+        for route in self.routes():
+            if route.file in files or (not include_tests and _is_test(route.file)):
+                continue
+            if routes_match(route.template, api_path) or (
+                route.class_prefix and routes_match(route.class_prefix, literal)
+            ):
+                files.append(route.file)
+        return files
+
+    def controllers_for_resource(
+        self, resource: str, include_tests: bool = False
+    ) -> List[str]:
+        """
+        Controller files whose class-level mapping starts with a resource
+
+        Args:
+            resource: Resource segment, e.g. "users"
+        """
+        resource = resource.lower()
+        files = []
+        for route in self.routes():
+            if route.file in files or (not include_tests and _is_test(route.file)):
+                continue
+            segments = _segments(normalize_route(route.class_prefix), True)
+            if segments and segments[0].lower() == resource:
+                files.append(route.file)
+        return files
+
+    def routes_for_file(self, rel_path: str) -> List[Route]:
+        """Routes declared in one controller file"""
+        rel_path = Path(rel_path).as_posix()
+        return [route for route in self.routes() if route.file == rel_path]
+
+
+def _is_test(rel_path: str) -> bool:
+    """Whether a relative path is under a test source tree"""
+    return "/test/" in f"/{rel_path}" or "/tests/" in f"/{rel_path}"
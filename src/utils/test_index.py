@@ -0,0 +1,137 @@
+"""
+Java test-source index.
+
+Finding the tests of a class used to run a dozen rglob patterns over the
+whole project, for every violation and every related controller.
+JavaTestIndex walks the project once and maps test class names to their
+files, so the naming-convention variants of a class (UserTest, UserIT,
+UserControllerTests, ...) are dictionary lookups and "starts with the class
+name" matches are a binary search over the sorted names.
+"""
+
+import bisect
+import os
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from utils.route_index import SKIP_DIRS
+
+# Suffixes of tests named after the class under test
+TEST_SUFFIXES = (
+    "Test",
+    "Tests",
+    "TestCase",
+    "IntegrationTest",
+    "IT",
+    "IntegrationTests",
+)
+
+# Suffixes of controller tests named after the base (resource) name
+CONTROLLER_TEST_SUFFIXES = ("ControllerTest", "ControllerTests", "ControllerIT")
+
+
+def is_test_path(rel_path: str) -> bool:
+    """Whether a relative path is under a test source tree"""
+    path = f"/{Path(rel_path).as_posix()}"
+    return "/test/" in path or "/tests/" in path
+
+
+class JavaTestIndex:
+    """Index of Java test sources by class name"""
+
+    _instances: Dict[str, "JavaTestIndex"] = {}
+
+    def __init__(self, project_path: str):
+        """
+        Initialize test index
+
+        Args:
+            project_path: Project root
+        """
+        self.project_path = Path(project_path)
+        self._by_name: Dict[str, List[str]] = {}
+        self._sorted_names: List[str] = []
+        self._loaded = False
+
+    @classmethod
+    def for_project(cls, project_path: str, rescan: bool = True) -> "JavaTestIndex":
+        """
+        Shared index for a project
+
+        Args:
+            project_path: Project root
+            rescan: Re-walk the project on the next query (pass True once at
+                the start of a scan, False for lookups within it)
+        """
+        key = str(Path(project_path).resolve())
+        if key not in cls._instances:
+            cls._instances[key] = cls(project_path)
+        index = cls._instances[key]
+        if rescan:
+            index._loaded = False
+        return index
+
+    def refresh(self) -> "JavaTestIndex":
+        """Walk the project and rebuild the index"""
+        by_name: Dict[str, List[str]] = {}
+        for root, dirs, files in os.walk(self.project_path):
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+            for name in sorted(files):
+                if not name.endswith(".java"):
+                    continue
+                rel_path = (Path(root) / name).relative_to(self.project_path)
+                if is_test_path(rel_path.as_posix()):
+                    by_name.setdefault(name[:-5], []).append(rel_path.as_posix())
+
+        self._by_name = by_name
+        self._sorted_names = sorted(by_name)
+        self._loaded = True
+        return self
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.refresh()
+
+    def files_named(self, test_class: str) -> List[str]:
+        """Test files declaring a class with this simple name"""
+        self._ensure_loaded()
+        return list(self._by_name.get(test_class, []))
+
+    def tests_for_class(
+        self,
+        class_name: str,
+        base_name: Optional[str] = None,
+        prefix_matches: bool = False,
+    ) -> List[str]:
+        """
+        Test files for a class
+
+        Args:
+            class_name: Simple name of the class under test, e.g. "UserController"
+            base_name: Resource name for controller-test variants, e.g. "User"
+                (UserControllerTest, ...); omitted if None
+            prefix_matches: Also include test classes whose name starts with
+                class_name and contains "Test" (e.g. UserServiceCachingTest)
+
+        Returns:
+            Relative paths, in naming-convention order
+        """
+        self._ensure_loaded()
+        names = [class_name + suffix for suffix in TEST_SUFFIXES]
+        if base_name is not None:
+            names += [base_name + suffix for suffix in CONTROLLER_TEST_SUFFIXES]
+
+        if prefix_matches:
+            start = bisect.bisect_left(self._sorted_names, class_name)
+            for name in self._sorted_names[start:]:
+                if not name.startswith(class_name):
+                    break
+                if "Test" in name:
+                    names.append(name)
+
+        test_files = []
+        for name in names:
+            for rel_path in self._by_name.get(name, []):
+                if rel_path not in test_files:
+                    test_files.append(rel_path)
+        return test_files
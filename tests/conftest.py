@@ -0,0 +1,20 @@
+"""
+Shared test fixtures
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+src_path = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(src_path))
+
+
+@pytest.fixture(autouse=True)
+def isolated_blob_store(tmp_path, monkeypatch):
+    """Keep fix contents written by tests out of the user's home directory"""
+    from autofix.blob_store import BlobStore
+
+    monkeypatch.setenv("FIX_BLOB_DIR", str(tmp_path / "blobs"))
+    monkeypatch.setattr(BlobStore, "_instances", {})
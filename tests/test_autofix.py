@@ -111,6 +111,252 @@ class TestDiffGenerator:
         assert "+1" in str_repr
         assert "-1" in str_repr
 
+    def test_diff_backends_agree_on_stats(self):
+        """Test the fast backends produce reconstructible diffs with their stats"""
+        import difflib
+        from autofix.diff_backends import get_opcodes, unified_diff
+
+        original = [f"line {i}\n" for i in range(200)]
+        proposed = list(original)
+        proposed[10] = "changed\n"
+        del proposed[50:55]
+        proposed.insert(120, "added\n")
+
+        expected = list(
+            difflib.unified_diff(original, proposed, "a/f", "b/f", lineterm="")
+        )
+        for backend in ("difflib", "myers", "patience"):
+            lines, additions, deletions = unified_diff(
+                original, proposed, "a/f", "b/f", lineterm="", backend=backend
+            )
+            assert lines == expected
+            assert (additions, deletions) == (2, 6)
+
+            rebuilt = []
+            for tag, i1, i2, j1, j2 in get_opcodes(original, proposed, backend):
+                rebuilt += original[i1:i2] if tag == "equal" else proposed[j1:j2]
+            assert rebuilt == proposed
+
+    def test_diffs_are_lazy_and_materialize_in_parallel(self):
+        """Test diff text is only built on demand, in worker processes for exports"""
+        from autofix.fix_strategies import get_strategy
+        from autofix.proposer import ProposedFix
+
+        fixes = []
+        for i in range(3):
+            original = "".join(f"line {n}\n" for n in range(50))
+            fixes.append(
+                ProposedFix(
+                    fix_id=f"fix-{i}",
+                    rule_id="coding-rule",
+                    file_path=f"F{i}.java",
+                    line_number=None,
+                    original_content=original,
+                    proposed_content=original.replace("line 7\n", f"fixed {i}\n"),
+                    explanation="Fix",
+                    strategy=get_strategy("coding-no-std-streams"),
+                )
+            )
+        diffs = self.generator.generate_all_diffs(fixes)
+
+        assert not any(d.is_materialized for d in diffs)
+        # Contents stay in the blob store, referenced by hash
+        assert diffs[0]._original_content is None
+        assert diffs[0].original_hash == fixes[0].original_hash
+        assert (diffs[0].additions, diffs[0].deletions) == (1, 1)
+        assert not diffs[0].is_materialized
+
+        inline_text = (
+            DiffGenerator(self.temp_dir, diff_workers=0)
+            .generate_diff(fixes[2])
+            .unified_diff
+        )
+        generator = DiffGenerator(self.temp_dir, diff_workers=2)
+        generator.parallel_min_lines = 0
+        generator.export_diff_to_file(diffs, os.path.join(self.temp_dir, "out.txt"))
+
+        assert all(d.is_materialized for d in diffs)
+        assert diffs[2].unified_diff == inline_text
+        assert "+fixed 2" in inline_text
+
+    def test_patch_export_applies_with_git(self):
+        """Test the patch export applies cleanly with git apply --index"""
+        import subprocess
+        from autofix.blob_store import BlobStore
+        from autofix.fix_strategies import get_strategy
+        from autofix.proposer import RELATED_FILE_REFERENCE, ProposedFix
+
+        def git(*args):
+            return subprocess.run(
+                ["git", *args], cwd=self.temp_dir, capture_output=True, text=True
+            )
+
+        files = {
+            "api.yaml": "openapi: 3.0.0\npaths:\n  /getUser:\n    get: {}\n",
+            "src/UserController.java": "class UserController {\n  // /getUser\n}",
+        }
+        for path, content in files.items():
+            full_path = Path(self.temp_dir) / path
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+            full_path.write_text(content, encoding="utf-8")
+        git("init", "-q")
+        git("add", ".")
+
+        blob_store = BlobStore(os.path.join(self.temp_dir, ".blobs"))
+
+        def make_fix(**fields):
+            return ProposedFix(
+                fix_id=fields["file_path"],
+                rule_id="kebab-case-paths",
+                line_number=None,
+                explanation="Fix",
+                strategy=get_strategy("kebab-case-paths"),
+                blob_store=blob_store,
+                **fields,
+            )
+
+        spec_fix = make_fix(
+            file_path="api.yaml",
+            original_content=files["api.yaml"],
+            proposed_content=files["api.yaml"].replace("/getUser", "/users"),
+            additional_files=[
+                (
+                    "src/UserController.java",
+                    "class UserController {\n  // /users\n}",
+                ),
+                ("src/Other.java", RELATED_FILE_REFERENCE),
+            ],
+        )
+        new_file_fix = make_fix(
+            file_path="src/UserDto.java",
+            original_content="",
+            proposed_content="record UserDto(String id) {}\n",
+        )
+        # A later fix of the same file replaces the earlier one, also when
+        # given by absolute path (as ArchUnit reports it)
+        controller_fix = make_fix(
+            file_path=str(Path(self.temp_dir).resolve() / "src/UserController.java"),
+            original_content=files["src/UserController.java"],
+            proposed_content="class UserController {\n  // /v1/users\n}\n",
+        )
+        patch_path = os.path.join(self.temp_dir, "fixes.patch")
+        stats = self.generator.export_patch(
+            [spec_fix, new_file_fix, controller_fix], patch_path
+        )
+
+        assert stats["files"] == 3
+        assert "diff --git a/src/UserController.java" in Path(patch_path).read_text()
+        result = git("apply", "--index", "fixes.patch")
+        assert result.returncode == 0, result.stderr
+        assert "/users" in (Path(self.temp_dir) / "api.yaml").read_text()
+        assert (Path(self.temp_dir) / "src/UserController.java").read_text() == (
+            controller_fix.proposed_content
+        )
+        assert (Path(self.temp_dir) / "src/UserDto.java").exists()
+        assert not (Path(self.temp_dir) / "src/Other.java").exists()
+        assert "src/UserDto.java" in git("diff", "--cached", "--name-only").stdout
+
+    def test_markdown_preview_grows_then_finishes(self):
+        """Test the preview is appended per diff and completed with a summary"""
+        diffs = [
+            FileDiff(
+                file_path=f"test{i}.java",
+                unified_diff="diff content",
+                additions=1,
+                deletions=0,
+                explanation="Test explanation",
+                rule_id="test-rule",
+            )
+            for i in range(2)
+        ]
+        path = os.path.join(self.temp_dir, "fix-preview.md")
+
+        preview = self.generator.start_markdown_preview(path)
+        preview.add(diffs[1])
+        with open(path) as f:
+            partial = f.read()
+        assert "in progress" in partial
+        assert "### 1. 🟡 test1.java" in partial
+        assert "diff content" not in partial
+
+        preview.finish(diffs)
+        with open(path) as f:
+            final = f.read()
+        assert "**Total Files**: 2" in final
+        assert final.index("test0.java") < final.index("test1.java")
+        assert "diff content" in final
+
+    def test_streaming_preview_leaves_diffs_to_materialize(self):
+        """Test streamed diffs are computed by materialize, not as they arrive"""
+        rendered = []
+        original_materialize = self.generator.materialize
+
+        def materialize(diffs):
+            rendered.extend(d for d in diffs if not d.is_materialized)
+            original_materialize(diffs)
+
+        self.generator.materialize = materialize
+        diffs = [
+            FileDiff(
+                file_path=f"test{i}.java",
+                original_content="a\n",
+                proposed_content=f"b{i}\n",
+                rule_id="test-rule",
+            )
+            for i in range(2)
+        ]
+        preview = self.generator.start_markdown_preview(
+            os.path.join(self.temp_dir, "fix-preview.md")
+        )
+        for diff in diffs:
+            preview.add(diff)
+        assert not any(d.is_materialized for d in diffs)
+
+        preview.finish(diffs)
+        assert rendered == diffs
+
+    def test_engine_preview_export_runs_off_the_event_loop(self):
+        """Test the engine computes the final preview diffs in a worker thread"""
+        import asyncio
+        import threading
+        from autofix.engine import AutoFixEngine
+        from autofix.fix_strategies import get_strategy
+        from autofix.proposer import ProposedFix
+
+        engine = AutoFixEngine(self.temp_dir, use_copilot=False)
+        fix = ProposedFix(
+            fix_id="fix-1",
+            rule_id="coding-rule",
+            file_path="F.java",
+            line_number=None,
+            original_content="a\n",
+            proposed_content="b\n",
+            explanation="Fix",
+            strategy=get_strategy("coding-no-std-streams"),
+        )
+
+        async def iter_fixes(violations):
+            yield fix
+
+        engine.proposer.iter_fixes = iter_fixes
+        threads = []
+        original_materialize = engine.diff_generator.materialize
+
+        def materialize(diffs):
+            threads.append(threading.current_thread())
+            original_materialize(diffs)
+
+        engine.diff_generator.materialize = materialize
+
+        async def run():
+            return [
+                pair async for pair in engine.iter_fixes([], output_dir=self.temp_dir)
+            ]
+
+        assert len(asyncio.run(run())) == 1
+        assert threads and threading.main_thread() not in threads
+        assert "+b" in (Path(self.temp_dir) / "fix-preview.txt").read_text()
+
 
 class TestProposedFix:
     """Test ProposedFix dataclass"""
@@ -195,3 +441,1249 @@ class TestProposedFix:
         )
 
         assert fix.complexity_level == "moderate"
+
+    def test_contents_are_stored_by_hash(self):
+        """Test fixes hold content hashes backed by a shared blob store"""
+        from autofix.blob_store import BlobStore
+        from autofix.fix_strategies import get_strategy
+        from autofix.proposer import ProposedFix
+        from dataclasses import fields
+
+        blob_dir = tempfile.mkdtemp()
+        try:
+            store = BlobStore(blob_dir, cache_size_mb=0)
+            content = "openapi: 3.0.0\n" * 1000
+            fixes = [
+                ProposedFix(
+                    fix_id=f"fix-{i}",
+                    rule_id="kebab-case-paths",
+                    file_path="api.yaml",
+                    line_number=None,
+                    original_content=content,
+                    proposed_content=content.replace("3.0.0", f"3.1.{i}"),
+                    explanation="Fix",
+                    strategy=get_strategy("kebab-case-paths"),
+                    additional_files=[("A.java", "class A {}")],
+                    blob_store=store,
+                )
+                for i in range(2)
+            ]
+
+            # Identical contents are stored once
+            assert fixes[0].original_hash == fixes[1].original_hash
+            assert store.writes == 4  # original, two proposals, A.java
+            assert len([p for p in Path(blob_dir).rglob("*") if p.is_file()]) == 4
+            assert fixes[0].is_safe_to_auto_apply
+
+            # The LRU keeps only the latest blob; the rest load from disk
+            assert len(store._cache) == 1
+            fresh = BlobStore(blob_dir)
+            fix = ProposedFix.from_hashes(
+                blob_store=fresh,
+                **{f.name: getattr(fixes[1], f.name) for f in fields(ProposedFix)},
+            )
+            assert fix.original_content == content
+            assert fix.proposed_content == content.replace("3.0.0", "3.1.1")
+            assert fix.additional_files == [("A.java", "class A {}")]
+            assert fresh.reads == 3
+        finally:
+            shutil.rmtree(blob_dir)
+
+
+class TestReviewGate:
+    """Test bulk review operations and the review index"""
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Setup and teardown for each test"""
+        self.temp_dir = tempfile.mkdtemp()
+        yield
+        shutil.rmtree(self.temp_dir)
+
+    def _fixes(self):
+        from autofix.blob_store import BlobStore
+        from autofix.fix_strategies import get_strategy
+        from autofix.proposer import ProposedFix
+
+        store = BlobStore(self.temp_dir)
+        specs = [
+            ("kebab-case-paths", "api/users.yaml"),
+            ("kebab-case-paths", "api/orders.yaml"),
+            ("plural-resources", "api/users.yaml"),
+            ("coding-no-std-streams", "src/main/java/App.java"),
+        ]
+        return [
+            ProposedFix(
+                fix_id=f"fix-{i}",
+                rule_id=rule_id,
+                file_path=path,
+                line_number=None,
+                original_content="old",
+                proposed_content=f"new {i}",
+                explanation="Fix",
+                strategy=get_strategy(rule_id),
+                blob_store=store,
+            )
+            for i, (rule_id, path) in enumerate(specs)
+        ]
+
+    def test_bulk_decisions_by_predicate(self):
+        """Test approve/reject by rule, glob and safety only touch pending fixes"""
+        from autofix.review_gate import ReviewDecision, ReviewGate
+
+        gate = ReviewGate()
+        state = gate.start_review(self._fixes())
+
+        gate.reject_fix("fix-1")
+        assert gate.approve_where(rule_id="kebab-case-paths") == 1
+        assert [f.fix_id for f in state.approved_fixes] == ["fix-0"]
+        assert state.decisions["fix-1"] == ReviewDecision.REJECTED
+
+        assert gate.reject_where(file_glob="src/*.java") == 1
+        assert [f.fix_id for f in state.select(file_glob="api/users.*")] == [
+            "fix-0",
+            "fix-2",
+        ]
+        strategy = state.fixes[2].strategy
+        assert state.select(
+            safety=strategy.safety, complexity=strategy.complexity.value
+        ) == [state.fixes[2]]
+        assert state.select(category="NO_SUCH_CATEGORY") == []
+
+        gate.approve_all()
+        assert state.get_summary() == {
+            "total": 4,
+            "approved": 2,
+            "rejected": 2,
+            "pending": 0,
+        }
+        assert state.is_complete()
+
+    def test_summary_tracks_direct_decision_updates(self):
+        """Test the index follows decisions set directly or loaded from a file"""
+        from autofix.review_gate import ReviewDecision, ReviewGate
+
+        gate = ReviewGate()
+        fixes = self._fixes()
+        state = gate.start_review(fixes)
+        state.decisions["fix-3"] = ReviewDecision.APPROVED
+        state.decisions.update({"fix-0": ReviewDecision.SKIPPED})
+        assert state.get_summary()["pending"] == 2
+        assert state.approved_fixes == [fixes[3]]
+
+        path = os.path.join(self.temp_dir, "review.json")
+        gate.save_review_state(path)
+        gate.load_review_state(path, fixes)
+        assert gate.review_state.get_summary() == state.get_summary()
+        assert [f.fix_id for f in gate.review_state.pending_fixes] == [
+            "fix-1",
+            "fix-2",
+        ]
+
+    def test_summary_tracks_every_mapping_method(self):
+        """Test pop, popitem, setdefault and clear keep the index in sync"""
+        from autofix.review_gate import ReviewDecision, ReviewGate
+
+        state = ReviewGate().start_review(self._fixes())
+        assert state.decisions.pop("fix-1") == ReviewDecision.PENDING
+        assert state.get_summary()["pending"] == len(state.decisions) == 3
+
+        state.decisions.setdefault("fix-1", ReviewDecision.APPROVED)
+        assert [f.fix_id for f in state.approved_fixes] == ["fix-1"]
+
+        fix_id, _ = state.decisions.popitem()
+        assert fix_id not in [f.fix_id for f in state.pending_fixes]
+        state.decisions.clear()
+        assert state.get_summary() == {
+            "total": 4,
+            "approved": 0,
+            "rejected": 0,
+            "pending": 0,
+        }
+        assert state.decisions == {}
+
+
+class TestPRCreator:
+    """Test commit creation with git plumbing"""
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Setup and teardown for each test"""
+        self.temp_dir = tempfile.mkdtemp()
+        yield
+        shutil.rmtree(self.temp_dir)
+
+    def _git(self, *args):
+        import subprocess
+
+        return subprocess.run(
+            ["git", *args], cwd=self.temp_dir, capture_output=True, text=True
+        ).stdout
+
+    def _repo_with_fixes(self, file_count):
+        from autofix.blob_store import BlobStore
+        from autofix.fix_strategies import get_strategy
+        from autofix.proposer import RELATED_FILE_REFERENCE, ProposedFix
+
+        self._git("init", "-q")
+        self._git("config", "user.name", "Test")
+        self._git("config", "user.email", "test@example.com")
+        for i in range(file_count):
+            (Path(self.temp_dir) / f"F{i}.java").write_text(f"class F{i} {{}}\n")
+        (Path(self.temp_dir) / "api.yaml").write_text("paths: {}\n")
+        self._git("add", ".")
+        self._git("commit", "-q", "-m", "initial")
+
+        store = BlobStore(os.path.join(self.temp_dir, ".git", "test-blobs"))
+        fixes = [
+            ProposedFix(
+                fix_id=f"fix-{i}",
+                rule_id="coding-no-std-streams" if i % 2 else "kebab-case-paths",
+                file_path=f"F{i}.java",
+                line_number=None,
+                original_content=f"class F{i} {{}}\n",
+                proposed_content=f"class F{i} {{ }}\n",
+                explanation="Fix",
+                strategy=get_strategy("kebab-case-paths"),
+                additional_files=[("README.md", RELATED_FILE_REFERENCE)],
+                blob_store=store,
+            )
+            for i in range(file_count)
+        ]
+        fixes[0].additional_files = [("src/Extra.java", "class Extra {}\n")]
+        return fixes
+
+    def test_commits_by_rule_with_constant_git_calls(self):
+        """Test per-rule commits cost the same git calls for 4 or 40 files"""
+        from autofix.pr_creator import PRCreator
+        from autofix.review_gate import ReviewGate
+
+        calls = []
+        for file_count in (4, 40):
+            shutil.rmtree(self.temp_dir)
+            os.makedirs(self.temp_dir)
+            fixes = self._repo_with_fixes(file_count)
+            # A change staged by the user stays staged, out of the commits
+            (Path(self.temp_dir) / "api.yaml").write_text("paths: {a: 1}\n")
+            self._git("add", "api.yaml")
+
+            gate = ReviewGate()
+            gate.start_review(fixes)
+            gate.approve_all()
+            creator = PRCreator(self.temp_dir)
+            run = creator._run_git_command
+            count = [0]
+
+            def counting(*args, **kwargs):
+                count[0] += 1
+                return run(*args, **kwargs)
+
+            creator._run_git_command = counting
+            commits = creator.create_commits_by_rule(gate.review_state)
+            calls.append(count[0])
+
+            assert len(commits) == 2
+            assert "src/Extra.java" in commits[0].files_changed
+            assert "README.md" not in commits[0].files_changed
+            log = self._git("log", "--format=%H %s").splitlines()
+            assert len(log) == 3
+            assert log[0].split()[0] == commits[1].hash
+            assert "[coding-no-std-streams]" in log[0]
+            assert self._git("show", "HEAD:F1.java") == "class F1 { }\n"
+            assert (Path(self.temp_dir) / "src/Extra.java").exists()
+            assert self._git("status", "--porcelain").splitlines() == ["M  api.yaml"]
+
+        assert calls[0] == calls[1]
+
+    def test_absolute_fix_paths_committed_relative(self):
+        """Test absolute paths (as ArchUnit reports them) are committed"""
+        from autofix.pr_creator import PRCreator
+        from autofix.review_gate import ReviewGate
+
+        fixes = self._repo_with_fixes(2)
+        fixes[1].file_path = str(Path(self.temp_dir).resolve() / "F1.java")
+
+        gate = ReviewGate()
+        gate.start_review(fixes)
+        gate.approve_all()
+        commits = PRCreator(self.temp_dir).create_commits_by_rule(gate.review_state)
+
+        assert commits[1].files_changed == ["F1.java"]
+        assert self._git("show", "HEAD:F1.java") == "class F1 { }\n"
+        assert (Path(self.temp_dir) / "F1.java").read_text() == "class F1 { }\n"
+        assert self._git("status", "--porcelain") == ""
+
+    def test_commits_are_signed_when_gpgsign_is_set(self):
+        """Test commit.gpgsign is honored like it is by git commit"""
+        from autofix.pr_creator import PRCreator
+        from autofix.review_gate import ReviewGate
+
+        fixes = self._repo_with_fixes(2)
+        # Stand-in for gpg: git only needs the status line and a signature
+        fake_gpg = Path(self.temp_dir) / ".git" / "fake-gpg"
+        fake_gpg.write_text(
+            "#!/bin/sh\n"
+            "cat > /dev/null\n"
+            "echo '[GNUPG:] SIG_CREATED ' >&2\n"
+            "printf -- '-----BEGIN PGP SIGNATURE-----\\n\\nfake\\n"
+            "-----END PGP SIGNATURE-----\\n'\n"
+        )
+        fake_gpg.chmod(0o755)
+        self._git("config", "gpg.program", str(fake_gpg))
+        self._git("config", "commit.gpgsign", "true")
+
+        gate = ReviewGate()
+        gate.start_review(fixes)
+        gate.approve_all()
+        commits = PRCreator(self.temp_dir).create_commits_by_rule(gate.review_state)
+
+        assert len(commits) == 2
+        for commit in commits:
+            assert "gpgsig -----BEGIN PGP SIGNATURE-----" in self._git(
+                "cat-file", "commit", commit.hash
+            )
+
+    def test_failed_write_leaves_head_unmoved(self, monkeypatch):
+        """Test HEAD only moves once the working tree and index are updated"""
+        from autofix.pr_creator import PRCreator
+        from autofix.review_gate import ReviewGate
+        from utils.atomic_writer import AtomicFileWriter, AtomicWriteError
+
+        fixes = self._repo_with_fixes(2)
+        head = self._git("rev-parse", "HEAD")
+
+        def failing_commit(writer):
+            raise AtomicWriteError("disk full")
+
+        monkeypatch.setattr(AtomicFileWriter, "commit", failing_commit)
+        gate = ReviewGate()
+        gate.start_review(fixes)
+        gate.approve_all()
+        with pytest.raises(AtomicWriteError):
+            PRCreator(self.temp_dir).create_commits_by_rule(gate.review_state)
+
+        assert self._git("rev-parse", "HEAD") == head
+        assert self._git("status", "--porcelain") == ""
+
+    def test_fix_paths_outside_repository_rejected(self):
+        """Test paths escaping the repository fail before anything changes"""
+        from autofix.pr_creator import PRCreator
+        from autofix.review_gate import ReviewGate
+
+        for outside in ("../F0.java", "/elsewhere/F0.java"):
+            shutil.rmtree(self.temp_dir)
+            os.makedirs(self.temp_dir)
+            fixes = self._repo_with_fixes(2)
+            fixes[0].file_path = outside
+            head = self._git("rev-parse", "HEAD")
+
+            gate = ReviewGate()
+            gate.start_review(fixes)
+            gate.approve_all()
+            with pytest.raises(ValueError):
+                PRCreator(self.temp_dir).create_commits_by_rule(gate.review_state)
+            assert self._git("rev-parse", "HEAD") == head
+
+
+class TestWorktreeValidator:
+    """Test validating fix batches in temporary worktrees"""
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Setup and teardown for each test"""
+        self.temp_dir = tempfile.mkdtemp()
+        yield
+        shutil.rmtree(self.temp_dir)
+
+    def test_only_passing_batches_reach_the_checkout(self):
+        """Test batches build in parallel worktrees and winners are promoted"""
+        import asyncio
+        import subprocess
+        from autofix.blob_store import BlobStore
+        from autofix.build_validator import BuildResult, ValidationResult
+        from autofix.fix_strategies import get_strategy
+        from autofix.proposer import ProposedFix
+        from autofix.worktree_validator import WorktreeValidator
+
+        def git(*args):
+            return subprocess.run(
+                ["git", *args], cwd=self.temp_dir, capture_output=True, text=True
+            ).stdout
+
+        git("init", "-q")
+        git("config", "user.name", "Test")
+        git("config", "user.email", "test@example.com")
+        for name in ("A", "B", "C"):
+            (Path(self.temp_dir) / f"{name}.java").write_text(f"class {name} {{}}\n")
+        git("add", ".")
+        git("commit", "-q", "-m", "initial")
+
+        store = BlobStore(os.path.join(self.temp_dir, ".git", "test-blobs"))
+        batches = {
+            rule: [
+                ProposedFix(
+                    fix_id=rule,
+                    rule_id=rule,
+                    file_path=f"{name}.java",
+                    line_number=None,
+                    original_content=f"class {name} {{}}\n",
+                    proposed_content=content,
+                    explanation="Fix",
+                    strategy=get_strategy("kebab-case-paths"),
+                    blob_store=store,
+                )
+            ]
+            for rule, name, content in (
+                ("rule-a", "A", "class A { }\n"),
+                ("rule-b", "B", "class B { BROKEN }\n"),
+                ("rule-c", "C", "class C { }\n"),
+            )
+        }
+
+        built_in = []
+
+        class FakeValidator:
+            def __init__(self, path):
+                self.path = Path(path)
+
+            async def validate_fixes(self, category, violations_before, **kwargs):
+                built_in.append(self.path)
+                sources = "".join(p.read_text() for p in self.path.glob("*.java"))
+                ok = "BROKEN" not in sources
+                return ValidationResult(
+                    category=category,
+                    violations_before=1,
+                    violations_after=0 if ok else 1,
+                    violations_fixed=1 if ok else 0,
+                    new_violations=0,
+                    build_result=BuildResult(success=ok, build_tool="fake", output=""),
+                    scan_result={},
+                    success=ok,
+                    message="ok" if ok else "build failed",
+                )
+
+        validator = WorktreeValidator(
+            self.temp_dir, max_parallel=3, validator_factory=FakeValidator
+        )
+        results = asyncio.run(validator.validate_batches(batches, "NAMING"))
+
+        assert [r.success for r in results] == [True, False, True]
+        assert Path(self.temp_dir) not in built_in
+        # Nothing touched the checkout while validating
+        assert (Path(self.temp_dir) / "A.java").read_text() == "class A {}\n"
+
+        promoted = validator.promote(results)
+        assert [r.name for r in promoted] == ["rule-a", "rule-c"]
+        assert git("rev-parse", "HEAD~1").strip() == results[0].commit
+        assert (Path(self.temp_dir) / "A.java").read_text() == "class A { }\n"
+        assert (Path(self.temp_dir) / "B.java").read_text() == "class B {}\n"
+        assert (Path(self.temp_dir) / "C.java").read_text() == "class C { }\n"
+        assert len(git("worktree", "list").splitlines()) == 1
+
+    def test_engine_applies_fixes_isolated(self, monkeypatch):
+        """Test apply_fixes_isolated promotes batches that pass validate_fixes"""
+        import asyncio
+        import subprocess
+        from autofix import worktree_validator
+        from autofix.build_validator import BuildResult, BuildValidator
+        from autofix.engine import AutoFixEngine
+        from autofix.fix_strategies import get_strategy
+        from autofix.proposer import ProposedFix
+        from autofix.review_gate import ReviewGate
+
+        def git(*args):
+            return subprocess.run(
+                ["git", *args], cwd=self.temp_dir, capture_output=True, text=True
+            ).stdout
+
+        git("init", "-q")
+        git("config", "user.name", "Test")
+        git("config", "user.email", "test@example.com")
+        for name in ("A", "B", "C"):
+            (Path(self.temp_dir) / f"{name}.java").write_text(f"class {name} {{}}\n")
+        git("add", ".")
+        git("commit", "-q", "-m", "initial")
+
+        def path(name):
+            # Proposers report absolute paths
+            return str(Path(self.temp_dir) / f"{name}.java")
+
+        violations = [
+            {"rule": f"rule-{name.lower()}", "message": "m", "file": path(name)}
+            for name in ("A", "B", "C")
+        ]
+
+        class ScanningValidator(BuildValidator):
+            """Real validate_fixes over a fake build and re-scan"""
+
+            def _source(self, name):
+                return (self.project_path / f"{name}.java").read_text()
+
+            def run_build(self, clean=True):
+                ok = "BROKEN" not in self._source("B")
+                return BuildResult(success=ok, build_tool="fake", output="")
+
+            async def run_governance_scan(self, category=None, output_dir=None):
+                # C's violation is never fixed
+                remaining = [
+                    {"rule": f"rule-{name.lower()}", "file": f"{name}.java"}
+                    for name in ("A", "B", "C")
+                    if self._source(name) == f"class {name} {{}}\n"
+                ]
+                return {"success": True, "violations": remaining}
+
+        monkeypatch.setattr(worktree_validator, "BuildValidator", ScanningValidator)
+        fixes = [
+            ProposedFix(
+                fix_id=rule,
+                rule_id=rule,
+                file_path=path(name),
+                line_number=None,
+                original_content=f"class {name} {{}}\n",
+                proposed_content=content,
+                explanation="Fix",
+                strategy=get_strategy("kebab-case-paths"),
+            )
+            for rule, name, content in (
+                ("rule-a", "A", "class A { }\n"),
+                ("rule-b", "B", "class B { BROKEN }\n"),
+            )
+        ]
+        gate = ReviewGate()
+        gate.start_review(fixes)
+        gate.approve_all()
+
+        engine = AutoFixEngine(self.temp_dir, use_copilot=False)
+        result = asyncio.run(engine.apply_fixes_isolated(gate.review_state, violations))
+
+        passed = result.batch_validations[0].validation
+        assert (passed.violations_before, passed.violations_after) == (1, 0)
+        assert result.fixes_applied == 1
+        assert [r.promoted for r in result.batch_validations] == [True, False]
+        assert (Path(self.temp_dir) / "A.java").read_text() == "class A { }\n"
+        assert (Path(self.temp_dir) / "B.java").read_text() == "class B {}\n"
+        assert git("log", "--format=%s").count("\n") == 2
+
+
+class TestAdaptiveConcurrencyLimiter:
+    """Test AIMD concurrency limiter used by FixProposer"""
+
+    def test_additive_increase_up_to_ceiling(self):
+        """Test limit grows by one after a window of healthy calls"""
+        from autofix.concurrency import AdaptiveConcurrencyLimiter
+
+        limiter = AdaptiveConcurrencyLimiter(initial=2, floor=1, ceiling=3)
+        for _ in range(20):
+            limiter.record(1.0)
+
+        assert limiter.limit == 3
+        assert limiter.get_stats()["peak_concurrency"] == 3
+
+    def test_multiplicative_decrease_on_overload(self):
+        """Test 429/timeout signals halve the limit, never below the floor"""
+        from autofix.concurrency import AdaptiveConcurrencyLimiter
+
+        limiter = AdaptiveConcurrencyLimiter(initial=8, floor=2, ceiling=16)
+        limiter.record(1.0, overloaded=True)
+        assert limiter.limit == 4
+
+        limiter.record(1.0, overloaded=True)
+        limiter.record(1.0, overloaded=True)
+        assert limiter.limit == 2
+
+    def test_latency_spike_counts_as_overload(self):
+        """Test smoothed latency far above baseline backs off"""
+        from autofix.concurrency import AdaptiveConcurrencyLimiter
+
+        limiter = AdaptiveConcurrencyLimiter(initial=8, ceiling=8)
+        limiter.record(1.0)
+        for _ in range(5):
+            limiter.record(20.0)
+
+        assert limiter.limit < 8
+        assert limiter.get_stats()["decreases"] >= 1
+
+    def test_slots_respect_limit(self):
+        """Test no more than `limit` calls run at once"""
+        import asyncio
+        from autofix.concurrency import AdaptiveConcurrencyLimiter
+
+        limiter = AdaptiveConcurrencyLimiter(initial=2, floor=2, ceiling=2)
+        running = 0
+        peak = 0
+
+        async def call():
+            nonlocal running, peak
+            async with limiter.slot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        async def run():
+            await asyncio.gather(*(call() for _ in range(6)))
+
+        asyncio.run(run())
+        assert peak == 2
+        assert limiter.get_stats()["calls"] == 6
+
+    def test_overload_is_attributed_to_its_call(self, tmp_path):
+        """Test a 429 only marks the call that saw it, not others in flight"""
+        import asyncio
+        from autofix.fix_cache import FixCache
+        from autofix.proposer import FixProposer
+        from engines.rate_limiter import report_overload
+
+        class FakeAnalyzer:
+            overload_events = 0
+
+            async def generate_batch_fix(self, content, violations):
+                await asyncio.sleep(0.01 if content == "throttled" else 0.02)
+                if content == "throttled":
+                    self.overload_events += 1
+                    report_overload()
+                return content
+
+        proposer = FixProposer(
+            str(tmp_path),
+            use_copilot=False,
+            fix_cache=FixCache(str(tmp_path), enabled=False),
+        )
+        proposer.analyzer = FakeAnalyzer()
+        recorded = []
+        proposer.concurrency.record = lambda latency, overloaded, slot: (
+            recorded.append(overloaded)
+        )
+
+        async def run():
+            await asyncio.gather(
+                *(
+                    proposer._call_analyzer("generate_batch_fix", content, [])
+                    for content in ("throttled", "ok", "ok")
+                )
+            )
+
+        asyncio.run(run())
+        assert sorted(recorded) == [False, False, True]
+
+
+class TestFixPacking:
+    """Test packing small files into shared LLM fix requests"""
+
+    class FakeAnalyzer:
+        """Analyzer that records calls and uppercases the fixed files"""
+
+        def __init__(self, skip=()):
+            self.skip = set(skip)
+            self.multi_calls = []
+            self.batch_calls = []
+
+        async def generate_multi_file_fix(self, files, violations):
+            self.multi_calls.append(sorted(files))
+            return {p: c.upper() for p, c in files.items() if p not in self.skip}
+
+        async def generate_batch_fix(self, content, violations):
+            self.batch_calls.append(content)
+            return content.upper()
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Set up a project with small DTO files"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.violations = []
+        for i in range(5):
+            path = f"dto/Dto{i}.java"
+            (Path(self.temp_dir) / "dto").mkdir(exist_ok=True)
+            (Path(self.temp_dir) / path).write_text(f"class Dto{i} {{}}\n")
+            self.violations.append(
+                {"rule": "custom-llm-rule", "message": "fix me", "file": path}
+            )
+        yield
+        shutil.rmtree(self.temp_dir)
+
+    def _proposer(self, analyzer, budget=3000):
+        from autofix.fix_cache import FixCache
+        from autofix.proposer import FixProposer
+
+        proposer = FixProposer(
+            self.temp_dir,
+            use_copilot=False,
+            pack_token_budget=budget,
+            fix_cache=FixCache(self.temp_dir, enabled=False),
+        )
+        proposer.analyzer = analyzer
+        return proposer
+
+    def test_small_files_share_one_request(self):
+        """Test small files are packed and split back into per-file fixes"""
+        import asyncio
+
+        analyzer = self.FakeAnalyzer()
+        proposer = self._proposer(analyzer)
+        fixes = asyncio.run(proposer.propose_fixes(self.violations))
+
+        assert len(analyzer.multi_calls) == 1
+        assert len(analyzer.multi_calls[0]) == 5
+        assert analyzer.batch_calls == []
+        assert sorted(f.file_path for f in fixes) == [
+            f"dto/Dto{i}.java" for i in range(5)
+        ]
+        assert all(f.proposed_content == f.original_content.upper() for f in fixes)
+
+    def test_missing_files_retried_alone(self):
+        """Test files the packed response missed fall back to a batch fix"""
+        import asyncio
+
+        analyzer = self.FakeAnalyzer(skip={"dto/Dto3.java"})
+        proposer = self._proposer(analyzer)
+        fixes = asyncio.run(proposer.propose_fixes(self.violations))
+
+        assert analyzer.batch_calls == ["class Dto3 {}\n"]
+        assert len(fixes) == 5
+
+    def test_packs_respect_budget_and_can_be_disabled(self):
+        """Test the token budget bounds pack size and 0 disables packing"""
+        import asyncio
+
+        analyzer = self.FakeAnalyzer()
+        asyncio.run(self._proposer(analyzer, budget=60).propose_fixes(self.violations))
+        assert all(len(files) <= 2 for files in analyzer.multi_calls)
+
+        analyzer = self.FakeAnalyzer()
+        asyncio.run(self._proposer(analyzer, budget=0).propose_fixes(self.violations))
+        assert analyzer.multi_calls == []
+        assert len(analyzer.batch_calls) == 5
+
+    def test_wrapped_single_file_backends_are_not_packed(self):
+        """Test hedged and routed analyzers only pack if a backend can"""
+        import asyncio
+        from engines.hedged_analyzer import HedgedAnalyzer
+        from engines.model_router import ModelRouter
+
+        class SingleFileAnalyzer:
+            model = "single"
+
+            def __init__(self):
+                self.batch_calls = []
+
+            async def generate_batch_fix(self, content, violations):
+                self.batch_calls.append(content)
+                return content.upper()
+
+        primary = SingleFileAnalyzer()
+        hedged = HedgedAnalyzer(primary, SingleFileAnalyzer())
+        router = ModelRouter(SingleFileAnalyzer(), hedged)
+        assert not hedged.supports_multi_file_fix
+        assert not router.supports_multi_file_fix
+
+        for analyzer in (hedged, router):
+            proposer = self._proposer(analyzer)
+            jobs = asyncio.run(
+                proposer._prepare_file_jobs(proposer.group_by_file(self.violations))
+            )
+            packs, singles = proposer._pack_jobs(jobs)
+            assert packs == []
+            assert len(singles) == 5
+
+        fixes = asyncio.run(self._proposer(hedged).propose_fixes(self.violations))
+        assert len(primary.batch_calls) == 5
+        assert len(fixes) == 5
+
+        packing = HedgedAnalyzer(self.FakeAnalyzer(), primary)
+        assert ModelRouter(SingleFileAnalyzer(), packing).supports_multi_file_fix
+
+
+class TestFixWorkerProcesses:
+    """Test deterministic fixes running in worker processes"""
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Set up a project with Java files hitting deterministic rules"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.violations = []
+        for i in range(4):
+            path = f"Svc{i}.java"
+            (Path(self.temp_dir) / path).write_text(
+                f"public class Svc{i} {{\n"
+                f'    void run() {{ System.out.println("{i}"); }}\n'
+                "}\n"
+            )
+            self.violations.append(
+                {"rule": "coding-no-std-streams", "message": "m", "file": path}
+            )
+        self.violations.append(
+            {"rule": "coding-no-std-streams", "message": "m", "file": "Gone.java"}
+        )
+        yield
+        shutil.rmtree(self.temp_dir)
+
+    def _proposer(self, workers):
+        from autofix.fix_cache import FixCache
+        from autofix.proposer import FixProposer
+
+        proposer = FixProposer(
+            self.temp_dir,
+            use_copilot=False,
+            fix_cache=FixCache(self.temp_dir, enabled=False),
+            process_workers=workers,
+        )
+        proposer.process_min_files = 1
+        return proposer
+
+    def _run(self, workers):
+        import asyncio
+
+        proposer = self._proposer(workers)
+        try:
+            return asyncio.run(proposer.propose_fixes(self.violations))
+        finally:
+            proposer.close()
+
+    def test_pool_is_closed_after_each_run(self, monkeypatch):
+        """Test the worker pool is started per run, outside fork, and closed"""
+        import asyncio
+        from autofix import proposer as proposer_module
+
+        pools = []
+        real_pool = proposer_module.ProcessPoolExecutor
+
+        def tracking_pool(*args, **kwargs):
+            pools.append(kwargs.get("mp_context"))
+            return real_pool(*args, **kwargs)
+
+        monkeypatch.setattr(proposer_module, "ProcessPoolExecutor", tracking_pool)
+        proposer = self._proposer(workers=2)
+        first = asyncio.run(proposer.propose_fixes(self.violations))
+        assert proposer._process_pool is None
+        second = asyncio.run(proposer.propose_fixes(self.violations))
+
+        assert proposer._process_pool is None
+        assert len(first) == len(second) == 4
+        assert len(pools) == 2
+        assert all(context.get_start_method() != "fork" for context in pools)
+
+    def test_workers_use_the_parent_indexes(self, monkeypatch):
+        """Test worker jobs use the indexes they are given instead of rescanning"""
+        from autofix.proposer import FixProposer, _prepare_file_jobs_in_worker
+        from utils.route_index import RouteIndex
+        from utils.test_index import JavaTestIndex
+
+        route_index = RouteIndex(self.temp_dir).refresh()
+        test_index = JavaTestIndex(self.temp_dir).refresh()
+
+        def rescan(index):
+            raise AssertionError("worker walked the project")
+
+        monkeypatch.setattr(RouteIndex, "refresh", rescan)
+        monkeypatch.setattr(JavaTestIndex, "refresh", rescan)
+        monkeypatch.setattr(RouteIndex, "_instances", {})
+        monkeypatch.setattr(JavaTestIndex, "_instances", {})
+
+        results = _prepare_file_jobs_in_worker(
+            FixProposer,
+            self.temp_dir,
+            route_index,
+            test_index,
+            [("Svc0.java", self.violations[:1]), ("Gone.java", self.violations[-1:])],
+        )
+
+        assert [path for path, _, _ in results] == ["Svc0.java", "Gone.java"]
+        assert "logger.info" in results[0][1].current_content
+
+    def test_process_pool_matches_inline(self):
+        """Test pooled fixes match inline fixes, in report order"""
+        inline = self._run(workers=0)
+        pooled = self._run(workers=2)
+
+        assert [f.file_path for f in pooled] == [f"Svc{i}.java" for i in range(4)]
+        assert [f.proposed_content for f in pooled] == [
+            f.proposed_content for f in inline
+        ]
+        assert all("logger.info" in f.proposed_content for f in pooled)
+
+
+class TestFixStreaming:
+    """Test fix proposals streamed as they complete"""
+
+    class SlowFirstAnalyzer:
+        """Analyzer that answers for the first file last"""
+
+        async def generate_batch_fix(self, content, violations):
+            import asyncio
+
+            await asyncio.sleep(0.2 if "First" in content else 0)
+            return content.replace("class", "final class")
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Set up a project with two Java files"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.violations = []
+        for name in ("First", "Second"):
+            (Path(self.temp_dir) / f"{name}.java").write_text(f"class {name} {{}}\n")
+            self.violations.append(
+                {"rule": "custom-llm-rule", "message": "m", "file": f"{name}.java"}
+            )
+        yield
+        shutil.rmtree(self.temp_dir)
+
+    def _proposer(self):
+        from autofix.fix_cache import FixCache
+        from autofix.proposer import FixProposer
+
+        proposer = FixProposer(
+            self.temp_dir,
+            use_copilot=False,
+            pack_token_budget=0,
+            fix_cache=FixCache(self.temp_dir, enabled=False),
+        )
+        proposer.analyzer = self.SlowFirstAnalyzer()
+        return proposer
+
+    def test_fixes_yielded_in_completion_order(self):
+        """Test a fast fix is yielded before a slow one; propose_fixes keeps report order"""
+        import asyncio
+
+        proposer = self._proposer()
+
+        async def collect():
+            return [fix.file_path async for fix in proposer.iter_fixes(self.violations)]
+
+        assert asyncio.run(collect()) == ["Second.java", "First.java"]
+
+        fixes = asyncio.run(self._proposer().propose_fixes(self.violations))
+        assert [fix.file_path for fix in fixes] == ["First.java", "Second.java"]
+
+
+class TestFixCache:
+    """Test on-disk cache of AI-generated fixes"""
+
+    class FakeAnalyzer:
+        """Analyzer that counts batch fix calls"""
+
+        model = "fake-model"
+        PROMPT_TEMPLATE_VERSION = "1"
+
+        def __init__(self):
+            self.calls = 0
+
+        async def generate_batch_fix(self, content, violations):
+            self.calls += 1
+            return content.replace("class", "final class")
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Set up a project with one Java file"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.file = Path(self.temp_dir) / "A.java"
+        self.file.write_text("class A {}\n")
+        self.violations = [
+            {"rule": "custom-llm-rule", "message": "m", "file": "A.java"}
+        ]
+        yield
+        shutil.rmtree(self.temp_dir)
+
+    def _run(self, analyzer, violations=None):
+        import asyncio
+        from autofix.proposer import FixProposer
+
+        proposer = FixProposer(self.temp_dir, use_copilot=False)
+        proposer.analyzer = analyzer
+        return asyncio.run(proposer.propose_fixes(violations or self.violations))
+
+    def test_second_run_served_from_cache(self):
+        """Test an identical re-run doesn't call the analyzer"""
+        analyzer = self.FakeAnalyzer()
+        first = self._run(analyzer)
+        second = self._run(analyzer)
+
+        assert analyzer.calls == 1
+        assert second[0].proposed_content == first[0].proposed_content
+        assert (Path(self.temp_dir) / ".governance-cache" / "fixes").is_dir()
+
+    def test_cache_directory_is_git_ignored(self):
+        """Test the project cache directory never shows up as untracked"""
+        import subprocess
+
+        subprocess.run(["git", "init", "-q"], cwd=self.temp_dir, check=True)
+        self._run(self.FakeAnalyzer())
+
+        status = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=all"],
+            cwd=self.temp_dir,
+            capture_output=True,
+            text=True,
+        ).stdout
+        assert (Path(self.temp_dir) / ".governance-cache" / "fixes").is_dir()
+        assert ".governance-cache" not in status
+        assert "A.java" in status
+
+    def test_disabled_cache_creates_no_directory(self, monkeypatch):
+        """Test FIX_CACHE=0 leaves no cache directory in the project"""
+        monkeypatch.setenv("FIX_CACHE", "0")
+        monkeypatch.delenv("FIX_CACHE_DIR", raising=False)
+        analyzer = self.FakeAnalyzer()
+        self._run(analyzer)
+        self._run(analyzer)
+
+        assert analyzer.calls == 2
+        assert not (Path(self.temp_dir) / ".governance-cache").exists()
+
+    def test_changed_inputs_invalidate(self):
+        """Test content, violations and prompt version all change the key"""
+        analyzer = self.FakeAnalyzer()
+        self._run(analyzer)
+
+        self.file.write_text("class A { }\n")
+        self._run(analyzer)
+        assert analyzer.calls == 2
+
+        self._run(analyzer, [dict(self.violations[0], message="other")])
+        assert analyzer.calls == 3
+
+        analyzer.PROMPT_TEMPLATE_VERSION = "2"
+        self._run(analyzer)
+        assert analyzer.calls == 4
+
+        analyzer.fix_settings = "format=patch"
+        self._run(analyzer)
+        assert analyzer.calls == 5
+
+    def test_violation_order_does_not_matter(self):
+        """Test keys use sorted violation fingerprints"""
+        from autofix.fix_cache import FixCache
+
+        cache = FixCache(self.temp_dir)
+        a = {"rule": "r1", "message": "x"}
+        b = {"rule": "r2", "message": "y", "line": 3}
+        analyzer = self.FakeAnalyzer()
+
+        assert cache.make_key("c", [a, b], analyzer) == cache.make_key(
+            "c", [b, a], analyzer
+        )
+        assert cache.make_key("c", [a], analyzer) != cache.make_key("c", [b], analyzer)
+
+    def test_fix_settings_change_the_key(self, monkeypatch):
+        """Test fix format, context slicing and packing are part of the key"""
+        from autofix.fix_cache import FixCache
+        from engines.copilot_analyzer import CopilotAnalyzer
+
+        cache = FixCache(self.temp_dir)
+        violations = [{"rule": "r1", "message": "x"}]
+
+        def key(settings=None):
+            return cache.make_key("c", violations, CopilotAnalyzer(), settings)
+
+        monkeypatch.setenv("COPILOT_FIX_FORMAT", "full")
+        whole_file = key()
+        monkeypatch.setenv("COPILOT_FIX_FORMAT", "patch")
+        search_replace = key()
+        monkeypatch.setenv("FIX_CONTEXT_MIN_LINES", "50")
+        sliced = key()
+
+        assert len({whole_file, search_replace, sliced}) == 3
+        assert key({"pack": None}) != key({"pack": [3000, 8, 1000]})
+
+
+class TestSpecTransforms:
+    """Test spec fixes applied over one parsed tree"""
+
+    SPEC = """openapi: 3.0.0
+info:
+  title: Users
+  version: '1'
+paths:
+  /userAccounts/{id}:
+    get:
+      operationId: getUserAccount
+      parameters:
+      - name: id
+        in: path
+        schema:
+          type: string
+components:
+  schemas:
+    UserAccount:
+      type: object
+      properties:
+        first_name:
+          type: string
+"""
+
+    RULES = [
+        "kebab-case-paths",
+        "versioning-required",
+        "operation-description-required",
+        "array-fields-plural",
+        "created-returns-resource",
+    ]
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Set up a project with one spec"""
+        from autofix.fix_cache import FixCache
+        from autofix.proposer import FixProposer
+
+        self.temp_dir = tempfile.mkdtemp()
+        (Path(self.temp_dir) / "api.yaml").write_text(self.SPEC)
+        self.proposer = FixProposer(
+            self.temp_dir,
+            use_copilot=False,
+            fix_cache=FixCache(self.temp_dir, enabled=False),
+        )
+        yield
+        shutil.rmtree(self.temp_dir)
+
+    def test_single_parse_matches_chained_fixers(self):
+        """Test the shared tree gives the same result as chaining fixers"""
+        from unittest.mock import patch
+        from autofix.fix_strategies import get_strategy
+        from autofix.yaml_edits import load_with_spans
+
+        expected = self.SPEC
+        for rule in self.RULES:
+            fixer = getattr(self.proposer, get_strategy(rule).fix_function)
+            result = fixer(expected, "", None)
+            if result:
+                expected = result[0]
+
+        violations = [
+            {"rule": rule, "message": "", "source": "api.yaml"} for rule in self.RULES
+        ]
+        with patch(
+            "autofix.spec_transforms.load_with_spans", wraps=load_with_spans
+        ) as parse:
+            job = self.proposer._prepare_file_job("api.yaml", violations)
+
+        assert job.current_content == expected
+        assert "/v1/user-accounts/{id}" in job.current_content
+        assert "firstName" in job.current_content
+        assert parse.call_count == 1
+
+    def test_unchanged_spec_goes_to_llm(self):
+        """Test fixes with nothing to change leave the text and defer to the LLM"""
+        violations = [
+            {"rule": "created-returns-resource", "message": "", "source": "api.yaml"}
+        ]
+        job = self.proposer._prepare_file_job("api.yaml", violations)
+
+        assert job.current_content == self.SPEC
+        assert job.llm_violations == violations
+
+    def test_failed_transform_changes_nothing(self):
+        """Test a transform that raises midway leaves no partial edits"""
+        import yaml
+        from autofix import spec_transforms as t
+        from autofix.spec_transforms import SpecTree
+
+        def half_applied(spec):
+            spec["paths"]["/half-applied"] = {}
+            spec["info"]["title"] = "Changed"
+            raise TypeError("name is not a string")
+
+        tree = SpecTree(self.SPEC)
+        with pytest.raises(TypeError):
+            tree.apply(half_applied)
+        assert tree.apply(t.kebab_case_paths)
+
+        fixed = yaml.safe_load(tree.serialize())
+        assert "/half-applied" not in fixed["paths"]
+        assert fixed["info"]["title"] == "Users"
+        assert "/user-accounts/{id}" in fixed["paths"]
+
+
+class TestYamlEdits:
+    """Test minimal text edits for fixed specs"""
+
+    SPEC = """openapi: 3.0.0
+paths:
+  # Accounts
+  /userAccounts/{id}:  # legacy name
+    get:
+      operationId: getAccount
+      responses:
+        "200":
+          description: OK
+components:
+  schemas:
+    Account:
+      type: object
+"""
+
+    def _fix(self, *transforms, content=None):
+        from autofix.spec_transforms import SpecTree
+
+        tree = SpecTree(content or self.SPEC)
+        for transform in transforms:
+            tree.apply(transform)
+        return tree, tree.serialize()
+
+    def test_edits_keep_comments_and_quoting(self):
+        """Test renames and insertions leave the rest of the text untouched"""
+        import yaml
+        from autofix import spec_transforms as t
+
+        tree, fixed = self._fix(t.kebab_case_paths, t.description_required)
+
+        assert tree.serialized_with == "minimal-edits"
+        assert "  # Accounts\n  /user-accounts/{id}:  # legacy name\n" in fixed
+        assert '"200":' in fixed
+        expected = yaml.safe_load(self.SPEC)
+        t.kebab_case_paths(expected)
+        t.description_required(expected)
+        assert yaml.safe_load(fixed) == expected
+
+        changed = [
+            line for line in fixed.splitlines() if line not in self.SPEC.splitlines()
+        ]
+        assert len(changed) == 4  # path, operation description and summary, schema
+
+    def test_insertions_stay_above_outer_trailing_comments(self):
+        """Test new entries land before comments of an enclosing level"""
+        import yaml
+        from autofix.yaml_edits import load_with_spans, render_minimal_edits
+
+        content = """paths:
+  /users:
+    get:
+      parameters:
+        - name: id
+      # get comment
+  # trailing comment
+components: {}
+"""
+        data, node = load_with_spans(content)
+        data["paths"]["/users"]["get"]["responses"] = {"200": {"description": "OK"}}
+        fixed = render_minimal_edits(content, node, data)
+
+        assert fixed.index("# get comment") < fixed.index("responses:")
+        assert fixed.index("responses:") < fixed.index("# trailing comment")
+        assert yaml.safe_load(fixed) == data
+
+    def test_json_spec_stays_json(self):
+        """Test insertions into flow mappings keep JSON valid"""
+        import json
+        from autofix import spec_transforms as t
+
+        content = json.dumps(
+            {"paths": {"/a": {"get": {"operationId": "getA"}}}}, indent=2
+        )
+        tree, fixed = self._fix(t.description_required, content=content)
+
+        assert tree.serialized_with == "minimal-edits"
+        assert json.loads(fixed)["paths"]["/a"]["get"]["summary"] == (
+            "TODO: Add summary for getA"
+        )
+
+    def test_unsupported_change_falls_back_to_dump(self):
+        """Test removed keys fall back to a full dump"""
+        import yaml
+
+        def drop_components(spec):
+            del spec["components"]
+            return True
+
+        tree, fixed = self._fix(drop_components)
+
+        assert tree.serialized_with == "dump"
+        assert "components" not in yaml.safe_load(fixed)
@@ -124,3 +124,598 @@ class TestArchUnitEngine:
         classpath = engine._get_classpath()
         assert isinstance(classpath, str)
         assert str(engine.resources_dir) in classpath
+
+
+class TestTokenBucketRateLimiter:
+    """Test shared rate limiter for remote LLM APIs"""
+
+    def test_retry_after_blocks_all_callers(self):
+        """Test Retry-After on a 429 pauses the bucket for that long"""
+        from engines.rate_limiter import TokenBucketRateLimiter
+
+        now = [100.0]
+        limiter = TokenBucketRateLimiter(requests_per_minute=60, clock=lambda: now[0])
+
+        wait = limiter.report_rate_limited({"Retry-After": "7"}, fallback=1)
+        assert wait == pytest.approx(7)
+        assert limiter.metrics.rate_limited_responses == 1
+        assert limiter._seconds_until_available(1) >= 7
+
+    def test_fallback_backoff_without_headers(self):
+        """Test 429 without hints falls back to the given pause"""
+        from engines.rate_limiter import TokenBucketRateLimiter
+
+        now = [0.0]
+        limiter = TokenBucketRateLimiter(clock=lambda: now[0])
+
+        assert limiter.report_rate_limited({}, fallback=4) == pytest.approx(4)
+
+    def test_ratelimit_headers_sync_bucket(self):
+        """Test x-ratelimit-* headers drain the bucket and set the reset window"""
+        from engines.rate_limiter import TokenBucketRateLimiter
+
+        now = [0.0]
+        limiter = TokenBucketRateLimiter(requests_per_minute=60, clock=lambda: now[0])
+        limiter.update_from_headers(
+            {
+                "x-ratelimit-limit-tokens": "10000",
+                "x-ratelimit-remaining-requests": "0",
+                "x-ratelimit-reset-requests": "1m30s",
+            }
+        )
+
+        assert limiter.tokens_per_minute == 10000
+        assert limiter._seconds_until_available(1) == pytest.approx(90)
+
+    def test_waiting_callers_served_in_order(self):
+        """Test throttled callers are served FIFO and counted in metrics"""
+        import asyncio
+        from engines.rate_limiter import TokenBucketRateLimiter
+
+        limiter = TokenBucketRateLimiter(requests_per_minute=1200)
+        limiter._request_level = 0  # Start with an empty bucket
+        order = []
+
+        async def caller(i):
+            await limiter.acquire()
+            order.append(i)
+
+        async def run():
+            await asyncio.gather(*(caller(i) for i in range(3)))
+
+        asyncio.run(run())
+
+        metrics = limiter.get_metrics()
+        assert order == [0, 1, 2]
+        assert metrics["requests_granted"] == 3
+        assert metrics["requests_throttled"] == 3
+        assert metrics["max_queue_depth"] == 3
+        assert metrics["queue_depth"] == 0
+
+
+class TestPatchFormat:
+    """Test patch-format fix responses"""
+
+    ORIGINAL = (
+        "public class UserService {\n"
+        "    private Random random = new Random();\n"
+        "\n"
+        "    public String token() {\n"
+        "        return String.valueOf(random.nextInt());\n"
+        "    }\n"
+        "}\n"
+    )
+
+    def test_search_replace_blocks_apply(self):
+        """Test search/replace blocks are applied in place"""
+        from engines.patch_format import apply_patch_response
+
+        response = (
+            "<<<<<<< SEARCH\n"
+            "    private Random random = new Random();\n"
+            "=======\n"
+            "    private SecureRandom random = new SecureRandom();\n"
+            ">>>>>>> REPLACE\n"
+        )
+
+        patched = apply_patch_response(self.ORIGINAL, response)
+        assert "new SecureRandom()" in patched
+        assert patched.count("\n") == self.ORIGINAL.count("\n")
+
+    def test_unified_diff_tolerates_line_drift(self):
+        """Test unified diff hunks apply even when line numbers are off"""
+        from engines.patch_format import apply_patch_response
+
+        response = (
+            "--- a/UserService.java\n"
+            "+++ b/UserService.java\n"
+            "@@ -40,3 +40,3 @@\n"
+            "     public String token() {\n"
+            "-        return String.valueOf(random.nextInt());\n"
+            "+        return Long.toHexString(random.nextLong());\n"
+            "     }\n"
+        )
+
+        patched = apply_patch_response(self.ORIGINAL, response)
+        assert "Long.toHexString(random.nextLong())" in patched
+        assert patched.endswith("}\n")
+
+    def test_unmatched_or_ambiguous_hunks_raise(self):
+        """Test hunks that don't apply cleanly are rejected"""
+        from engines.patch_format import PatchApplyError, apply_patch_response
+
+        missing = "<<<<<<< SEARCH\nnot in file\n=======\nx\n>>>>>>> REPLACE\n"
+        ambiguous = "<<<<<<< SEARCH\n}\n=======\n};\n>>>>>>> REPLACE\n"
+
+        with pytest.raises(PatchApplyError):
+            apply_patch_response(self.ORIGINAL, missing)
+        with pytest.raises(PatchApplyError):
+            apply_patch_response("{\n}\n{\n}\n", ambiguous)
+        with pytest.raises(PatchApplyError):
+            apply_patch_response(self.ORIGINAL, "Here is the fix!")
+        assert apply_patch_response(self.ORIGINAL, "NO_CHANGES") == self.ORIGINAL
+
+    def test_analyzer_falls_back_to_whole_file(self):
+        """Test CopilotAnalyzer falls back to whole-file mode when hunks fail"""
+        import asyncio
+        from engines.copilot_analyzer import CopilotAnalyzer
+
+        analyzer = CopilotAnalyzer(api_token="test", fix_format="patch")
+        fixed = self.ORIGINAL.replace("Random", "SecureRandom")
+        responses = ["<<<<<<< SEARCH\nmissing\n=======\nx\n>>>>>>> REPLACE", fixed]
+        prompts = []
+
+        async def fake_call(prompt, system_prompt=None, temperature=0.3, **kwargs):
+            prompts.append(prompt)
+            return responses.pop(0)
+
+        analyzer._call_copilot = fake_call
+        result = asyncio.run(
+            analyzer.generate_batch_fix(self.ORIGINAL, [{"rule": "r", "message": "m"}])
+        )
+
+        assert result.strip() == fixed.strip()
+        assert "SEARCH" in prompts[0] and "COMPLETE fixed file" in prompts[1]
+        assert analyzer.get_patch_stats() == {"applied": 0, "fallbacks": 1}
+
+
+class TestContextExtractor:
+    """Test context-window slicing for fix prompts"""
+
+    @staticmethod
+    def _java_source(methods=40):
+        lines = ["package com.example;", "", "import java.util.Random;", ""]
+        lines += ["public class UserController {", "    private Random random;", ""]
+        for i in range(methods):
+            lines += [
+                f"    /** Get user {i} */",
+                '    @GetMapping("/users")',
+                f"    public String get{i}(int id) {{",
+                f'        return "}}" + id; // {i}',
+                "    }",
+                "",
+            ]
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+    def test_java_slice_is_enclosing_method(self):
+        """Test a Java violation slices to its method with an outline"""
+        from engines.context_extractor import ContextExtractor
+
+        content = self._java_source()
+        context = ContextExtractor(min_file_lines=50).extract(
+            content, [{"file": "UserController.java", "line": 17}]
+        )
+
+        assert context is not None
+        assert context.text.splitlines()[0] == "    /** Get user 1 */"
+        assert context.text.splitlines()[-1] == "    }"
+        assert "import java.util.Random;" in context.outline
+        assert "private Random random;" in context.outline
+        assert "public String get2(int id) {" in context.outline
+        assert len(context.text) < len(content) / 10
+
+    def test_splice_restores_region_and_imports(self):
+        """Test the edited region is spliced back and new imports are added"""
+        from engines.context_extractor import ContextExtractor
+
+        content = self._java_source()
+        context = ContextExtractor(min_file_lines=50).extract(
+            content, [{"file": "UserController.java", "line": 17}]
+        )
+        edited = "import java.util.UUID;\n\n" + context.text.strip().replace(
+            "int id", "UUID id"
+        )
+
+        result = context.splice(content, edited)
+        lines = result.splitlines()
+        assert "import java.util.UUID;" in lines[:6]
+        assert "    public String get1(UUID id) {" in lines
+        assert "    public String get2(int id) {" in lines
+        assert len(lines) == len(content.splitlines()) + 1
+
+    def test_yaml_slice_follows_spec_path(self):
+        """Test a Spectral path selects the path item subtree"""
+        from engines.context_extractor import ContextExtractor
+
+        paths = "".join(
+            f"  /users{i}:\n    get:\n      responses:\n        '200':\n"
+            f"          description: ok\n"
+            for i in range(40)
+        )
+        content = f"openapi: 3.0.0\ninfo:\n  title: Test\npaths:\n{paths}"
+        context = ContextExtractor(min_file_lines=50).extract(
+            content,
+            [{"path": "paths./users3.get.responses", "source": "openapi.yaml"}],
+        )
+
+        assert context is not None
+        assert context.text.splitlines()[0] == "  /users3:"
+        assert "/users4" not in context.text
+        assert context.outline.splitlines() == ["openapi: 3.0.0", "# ...", "paths:"]
+
+    def test_small_or_unlocated_files_sent_whole(self):
+        """Test small files and violations without a location aren't sliced"""
+        from engines.context_extractor import ContextExtractor
+
+        extractor = ContextExtractor(min_file_lines=50)
+        assert (
+            extractor.extract("class A {}\n", [{"file": "A.java", "line": 1}]) is None
+        )
+        assert (
+            extractor.extract(self._java_source(), [{"file": "A.java", "message": "x"}])
+            is None
+        )
+        assert extractor.stats["whole_file"] == 2
+
+    def test_analyzer_sends_only_the_slice(self):
+        """Test CopilotAnalyzer prompts with the slice and splices the answer"""
+        import asyncio
+        from engines.copilot_analyzer import CopilotAnalyzer
+
+        content = self._java_source()
+        analyzer = CopilotAnalyzer(api_token="test", fix_format="full")
+        analyzer.context_extractor.min_file_lines = 50
+        prompts = []
+
+        async def fake_call(prompt, system_prompt=None, temperature=0.3, **kwargs):
+            prompts.append(prompt)
+            return (
+                "    /** Get user 1 */\n"
+                '    @GetMapping("/users")\n'
+                "    public String get1(long id) {\n"
+                '        return "}" + id; // 1\n'
+                "    }"
+            )
+
+        analyzer._call_copilot = fake_call
+        result = asyncio.run(
+            analyzer.generate_fix(
+                content, {"rule": "r", "message": "m", "file": "A.java", "line": 16}
+            )
+        )
+
+        assert len(prompts) == 1 and len(prompts[0]) < len(content) * 0.6
+        assert result == content.replace("get1(int id)", "get1(long id)")
+
+
+class TestMultiFileFix:
+    """Test packed multi-file fix requests"""
+
+    def test_multi_file_response_split_per_file(self):
+        """Test a packed response is split back into per-file contents"""
+        import asyncio
+        from engines.copilot_analyzer import CopilotAnalyzer
+
+        analyzer = CopilotAnalyzer(api_token="test")
+        files = {"src/A.java": "class A {}\n", "src/B.java": "class B {}\n"}
+
+        async def fake_call(prompt, system_prompt=None, temperature=0.3, **kwargs):
+            return (
+                "=== FILE: src/A.java ===\n```java\nfinal class A {}\n```\n"
+                "=== END FILE ===\n"
+                "=== FILE: B.java ===\nUNCHANGED\n=== END FILE ==="
+            )
+
+        analyzer._call_copilot = fake_call
+        result = asyncio.run(
+            analyzer.generate_multi_file_fix(files, {p: [] for p in files})
+        )
+
+        assert result == {
+            "src/A.java": "final class A {}\n",
+            "src/B.java": files["src/B.java"],
+        }
+
+    def test_llm_cross_file_fix_returns_files(self):
+        """Test LLMAnalyzer returns the fixed contents of related files"""
+        import asyncio
+        from engines.llm_analyzer import LLMAnalyzer
+
+        analyzer = LLMAnalyzer("http://unused")
+        files = {"/repo/api.yaml": "paths: {}\n", "/repo/Api.java": "class Api {}\n"}
+
+        async def fake_call(prompt, timeout=60):
+            return '{"api.yaml": "paths:\\n  /users: {}\\n"}'
+
+        analyzer._call_llm = fake_call
+        result = asyncio.run(
+            analyzer.generate_cross_file_fix(files, {"rule": "r", "message": "m"})
+        )
+
+        assert result == {"/repo/api.yaml": "paths:\n  /users: {}\n"}
+
+    def test_llm_yaml_slice_prompt_is_spec_specific(self):
+        """Test YAML slices aren't prompted as Java code"""
+        import asyncio
+        from engines.context_extractor import ContextExtractor
+        from engines.llm_analyzer import LLMAnalyzer
+
+        paths = "".join(
+            f"  /users{i}:\n    get:\n      description: ok\n" for i in range(40)
+        )
+        content = f"openapi: 3.0.0\npaths:\n{paths}"
+        context = ContextExtractor(min_file_lines=50).extract(
+            content, [{"path": "paths./users3.get", "source": "openapi.yaml"}]
+        )
+        analyzer = LLMAnalyzer("http://unused")
+        prompts = []
+
+        async def fake_call(prompt, timeout=60):
+            prompts.append(prompt)
+            return "  /users3:\n    get:\n      description: fixed"
+
+        analyzer._call_llm = fake_call
+        result = asyncio.run(analyzer._generate_slice_fix(content, context, "", 5))
+
+        assert "Java" not in prompts[0]
+        assert "description: fixed" in result
+
+
+class TestModelRouter:
+    """Test complexity-based routing between fast and strong models"""
+
+    class FakeAnalyzer:
+        """Analyzer that applies a fixed transformation"""
+
+        def __init__(self, model, transform):
+            self.model = model
+            self.transform = transform
+            self.calls = 0
+
+        async def generate_batch_fix(self, content, violations):
+            self.calls += 1
+            return self.transform(content)
+
+    def _router(self, fast_transform):
+        from engines.model_router import ModelRouter
+
+        fast = self.FakeAnalyzer("small", fast_transform)
+        strong = self.FakeAnalyzer("large", lambda c: c.replace("old", "strong"))
+        return ModelRouter(fast, strong), fast, strong
+
+    def test_simple_fix_stays_on_fast_model(self):
+        """Test simple/moderate rules are served by the fast model"""
+        import asyncio
+
+        router, fast, strong = self._router(lambda c: c.replace("old", "fast"))
+        violations = [{"rule": "coding-no-std-streams", "file": "A.java"}]
+        result = asyncio.run(router.generate_batch_fix("class A { old }", violations))
+
+        assert result == "class A { fast }"
+        assert (fast.calls, strong.calls) == (1, 0)
+        assert router.get_decisions()[0]["tier"] == "fast"
+
+    def test_complex_fix_goes_to_strong_model(self):
+        """Test complex rules skip the fast model"""
+        import asyncio
+        from autofix.fix_strategies import ALL_STRATEGIES, FixComplexity
+
+        complex_rule = next(
+            rule
+            for rule, strategy in ALL_STRATEGIES.items()
+            if strategy.complexity == FixComplexity.COMPLEX
+        )
+        router, fast, strong = self._router(lambda c: c.replace("old", "fast"))
+        asyncio.run(router.generate_batch_fix("old", [{"rule": complex_rule}]))
+
+        assert (fast.calls, strong.calls) == (0, 1)
+
+    def test_failed_validation_escalates(self):
+        """Test unbalanced or unchanged fast output escalates to the strong model"""
+        import asyncio
+
+        violations = [{"rule": "coding-no-std-streams", "file": "A.java"}]
+        router, fast, strong = self._router(lambda c: c.replace("}", ""))
+        result = asyncio.run(router.generate_batch_fix("class A { old }", violations))
+
+        assert result == "class A { strong }"
+        assert (fast.calls, strong.calls) == (1, 1)
+        escalation = router.get_decisions()[-1]
+        assert escalation["escalated"] and escalation["reason"] == "failed validation"
+        assert router.get_routing_stats()["strong"]["escalations"] == 1
+
+        router, fast, strong = self._router(lambda c: c)
+        asyncio.run(router.generate_batch_fix("class A { old }", violations))
+        assert router.get_decisions()[-1]["reason"] == "no change"
+
+
+class TestHedgedAnalyzer:
+    """Test hedged requests across LLM backends"""
+
+    class SleepyAnalyzer:
+        """Analyzer that answers after a delay"""
+
+        def __init__(self, model, delay, answer):
+            self.model = model
+            self.delay = delay
+            self.answer = answer
+            self.cancelled = False
+
+        async def generate_batch_fix(self, content, violations):
+            import asyncio
+
+            try:
+                await asyncio.sleep(self.delay)
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+            return self.answer if self.answer is not None else content
+
+    def test_slow_primary_hedged_and_cancelled(self):
+        """Test the secondary wins when the primary exceeds the hedge delay"""
+        import asyncio
+        from engines.hedged_analyzer import HedgedAnalyzer
+
+        primary = self.SleepyAnalyzer("remote", 1.0, "primary fix")
+        secondary = self.SleepyAnalyzer("local", 0.01, "secondary fix")
+        hedged = HedgedAnalyzer(primary, secondary, initial_delay=0.05, min_delay=0)
+
+        result = asyncio.run(hedged.generate_batch_fix("orig", []))
+
+        stats = hedged.get_hedge_stats()
+        assert result == "secondary fix"
+        assert primary.cancelled
+        assert stats["hedged"] == 1 and stats["secondary_wins"] == 1
+        assert stats["hedge_rate"] == 1.0
+
+    def test_lost_races_keep_the_hedge_delay(self):
+        """Test a primary that loses still counts as slow in the delay window"""
+        import asyncio
+        from engines.hedged_analyzer import HedgedAnalyzer
+
+        primary = self.SleepyAnalyzer("remote", 1.0, "primary fix")
+        secondary = self.SleepyAnalyzer("local", 0.0, "secondary fix")
+        hedged = HedgedAnalyzer(
+            primary, secondary, min_samples=1, initial_delay=0.2, min_delay=0
+        )
+        hedged._latencies.append(0.2)
+
+        async def run():
+            for _ in range(3):
+                await hedged.generate_batch_fix("orig", [])
+
+        asyncio.run(run())
+        assert len(hedged._latencies) == 4
+        assert hedged.hedge_delay() >= 0.2
+
+    def test_fast_primary_not_hedged(self):
+        """Test requests answered within the delay never reach the secondary"""
+        import asyncio
+        from engines.hedged_analyzer import HedgedAnalyzer
+
+        primary = self.SleepyAnalyzer("remote", 0.0, "primary fix")
+        secondary = self.SleepyAnalyzer("local", 0.0, "secondary fix")
+        hedged = HedgedAnalyzer(primary, secondary, min_samples=3, min_delay=0)
+
+        async def run():
+            return [await hedged.generate_batch_fix("orig", []) for _ in range(4)]
+
+        assert asyncio.run(run()) == ["primary fix"] * 4
+        assert hedged.get_hedge_stats()["hedged"] == 0
+        assert hedged.hedge_delay() < 0.5  # Learned from observed latencies
+
+    def test_invalid_secondary_waits_for_primary(self):
+        """Test a fallback (unchanged) secondary answer doesn't win"""
+        import asyncio
+        from engines.hedged_analyzer import HedgedAnalyzer
+
+        primary = self.SleepyAnalyzer("remote", 0.1, "primary fix")
+        secondary = self.SleepyAnalyzer("local", 0.0, None)
+        hedged = HedgedAnalyzer(primary, secondary, initial_delay=0.01, min_delay=0)
+
+        assert asyncio.run(hedged.generate_batch_fix("orig", [])) == "primary fix"
+        assert hedged.get_hedge_stats()["secondary_wins"] == 0
+
+    def test_truncated_secondary_waits_for_primary(self):
+        """Test a secondary answer cut off mid-file doesn't win"""
+        import asyncio
+        from engines.hedged_analyzer import HedgedAnalyzer
+
+        original = "class A {\n    void run() {}\n}\n"
+        primary = self.SleepyAnalyzer("remote", 0.1, "final " + original)
+        secondary = self.SleepyAnalyzer(
+            "local", 0.0, "final class A {\n    void run() {"
+        )
+        hedged = HedgedAnalyzer(primary, secondary, initial_delay=0.01, min_delay=0)
+        violations = [{"rule": "r", "file": "src/A.java"}]
+
+        result = asyncio.run(hedged.generate_batch_fix(original, violations))
+
+        assert result == "final " + original
+        assert hedged.get_hedge_stats()["secondary_wins"] == 0
+
+
+class TestLLMWarmUp:
+    """Test Ollama warm-up and keep_alive handling"""
+
+    async def _with_fake_ollama(self, analyzer_call, load_duration=0):
+        """Run analyzer_call(endpoint) against a local fake Ollama"""
+        from aiohttp import web
+
+        requests = []
+
+        async def generate(request):
+            payload = await request.json()
+            requests.append(payload)
+            return web.json_response(
+                {"response": "yes", "done": True, "load_duration": load_duration}
+            )
+
+        app = web.Application()
+        app.router.add_post("/api/generate", generate)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            result = await analyzer_call(f"http://127.0.0.1:{port}")
+        finally:
+            await runner.cleanup()
+        return result, requests
+
+    def test_keep_alive_sent_and_cold_load_detected(self):
+        """Test every request carries keep_alive and slow loads are counted"""
+        import asyncio
+        from engines.llm_analyzer import LLMAnalyzer
+
+        with patch.dict(os.environ, {"LLM_KEEP_ALIVE": "-1"}):
+            analyzer = LLMAnalyzer("http://unused")
+
+        async def call(endpoint):
+            analyzer.api_endpoint = endpoint
+            return await analyzer._call_llm("Is 'run' a verb?")
+
+        result, requests = asyncio.run(
+            self._with_fake_ollama(call, load_duration=4_000_000_000)
+        )
+
+        assert result == "yes"
+        assert requests[0]["keep_alive"] == -1
+        assert analyzer.cold_loads == 1
+
+    def test_warm_up_loads_model_without_prompt(self):
+        """Test warm-up sends a prompt-less request with keep_alive"""
+        import asyncio
+        from engines.llm_analyzer import LLMAnalyzer
+
+        with patch.dict(os.environ, {"LLM_KEEP_ALIVE": "1h"}):
+            analyzer = LLMAnalyzer("http://unused")
+
+        async def call(endpoint):
+            analyzer.api_endpoint = endpoint
+            return await analyzer.warm_up(timeout=5)
+
+        warmed, requests = asyncio.run(self._with_fake_ollama(call))
+
+        assert warmed is True
+        assert requests == [{"model": analyzer.model, "keep_alive": "1h"}]
+
+    def test_warm_up_unreachable_endpoint(self):
+        """Test warm-up reports failure instead of raising"""
+        import asyncio
+        from engines.llm_analyzer import LLMAnalyzer
+
+        analyzer = LLMAnalyzer("http://127.0.0.1:9")
+        assert asyncio.run(analyzer.warm_up(timeout=2)) is False
@@ -179,5 +179,142 @@ class TestOutputNormalizer:
         assert "service" in layers
 
 
+class TestFixSessionStore:
+    """Test the persistent fix-session store"""
+
+    @staticmethod
+    def _engine(project_path="/project", use_copilot=False):
+        from types import SimpleNamespace
+        from autofix.review_gate import ReviewGate
+
+        return SimpleNamespace(
+            project_path=Path(project_path),
+            use_copilot=use_copilot,
+            review_gate=ReviewGate(),
+            last_pr_info=None,
+        )
+
+    @staticmethod
+    def _fixes(count, size=10, blob_store=None):
+        from autofix.fix_strategies import get_strategy
+        from autofix.proposer import ProposedFix
+
+        return [
+            ProposedFix(
+                fix_id=f"fix-{i}",
+                rule_id="kebab-case-paths",
+                file_path=f"api{i}.yaml",
+                line_number=i,
+                original_content="a" * size,
+                proposed_content="b" * size,
+                explanation="Fix",
+                strategy=get_strategy("kebab-case-paths"),
+                additional_files=[("UserController.java", "class A {}")],
+                blob_store=blob_store,
+            )
+            for i in range(count)
+        ]
+
+    def _store(self, db_path, **kwargs):
+        from mcp_server.session_store import FixSessionStore
+
+        return FixSessionStore(
+            db_path=str(db_path),
+            engine_factory=lambda path, copilot: self._engine(path, copilot),
+            **kwargs,
+        )
+
+    def test_sessions_survive_restart_and_eviction(self, tmp_path):
+        """Test evicted or restarted sessions are rehydrated with their reviews"""
+        from autofix.review_gate import ReviewDecision
+
+        store = self._store(tmp_path / "sessions.db", max_cached=1)
+        for session_id in ("s1", "s2"):
+            engine = self._engine()
+            fixes = self._fixes(2)
+            store.put(session_id, engine, fixes, engine.review_gate.start_review(fixes))
+
+        engine, fixes, review_state = store.get("s2")
+        engine.review_gate.approve_fix("fix-1")
+        engine.review_gate.add_comment("fix-1", "ok")
+        store.save("s2")
+
+        # s1 was evicted from memory when s2 was stored
+        assert list(store._cache) == ["s2"]
+        assert store.get("s1") is not None
+        assert store.rehydrated == 1
+        store.close()
+
+        restarted = self._store(tmp_path / "sessions.db")
+        engine, fixes, review_state = restarted.get("s2")
+        assert [f.fix_id for f in review_state.approved_fixes] == ["fix-1"]
+        assert review_state.decisions["fix-0"] == ReviewDecision.PENDING
+        assert review_state.comments[0].comment == "ok"
+        assert fixes[0].strategy.rule_id == "kebab-case-paths"
+        assert fixes[0].additional_files == [("UserController.java", "class A {}")]
+        assert engine.review_gate.review_state is review_state
+        assert restarted.get("unknown") is None
+        restarted.close()
+
+    def test_ttl_memory_cap_and_session_limit(self, tmp_path):
+        """Test sessions are evicted by age and count, contents by memory"""
+        from autofix.blob_store import BlobStore
+
+        blob_store = BlobStore(str(tmp_path / "blobs"), cache_size_mb=1)
+        store = self._store(
+            tmp_path / "sessions.db",
+            max_sessions=2,
+            max_cached=1,
+            ttl_seconds=60,
+            blob_store=blob_store,
+        )
+        for session_id in ("s1", "s2", "s3"):
+            engine = self._engine()
+            fixes = self._fixes(
+                1, size=400 * 1024 + ord(session_id[1]), blob_store=blob_store
+            )
+            store.put(session_id, engine, fixes, engine.review_gate.start_review(fixes))
+
+        # ~800 KB of contents per session: only the latest fits under 1 MB
+        assert list(store._cache) == ["s3"]
+        assert blob_store._cached_size <= 1024 * 1024
+        # Only the two most recently used are kept on disk
+        assert store.get("s1") is None
+        assert store.get("s2") is not None
+        assert store.get("s2")[1][0].proposed_content == "b" * (400 * 1024 + ord("2"))
+
+        store._db().execute("UPDATE fix_sessions SET accessed_at = 0")
+        assert store.get("s3") is None
+        store.close()
+
+    def test_deleted_sessions_release_their_blobs(self, tmp_path):
+        """Test blobs of expired sessions are collected, others are kept"""
+        import os
+        from autofix.blob_store import BlobStore
+
+        blob_store = BlobStore(str(tmp_path / "blobs"), ttl_seconds=60)
+        store = self._store(
+            tmp_path / "sessions.db", max_sessions=1, blob_store=blob_store
+        )
+        for session_id in ("s1", "s2"):
+            engine = self._engine()
+            fixes = self._fixes(1, size=ord(session_id[1]), blob_store=blob_store)
+            store.put(session_id, engine, fixes, engine.review_gate.start_review(fixes))
+
+        # Unused for longer than the TTL, and not in memory
+        for path in (tmp_path / "blobs").glob("??/*"):
+            os.utime(path, (0, 0))
+        blob_store._cache.clear()
+        blob_store.gc()
+
+        store._cache.clear()
+        _, fixes, _ = store.get("s2")
+        assert fixes[0].original_content == "a" * ord("2")
+        # s1 was deleted beyond max_sessions: its own contents are gone
+        with pytest.raises(KeyError):
+            blob_store.get(BlobStore.hash_content("a" * ord("1")))
+        store.close()
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
@@ -130,3 +130,52 @@ class TestProjectDetector:
         # Invalid locations (build artifacts)
         assert not detector._is_valid_spec_location(Path("target/openapi.yaml"))
         assert not detector._is_valid_spec_location(Path("build/openapi.json"))
+
+
+class TestGovernanceScanner:
+    """Test the scan orchestration"""
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Create a project with one spec"""
+        self.temp_dir = tempfile.mkdtemp()
+        Path(self.temp_dir, "openapi.yaml").write_text(
+            "openapi: 3.0.0\ninfo:\n  title: Test\n  version: '1'\npaths: {}\n"
+        )
+        yield
+        shutil.rmtree(self.temp_dir)
+
+    def test_scan_does_not_wait_for_llm_warm_up(self):
+        """Test a slow model load neither blocks Spectral nor delays the scan"""
+        import asyncio
+        import threading
+        import time
+        from unittest.mock import patch
+        from scanner.governance_scanner import GovernanceScanner
+
+        loaded = threading.Event()
+
+        async def slow_warm_up(timeout=120):
+            await asyncio.sleep(3)
+            loaded.set()
+            return True
+
+        with patch.dict(os.environ, {"LLM_WARM_UP": "1"}):
+            scanner = GovernanceScanner(self.temp_dir, "ruleset.yaml", "http://unused")
+        scanner.llm.warm_up = slow_warm_up
+        spectral_threads = []
+
+        def run_spectral(spec):
+            spectral_threads.append(threading.current_thread())
+            return []
+
+        scanner.spectral.run_spectral = run_spectral
+        start = time.monotonic()
+        result = asyncio.run(
+            scanner.scan(output_path=os.path.join(self.temp_dir, "report.md"))
+        )
+
+        assert time.monotonic() - start < 2
+        assert not loaded.is_set()
+        assert len(result.spec_files) == 1
+        assert spectral_threads[0] is not threading.main_thread()
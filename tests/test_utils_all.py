@@ -427,3 +427,278 @@ class TestProjectUtils:
         assert not ProjectUtils.should_exclude_path(
             "src/main/java/User.java", self.temp_dir
         )
+
+
+class TestRouteIndex:
+    """Test the Spring controller route index"""
+
+    CONTROLLER = """package com.example.web;
+
+/**
+ * This class serves user accounts
+ */
+@RestController
+@RequestMapping(value = "/api/userAccounts", produces = "application/json")
+public class UserAccountController {
+
+    @GetMapping("/{id}")
+    public ResponseEntity<UserAccount> getAccount(@PathVariable String id) {
+        return null;
+    }
+
+    @RequestMapping(method = RequestMethod.POST)
+    public ResponseEntity<UserAccount> create(@RequestBody UserAccount account) {
+        return null;
+    }
+}
+"""
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Set up a project with one controller"""
+        self.temp_dir = tempfile.mkdtemp()
+        web_dir = os.path.join(self.temp_dir, "src", "main", "java", "web")
+        os.makedirs(web_dir)
+        self.controller = os.path.join(web_dir, "UserAccountController.java")
+        with open(self.controller, "w") as f:
+            f.write(self.CONTROLLER)
+        yield
+        shutil.rmtree(self.temp_dir)
+
+    def test_routes_combine_class_and_method_mappings(self):
+        """Test class prefixes, HTTP methods and method names are indexed"""
+        from utils.route_index import RouteIndex
+
+        index = RouteIndex(self.temp_dir)
+        routes = {(r.http_method, r.template, r.method_name) for r in index.routes()}
+
+        assert routes == {
+            ("GET", "/api/userAccounts/{id}", "getAccount"),
+            ("POST", "/api/userAccounts", "create"),
+        }
+        rel_path = "src/main/java/web/UserAccountController.java"
+        assert index.controllers_for_path("/v1/userAccounts/{accountId}") == [rel_path]
+        assert index.find_routes("/userAccounts/{x}", "POST") == []
+        assert index.controllers_for_resource("api") == [rel_path]
+
+    def test_persisted_index_only_reparses_changed_files(self):
+        """Test the on-disk index is reused until a file's mtime changes"""
+        from utils.route_index import RouteIndex
+
+        RouteIndex(self.temp_dir).refresh()
+        assert os.path.exists(
+            os.path.join(self.temp_dir, ".governance-cache", "route-index.json")
+        )
+
+        index = RouteIndex(self.temp_dir).refresh()
+        assert index.parsed_files == 0
+        assert len(index.routes()) == 2
+
+        with open(self.controller, "w") as f:
+            f.write(self.CONTROLLER.replace('"/{id}"', '"/{id}/profile"'))
+        os.utime(self.controller, ns=(1, 1))
+
+        index = RouteIndex(self.temp_dir).refresh()
+        assert index.parsed_files == 1
+        assert index.find_routes("/api/userAccounts/{id}/profile", "GET")
+
+
+class TestJavaTestIndex:
+    """Test the Java test-source index"""
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Set up a project with main, test and build sources"""
+        self.temp_dir = tempfile.mkdtemp()
+        files = [
+            "src/main/java/web/UserController.java",
+            "src/main/java/web/UserControllerTest.java",
+            "src/test/java/web/UserControllerTest.java",
+            "src/test/java/web/UserControllerIT.java",
+            "src/test/java/web/UserControllerSecurityTest.java",
+            "src/test/java/web/UserControllerHelper.java",
+            "target/test-classes/src/test/java/UserControllerTests.java",
+        ]
+        for rel_path in files:
+            path = os.path.join(self.temp_dir, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write("class X {}")
+        yield
+        shutil.rmtree(self.temp_dir)
+
+    def test_tests_for_class(self):
+        """Test naming-convention, base-name and prefix lookups"""
+        from utils.test_index import JavaTestIndex
+
+        index = JavaTestIndex(self.temp_dir)
+
+        assert index.tests_for_class("UserController") == [
+            "src/test/java/web/UserControllerTest.java",
+            "src/test/java/web/UserControllerIT.java",
+        ]
+        assert index.tests_for_class("User", base_name="User") == [
+            "src/test/java/web/UserControllerTest.java",
+            "src/test/java/web/UserControllerIT.java",
+        ]
+        assert index.tests_for_class("UserController", prefix_matches=True)[-1] == (
+            "src/test/java/web/UserControllerSecurityTest.java"
+        )
+
+    def test_shared_index_rescans_only_when_asked(self):
+        """Test lookups within a scan reuse one walk of the project"""
+        from utils.test_index import JavaTestIndex
+
+        index = JavaTestIndex.for_project(self.temp_dir)
+        assert len(index.files_named("UserControllerTest")) == 1
+
+        new_test = os.path.join(self.temp_dir, "src/test/java/UserControllerTests.java")
+        with open(new_test, "w") as f:
+            f.write("class UserControllerTests {}")
+
+        assert JavaTestIndex.for_project(self.temp_dir, rescan=False) is index
+        assert index.files_named("UserControllerTests") == []
+        JavaTestIndex.for_project(self.temp_dir)
+        assert index.files_named("UserControllerTests") == [
+            "src/test/java/UserControllerTests.java"
+        ]
+
+
+class TestAtomicFileWriter:
+    """Test atomic batch writes"""
+
+    @pytest.fixture(autouse=True)
+    def setup_teardown(self):
+        """Set up a project with existing files"""
+        self.temp_dir = tempfile.mkdtemp()
+        self.journal_dir = os.path.join(self.temp_dir, ".governance-cache", "journal")
+        for name in ("A.java", "B.java"):
+            with open(os.path.join(self.temp_dir, name), "w") as f:
+                f.write(f"class {name[0]} {{}}")
+        yield
+        shutil.rmtree(self.temp_dir)
+
+    def test_commit_writes_all_files(self):
+        """Test existing and new files are written and temp files removed"""
+        from utils.atomic_writer import AtomicFileWriter
+
+        writer = AtomicFileWriter(journal_dir=self.journal_dir, max_workers=4)
+        for i in range(20):
+            writer.add(Path(self.temp_dir) / "gen" / f"G{i}.java", f"class G{i} {{}}")
+        writer.add(Path(self.temp_dir) / "A.java", "class A { int x; }")
+
+        assert len(writer.commit()) == 21
+        assert (Path(self.temp_dir) / "A.java").read_text() == "class A { int x; }"
+        assert (Path(self.temp_dir) / "gen" / "G7.java").read_text() == "class G7 {}"
+        assert not list(Path(self.temp_dir).rglob("*.tmp"))
+        assert not list(Path(self.journal_dir).iterdir())
+
+    def test_failed_rename_rolls_back(self, monkeypatch):
+        """Test a failing write restores the files already replaced"""
+        from utils import atomic_writer
+        from utils.atomic_writer import AtomicFileWriter, AtomicWriteError
+
+        writer = AtomicFileWriter(journal_dir=self.journal_dir)
+        writer.add(Path(self.temp_dir) / "A.java", "class A { int x; }")
+        writer.add(Path(self.temp_dir) / "New.java", "class New {}")
+        writer.add(Path(self.temp_dir) / "B.java", "class B { int y; }")
+
+        real_replace = os.replace
+
+        def failing_replace(src, dst):
+            if str(dst).endswith("B.java"):
+                raise OSError("disk full")
+            real_replace(src, dst)
+
+        monkeypatch.setattr(atomic_writer.os, "replace", failing_replace)
+        with pytest.raises(AtomicWriteError):
+            writer.commit()
+        monkeypatch.setattr(atomic_writer.os, "replace", real_replace)
+
+        assert (Path(self.temp_dir) / "A.java").read_text() == "class A {}"
+        assert (Path(self.temp_dir) / "B.java").read_text() == "class B {}"
+        assert not (Path(self.temp_dir) / "New.java").exists()
+        assert not list(Path(self.temp_dir).rglob("*.tmp"))
+
+    def test_failed_stage_removes_every_temp_file(self):
+        """Test files staged next to a failing one don't leave temp files"""
+        from utils.atomic_writer import AtomicFileWriter, AtomicWriteError
+
+        writer = AtomicFileWriter(journal_dir=self.journal_dir, max_workers=4)
+        # A.java is a file, so nothing can be created below it
+        writer.add(Path(self.temp_dir) / "A.java" / "F.txt", "unwritable")
+        for i in range(5):
+            writer.add(Path(self.temp_dir) / f"f{i}.txt", f"file {i}")
+
+        with pytest.raises(AtomicWriteError):
+            writer.commit()
+
+        assert not list(Path(self.temp_dir).rglob("*.tmp"))
+        assert not (Path(self.temp_dir) / "f0.txt").exists()
+
+    def test_recover_restores_interrupted_batch(self):
+        """Test the next batch rolls back a batch left journaled by a crash"""
+        import subprocess
+        from utils.atomic_writer import AtomicFileWriter
+
+        writer = AtomicFileWriter(journal_dir=self.journal_dir)
+        targets = [Path(self.temp_dir) / "A.java", Path(self.temp_dir) / "C.java"]
+        journal = writer._write_journal(targets)
+        # Crash after both renames, in a process that no longer exists
+        for target, content in zip(targets, ["class A { broken", "class C {}"]):
+            tmp_path = target.with_suffix(".tmp")
+            tmp_path.write_text(content)
+            os.replace(tmp_path, target)
+        dead = subprocess.Popen(["true"])
+        dead.wait()
+        journal.rename(journal.with_name(f"batch-{dead.pid}-1-crashed"))
+
+        # A batch of a running process is left alone
+        live = writer._write_journal([Path(self.temp_dir) / "B.java"])
+        assert AtomicFileWriter.recover(self.journal_dir) == 2
+        assert targets[0].read_text() == "class A {}"
+        assert not targets[1].exists()
+        assert live.exists()
+
+        targets[0].write_text("class A { broken")
+        journal = writer._write_journal(targets[:1])
+        journal.rename(journal.with_name(f"batch-{dead.pid}-1-crashed"))
+        writer.add(Path(self.temp_dir) / "D.java", "class D {}")
+        writer.commit()
+        assert targets[0].read_text() == "class A { broken"
+
+    def test_reused_pid_batch_is_recovered(self):
+        """Test a crashed batch is rolled back when its PID is alive again"""
+        from utils import atomic_writer
+        from utils.atomic_writer import AtomicFileWriter
+
+        if not atomic_writer._process_start_time(os.getpid()):
+            pytest.skip("process start times need /proc")
+        writer = AtomicFileWriter(journal_dir=self.journal_dir)
+        target = Path(self.temp_dir) / "A.java"
+        journal = writer._write_journal([target])
+        tmp_path = target.with_suffix(".tmp")
+        tmp_path.write_text("class A { broken")
+        os.replace(tmp_path, target)
+        # Same PID as this process (e.g. PID 1 in a restarted container),
+        # but another start time
+        journal.rename(journal.with_name(f"batch-{os.getpid()}-1-crashed"))
+
+        assert AtomicFileWriter.recover(self.journal_dir) == 1
+        assert target.read_text() == "class A {}"
+
+    def test_new_files_follow_umask(self, monkeypatch):
+        """Test new files get open()'s mode and existing files keep theirs"""
+        from utils import atomic_writer
+        from utils.atomic_writer import AtomicFileWriter
+
+        existing = Path(self.temp_dir) / "A.java"
+        os.chmod(existing, 0o755)
+        monkeypatch.setattr(atomic_writer, "_UMASK", 0o022)
+        writer = AtomicFileWriter(journal_dir=self.journal_dir)
+        writer.add(Path(self.temp_dir) / "New.java", "class New {}")
+        writer.add(existing, "class A { int x; }")
+        writer.commit()
+
+        assert (Path(self.temp_dir) / "New.java").stat().st_mode & 0o777 == 0o644
+        assert existing.stat().st_mode & 0o777 == 0o755